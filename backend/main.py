@@ -29,7 +29,7 @@ from error_handlers import (
     sqlalchemy_exception_handler,
     validation_exception_handler,
 )
-from routers.common import files_router, push_router, upload_router
+from routers.common import exports_router, files_router, push_router, upload_router
 from routers.finance import ledger_router, subjects_router
 from routers.investment import investment_router
 from routers.leads import leads_router
@@ -55,6 +55,11 @@ from routers.system import (
     roles_router,
     users_router,
 )
+from services.exports import start_embedded_export_workers
+from services.market import start_embedded_import_workers, start_media_downloads
+from services.recruit.events import start_recruit_event_flusher, stop_recruit_event_flusher
+from services.reports.warmer import start_report_cache_warmer
+from services.system import ApiKeyService
 from services.system.exceptions import ServiceException
 from settings import settings
 from utils.common import limiter
@@ -135,11 +140,26 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:  # noqa: ARG001
         logger.exception("Redis 连接失败，应用无法启动")
         sys.exit(1)
 
+    # 导入工作线程：消费持久化导入队列（含上次进程退出时中断的任务）
+    start_embedded_import_workers()
+    # 续跑上次进程退出时未完成的户型图下载任务（后台线程，不阻塞启动）
+    start_media_downloads()
+    # 报表缓存预热线程（导入完成后与定时预热默认报表视图）
+    start_report_cache_warmer()
+    # 后台导出工作线程：生成排队的导出文件并清理过期文件
+    start_embedded_export_workers()
+    # 招募访问/分享埋点批量写库线程
+    start_recruit_event_flusher()
+
     logger.info("Application started successfully: %s v%s", settings.app_name, settings.app_version)
 
     yield
 
     logger.info("Application is shutting down...")
+    # 写回进程内缓冲的 API Key 最后使用时间
+    ApiKeyService.flush_last_used()
+    # 停止埋点写入线程（未确认的埋点留在 Redis Stream 中由其他进程认领）
+    stop_recruit_event_flusher()
 
 
 app = FastAPI(
@@ -178,6 +198,7 @@ app = FastAPI(
         {"name": "upload", "description": "文件上传与导入任务"},
         {"name": "push", "description": "JSON 数据推送"},
         {"name": "files", "description": "文件管理"},
+        {"name": "exports", "description": "后台导出任务"},
         {"name": "monitor", "description": "市场监控与竞品分析"},
         {"name": "public-auth", "description": "C端公开 - 认证"},
         {"name": "public-users", "description": "C端公开 - 用户资料"},
@@ -308,6 +329,7 @@ app.include_router(operation_logs_router, prefix=API_V1_PREFIX)
 app.include_router(upload_router, prefix=API_V1_PREFIX)
 app.include_router(push_router, prefix=API_V1_PREFIX)
 app.include_router(files_router, prefix=API_V1_PREFIX)
+app.include_router(exports_router, prefix=API_V1_PREFIX)
 app.include_router(monitor_router, prefix=API_V1_PREFIX)
 app.include_router(public_auth_router, prefix=API_V1_PREFIX)
 app.include_router(public_users_router, prefix=API_V1_PREFIX)
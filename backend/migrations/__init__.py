@@ -21,6 +21,7 @@ SQLite）下，迁移只执行跨方言通用的 DDL（建列等），PG 专属
 - ``_type_migrations``：timestamp → timestamptz、VARCHAR → date / text 等列类型合规性修复
 - ``_permission_system``：微信 OAuth 表、user_roles、权限系统三张表与索引
 - ``_search_indexes``：模糊搜索 pg_trgm GIN 索引（O1：前导通配符 LIKE 全表扫描）
+- ``_market_import``：房源导入链路（外站媒体下载任务表、导入任务进度/来源列、报表统计汇总表、房源列表游标分页索引）
 - 其余独立迁移（add_counterparty_type / fix_image_urls / migrate_uploads_to_oss 等）保留为单独模块
 
 迁移清单：
@@ -90,6 +91,19 @@ SQLite）下，迁移只执行跨方言通用的 DDL（建列等），PG 专属
 - add_trgm_search_indexes: 安装 pg_trgm 并为 leads/communities/investments/
   projects/project_contracts/users/l4_marketing_projects 的模糊搜索列创建
   trigram GIN 表达式索引，加速 lower(col) 及普通 LIKE '%kw%' 前导通配符查询（O1，幂等）
+- create_media_download_jobs_table: 幂等创建 media_download_jobs 表（户型图下载与导入事务解耦，
+  导入先写外站 URL，下载工作池异步下载后回写 property_media/community_images）
+- add_import_task_media_columns: 为 property_import_tasks 表添加 media_total/media_downloaded/
+  media_failed 列（导入任务的户型图下载进度）
+- add_import_task_queue_columns: 为 property_import_tasks 表添加 worker_id/heartbeat_at/attempts 列
+  （持久化导入队列：多工作进程 SKIP LOCKED 领取，崩溃后从最后提交的批次续跑）
+- add_import_task_source_type_column: 为 property_import_tasks 表添加 source_type 列
+  （JSON 推送异步任务与 CSV 上传任务共用导入队列）
+- build_market_stats_rollups: 幂等创建 market_stats_rollups 报表统计汇总表，为空时从 property_current
+  全量构建（报表 KPI/趋势/商圈/小区/对比统计改读汇总行，之后由房源写入事务按小区增量维护）
+- add_property_keyset_index: 为 property_current 创建 (updated_at, id) 索引（房源列表游标分页续翻）
+- add_image_key_to_qr_scenes: 为 recruit_qr_scenes 表添加 image_key 列（小程序码图片写入存储后端后
+  按短码复用，不再每次请求调用微信接口）
 
 """
 
@@ -116,6 +130,14 @@ from migrations._finance import (
 # 重新导出供外部模块（conftest.py 等）使用 —— 以下导入必须放在迁移子模块导入之前，
 # 以避免出现循环导入：子模块（如 _finance）会反向 from migrations import _column_exists。
 from migrations._helpers import _MIGRATION_ADVISORY_LOCK_KEY, _column_exists
+from migrations._market_import import (
+    add_import_task_media_columns,
+    add_import_task_queue_columns,
+    add_import_task_source_type_column,
+    add_property_keyset_index,
+    build_market_stats_rollups,
+    create_media_download_jobs_table,
+)
 from migrations._permission_system import (
     add_permission_foreign_indexes,
     add_reports_indexes,
@@ -125,6 +147,7 @@ from migrations._permission_system import (
     migrate_project_business_permission,
 )
 from migrations._recruit import (
+    add_image_key_to_qr_scenes,
     add_poster_bg_url_to_campaigns,
     create_recruit_tables,
     ensure_visit_referrer_index,
@@ -267,8 +290,21 @@ def _run_all_migrations(engine: Engine) -> None:
         # 招募计划二期：补建 recruit_campaigns.poster_bg_url 列与 recruit_visits.referrer 索引
         add_poster_bg_url_to_campaigns(engine)
         ensure_visit_referrer_index(engine)
+        # 小程序码图片缓存：recruit_qr_scenes.image_key 列
+        add_image_key_to_qr_scenes(engine)
         # O1：模糊搜索 pg_trgm GIN 索引（前导通配符 LIKE 全表扫描修复）
         add_trgm_search_indexes(engine)
+        # 户型图下载与导入事务解耦：下载任务表 + 导入任务下载进度列
+        create_media_download_jobs_table(engine)
+        add_import_task_media_columns(engine)
+        # 持久化导入队列：领取/心跳列
+        add_import_task_queue_columns(engine)
+        # JSON 推送异步任务：任务来源列
+        add_import_task_source_type_column(engine)
+        # 报表统计汇总表：为空时从房源全量构建
+        build_market_stats_rollups(engine)
+        # 房源列表游标分页索引
+        add_property_keyset_index(engine)
         # 数据迁移（不改 schema，放在末尾）：仅 storage_backend=oss 时执行，local 模式跳过
         migrate_uploads_to_oss(engine)
     except Exception:
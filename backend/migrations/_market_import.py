@@ -0,0 +1,125 @@
+"""房源导入链路迁移.
+
+- ``create_media_download_jobs_table``：幂等创建外站媒体下载任务表 ``media_download_jobs``
+- ``add_import_task_media_columns``：为 ``property_import_tasks`` 表添加媒体下载进度列
+- ``add_import_task_queue_columns``：为 ``property_import_tasks`` 表添加持久化队列领取/心跳列
+- ``add_import_task_source_type_column``：为 ``property_import_tasks`` 表添加任务来源列（CSV 上传 / JSON 推送）
+- ``build_market_stats_rollups``：幂等创建报表统计汇总表 ``market_stats_rollups``，为空时从房源全量构建
+- ``add_property_keyset_index``：为 ``property_current`` 创建游标分页索引 ``(updated_at, id)``
+"""
+
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from migrations._helpers import _column_exists, _index_exists
+
+logger = logging.getLogger(__name__)
+
+
+def create_media_download_jobs_table(engine: Engine) -> None:
+    """幂等创建 ``media_download_jobs`` 表与索引（CREATE TABLE IF NOT EXISTS 语义）."""
+    from models import Base
+    from models.property import MediaDownloadJob
+
+    inspector = inspect(engine)
+    if MediaDownloadJob.__table__.name not in inspector.get_table_names():
+        logger.info("迁移：创建外站媒体下载任务表 %s", MediaDownloadJob.__table__.name)
+        Base.metadata.create_all(bind=engine, tables=[MediaDownloadJob.__table__], checkfirst=True)
+
+
+def add_import_task_media_columns(engine: Engine) -> None:
+    """为 property_import_tasks 表添加媒体下载进度列（幂等）.
+
+    - media_total: 本任务入队的户型图下载数
+    - media_downloaded: 已下载并回写 URL 数
+    - media_failed: 重试耗尽的下载数
+    """
+    # 列名来自硬编码元组，无注入风险；DDL 不支持绑定参数
+    for column_name in ("media_total", "media_downloaded", "media_failed"):
+        if _column_exists(engine, "property_import_tasks", column_name):
+            continue
+        logger.info("迁移：为 property_import_tasks 表添加 %s 列", column_name)
+        ddl = "ALTER TABLE property_import_tasks ADD COLUMN " + column_name + " INTEGER NOT NULL DEFAULT 0"
+        with engine.begin() as conn:
+            conn.execute(text(ddl))
+
+
+def add_import_task_queue_columns(engine: Engine) -> None:
+    """为 property_import_tasks 表添加持久化队列列（幂等）.
+
+    - worker_id: 当前处理任务的工作进程标识
+    - heartbeat_at: 最近一次批次提交时间，超时视为工作进程崩溃
+    - attempts: 领取次数
+    """
+    columns = {
+        "worker_id": "VARCHAR(100)",
+        "heartbeat_at": "TIMESTAMP WITH TIME ZONE",
+        "attempts": "INTEGER NOT NULL DEFAULT 0",
+    }
+    # 列名/类型来自硬编码字典，无注入风险；DDL 不支持绑定参数
+    for column_name, column_type in columns.items():
+        if _column_exists(engine, "property_import_tasks", column_name):
+            continue
+        logger.info("迁移：为 property_import_tasks 表添加 %s 列", column_name)
+        ddl = "ALTER TABLE property_import_tasks ADD COLUMN " + column_name + " " + column_type
+        with engine.begin() as conn:
+            conn.execute(text(ddl))
+
+
+def add_import_task_source_type_column(engine: Engine) -> None:
+    """为 property_import_tasks 表添加 source_type 列（幂等）.
+
+    JSON 推送接口的异步任务与 CSV 上传任务共用持久化导入队列，按该列区分文件格式；
+    已有任务均为 CSV 上传，默认值 csv。
+    """
+    if _column_exists(engine, "property_import_tasks", "source_type"):
+        return
+    logger.info("迁移：为 property_import_tasks 表添加 source_type 列")
+    with engine.begin() as conn:
+        conn.execute(
+            text("ALTER TABLE property_import_tasks ADD COLUMN source_type VARCHAR(20) NOT NULL DEFAULT 'csv'")
+        )
+
+
+def build_market_stats_rollups(engine: Engine) -> None:
+    """幂等创建 ``market_stats_rollups`` 表，汇总表为空且存在有效房源时全量构建.
+
+    之后由房源写入事务按小区增量维护（见 ``services.market.stats_rollup``）。
+    """
+    from models import Base
+    from models.property import MarketStatsRollup
+    from services.market.stats_rollup import rebuild_market_rollups
+
+    table_name = MarketStatsRollup.__table__.name
+    if table_name not in inspect(engine).get_table_names():
+        logger.info("迁移：创建报表统计汇总表 %s", table_name)
+        Base.metadata.create_all(bind=engine, tables=[MarketStatsRollup.__table__], checkfirst=True)
+
+    with engine.connect() as conn:
+        has_rollups = conn.execute(text("SELECT EXISTS (SELECT 1 FROM market_stats_rollups)")).scalar()
+        has_properties = conn.execute(
+            text("SELECT EXISTS (SELECT 1 FROM property_current WHERE is_active IS TRUE)")
+        ).scalar()
+    if has_rollups or not has_properties:
+        return
+
+    logger.info("迁移：全量构建报表统计汇总表 %s", table_name)
+    with Session(bind=engine) as db:
+        rebuild_market_rollups(db)
+        db.commit()
+
+
+def add_property_keyset_index(engine: Engine) -> None:
+    """为 property_current 创建游标分页索引 (updated_at, id)（幂等）.
+
+    房源列表游标分页按 ``updated_at DESC, id DESC`` 排序并以 ``(updated_at, id) < (?, ?)`` 续翻，
+    该索引使每页只扫描 page_size 行，不随翻页深度增长。
+    """
+    if _index_exists(engine, "idx_property_updated_keyset"):
+        return
+    logger.info("迁移：创建 idx_property_updated_keyset 索引 (updated_at, id)")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX idx_property_updated_keyset ON property_current (updated_at, id)"))
@@ -152,6 +152,23 @@ def add_poster_bg_url_to_campaigns(engine: Engine) -> None:
         conn.execute(text("ALTER TABLE recruit_campaigns ADD COLUMN poster_bg_url VARCHAR(500)"))
 
 
+def add_image_key_to_qr_scenes(engine: Engine) -> None:
+    """为 ``recruit_qr_scenes`` 表补建 ``image_key`` 列（幂等）.
+
+    小程序码图片首次生成后写入存储后端并记录存储键，之后按短码直接读取存储，
+    不再重复调用微信接口。已部署环境（表已存在）需显式 ``ALTER TABLE ... ADD COLUMN``；
+    存量短码该列为空，首次访问时生成并回填。
+    """
+    if "recruit_qr_scenes" not in _get_table_names(engine):
+        return
+    if _column_exists(engine, "recruit_qr_scenes", "image_key"):
+        return
+    logger.info("迁移：为 recruit_qr_scenes 表添加 image_key 列")
+    with engine.begin() as conn:
+        # 列名/类型硬编码,无注入风险;DDL 不支持绑定参数
+        conn.execute(text("ALTER TABLE recruit_qr_scenes ADD COLUMN image_key VARCHAR(200)"))
+
+
 def ensure_visit_referrer_index(engine: Engine) -> None:
     """幂等补建 ``recruit_visits.referrer_employee_id`` 索引.
 
@@ -11,6 +11,7 @@ from .common import (
     CashFlowCategory,
     CashFlowType,
     ChangeType,
+    ExportJobStatus,
     FinanceActionType,
     FollowUpMethod,
     ImportTaskStatus,
@@ -72,6 +73,11 @@ from .property import (
     CommunityCompetitor,
     CommunityImage,
     CommunityImageSource,
+    MarketStatsRollup,
+    MediaDownloadJob,
+    MediaDownloadStatus,
+    MediaObject,
+    MediaSourceUrl,
     PropertyCurrent,
     PropertyHistory,
     PropertyMedia,
@@ -90,7 +96,7 @@ from .recruit import (
 )
 
 # 系统模块
-from .system import FailedRecord, OperationLog, PropertyImportTask, WeChatOAuthState, WeChatTempCode
+from .system import ExportJob, FailedRecord, OperationLog, PropertyImportTask, WeChatOAuthState, WeChatTempCode
 
 # 用户权限模块
 from .user import (
@@ -121,6 +127,8 @@ __all__ = [
     "CommunityImage",
     "CommunityImageSource",
     # 系统
+    "ExportJob",
+    "ExportJobStatus",
     "FailedRecord",
     "FinanceActionType",
     "FinanceRecord",
@@ -141,7 +149,12 @@ __all__ = [
     "LeadFollowUp",
     "LeadPriceHistory",
     "LeadStatus",
+    "MarketStatsRollup",
     "MarketingProjectStatus",
+    "MediaDownloadJob",
+    "MediaDownloadStatus",
+    "MediaObject",
+    "MediaSourceUrl",
     "MediaType",
     "OperationLog",
     "Permission",
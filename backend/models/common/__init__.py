@@ -12,6 +12,7 @@ from .base import (
     ChangeType,
     CounterpartyType,
     DocumentSignoffStatus,
+    ExportJobStatus,
     FinanceActionType,
     FollowUpMethod,
     ImportTaskStatus,
@@ -38,6 +39,7 @@ __all__ = [
     "ChangeType",
     "CounterpartyType",
     "DocumentSignoffStatus",
+    "ExportJobStatus",
     "FinanceActionType",
     "FollowUpMethod",
     "ImportTaskStatus",
@@ -186,6 +186,16 @@ class ImportTaskStatus(str, enum.Enum):
     CANCELLED = "cancelled"  # 已取消
 
 
+class ExportJobStatus(str, enum.Enum):
+    """导出任务状态枚举."""
+
+    PENDING = "pending"  # 待处理
+    PROCESSING = "processing"  # 生成中
+    COMPLETED = "completed"  # 完成（可下载）
+    FAILED = "failed"  # 失败
+    EXPIRED = "expired"  # 文件已过期清理
+
+
 class SettlementStatus(str, enum.Enum):
     """跟投结算状态枚举."""
 
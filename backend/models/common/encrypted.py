@@ -1,17 +1,25 @@
-"""加密字符串类型，基于 Fernet 自动加解密.
+"""加密字符串列，基于 Fernet 加解密，访问属性时惰性解密.
 
-写入数据库时自动加密，读取时自动解密，对 Service 层透明。
+映射列保存 Fernet 密文（``EncryptedString`` 类型，读写不做转换），模型上同名的
+``EncryptedAttribute`` 描述符在赋值时加密、在读取属性时才解密，对 Service 层透明：
+
+    _phone: Mapped[str | None] = mapped_column("phone", EncryptedString(20), nullable=True)
+    phone = EncryptedAttribute("_phone")
+
+加载实体不再逐行解密所有加密列，列表/导出只为实际访问的字段付出解密开销。
 底层存储为 Text，密文为 base64 编码的 Fernet token（远长于明文）。
 """
 
 from sqlalchemy import Text, TypeDecorator
+from sqlalchemy import inspect as sa_inspect
 
 
 class EncryptedString(TypeDecorator):
-    """加密字符串类型.
+    """加密字符串列类型（列值为 Fernet 密文）.
 
     继承 TypeDecorator，impl 用 Text（无长度限制，适配 Fernet 密文），cache_ok = True。
-    写入时自动加密，读取时自动解密。
+    加解密由 ``EncryptedAttribute`` 在属性赋值/访问时完成；Core 查询直接选取该列得到密文，
+    需用 ``utils.crypto.decrypt`` 解密。
 
     构造时传入的 length 仅作为明文长度元数据（self.plaintext_length）保存，
     不透传给底层 Text impl——Fernet 密文为 base64 编码，长度远超明文，
@@ -30,25 +38,52 @@ class EncryptedString(TypeDecorator):
         super().__init__()
         self.plaintext_length = length
 
-    def process_bind_param(self, value: str | None, dialect: object) -> str | None:  # noqa: ARG002
-        """写入数据库时加密.
 
-        若 ``self.plaintext_length`` 不为 None，加密前校验明文长度，
-        超长时抛 ``ValueError`` 阻止写入。
-        """
-        if value is None:
-            return None
-        if self.plaintext_length is not None and len(value) > self.plaintext_length:
-            msg = f"明文长度 {len(value)} 超过限制 {self.plaintext_length}"
-            raise ValueError(msg)
-        from utils.crypto import encrypt
+class EncryptedAttribute:
+    """加密列的明文属性描述符.
+
+    - 实例读取：解密映射列中的密文，按密文缓存在实例上（密文变化后自动重新解密）
+    - 实例赋值：校验明文长度（``EncryptedString.plaintext_length``）后加密写入映射列，
+      超长时抛 ``ValueError`` 阻止写入
+    - 类级访问：返回映射列属性，可用于查询条件与列选取（得到密文）
+    """
+
+    def __init__(self, column_attr: str) -> None:
+        """初始化描述符.
 
-        return encrypt(value)
+        :param column_attr: 保存密文的映射列属性名。
+        """
+        self.column_attr = column_attr
+        self._cache_key = f"{column_attr}_plaintext"
 
-    def process_result_value(self, value: str | None, dialect: object) -> str | None:  # noqa: ARG002
-        """从数据库读取时解密."""
-        if value is None or value == "":
+    def __get__(self, obj: object | None, objtype: type | None = None) -> object:
+        """读取明文（类级访问返回映射列属性）."""
+        if obj is None:
+            return getattr(objtype, self.column_attr)
+        token = getattr(obj, self.column_attr)
+        if not token:
             return None
+        cached = obj.__dict__.get(self._cache_key)
+        if cached is not None and cached[0] == token:
+            return cached[1]
         from utils.crypto import decrypt
 
-        return decrypt(value)
+        plaintext = decrypt(token)
+        obj.__dict__[self._cache_key] = (token, plaintext)
+        return plaintext
+
+    def __set__(self, obj: object, value: str | None) -> None:
+        """加密明文并写入映射列."""
+        if value is None:
+            setattr(obj, self.column_attr, None)
+            obj.__dict__.pop(self._cache_key, None)
+            return
+        length = sa_inspect(type(obj)).attrs[self.column_attr].columns[0].type.plaintext_length
+        if length is not None and len(value) > length:
+            msg = f"明文长度 {len(value)} 超过限制 {length}"
+            raise ValueError(msg)
+        from utils.crypto import encrypt
+
+        token = encrypt(value)
+        setattr(obj, self.column_attr, token)
+        obj.__dict__[self._cache_key] = (token, value)
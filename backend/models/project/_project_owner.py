@@ -6,7 +6,7 @@ from sqlalchemy import Boolean, Index, String, Text, Uuid
 from sqlalchemy.orm import Mapped, mapped_column
 
 from models.common.base import BaseModel
-from models.common.encrypted import EncryptedString
+from models.common.encrypted import EncryptedAttribute, EncryptedString
 
 
 class ProjectOwner(BaseModel):
@@ -17,10 +17,28 @@ class ProjectOwner(BaseModel):
     project_id: Mapped[uuid.UUID] = mapped_column(Uuid, nullable=False, comment="项目ID(逻辑外键)")
 
     owner_name: Mapped[str | None] = mapped_column(String(100), nullable=True, comment="业主姓名")
-    owner_phone: Mapped[str | None] = mapped_column(EncryptedString(500), nullable=True, comment="业主联系方式")
-    owner_id_card: Mapped[str | None] = mapped_column(EncryptedString(500), nullable=True, comment="业主身份证号")
+    _owner_phone: Mapped[str | None] = mapped_column(
+        "owner_phone",
+        EncryptedString(500),
+        nullable=True,
+        comment="业主联系方式",
+    )
+    owner_phone = EncryptedAttribute("_owner_phone")
+    _owner_id_card: Mapped[str | None] = mapped_column(
+        "owner_id_card",
+        EncryptedString(500),
+        nullable=True,
+        comment="业主身份证号",
+    )
+    owner_id_card = EncryptedAttribute("_owner_id_card")
     bank_name: Mapped[str | None] = mapped_column(String(100), nullable=True, comment="开户行")
-    bank_card_number: Mapped[str | None] = mapped_column(EncryptedString(500), nullable=True, comment="银行卡号(加密)")
+    _bank_card_number: Mapped[str | None] = mapped_column(
+        "bank_card_number",
+        EncryptedString(500),
+        nullable=True,
+        comment="银行卡号(加密)",
+    )
+    bank_card_number = EncryptedAttribute("_bank_card_number")
     relation_type: Mapped[str] = mapped_column(String(20), nullable=False, default="业主", comment="关系类型")
     owner_info: Mapped[str | None] = mapped_column(Text, nullable=True, comment="备注")
 
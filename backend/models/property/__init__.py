@@ -5,7 +5,10 @@
 
 from .community import Community, CommunityAlias, CommunityCompetitor
 from .community_image import CommunityImage, CommunityImageSource
+from .market_rollup import MarketStatsRollup
 from .media import PropertyMedia
+from .media_download import MediaDownloadJob, MediaDownloadStatus
+from .media_object import MediaObject, MediaSourceUrl
 from .property import PropertyCurrent, PropertyHistory
 
 __all__ = [
@@ -14,6 +17,11 @@ __all__ = [
     "CommunityCompetitor",
     "CommunityImage",
     "CommunityImageSource",
+    "MarketStatsRollup",
+    "MediaDownloadJob",
+    "MediaDownloadStatus",
+    "MediaObject",
+    "MediaSourceUrl",
     "PropertyCurrent",
     "PropertyHistory",
     "PropertyMedia",
@@ -0,0 +1,64 @@
+"""房源市场统计汇总模型.
+
+报表模块的 KPI / 趋势 / 商圈 / 小区 / 对比统计原本直接扫描 ``property_current``；
+本表按报表可筛选、可分组的维度预先聚合有效房源，报表查询改为扫描汇总行，
+耗时不再随房源明细表规模增长。
+
+- 维度列与 ``property_current`` 同名（status / community_id / data_source / rooms /
+  halls / floor_level / sold_date），报表筛选条件可原样作用于本表
+- ``sold_date`` 按 UTC 截断到成交日：报表窗口按 UTC 整天回溯、趋势按 UTC 周/月截断分组，均可由日粒度汇总还原
+- 度量列只保存可加的计数与求和，均值由 ``SUM(sum) / SUM(count)`` 还原
+- 只收录 ``is_active`` 房源，按小区整片重算维护（见 ``services.market.stats_rollup``）
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, Index, Integer, Numeric, String
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.common.base import Base, PropertyStatus
+
+
+class MarketStatsRollup(Base):
+    """房源市场统计汇总表（小区 × 来源 × 状态 × 户型 × 楼层 × 成交日）."""
+
+    __tablename__ = "market_stats_rollups"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    # 维度（与 property_current 同名同类型）
+    community_id: Mapped[str] = mapped_column(String(36), nullable=False, comment="小区ID")
+    data_source: Mapped[str] = mapped_column(String(50), nullable=False, comment="数据来源")
+    status: Mapped[PropertyStatus] = mapped_column(SQLEnum(PropertyStatus), nullable=False, comment="状态")
+    rooms: Mapped[int] = mapped_column(Integer, nullable=False, comment="室")
+    halls: Mapped[int | None] = mapped_column(Integer, nullable=True, comment="厅")
+    floor_level: Mapped[str | None] = mapped_column(String(20), nullable=True, comment="楼层级别(低/中/高)")
+    sold_date: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, comment="成交日（成交时间截断到天）"
+    )
+
+    # 度量（均可跨行相加）
+    listing_count: Mapped[int] = mapped_column(Integer, nullable=False, comment="房源套数")
+    price_count: Mapped[int] = mapped_column(Integer, nullable=False, comment="有成交价的套数")
+    price_sum: Mapped[Decimal] = mapped_column(Numeric(20, 2), nullable=False, comment="成交价合计(万)")
+    unit_price_count: Mapped[int] = mapped_column(Integer, nullable=False, comment="可计算单价的套数")
+    unit_price_sum: Mapped[Decimal] = mapped_column(Numeric, nullable=False, comment="成交单价合计(元/㎡)")
+    area_sum: Mapped[Decimal] = mapped_column(Numeric(20, 2), nullable=False, comment="建筑面积合计(㎡)")
+    valid_area_count: Mapped[int] = mapped_column(Integer, nullable=False, comment="面积大于0的套数")
+    valid_area_sum: Mapped[Decimal] = mapped_column(Numeric(20, 2), nullable=False, comment="面积大于0的面积合计(㎡)")
+
+    __table_args__ = (
+        # 按小区整片重算 / 小区维度统计
+        Index("idx_market_rollup_community", "community_id", "status", "sold_date"),
+        # 报表时间窗口扫描
+        Index("idx_market_rollup_status_date", "status", "sold_date"),
+    )
+
+    def __repr__(self) -> str:
+        """返回字符串表示."""
+        return (
+            f"<MarketStatsRollup(community_id='{self.community_id}', status={self.status}, "
+            f"sold_date={self.sold_date}, listing_count={self.listing_count})>"
+        )
@@ -0,0 +1,80 @@
+"""外站媒体下载任务模型.
+
+导入时户型图先以外站原始 URL 入库，下载任务由独立的下载工作池异步执行，
+完成后回写 ``property_media`` / ``community_images`` 的 URL 与缩略图。
+"""
+
+import enum
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.common.base import Base
+
+
+class MediaDownloadStatus(str, enum.Enum):
+    """媒体下载任务状态枚举."""
+
+    PENDING = "pending"  # 待下载（含等待退避重试）
+    PROCESSING = "processing"  # 下载中（已被工作线程领取）
+    DONE = "done"  # 下载完成并已回写 URL
+    FAILED = "failed"  # 重试次数耗尽
+
+
+class MediaDownloadJob(Base):
+    """外站媒体下载任务表.
+
+    以 ``(data_source, source_property_id, source_url)`` 唯一，房源重新导入时复用同一任务。
+    """
+
+    __tablename__ = "media_download_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    data_source: Mapped[str] = mapped_column(String(50), nullable=False, comment="数据来源")
+    source_property_id: Mapped[str] = mapped_column(String(100), nullable=False, comment="来源平台的房源ID")
+    community_id: Mapped[str | None] = mapped_column(String(36), nullable=True, comment="房源关联小区ID")
+    import_task_id: Mapped[str | None] = mapped_column(String(36), nullable=True, comment="来源导入任务ID")
+    source_url: Mapped[str] = mapped_column(Text, nullable=False, comment="外站原始URL")
+    stored_url: Mapped[str | None] = mapped_column(Text, nullable=True, comment="存储后端URL")
+    thumbnail_url: Mapped[str | None] = mapped_column(Text, nullable=True, comment="缩略图URL")
+    status: Mapped[MediaDownloadStatus] = mapped_column(
+        SQLEnum(MediaDownloadStatus, values_callable=lambda x: [e.value for e in x]),
+        default=MediaDownloadStatus.PENDING,
+        nullable=False,
+        comment="任务状态",
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="已尝试次数")
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        comment="下次可执行时间(退避)",
+    )
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, comment="领取时间")
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True, comment="最近一次失败原因")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        comment="创建时间",
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        comment="更新时间",
+    )
+
+    __table_args__ = (
+        UniqueConstraint("data_source", "source_property_id", "source_url", name="uq_media_download_source"),
+        # 工作线程领取路径：按状态 + 到期时间扫描
+        Index("idx_media_download_due", "status", "next_attempt_at"),
+        Index("idx_media_download_task", "import_task_id"),
+    )
+
+    def __repr__(self) -> str:
+        """返回字符串表示."""
+        return f"<MediaDownloadJob(id={self.id}, status={self.status}, url='{self.source_url}')>"
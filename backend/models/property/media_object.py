@@ -0,0 +1,78 @@
+"""内容寻址媒体对象模型.
+
+外站户型图按图片内容（SHA-256）寻址存储：相同内容的图片无论来自哪个房源、哪个外站 URL，
+都只保存一个存储对象和一张缩略图；外站 URL 到存储对象的索引在下载前查询，
+已知 URL 重新导入时不再发起网络请求。
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.common.base import Base
+
+
+class MediaObject(Base):
+    """媒体存储对象表（按内容哈希唯一）.
+
+    存储键为 ``properties/{content_hash}{ext}``，缩略图为 ``thumbs/{content_hash}.webp``。
+    """
+
+    __tablename__ = "media_objects"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    content_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, comment="内容SHA-256")
+    storage_key: Mapped[str] = mapped_column(String(200), nullable=False, comment="存储键")
+    url: Mapped[str] = mapped_column(Text, nullable=False, comment="存储后端URL")
+    thumbnail_key: Mapped[str | None] = mapped_column(String(200), nullable=True, comment="缩略图存储键")
+    thumbnail_url: Mapped[str | None] = mapped_column(Text, nullable=True, comment="缩略图URL")
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False, comment="文件大小(字节)")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        comment="创建时间",
+    )
+    last_used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        comment="最近一次被下载任务使用的时间(垃圾回收宽限期依据)",
+    )
+
+    __table_args__ = (
+        # 垃圾回收按使用时间扫描候选对象
+        Index("idx_media_object_last_used", "last_used_at"),
+    )
+
+    def __repr__(self) -> str:
+        """返回字符串表示."""
+        return f"<MediaObject(id={self.id}, hash='{self.content_hash[:12]}', key='{self.storage_key}')>"
+
+
+class MediaSourceUrl(Base):
+    """外站 URL → 媒体存储对象索引表.
+
+    ``url_hash`` 为外站 URL 的 SHA-256（URL 可能很长，不直接建唯一索引）；
+    存储对象被回收时由垃圾回收一并删除其索引。
+    """
+
+    __tablename__ = "media_source_urls"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    url_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, comment="外站URL的SHA-256")
+    source_url: Mapped[str] = mapped_column(Text, nullable=False, comment="外站原始URL")
+    media_object_id: Mapped[int] = mapped_column(Integer, nullable=False, comment="媒体存储对象ID(逻辑外键)")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        comment="创建时间",
+    )
+
+    __table_args__ = (Index("idx_media_source_object", "media_object_id"),)
+
+    def __repr__(self) -> str:
+        """返回字符串表示."""
+        return f"<MediaSourceUrl(id={self.id}, object={self.media_object_id}, url='{self.source_url}')>"
@@ -137,6 +137,8 @@ class PropertyCurrent(Base):
         Index("idx_reports_core", "is_active", "status", "sold_date"),
         # 报表模块小区维度聚合索引
         Index("idx_community_status_date", "community_id", "status", "sold_date"),
+        # 房源列表游标分页（默认 updated_at 排序 + id 续翻）
+        Index("idx_property_updated_keyset", "updated_at", "id"),
     )
 
     def __repr__(self) -> str:
@@ -28,7 +28,7 @@ from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column
 
 from models.common.base import Base
-from models.common.encrypted import EncryptedString
+from models.common.encrypted import EncryptedAttribute, EncryptedString
 
 
 class RecruitCampaignStatus(str, enum.Enum):
@@ -111,7 +111,13 @@ class RecruitLead(Base):
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_new_id, comment="UUID")
 
     # phone 使用 Fernet 加密存储；由于加密使用随机 IV，唯一性由 phone_hash 维持
-    phone: Mapped[str] = mapped_column(EncryptedString(20), nullable=False, comment="手机号(加密存储)")
+    _phone: Mapped[str] = mapped_column(
+        "phone",
+        EncryptedString(20),
+        nullable=False,
+        comment="手机号(加密存储)",
+    )
+    phone = EncryptedAttribute("_phone")
     phone_hash: Mapped[str] = mapped_column(String(64), nullable=False, comment="手机号HMAC哈希(归因查重)")
 
     main_business_area: Mapped[str] = mapped_column(String(50), nullable=False, comment="主营商圈")
@@ -227,6 +233,9 @@ class RecruitQRScene(Base):
     code: Mapped[str] = mapped_column(String(8), nullable=False, comment="8位短码")
     campaign_id: Mapped[str] = mapped_column(String(36), nullable=False, comment="活动ID(逻辑外键)")
     employee_id: Mapped[str | None] = mapped_column(String(36), nullable=True, comment="归属员工ID(逻辑外键)")
+    image_key: Mapped[str | None] = mapped_column(
+        String(200), nullable=True, comment="小程序码图片存储键（首次生成后缓存，为空表示尚未生成）"
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=_now, nullable=False, comment="创建时间"
     )
@@ -1,14 +1,16 @@
 """系统模块.
 
-包含系统级别的功能，如错误处理、导入任务、审计日志.
+包含系统级别的功能，如错误处理、导入/导出任务、审计日志.
 """
 
 from .error import FailedRecord
+from .export_job import ExportJob
 from .import_task import ImportTaskStatus, PropertyImportTask
 from .operation_log import OperationLog
 from .wechat_oauth import WeChatOAuthState, WeChatTempCode
 
 __all__ = [
+    "ExportJob",
     "FailedRecord",
     "ImportTaskStatus",
     "OperationLog",
@@ -0,0 +1,79 @@
+"""导出任务模型.
+
+大数据量导出（资金账本/跟投列表 Excel、项目/房源 CSV）以任务形式在后台生成，
+文件上传至存储后端，客户端轮询任务状态获取下载地址.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.common.base import Base, ExportJobStatus
+
+
+class ExportJob(Base):
+    """导出任务表.
+
+    表本身即持久化队列：接口写入 pending 任务，导出工作线程以 SKIP LOCKED 领取；
+    同一用户相同类型与参数的导出在复用窗口内共享已生成的文件（storage_key 相同）。
+    """
+
+    __tablename__ = "export_jobs"
+
+    id: Mapped[str] = mapped_column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid.uuid4()),
+        comment="任务ID (UUID)",
+    )
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True, comment="创建用户ID(UUID字符串)")
+
+    # 导出内容
+    export_type: Mapped[str] = mapped_column(String(50), nullable=False, comment="导出类型")
+    params: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict, comment="导出筛选参数")
+    params_hash: Mapped[str] = mapped_column(String(64), nullable=False, comment="导出类型+参数的 SHA-256（复用匹配）")
+
+    # 任务状态
+    status: Mapped[ExportJobStatus] = mapped_column(
+        SQLEnum(ExportJobStatus, values_callable=lambda x: [e.value for e in x], create_constraint=True),
+        default=ExportJobStatus.PENDING,
+        nullable=False,
+        comment="任务状态",
+    )
+    worker_id: Mapped[str | None] = mapped_column(String(100), nullable=True, comment="当前处理的工作线程标识")
+    attempts: Mapped[int] = mapped_column(Integer, default=0, comment="领取次数")
+
+    # 结果信息
+    filename: Mapped[str | None] = mapped_column(String(255), nullable=True, comment="下载文件名")
+    storage_key: Mapped[str | None] = mapped_column(String(500), nullable=True, comment="存储键")
+    download_url: Mapped[str | None] = mapped_column(Text, nullable=True, comment="下载地址")
+    row_count: Mapped[int | None] = mapped_column(Integer, nullable=True, comment="导出行数")
+    reused_from: Mapped[str | None] = mapped_column(String(36), nullable=True, comment="复用的导出任务ID")
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True, comment="错误信息(失败时)")
+
+    # 时间戳
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.now,
+        nullable=False,
+        comment="创建时间",
+    )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, comment="开始生成时间")
+    heartbeat_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, comment="最近一次心跳时间（生成期间定期刷新，超时视为工作线程崩溃）"
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, comment="文件生成完成时间"
+    )
+
+    __table_args__ = (
+        Index("idx_export_job_status_created", "status", "created_at"),
+        Index("idx_export_job_reuse", "export_type", "params_hash", "status", "completed_at"),
+    )
+
+    def __repr__(self) -> str:
+        """返回字符串表示."""
+        return f"<ExportJob(id='{self.id}', type='{self.export_type}', status='{self.status}')>"
@@ -38,6 +38,11 @@ class PropertyImportTask(Base):
         comment="任务状态",
     )
 
+    # 任务来源：csv（上传 CSV 文件）/ push（JSON 推送接口异步任务，文件为 JSON 数组）
+    source_type: Mapped[str] = mapped_column(
+        String(20), default="csv", server_default="csv", nullable=False, comment="任务来源: csv/push"
+    )
+
     # 文件信息
     filename: Mapped[str] = mapped_column(String(255), nullable=False, comment="原始文件名")
     file_path: Mapped[str] = mapped_column(String(500), nullable=False, comment="文件存储路径")
@@ -50,6 +55,19 @@ class PropertyImportTask(Base):
     failed_count: Mapped[int] = mapped_column(Integer, default=0, comment="失败记录数")
     progress_percent: Mapped[float] = mapped_column(Float, default=0.0, comment="进度百分比(0-100)")
 
+    # 户型图下载进度（下载与导入事务解耦，导入完成后由下载工作池推进）
+    media_total: Mapped[int] = mapped_column(Integer, default=0, comment="入队户型图下载数")
+    media_downloaded: Mapped[int] = mapped_column(Integer, default=0, comment="已下载户型图数")
+    media_failed: Mapped[int] = mapped_column(Integer, default=0, comment="下载失败户型图数")
+
+    # 持久化队列：工作进程以 SKIP LOCKED 领取 pending 任务，心跳超时的 processing 任务可被重新领取，
+    # 从 processed_records（与批次数据同事务提交）处续跑
+    worker_id: Mapped[str | None] = mapped_column(String(100), nullable=True, comment="当前处理的工作进程标识")
+    heartbeat_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, comment="最近一次批次提交时间(心跳)"
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, comment="领取次数(>1 表示崩溃后续跑)")
+
     # 结果信息
     failed_file_url: Mapped[str | None] = mapped_column(Text, nullable=True, comment="失败记录文件URL")
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True, comment="错误信息(失败时)")
@@ -17,7 +17,7 @@ from sqlalchemy import (
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.common.base import Base, BaseModel
-from models.common.encrypted import EncryptedString
+from models.common.encrypted import EncryptedAttribute, EncryptedString
 
 
 class UserRole(Base):
@@ -94,7 +94,13 @@ class User(BaseModel):
     nickname: Mapped[str | None] = mapped_column(String(100), nullable=True, comment="昵称")
     avatar: Mapped[str | None] = mapped_column(String(500), nullable=True, comment="头像")
     # phone 使用 Fernet 加密存储；由于加密使用随机 IV，唯一性由 phone_hash 维持
-    phone: Mapped[str | None] = mapped_column(EncryptedString(20), nullable=True, comment="手机号(加密存储)")
+    _phone: Mapped[str | None] = mapped_column(
+        "phone",
+        EncryptedString(20),
+        nullable=True,
+        comment="手机号(加密存储)",
+    )
+    phone = EncryptedAttribute("_phone")
     phone_hash: Mapped[str | None] = mapped_column(
         String(64),
         nullable=True,
@@ -105,7 +111,13 @@ class User(BaseModel):
     # 微信相关信息
     wechat_openid: Mapped[str | None] = mapped_column(String(100), nullable=True, unique=True, comment="微信OpenID")
     wechat_unionid: Mapped[str | None] = mapped_column(String(100), nullable=True, unique=True, comment="微信UnionID")
-    wechat_session_key: Mapped[str | None] = mapped_column(EncryptedString(500), nullable=True, comment="微信会话密钥")
+    _wechat_session_key: Mapped[str | None] = mapped_column(
+        "wechat_session_key",
+        EncryptedString(500),
+        nullable=True,
+        comment="微信会话密钥",
+    )
+    wechat_session_key = EncryptedAttribute("_wechat_session_key")
 
     # 临时账号与合并（微信登录新用户首次创建为临时账号，绑定主账号后合并）
     is_temporary: Mapped[bool] = mapped_column(
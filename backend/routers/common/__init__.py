@@ -1,13 +1,15 @@
 """通用功能模块路由.
 
-包含：文件管理、文件上传、数据推送等功能.
+包含：文件管理、文件上传、数据推送、后台导出任务等功能.
 """
 
+from .exports import router as exports_router
 from .files import router as files_router
 from .push import router as push_router
 from .upload import router as upload_router
 
 __all__ = [
+    "exports_router",
     "files_router",
     "push_router",
     "upload_router",
@@ -0,0 +1,30 @@
+"""后台导出任务路由.
+
+各业务模块的 ``POST .../export/jobs`` 接口创建导出任务后，客户端通过本路由轮询
+任务状态，完成后从 ``download_url`` 下载文件.
+"""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Path
+
+from dependencies.auth import CurrentActiveUserDep, DbSessionDep
+from schemas import ExportJobResponse
+from services.exports import get_export_job_service
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+
+@router.get("/{job_id}")
+def get_export_job(
+    job_id: Annotated[str, Path(max_length=36, description="导出任务ID")],
+    db: DbSessionDep,
+    current_user: CurrentActiveUserDep,
+) -> ExportJobResponse:
+    """查询导出任务状态（仅任务创建者可查询）.
+
+    status 为 completed 时 ``download_url`` 为下载地址；文件保留
+    ``settings.export_job_retention_hours`` 小时，过期后任务变为 expired，需重新发起导出。
+    """
+    job = get_export_job_service().get_job(db, job_id, str(current_user.id))
+    return ExportJobResponse.model_validate(job)
@@ -3,6 +3,7 @@
 import logging
 import shutil
 import uuid
+from concurrent.futures import wait
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Annotated
@@ -19,7 +20,7 @@ from settings import settings
 from utils.common import RateLimits, limiter
 from utils.file_security import get_safe_file_path, sanitize_filename
 from utils.image_processing import generate_thumbnail
-from utils.storage import get_storage_backend
+from utils.storage import get_storage_backend, submit_upload
 
 router = APIRouter(prefix="/files", tags=["files"])
 logger = logging.getLogger(__name__)
@@ -97,22 +98,22 @@ def save_upload_file(
         with Path(file_path).open("wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
 
-        # 通过存储后端上传，返回访问 URL
+        # 原图在后台线程上传，同时在当前线程生成并上传缩略图，最后等待原图完成
         # OSS 模式下若上传失败需清理本地临时文件，防止孤儿文件堆积
-        storage = get_storage_backend()
+        original_upload = submit_upload(Path(file_path), filename)
+        thumbnail_url: str | None = None
         thumb_path: Path | None = None
         try:
-            url = storage.upload_file(Path(file_path), filename)
-
             # 缩略图（仅图片）：本地生成后同样通过存储后端上传
-            thumbnail_url: str | None = None
             if ext in IMAGE_EXTENSIONS:
                 thumb_filename = f"{Path(filename).stem}.webp"
                 thumb_path = upload_path / "thumbs" / thumb_filename
                 if generate_thumbnail(file_path, thumb_path):
-                    thumbnail_url = storage.upload_file(thumb_path, f"thumbs/{thumb_filename}")
+                    thumbnail_url = get_storage_backend().upload_file(thumb_path, f"thumbs/{thumb_filename}")
+            url = original_upload.result()
         except Exception:
-            # 上传失败时清理已写入的本地临时文件
+            # 上传失败时清理已写入的本地临时文件（先等待仍在进行的原图上传结束）
+            wait([original_upload])
             if settings.storage_backend == "oss":
                 Path(file_path).unlink(missing_ok=True)
                 if thumb_path is not None:
@@ -1,19 +1,25 @@
 """JSON 推送 API 路由.
 
-处理 JSON 数组的批量房源数据推送.
+处理 JSON 数组的批量房源数据推送：
+- ``POST /push``：同步导入，请求内完成导入并返回结果（单次最多 1000 条）
+- ``POST /push/jobs``：异步导入，保存推送数据后立即返回任务ID，由导入工作进程处理；
+  通过 ``GET /push/jobs/{job_id}`` 查询进度与逐条错误详情
 """
 
 import logging
-from typing import Annotated
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Body, Depends, Request
+from fastapi import APIRouter, Body, Depends, Request, status
 from fastapi.concurrency import run_in_threadpool
 
 from dependencies.auth import DbSessionDep, require_api_key
-from models import User
-from schemas import PropertyIngestionModel, PushResult
+from models import ImportTaskStatus, User
+from schemas import ImportTaskCreateResponse, PropertyIngestionModel, PushJobStatusResponse, PushResult
+from services.market import FailedRecordHandler, get_import_task_service, start_import_task
+from services.market.import_task_service import TASK_SOURCE_PUSH, UPLOAD_DIR
 from services.market.json_batch_importer import JSONBatchImporter
-from services.system.exceptions import BusinessLogicError, ValidationError
+from services.system.exceptions import BusinessLogicError, PermissionDeniedError, ResourceNotFoundError, ValidationError
+from settings import settings
 from utils.common import RateLimits, limiter
 
 logger = logging.getLogger(__name__)
@@ -60,14 +66,12 @@ async def push_properties(
 
     logger.info("接收到 JSON 推送请求，包含 %d 条记录", len(properties))
 
-    # 转换为 dict 列表传给 importer（importer 内部仍会构造模型，双重校验无害）
-    properties_data = [p.model_dump(by_alias=True, exclude_unset=True) for p in properties]
-
     try:
         importer = JSONBatchImporter()
+        # 已校验的模型直接导入，不再重复校验
         return await run_in_threadpool(
             importer.batch_import_json,
-            properties_data,
+            list(properties),
             db,
             current_user.id,
         )
@@ -76,3 +80,76 @@ async def push_properties(
         logger.exception("JSON 推送处理失败")
         msg = "推送处理失败，请稍后重试"
         raise BusinessLogicError(msg) from e
+
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit(RateLimits.PUSH_API)
+async def create_push_job(
+    request: Request,
+    properties: Annotated[list[dict[str, Any]], Body()],
+    db: DbSessionDep,
+    current_user: Annotated[User, Depends(require_api_key)],
+) -> ImportTaskCreateResponse:
+    """JSON 数据异步推送接口.
+
+    推送数据保存后立即返回任务ID（202），由后台导入工作进程逐条校验并导入，
+    推送方无需在导入期间保持连接。
+    **需要通过 X-API-Key Header 进行认证。**
+
+    Args:
+        request: FastAPI 请求对象（速率限制所需）
+        properties: 房源数据列表（原始 JSON 对象，字段校验在导入时进行）
+        db: 数据库会话
+        current_user: 当前认证用户（通过 API Key）
+
+    Returns:
+        ImportTaskCreateResponse: 任务ID，通过 GET /push/jobs/{job_id} 查询结果
+
+    """
+    if not properties:
+        msg = "请求体不能为空"
+        raise ValidationError(msg)
+
+    if len(properties) > settings.push_job_max_records:
+        msg = f"单次异步推送最多支持 {settings.push_job_max_records} 条记录"
+        raise ValidationError(msg)
+
+    task_service = get_import_task_service()
+    task = await run_in_threadpool(task_service.create_push_task, properties, current_user.id, db)
+    start_import_task(task.id)
+    logger.info("JSON 推送任务已入队: %s, 记录数: %d", task.id, len(properties))
+
+    return ImportTaskCreateResponse(
+        task_id=task.id,
+        status=ImportTaskStatus.PENDING.value,
+        message="推送任务已创建，正在后台处理中",
+    )
+
+
+@router.get("/jobs/{job_id}")
+@limiter.limit(RateLimits.TASK_STATUS_QUERY)
+def get_push_job(
+    request: Request,
+    job_id: str,
+    db: DbSessionDep,
+    current_user: Annotated[User, Depends(require_api_key)],
+) -> PushJobStatusResponse:
+    """查询 JSON 推送任务状态.
+
+    任务完成后 ``errors`` 返回逐条失败原因（格式与同步推送结果一致）。
+    **需要通过 X-API-Key Header 进行认证。**
+    """
+    task_service = get_import_task_service()
+    task = task_service.get_task(job_id, db)
+    if not task or task.source_type != TASK_SOURCE_PUSH:
+        msg = "推送任务不存在"
+        raise ResourceNotFoundError(msg)
+
+    if task.user_id != current_user.id:
+        msg = "无权查看此推送任务"
+        raise PermissionDeniedError(msg)
+
+    response = PushJobStatusResponse.model_validate(task)
+    if task.status == ImportTaskStatus.COMPLETED.value:
+        response.errors = FailedRecordHandler(str(UPLOAD_DIR)).load_push_errors(task.id)
+    return response
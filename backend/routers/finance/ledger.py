@@ -21,7 +21,8 @@ from dependencies.auth import (
     LedgerSettlePermDep,
     LedgerWritePermDep,
 )
-from models.common import ProjectStatus
+from models.common import ExportJobStatus, ProjectStatus
+from schemas import ExportJobResponse
 from schemas.project import (
     CashFlowRecordResponse,
     CashFlowResponse,
@@ -40,6 +41,7 @@ from schemas.project.finance import (
     FinanceUnsettleRequest,
 )
 from services import FinanceService
+from services.exports import EXPORT_LEDGER_XLSX, get_export_job_service, start_export_job
 from utils.common import RateLimits, limiter
 
 router = APIRouter(
@@ -130,6 +132,34 @@ def export_ledger(
     )
 
 
+@router.post(
+    "/export/jobs",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="创建资金账本 Excel 后台导出任务",
+)
+@limiter.limit(RateLimits.LEDGER_EXPORT)
+def create_ledger_export_job(
+    request: Request,
+    db: DbSessionDep,
+    current_user: LedgerReadPermDep,
+    search: Annotated[str | None, Query(max_length=100, description="模糊搜索")] = None,
+    project_status: Annotated[ProjectStatus | None, Query(description="项目状态筛选")] = None,
+) -> ExportJobResponse:
+    """创建资金账本 .xlsx 后台导出任务，通过 ``GET /exports/{job_id}`` 轮询获取下载地址.
+
+    速率限制：60次/小时.
+    """
+    job = get_export_job_service().enqueue(
+        db,
+        str(current_user.id),
+        EXPORT_LEDGER_XLSX,
+        {"search": search, "project_status": project_status.value if project_status else None},
+    )
+    if job.status == ExportJobStatus.PENDING:
+        start_export_job(job.id)
+    return ExportJobResponse.model_validate(job)
+
+
 # ==================== 项目详情 ====================
 
 
@@ -201,15 +231,15 @@ def export_project_ledger(
     service: _FinanceServiceDep,
     _current_user: LedgerReadPermDep,
 ) -> StreamingResponse:
-    """导出单项目流水为 zip（含流水 CSV + 票据图片）.
+    """导出单项目流水为 zip（含流水 CSV + 票据图片，逐条目流式输出）.
 
     速率限制：10次/小时.
     """
-    filename_stem, content = service.export_project_records_zip(project_id)
+    filename_stem, chunks = service.export_project_records_zip(project_id)
     filename = f"{filename_stem}.zip"
     filename_encoded = urllib.parse.quote(filename)
     return StreamingResponse(
-        iter([content]),
+        chunks,
         media_type="application/zip",
         headers={
             "Content-Disposition": (f"attachment; filename*=UTF-8''{filename_encoded}"),
@@ -22,7 +22,8 @@ from dependencies.auth import (
     InvestmentReadPermDep,
     InvestmentWritePermDep,
 )
-from models.common import ProjectStatus, SettlementStatus
+from models.common import ExportJobStatus, ProjectStatus, SettlementStatus
+from schemas import ExportJobResponse
 from schemas.investment import (
     CopyInvestmentRequest,
     InvestmentCreate,
@@ -38,6 +39,7 @@ from schemas.investment import (
     SettlementChangeRequest,
     UnsettleRequest,
 )
+from services.exports import EXPORT_INVESTMENT_XLSX, get_export_job_service, start_export_job
 from services.investment import InvestmentService
 from services.system.exceptions import ResourceNotFoundError
 from utils.common import RateLimits, limiter
@@ -129,6 +131,39 @@ def export_investments(
     )
 
 
+@router.post(
+    "/export/jobs",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="创建跟投列表 Excel 后台导出任务",
+)
+@limiter.limit(RateLimits.INVESTMENT_EXPORT)
+def create_investment_export_job(
+    request: Request,
+    db: DbSessionDep,
+    current_user: InvestmentReadPermDep,
+    search: Annotated[str | None, Query(max_length=100, description="模糊搜索")] = None,
+    project_status: Annotated[ProjectStatus | None, Query(description="项目状态筛选")] = None,
+    settlement_status: Annotated[SettlementStatus | None, Query(description="跟投状态筛选")] = None,
+) -> ExportJobResponse:
+    """创建跟投列表 .xlsx 后台导出任务，通过 ``GET /exports/{job_id}`` 轮询获取下载地址.
+
+    速率限制：10次/小时.
+    """
+    job = get_export_job_service().enqueue(
+        db,
+        str(current_user.id),
+        EXPORT_INVESTMENT_XLSX,
+        {
+            "search": search,
+            "project_status": project_status.value if project_status else None,
+            "settlement_status": settlement_status.value if settlement_status else None,
+        },
+    )
+    if job.status == ExportJobStatus.PENDING:
+        start_export_job(job.id)
+    return ExportJobResponse.model_validate(job)
+
+
 # ==================== 跟投记录 CRUD ====================
 
 
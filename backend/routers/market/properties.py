@@ -4,10 +4,9 @@
 """
 
 import logging
-from datetime import datetime as dt
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Request, status
 from fastapi.responses import StreamingResponse
 
 from dependencies.auth import (
@@ -15,23 +14,29 @@ from dependencies.auth import (
     PropertyReadPermDep,
 )
 from dependencies.common import PaginationDep
-from models import Community, PropertyCurrent
-from models.common.base import MediaType
+from models.common import ExportJobStatus
 from schemas import (
     CommunitySearchResponse,
+    CursorPropertyResponse,
+    ExportJobResponse,
     PaginatedPropertyResponse,
     PropertyDetailResponse,
 )
+from services.exports import EXPORT_PROPERTIES_CSV, get_export_job_service, start_export_job
 from services.market import (
+    PROPERTY_EXPORT_HEADERS,
     PropertyQueryService,
     PropertyService,
     get_property_query_service,
     get_property_service,
+    property_export_row,
 )
 from services.system.exceptions import ResourceNotFoundError
-from utils.csv_exporter import generate_csv_response
+from settings import settings
+from utils.common import RateLimits, limiter
+from utils.csv_exporter import stream_csv_response
 from utils.param_parser import parse_comma_separated_list
-from utils.query_params import PropertyExportParams
+from utils.query_params import PropertyExportParams, PropertyScrollParams
 
 logger = logging.getLogger(__name__)
 
@@ -118,12 +123,21 @@ def get_properties(
     )
 
 
-@router.get("/export")
-def export_properties(
+@router.get("/scroll")
+def scroll_properties(
     db: DbSessionDep,
     _current_user: PropertyReadPermDep,
     service: PropertyServiceDep,
+    cursor: Annotated[str | None, Query(max_length=500, description="上一页返回的 next_cursor，首页不传")] = None,
+    page_size: Annotated[
+        int, Query(ge=1, le=settings.max_page_size, description="每页数量")
+    ] = settings.default_page_size,
+    total_mode: Annotated[
+        Literal["none", "estimated", "cached"],
+        Query(description="总数统计方式: none 不统计 | estimated 执行计划估算 | cached 精确统计并短期缓存"),
+    ] = "none",
     status: Annotated[str | None, Query(max_length=100, description="房源状态: 在售 | 成交")] = None,
+    keyword: Annotated[str | None, Query(max_length=100, description="关键词：同时模糊匹配小区名与商圈")] = None,
     community_name: Annotated[str | None, Query(max_length=100, description="小区名称（模糊搜索）")] = None,
     community_ids: Annotated[str | None, Query(max_length=500, description="小区ID，逗号分隔")] = None,
     districts: Annotated[str | None, Query(max_length=500, description="行政区，逗号分隔")] = None,
@@ -138,43 +152,113 @@ def export_properties(
     rooms_gte: Annotated[int | None, Query(ge=0, description="最少室数量")] = None,
     sort_by: Annotated[str, Query(description="排序字段")] = "updated_at",
     sort_order: Annotated[str, Query(description="排序方向: asc | desc")] = "desc",
-) -> StreamingResponse:
-    """导出房源数据为 CSV 文件.
+) -> CursorPropertyResponse:
+    """游标分页查询房源列表.
 
-    使用与查询接口相同的筛选和排序参数，但移除分页限制，导出所有匹配的记录
+    筛选与排序参数同列表接口；按 next_cursor 逐页翻动，每页耗时不随翻页深度增长。
+    游标与排序参数绑定，修改排序后需从首页重新查询。
     """
-    rooms_list = _parse_rooms_param(rooms)
+    scroll_params = PropertyScrollParams(
+        status=status,
+        keyword=keyword,
+        community_name=community_name,
+        community_ids=parse_comma_separated_list(community_ids),
+        districts=parse_comma_separated_list(districts),
+        business_circles=parse_comma_separated_list(business_circles),
+        orientations=parse_comma_separated_list(orientations),
+        floor_levels=parse_comma_separated_list(floor_levels),
+        min_price=min_price,
+        max_price=max_price,
+        min_area=min_area,
+        max_area=max_area,
+        rooms=_parse_rooms_param(rooms),
+        rooms_gte=rooms_gte,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        cursor=cursor,
+        page_size=page_size,
+        total_mode=total_mode,
+    )
+    return service.scroll_properties(db, scroll_params)
 
-    districts_list = parse_comma_separated_list(districts)
-    business_circles_list = parse_comma_separated_list(business_circles)
-    orientations_list = parse_comma_separated_list(orientations)
-    floor_levels_list = parse_comma_separated_list(floor_levels)
-    community_ids_list = parse_comma_separated_list(community_ids)
 
-    export_params = PropertyExportParams(
+def get_property_export_params(
+    status: Annotated[str | None, Query(max_length=100, description="房源状态: 在售 | 成交")] = None,
+    community_name: Annotated[str | None, Query(max_length=100, description="小区名称（模糊搜索）")] = None,
+    community_ids: Annotated[str | None, Query(max_length=500, description="小区ID，逗号分隔")] = None,
+    districts: Annotated[str | None, Query(max_length=500, description="行政区，逗号分隔")] = None,
+    business_circles: Annotated[str | None, Query(max_length=500, description="商圈，逗号分隔")] = None,
+    orientations: Annotated[str | None, Query(max_length=500, description="朝向关键词，逗号分隔")] = None,
+    floor_levels: Annotated[str | None, Query(max_length=500, description="楼层级别，逗号分隔")] = None,
+    min_price: Annotated[float | None, Query(ge=0, description="最低价格（万）")] = None,
+    max_price: Annotated[float | None, Query(ge=0, description="最高价格（万）")] = None,
+    min_area: Annotated[float | None, Query(ge=0, description="最小面积（㎡）")] = None,
+    max_area: Annotated[float | None, Query(ge=0, description="最大面积（㎡）")] = None,
+    rooms: Annotated[str | None, Query(max_length=500, description="室数量，逗号分隔，例如: 1,2,3")] = None,
+    rooms_gte: Annotated[int | None, Query(ge=0, description="最少室数量")] = None,
+    sort_by: Annotated[str, Query(description="排序字段")] = "updated_at",
+    sort_order: Annotated[str, Query(description="排序方向: asc | desc")] = "desc",
+) -> PropertyExportParams:
+    """房源导出筛选参数（同步导出与后台导出任务共用，与查询接口的筛选和排序参数一致）."""
+    return PropertyExportParams(
         status=status,
         community_name=community_name,
-        community_ids=community_ids_list,
-        districts=districts_list,
-        business_circles=business_circles_list,
-        orientations=orientations_list,
-        floor_levels=floor_levels_list,
+        community_ids=parse_comma_separated_list(community_ids),
+        districts=parse_comma_separated_list(districts),
+        business_circles=parse_comma_separated_list(business_circles),
+        orientations=parse_comma_separated_list(orientations),
+        floor_levels=parse_comma_separated_list(floor_levels),
         min_price=min_price,
         max_price=max_price,
         min_area=min_area,
         max_area=max_area,
-        rooms=rooms_list,
+        rooms=_parse_rooms_param(rooms),
         rooms_gte=rooms_gte,
         sort_by=sort_by,
         sort_order=sort_order,
     )
 
-    properties = service.query_properties_for_export(
-        db=db,
-        params=export_params,
-    )
 
-    return _generate_csv_response(properties)
+PropertyExportParamsDep = Annotated[PropertyExportParams, Depends(get_property_export_params)]
+
+
+@router.get("/export")
+def export_properties(
+    _current_user: PropertyReadPermDep,
+    service: PropertyServiceDep,
+    export_params: PropertyExportParamsDep,
+) -> StreamingResponse:
+    """导出房源数据为 CSV 文件.
+
+    使用与查询接口相同的筛选和排序参数，但移除分页限制，导出所有匹配的记录；
+    结果经服务端游标逐批读取并逐块写出，首字节即时返回，内存占用与导出行数无关
+    """
+    properties = service.stream_properties_for_export(params=export_params)
+    rows = (property_export_row(prop, community) for prop, community in properties)
+    return stream_csv_response(PROPERTY_EXPORT_HEADERS, rows, "properties_export")
+
+
+@router.post("/export/jobs", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit(RateLimits.PROPERTY_EXPORT)
+def create_property_export_job(
+    request: Request,
+    db: DbSessionDep,
+    current_user: PropertyReadPermDep,
+    export_params: PropertyExportParamsDep,
+) -> ExportJobResponse:
+    """创建房源 CSV 后台导出任务.
+
+    筛选参数与同步导出一致；文件在后台生成后上传至存储，通过 ``GET /exports/{job_id}``
+    轮询获取下载地址。相同参数的导出在复用窗口内直接返回已生成的文件。
+
+    速率限制：60次/小时.
+    """
+    job = get_export_job_service().enqueue(
+        db, str(current_user.id), EXPORT_PROPERTIES_CSV, export_params.model_dump(mode="json")
+    )
+    if job.status == ExportJobStatus.PENDING:
+        start_export_job(job.id)
+    return ExportJobResponse.model_validate(job)
 
 
 @router.get("/{property_id}")
@@ -200,128 +284,3 @@ def _parse_rooms_param(rooms: str | None) -> list[int] | None:
     except ValueError:
         logger.warning("无效的 rooms 参数: %s", rooms)
         return None
-
-
-def _format_datetime(value: object) -> str:
-    """格式化日期时间为字符串."""
-    if value is None:
-        return ""
-    if isinstance(value, dt):
-        return value.strftime("%Y-%m-%d")
-    return str(value)
-
-
-def _format_bool(value: object) -> str:
-    """格式化布尔值为大写英文字符串."""
-    if value is True:
-        return "TRUE"
-    if value is False:
-        return "FALSE"
-    return ""
-
-
-def _format_list(value: object) -> str:
-    """格式化列表为逗号分隔的字符串."""
-    if not value:
-        return ""
-    if isinstance(value, list):
-        return ",".join(str(v) for v in value)
-    return str(value)
-
-
-def _get_image_urls(prop: PropertyCurrent) -> str:
-    """从 property_media 关系中获取图片URL列表."""
-    if not hasattr(prop, "property_media") or not prop.property_media:
-        return ""
-
-    image_types = {
-        MediaType.INTERIOR.value,
-        MediaType.EXTERIOR.value,
-        MediaType.FLOOR_PLAN.value,
-        MediaType.OTHER.value,
-    }
-
-    urls = []
-    for media in prop.property_media:
-        if hasattr(media, "media_type"):
-            media_type_value = media.media_type.value
-            if media_type_value in image_types and media.url:
-                urls.append(media.url)
-
-    return ",".join(urls) if urls else ""
-
-
-def _generate_csv_response(results: list[tuple[PropertyCurrent, Community]]) -> StreamingResponse:
-    """生成 CSV 文件流响应.
-
-    格式与批量上传模板保持一致，参考 PropertyIngestionModel 的字段别名.
-    """
-    headers = [
-        "数据源",
-        "房源ID",
-        "状态",
-        "小区名",
-        "室",
-        "厅",
-        "卫",
-        "朝向",
-        "楼层",
-        "面积",
-        "套内面积",
-        "挂牌价",
-        "上架时间",
-        "成交价",
-        "成交时间",
-        "物业类型",
-        "建筑年代",
-        "建筑结构",
-        "装修情况",
-        "电梯",
-        "产权性质",
-        "产权年限",
-        "上次交易",
-        "供暖方式",
-        "房源描述",
-        "图片链接",
-        "城市ID",
-        "行政区",
-        "商圈",
-    ]
-
-    rows = []
-    for prop, community in results:
-        orientation = prop.orientation if prop.orientation and str(prop.orientation).strip() else "未知"
-        row = [
-            prop.data_source,
-            prop.source_property_id,
-            prop.status.value if hasattr(prop.status, "value") else prop.status,
-            community.name if community else (prop.community_name if hasattr(prop, "community_name") else ""),
-            prop.rooms,
-            prop.halls or 0,
-            prop.baths or 0,
-            orientation,
-            prop.floor_original,
-            prop.build_area,
-            prop.inner_area or "",
-            prop.listed_price_wan or "",
-            _format_datetime(prop.listed_date),
-            prop.sold_price_wan or "",
-            _format_datetime(prop.sold_date),
-            prop.property_type or "",
-            prop.build_year or "",
-            prop.building_structure or "",
-            prop.decoration or "",
-            _format_bool(prop.elevator),
-            prop.ownership_type or "",
-            prop.ownership_years or "",
-            prop.last_transaction or "",
-            prop.heating_method or "",
-            prop.listing_remarks or "",
-            _get_image_urls(prop),
-            community.city_id if community and hasattr(community, "city_id") else "",
-            community.district if community and hasattr(community, "district") else "",
-            community.business_circle if community and hasattr(community, "business_circle") else "",
-        ]
-        rows.append(row)
-
-    return generate_csv_response(headers, rows, "properties_export")
@@ -20,6 +20,8 @@ from dependencies.auth import (
 )
 from dependencies.common import PaginationDep
 from dependencies.projects import ProjectServiceDep
+from models.common import ExportJobStatus
+from schemas import ExportJobResponse
 from schemas.project import (
     ProjectCompleteRequest,
     ProjectCreate,
@@ -31,6 +33,7 @@ from schemas.project import (
     ProjectUpdate,
 )
 from schemas.response import PaginatedResponse
+from services.exports import EXPORT_PROJECTS_CSV, get_export_job_service, start_export_job
 from services.system.exceptions import ResourceNotFoundError, ValidationError
 from services.system.operation_log import operation_log_service
 from utils.common import RateLimits, limiter
@@ -214,6 +217,30 @@ def export_projects(
     return generate_csv_response(headers, rows, "projects_export")
 
 
+@router.post("/export/jobs", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit(RateLimits.PROJECT_EXPORT)
+def create_project_export_job(
+    request: Request,
+    db: DbSessionDep,
+    current_user: CurrentInternalUserDep,
+    status: Annotated[str | None, Query(max_length=100, description="项目状态筛选")] = None,
+    community_name: Annotated[str | None, Query(max_length=100, description="小区名称筛选")] = None,
+) -> ExportJobResponse:
+    """创建项目 CSV 后台导出任务，通过 ``GET /exports/{job_id}`` 轮询获取下载地址.
+
+    速率限制：10次/小时
+    """
+    job = get_export_job_service().enqueue(
+        db,
+        str(current_user.id),
+        EXPORT_PROJECTS_CSV,
+        {"status": status, "community_name": community_name},
+    )
+    if job.status == ExportJobStatus.PENDING:
+        start_export_job(job.id)
+    return ExportJobResponse.model_validate(job)
+
+
 @router.get("/{project_id}")
 def get_project(
     project_id: Annotated[UUID4, Path(description="项目ID")],
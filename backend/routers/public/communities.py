@@ -15,6 +15,7 @@ from schemas.reports.common import RangeOption, ReportsFilter, TrendDimension
 from services.market.community_image_service import CommunityImageService
 from services.market.community_service import CommunityQueryService
 from services.reports import aggregations
+from services.reports.warmer import record_community_view
 from services.system.exceptions import PermissionDeniedError
 from utils.common import RateLimits, limiter
 
@@ -89,9 +90,11 @@ def get_community_analysis(
     - 当前用户未绑定手机号时拒绝访问（403），与小程序端引导绑定手机号的门槛一致
     - ``range``/``trend_dim`` 解析为最小 ReportsFilter 后透传给 Service 层聚合
     - 路由仅编排，聚合全部复用 services.reports.aggregations.get_community_detail
+    - 访问计入小区分析访问量，用于挑选预热小区
     """
     if not current_user.phone:
         msg = "请先绑定手机号后查看小区分析"
         raise PermissionDeniedError(msg)
+    record_community_view(community.id)
     reports_filter = ReportsFilter(range=range.value)
     return aggregations.get_community_detail(db, community, filter=reports_filter, trend_dim=trend_dim.value)
@@ -21,6 +21,8 @@ from schemas.recruit import (
     RecruitLeadListResponse,
     RecruitLeadPhoneResponse,
     RecruitLeadStatusUpdate,
+    RecruitQRCodeBulkRequest,
+    RecruitQRCodeBulkResponse,
     RecruitQRCodeGenerateRequest,
     RecruitQRCodeResponse,
 )
@@ -200,7 +202,7 @@ def get_funnel(
 @router.post(
     "/campaigns/{campaign_id}/qrcode",
     summary="生成活动小程序码",
-    description="为活动生成小程序码（含归属员工参数），返回短码与 base64 图片",
+    description="为活动生成小程序码（含归属员工参数），返回短码、图片 URL 与 base64 图片；图片首次生成后缓存复用",
 )
 def generate_campaign_qrcode(
     campaign_id: Annotated[str, Path(description="活动ID")],
@@ -214,6 +216,24 @@ def generate_campaign_qrcode(
     return RecruitQRCodeResponse(**result)
 
 
+@router.post(
+    "/campaigns/{campaign_id}/qrcodes/bulk",
+    summary="批量生成员工小程序码",
+    description="为多个员工并发生成活动小程序码（已生成的直接复用，微信接口调用限速），返回短码与图片 URL；"
+    "单个员工失败不影响其余员工",
+)
+def bulk_generate_campaign_qrcodes(
+    campaign_id: Annotated[str, Path(description="活动ID")],
+    body: RecruitQRCodeBulkRequest,
+    db: DbSessionDep,
+    _current_user: RecruitWritePermDep,
+) -> RecruitQRCodeBulkResponse:
+    """批量生成员工小程序码."""
+    service = RecruitQRCodeService(db)
+    result = service.bulk_generate(campaign_id, body.employee_ids)
+    return RecruitQRCodeBulkResponse(**result)
+
+
 @router.get(
     "/leads/{lead_id}/phone",
     summary="获取线索完整手机号",
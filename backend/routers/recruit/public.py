@@ -6,7 +6,7 @@
 import logging
 from typing import Annotated
 
-from fastapi import APIRouter, Path, Query, Request
+from fastapi import APIRouter, Header, Path, Query, Request, Response
 from fastapi.concurrency import run_in_threadpool
 
 from dependencies.auth import CurrentCustomerUserDep, DbSessionDep
@@ -78,7 +78,7 @@ def get_business_areas(db: DbSessionDep) -> list[RecruitBusinessAreaItem]:
 @router.post(
     "/visits",
     summary="创建访问记录",
-    description="PV +1，UV 按 openid_hash 去重",
+    description="PV +1，UV 按 openid_hash 去重；埋点缓冲后批量落库，可携带 Idempotency-Key 头去重重试",
 )
 @limiter.limit(RateLimits.RECRUIT_VISIT)
 def create_visit(
@@ -86,17 +86,20 @@ def create_visit(
     body: RecruitVisitCreate,
     current_user: CurrentCustomerUserDep,
     db: DbSessionDep,
+    idempotency_key: Annotated[
+        str | None, Header(max_length=64, description="幂等键（客户端重试时携带同一值，只计一次 PV）")
+    ] = None,
 ) -> RecruitVisitResponse:
     """创建访问记录."""
     service = RecruitAttributionService(db)
-    visit = service.create_visit(current_user, body)
-    return RecruitVisitResponse(id=visit.id)
+    visit_id = service.create_visit(current_user, body, idempotency_key=idempotency_key)
+    return RecruitVisitResponse(id=visit_id)
 
 
 @router.put(
     "/visits/{visit_id}",
     summary="上报离开",
-    description="上报停留时长/深度浏览/点击授权，后端复核 is_deep_view",
+    description="上报停留时长/深度浏览/点击授权，后端复核 is_deep_view；埋点缓冲后批量落库",
 )
 @limiter.limit(RateLimits.RECRUIT_VISIT)
 def update_visit(
@@ -111,8 +114,8 @@ def update_visit(
     仅允许上报当前用户自己的访问记录（service 校验 visitor_id == current_user.id）。
     """
     service = RecruitAttributionService(db)
-    visit = service.update_visit(visit_id, body, user_id=current_user.id)
-    return RecruitVisitResponse(id=visit.id)
+    service.update_visit(visit_id, body, user_id=current_user.id)
+    return RecruitVisitResponse(id=visit_id)
 
 
 @router.post(
@@ -159,7 +162,8 @@ async def submit_lead(
 @router.post(
     "/share-events",
     summary="上报分享事件",
-    description="分享事件写入（漏斗第 1 级数据源），需 aud=c 登录态 + 限流",
+    description="分享事件写入（漏斗第 1 级数据源），需 aud=c 登录态 + 限流；"
+    "埋点缓冲后批量落库，可携带 Idempotency-Key 头去重重试",
 )
 @limiter.limit(RateLimits.RECRUIT_SHARE)
 def create_share_event(
@@ -167,17 +171,21 @@ def create_share_event(
     body: RecruitShareEventCreate,
     current_user: CurrentCustomerUserDep,
     db: DbSessionDep,
+    idempotency_key: Annotated[
+        str | None, Header(max_length=64, description="幂等键（客户端重试时携带同一值，只计一次分享）")
+    ] = None,
 ) -> RecruitShareEventResponse:
     """创建分享事件."""
     service = RecruitAttributionService(db)
-    event = service.create_share_event(current_user, body)
-    return RecruitShareEventResponse(id=event.id)
+    event_id = service.create_share_event(current_user, body, idempotency_key=idempotency_key)
+    return RecruitShareEventResponse(id=event_id)
 
 
 @router.get(
     "/campaigns/{campaign_id}/qrcode",
     summary="生成员工专属小程序码",
-    description="员工登录态生成带自己归属参数的活动小程序码，同一（活动,员工）复用短码，返回短码与 base64 图片",
+    description="员工登录态生成带自己归属参数的活动小程序码，同一（活动,员工）复用短码与已缓存图片，"
+    "返回短码、图片 URL 与 base64 图片",
 )
 @limiter.limit(RateLimits.RECRUIT_QR_GENERATE)
 def generate_my_campaign_qrcode(
@@ -282,3 +290,35 @@ def resolve_qr_code(
     service = RecruitQRCodeService(db)
     result = service.resolve(code)
     return RecruitQRSceneResponse(**result)
+
+
+@router.get(
+    "/qr/{code}/image",
+    summary="小程序码图片",
+    description="游客可访问，限流；返回短码对应的小程序码 PNG（首次访问时生成并缓存），"
+    "带 Cache-Control/ETag，If-None-Match 命中返回 304",
+    response_class=Response,
+    responses={200: {"content": {"image/png": {}}}},
+)
+@limiter.limit(RateLimits.RECRUIT_QR_IMAGE)
+def get_qr_code_image(
+    request: Request,
+    code: Annotated[str, Path(min_length=1, max_length=8, description="8位短码")],
+    db: DbSessionDep,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """获取小程序码图片（短码与场景一一对应，图片内容不变，可长期缓存）.
+
+    先校验短码存在且活动启用再比对 ETag：活动停用或短码失效后，携带旧 ETag 的请求同样返回错误。
+    """
+    service = RecruitQRCodeService(db)
+    scene = service.get_image_scene(code)
+    etag = f'"qr-{code}"'
+    headers = {
+        "Cache-Control": f"public, max-age={settings.recruit_qrcode_cache_max_age}, immutable",
+        "ETag": etag,
+    }
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    content = service.get_image(scene)
+    return Response(content=content, media_type="image/png", headers=headers)
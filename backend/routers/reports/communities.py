@@ -16,6 +16,7 @@ from routers.reports.dependencies import (
 from schemas.reports.common import ErrorResponse, TrendDimension
 from schemas.reports.communities import CommunityDetailResponse, CommunityListResponse
 from services.reports import aggregations
+from services.reports.warmer import record_community_view
 from utils.param_parser import parse_comma_separated_list
 
 communities_router = APIRouter(prefix="/communities", tags=["reports-communities"])
@@ -86,5 +87,7 @@ def get_community_analysis(
     - 组合 KPI / 趋势 / 价格分布 + main_layout + 同商圈对比小区列表
     - ``range/sources/rooms/floor_levels`` 由 ReportsFilterDep 解析后透传给 Service 层
     - ``trend_dim`` 默认 overall, 透传给 _get_trend_data_impl 计算 dim_breakdown
+    - 访问计入小区分析访问量，用于挑选预热小区
     """
+    record_community_view(community.id)
     return aggregations.get_community_detail(db, community, filter=reports_filter, trend_dim=trend_dim.value)
@@ -7,6 +7,7 @@
 - ``valid_community_id``: 校验路径参数 community_id 存在且 is_active=True，返回 ORM Community
 - ``valid_compare_ids``: 解析对比接口 ids 逗号分隔字符串，校验数量 ∈ [2, 5]
 - ``get_reports_filter``: 将查询参数解析为 ReportsFilter Pydantic 模型
+- ``valid_report_panels``: 解析批量面板查询 panels 逗号分隔字符串，校验面板名
 
 注意：``DbSessionDep`` 实际定义在 ``dependencies/auth.py``（项目无独立 database.py 模块），
 与 ``routers/market/communities.py``、``dependencies/projects.py`` 等现有导入风格保持一致.
@@ -18,8 +19,8 @@ from fastapi import Depends, Path, Query
 
 from dependencies.auth import DbSessionDep
 from models.property.community import Community
-from schemas.reports.common import RangeOption, ReportsFilter
-from services.reports.exceptions import CommunityNotFoundError, InvalidCompareIdsError
+from schemas.reports.common import RangeOption, ReportPanel, ReportsFilter
+from services.reports.exceptions import CommunityNotFoundError, InvalidCompareIdsError, InvalidReportPanelsError
 from services.reports.filter_builder import build_reports_filter
 
 # 对比接口 ids 数量上下限
@@ -106,6 +107,45 @@ def valid_compare_ids(
 ValidCompareIdsDep = Annotated[list[str], Depends(valid_compare_ids)]
 
 
+def valid_report_panels(
+    panels: Annotated[
+        str | None,
+        Query(
+            description="逗号分隔的面板（kpi/trend/price_distribution/rooms_distribution/floor_distribution），缺省为全部"
+        ),
+    ] = None,
+) -> list[ReportPanel]:
+    """批量面板查询 panels 解析.
+
+    - 解析逗号分隔字符串，去除空白与重复（保留首次出现顺序）
+    - 未传或为空时返回全部面板
+    - 含未知面板名抛 InvalidReportPanelsError
+
+    Args:
+        panels: 逗号分隔的面板名（如 "kpi,trend"）
+
+    Returns:
+        list[ReportPanel]: 去重后的面板列表
+
+    Raises:
+        InvalidReportPanelsError: 含不支持的面板名（400）
+
+    """
+    names = list(dict.fromkeys(name.strip() for name in (panels or "").split(",") if name.strip()))
+    if not names:
+        return list(ReportPanel)
+    supported = {panel.value for panel in ReportPanel}
+    unknown = [name for name in names if name not in supported]
+    if unknown:
+        msg = f"不支持的报表面板: {', '.join(unknown)}"
+        raise InvalidReportPanelsError(msg)
+    return [ReportPanel(name) for name in names]
+
+
+# 批量面板查询 panels 依赖类型别名
+ValidReportPanelsDep = Annotated[list[ReportPanel], Depends(valid_report_panels)]
+
+
 def get_reports_filter(
     range: Annotated[RangeOption, Query(description="时间范围：4w/8w=周；6m/12m/24m=月")] = RangeOption.W4,
     sources: Annotated[str | None, Query(description="逗号分隔的数据来源（链家/贝壳/网签）")] = None,
@@ -145,7 +185,9 @@ __all__ = [
     "ReportsFilterDep",
     "ValidCommunityIdDep",
     "ValidCompareIdsDep",
+    "ValidReportPanelsDep",
     "get_reports_filter",
     "valid_community_id",
     "valid_compare_ids",
+    "valid_report_panels",
 ]
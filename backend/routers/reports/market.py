@@ -1,6 +1,6 @@
 """商圈总览报表路由.
 
-提供 KPI / 趋势 / 价格分布 / 商圈列表 / 字典 / 多商圈对比 6 个端点.
+提供 KPI / 趋势 / 价格分布 / 户型分布 / 楼层分布 / 批量面板 / 商圈列表 / 字典 / 多商圈对比 / 缓存命中统计端点.
 所有端点强制 JWT 鉴权 + property:read 权限, 使用同步 SQLAlchemy Session.
 """
 
@@ -9,7 +9,7 @@ from typing import Annotated, Literal
 from fastapi import APIRouter, Query, status
 
 from dependencies.auth import DbSessionDep, ReportsReadPermDep
-from routers.reports.dependencies import ReportsFilterDep, ValidCompareIdsDep
+from routers.reports.dependencies import ReportsFilterDep, ValidCompareIdsDep, ValidReportPanelsDep
 from schemas.community import DictionaryResponse
 from schemas.reports.common import ErrorResponse, SortOrder, TrendDimension
 from schemas.reports.market import (
@@ -18,9 +18,13 @@ from schemas.reports.market import (
     DistributionResponse,
     KpiData,
     PriceDistributionResponse,
+    ReportCacheMetrics,
+    ReportPanelsResponse,
     TrendDataPoint,
 )
 from services.reports import aggregations, dictionaries
+from services.reports.panels import get_report_panels
+from services.reports.warmer import get_report_cache_stats
 
 # 报表字典类型枚举
 DictType = Literal["data_source", "rooms", "floor_level", "last_updated"]
@@ -126,6 +130,30 @@ def get_floor_distribution(
     return aggregations.get_floor_distribution(db, reports_filter)
 
 
+@market_router.get(
+    "/panels",
+    response_model=ReportPanelsResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        400: {"model": ErrorResponse, "description": "不支持的面板或 trend_dim"},
+        **_AUTH_ERRORS,
+    },
+    summary="报表面板批量查询",
+    description="一次返回多个报表面板（KPI/趋势/价格、户型、楼层分布），各面板并发计算并复用单面板端点的缓存",
+)
+def get_panels(
+    _current_user: ReportsReadPermDep,
+    reports_filter: ReportsFilterDep,
+    panels: ValidReportPanelsDep,
+    trend_dim: Annotated[
+        TrendDimension,
+        Query(description="趋势维度: overall(综合) / rooms(户型) / floor(楼层) / price(价格段)"),
+    ] = TrendDimension.OVERALL,
+) -> ReportPanelsResponse:
+    """返回所选面板数据与各面板耗时、缓存命中情况 (未请求的面板为 null)."""
+    return get_report_panels(reports_filter, panels, trend_dim.value)
+
+
 @market_router.get(
     "/business-districts",
     response_model=BusinessDistrictListResponse,
@@ -218,3 +246,18 @@ def get_compare(
 ) -> ComparisonData:
     """返回 2-5 个商圈的对比聚合数据 (7 行 summary + 趋势 + 结构)."""
     return aggregations.get_comparison_data(db, ids, reports_filter)
+
+
+@market_router.get(
+    "/cache-metrics",
+    response_model=ReportCacheMetrics,
+    status_code=status.HTTP_200_OK,
+    responses=_AUTH_ERRORS,
+    summary="报表缓存命中统计",
+    description="返回报表缓存命中率与预热命中率（全部 worker 累计）",
+)
+def get_cache_metrics(
+    _current_user: ReportsReadPermDep,
+) -> ReportCacheMetrics:
+    """返回报表调用次数、命中次数、命中预热条目次数与预热重算/跳过次数."""
+    return get_report_cache_stats()
@@ -39,6 +39,9 @@ from .community_image import (
     CommunityImageUpdate,
 )
 
+# 4.2 Export Jobs (后台导出任务)
+from .export_job import ExportJobResponse
+
 # 10. L4 Marketing
 from .l4_marketing import (
     ImportableMediaResponse,
@@ -114,6 +117,7 @@ from .project import (
 
 # 3. Property (房源)
 from .property import (
+    CursorPropertyResponse,
     FloorInfo,
     PaginatedPropertyResponse,
     PropertyDetailResponse,
@@ -129,6 +133,7 @@ from .upload import (
     ImportResult,
     ImportTaskCreateResponse,
     ImportTaskStatusResponse,
+    PushJobStatusResponse,
     PushResult,
     UploadResult,
 )
@@ -169,8 +174,10 @@ __all__ = [
     "CommunityResponse",
     "CommunitySearchResponse",
     "CompetitorResponse",
+    "CursorPropertyResponse",
     # Common
     "ErrorResponse",
+    "ExportJobResponse",
     "FloorInfo",
     # Monitor
     "FloorStats",
@@ -229,6 +236,7 @@ __all__ = [
     "PropertyResponse",
     # L4 Marketing
     "PublishStatus",
+    "PushJobStatusResponse",
     "PushResult",
     "RefreshTokenRequest",
     "RenovationPhotoResponse",
@@ -0,0 +1,27 @@
+"""后台导出任务相关Schema."""
+
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from models.common import ExportJobStatus
+
+
+class ExportJobResponse(BaseModel):
+    """导出任务状态响应.
+
+    创建接口与查询接口共用：任务完成后 ``download_url`` 为文件下载地址，
+    客户端按 ``status`` 轮询查询接口直至 completed/failed。
+    """
+
+    job_id: str = Field(validation_alias="id", description="任务ID")
+    export_type: str = Field(description="导出类型")
+    status: ExportJobStatus = Field(description="任务状态: pending/processing/completed/failed/expired")
+    filename: str | None = Field(None, description="下载文件名")
+    download_url: str | None = Field(None, description="下载地址（completed 时提供）")
+    row_count: int | None = Field(None, description="导出行数")
+    error_message: str | None = Field(None, description="错误信息")
+    created_at: datetime = Field(description="创建时间")
+    completed_at: datetime | None = Field(None, description="文件生成完成时间")
+
+    model_config = ConfigDict(from_attributes=True)
@@ -8,12 +8,14 @@ from .core import PropertyFilter, PropertyIngestionModel
 
 # 3. 导入响应模型
 from .response import (
+    CursorPropertyResponse,
     PaginatedPropertyResponse,
     PropertyDetailResponse,
     PropertyResponse,
 )
 
 __all__ = [
+    "CursorPropertyResponse",
     # Common
     "FloorInfo",
     "PaginatedPropertyResponse",
@@ -4,7 +4,7 @@ import logging
 from datetime import datetime, timedelta, timezone
 from typing import TYPE_CHECKING
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from schemas.response import PaginatedResponse
 from utils.floor_plan import clean_url
@@ -350,3 +350,13 @@ class PropertyDetailResponse(BaseModel):
 
 class PaginatedPropertyResponse(PaginatedResponse[PropertyResponse]):
     """分页房源列表响应 - 统一分页格式."""
+
+
+class CursorPropertyResponse(BaseModel):
+    """游标分页房源列表响应."""
+
+    items: list[PropertyResponse] = Field(description="数据列表")
+    page_size: int = Field(description="每页数量")
+    next_cursor: str | None = Field(description="下一页游标，为 null 表示已到最后一页")
+    total: int | None = Field(default=None, description="总记录数（total_mode=none 时为 null）")
+    total_estimated: bool = Field(default=False, description="total 是否为数据库执行计划估算值")
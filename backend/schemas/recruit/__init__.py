@@ -14,6 +14,7 @@ from models.recruit import (
     RecruitLeadSource,
     RecruitLeadStatus,
 )
+from settings import settings
 
 
 # ----------------------
@@ -94,7 +95,7 @@ class RecruitVisitCreate(BaseModel):
 class RecruitVisitUpdate(BaseModel):
     """上报离开请求."""
 
-    stayed_ms: int | None = Field(default=None, ge=0, description="停留毫秒")
+    stayed_ms: int | None = Field(default=None, ge=0, le=2**31 - 1, description="停留毫秒（列为 32 位整数）")
     is_deep_view: bool = Field(default=False, description="是否深度浏览（stayed_ms>=3000）")
     clicked_auth: bool = Field(default=False, description="是否点击报名且通过校验")
 
@@ -228,9 +229,42 @@ class RecruitQRCodeResponse(BaseModel):
     """生成小程序码响应."""
 
     code: str = Field(description="8位短码")
+    image_url: str = Field(description="小程序码图片 URL（可被浏览器/CDN 缓存）")
     image_base64: str = Field(description="小程序码图片 base64")
 
 
+class RecruitQRCodeBulkRequest(BaseModel):
+    """批量生成员工小程序码请求."""
+
+    employee_ids: list[str] = Field(
+        min_length=1,
+        max_length=settings.recruit_qrcode_bulk_max,
+        description="归属员工ID列表（重复ID只生成一次）",
+    )
+
+
+class RecruitQRCodeBulkItem(BaseModel):
+    """批量生成成功项."""
+
+    employee_id: str = Field(description="归属员工ID")
+    code: str = Field(description="8位短码")
+    image_url: str = Field(description="小程序码图片 URL")
+
+
+class RecruitQRCodeBulkFailure(BaseModel):
+    """批量生成失败项."""
+
+    employee_id: str = Field(description="归属员工ID")
+    reason: str = Field(description="失败原因")
+
+
+class RecruitQRCodeBulkResponse(BaseModel):
+    """批量生成员工小程序码响应."""
+
+    items: list[RecruitQRCodeBulkItem] = Field(description="生成成功的小程序码")
+    failures: list[RecruitQRCodeBulkFailure] = Field(default_factory=list, description="生成失败的员工")
+
+
 class RecruitQRSceneResponse(BaseModel):
     """解析短码响应."""
 
@@ -276,6 +310,10 @@ __all__ = [
     "RecruitMyLeadListResponse",
     "RecruitMyLeadPhoneResponse",
     "RecruitMyShareStatsResponse",
+    "RecruitQRCodeBulkFailure",
+    "RecruitQRCodeBulkItem",
+    "RecruitQRCodeBulkRequest",
+    "RecruitQRCodeBulkResponse",
     "RecruitQRCodeGenerateRequest",
     "RecruitQRCodeResponse",
     "RecruitQRSceneResponse",
@@ -10,6 +10,7 @@ from schemas.reports.common import (
     Pagination,
     QoqDirection,
     RangeOption,
+    ReportPanel,
     ReportsFilter,
     SortOrder,
     TrendDimension,
@@ -30,6 +31,9 @@ from schemas.reports.market import (
     KpiData,
     PriceBucket,
     PriceDistributionResponse,
+    ReportCacheMetrics,
+    ReportPanelsResponse,
+    ReportPanelTiming,
     TrendDataPoint,
 )
 
@@ -52,6 +56,10 @@ __all__ = [
     "PriceDistributionResponse",
     "QoqDirection",
     "RangeOption",
+    "ReportCacheMetrics",
+    "ReportPanel",
+    "ReportPanelTiming",
+    "ReportPanelsResponse",
     "ReportsFilter",
     "SortOrder",
     "TrendDataPoint",
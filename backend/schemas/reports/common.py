@@ -44,6 +44,16 @@ class RangeOption(str, Enum):
     M24 = "24m"
 
 
+class ReportPanel(str, Enum):
+    """报表页面板（批量面板查询）."""
+
+    KPI = "kpi"
+    TREND = "trend"
+    PRICE_DISTRIBUTION = "price_distribution"
+    ROOMS_DISTRIBUTION = "rooms_distribution"
+    FLOOR_DISTRIBUTION = "floor_distribution"
+
+
 class KpiCard(BaseModel):
     """单张 KPI 卡片数据."""
 
@@ -97,6 +107,7 @@ __all__ = [
     "Pagination",
     "QoqDirection",
     "RangeOption",
+    "ReportPanel",
     "ReportsFilter",
     "SortOrder",
     "TrendDimension",
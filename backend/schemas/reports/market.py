@@ -8,7 +8,7 @@ from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field
 
-from schemas.reports.common import KpiCard
+from schemas.reports.common import KpiCard, ReportPanel
 
 
 class KpiData(BaseModel):
@@ -155,6 +155,38 @@ class ComparisonData(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ReportCacheMetrics(BaseModel):
+    """报表缓存命中统计（全部 worker 累计）."""
+
+    requests: int = Field(description="报表聚合调用次数（不含预热）")
+    hits: int = Field(description="命中缓存次数")
+    warmed_hits: int = Field(description="命中预热生成条目的次数")
+    warm_refreshed: int = Field(description="预热重算条目次数")
+    warm_skipped: int = Field(description="预热时条目仍新鲜而跳过的次数")
+    hit_ratio: float | None = Field(description="命中率（hits / requests），无调用时为 null")
+    warm_hit_ratio: float | None = Field(description="预热命中率（warmed_hits / requests），无调用时为 null")
+
+
+class ReportPanelTiming(BaseModel):
+    """批量面板查询中单个面板的执行情况."""
+
+    panel: ReportPanel = Field(description="面板")
+    elapsed_ms: float = Field(description="面板耗时（毫秒，含获取连接与读取缓存）")
+    cached: bool = Field(description="是否命中报表缓存")
+
+
+class ReportPanelsResponse(BaseModel):
+    """报表面板批量查询响应；未请求的面板为 null."""
+
+    kpi: KpiData | None = Field(None, description="KPI 卡片")
+    trend: list[TrendDataPoint] | None = Field(None, description="成交趋势")
+    price_distribution: PriceDistributionResponse | None = Field(None, description="价格分布")
+    rooms_distribution: DistributionResponse | None = Field(None, description="户型分布")
+    floor_distribution: DistributionResponse | None = Field(None, description="楼层分布")
+    timings: list[ReportPanelTiming] = Field(description="各面板执行情况（按请求顺序）")
+    elapsed_ms: float = Field(description="批量查询总耗时（毫秒）")
+
+
 __all__ = [
     "BusinessDistrictListResponse",
     "BusinessDistrictRow",
@@ -168,5 +200,8 @@ __all__ = [
     "KpiData",
     "PriceBucket",
     "PriceDistributionResponse",
+    "ReportCacheMetrics",
+    "ReportPanelTiming",
+    "ReportPanelsResponse",
     "TrendDataPoint",
 ]
@@ -41,6 +41,11 @@ class ImportTaskStatusResponse(BaseModel):
     failed_count: int = Field(default=0, description="失败记录数")
     progress_percent: float = Field(default=0.0, description="进度百分比(0-100)")
 
+    # 户型图下载进度
+    media_total: int = Field(default=0, description="入队户型图下载数")
+    media_downloaded: int = Field(default=0, description="已下载户型图数")
+    media_failed: int = Field(default=0, description="下载失败户型图数")
+
     # 结果信息
     failed_file_url: str | None = Field(None, description="失败记录文件URL")
     error_message: str | None = Field(None, description="错误信息")
@@ -54,6 +59,15 @@ class ImportTaskStatusResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PushJobStatusResponse(ImportTaskStatusResponse):
+    """JSON 推送异步任务状态响应（任务完成后附带逐条错误详情）."""
+
+    errors: list[dict] = Field(
+        default_factory=list,
+        description="错误详情列表（index 为推送数组下标，格式与同步推送结果一致）",
+    )
+
+
 class PushResult(BaseModel):
     """JSON推送结果."""
 
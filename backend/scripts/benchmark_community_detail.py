@@ -0,0 +1,193 @@
+"""小区成交分析详情查询基准.
+
+在 ``DATABASE_URL`` 指向的 PostgreSQL 中构造一个基准小区（GROUPING SETS / FILTER 需 PostgreSQL），
+对比 ``get_community_detail`` 的两种计算方式（均绕过报表缓存）：
+
+- sequential：逐面板调用 ``_get_kpi_data_impl`` / ``_get_trend_data_impl`` / 各分布 ``_impl``
+  与 main_layout 查询（合并前的组合方式，约 10 次查询）
+- combined：当前实现（1 次 GROUPING SETS 统计查询 + 价格分段 2 次查询）
+
+每组参数先校验两种方式结果一致，再取多轮最快耗时。汇总表与明细表两种统计来源各测一遍。
+基准数据写入后在退出时删除，请勿对生产库运行。
+
+运行方式::
+
+    cd backend
+    python -m scripts.benchmark_community_detail
+    python -m scripts.benchmark_community_detail --sold 5000 --rounds 20
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from db import SessionLocal, engine
+from models import Base, Community, PropertyCurrent
+from models.common import PropertyStatus
+from schemas.reports.common import ReportsFilter
+from services.market.stats_rollup import refresh_market_rollups
+from services.reports.aggregations import (
+    _base_filter_no_status,
+    _get_data_reference_date,
+    _get_floor_distribution_impl,
+    _get_kpi_data_impl,
+    _get_price_distribution_impl,
+    _get_rooms_distribution_impl,
+    _get_trend_data_impl,
+    _main_layout,
+    _main_layout_query,
+    get_community_detail,
+)
+from services.reports.stats_source import get_stats_source
+from settings import settings
+
+_FLOOR_LEVELS = ("低楼层", "中楼层", "高楼层", None)
+
+# 基准参数组合（时间范围、趋势维度与额外筛选）
+_CASES: list[tuple[str, str, dict]] = [
+    *(
+        (range_, dim, {})
+        for range_ in ("4w", "8w", "6m", "12m", "24m")
+        for dim in ("overall", "rooms", "floor", "price")
+    ),
+    ("12m", "price", {"status": PropertyStatus.SOLD.value}),
+    ("12m", "overall", {"status": PropertyStatus.FOR_SALE.value}),
+    ("12m", "rooms", {"rooms": ["2", "3"]}),
+    ("24m", "floor", {"floor_levels": ["低楼层"], "sources": ["链家"]}),
+]
+
+
+def _seed(db: Session, sold: int, on_sale: int) -> Community:
+    now = datetime.now(timezone.utc)
+    community = Community(name=f"基准小区-{uuid.uuid4().hex[:8]}", business_circle="基准商圈", district="基准区")
+    db.add(community)
+    db.flush()
+
+    def _property(index: int, status: PropertyStatus) -> PropertyCurrent:
+        # 按序号散列出确定的房源属性, 多次运行数据分布一致
+        mixed = index * 2654435761 % 2**32
+        price = Decimal(150 + mixed % 1051)
+        sold_date = now - timedelta(days=mixed % 761, hours=index % 24)
+        return PropertyCurrent(
+            data_source=("链家", "贝壳")[index % 2],
+            source_property_id=f"bench-{community.id[:8]}-{index}",
+            community_id=community.id,
+            status=status,
+            rooms=1 + mixed % 4,
+            halls=index % 3,
+            orientation="南",
+            floor_original="中楼层/18层",
+            floor_level=_FLOOR_LEVELS[mixed % len(_FLOOR_LEVELS)],
+            build_area=Decimal(40 + mixed % 121),
+            listed_price_wan=price,
+            listed_date=sold_date - timedelta(days=30),
+            sold_price_wan=price if status == PropertyStatus.SOLD else None,
+            sold_date=sold_date if status == PropertyStatus.SOLD else None,
+        )
+
+    db.add_all(_property(index, PropertyStatus.SOLD) for index in range(sold))
+    db.add_all(_property(sold + index, PropertyStatus.FOR_SALE) for index in range(on_sale))
+    db.flush()
+    refresh_market_rollups(db, [community.id])
+    db.commit()
+    return community
+
+
+def _sequential(db: Session, community: Community, filter: ReportsFilter, trend_dim: str) -> dict:
+    """合并前的组合方式：逐面板查询."""
+    ref_date = _get_data_reference_date(db, _base_filter_no_status(filter), community.id)
+    kwargs = {"community_id": community.id, "reference_date": ref_date}
+    layout_query = _main_layout_query(get_stats_source(), community.id, datetime.now(timezone.utc))
+    return {
+        "kpi": _get_kpi_data_impl(db, filter, **kwargs),
+        "trend": _get_trend_data_impl(db, filter, trend_dim, **kwargs),
+        "price_distribution": _get_price_distribution_impl(db, filter, **kwargs),
+        "rooms_distribution": _get_rooms_distribution_impl(db, filter, **kwargs),
+        "floor_distribution": _get_floor_distribution_impl(db, filter, **kwargs),
+        "main_layout": _main_layout((row.rooms, row.halls, row.count) for row in db.execute(layout_query).all()),
+    }
+
+
+def _combined(db: Session, community: Community, filter: ReportsFilter, trend_dim: str) -> dict:
+    result = get_community_detail.__wrapped__(db, community, filter, trend_dim)
+    result.pop("community")
+    return result
+
+
+def _normalize(value: object) -> object:
+    if hasattr(value, "model_dump"):
+        return _normalize(value.model_dump())
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        return [_normalize(item) for item in value]
+    if isinstance(value, float):
+        return round(value, 6)
+    return value
+
+
+def _best(run: Callable[[], object], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    """脚本入口."""
+    parser = argparse.ArgumentParser(description="小区成交分析详情查询基准")
+    parser.add_argument("--sold", type=int, default=2000, help="基准小区成交房源数")
+    parser.add_argument("--on-sale", type=int, default=300, help="基准小区在售房源数")
+    parser.add_argument("--rounds", type=int, default=10, help="每组参数重复轮数（取最快一轮）")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        community = _seed(db, args.sold, args.on_sale)
+        try:
+            for use_rollups in (True, False):
+                settings.reports_use_rollups = use_rollups
+                totals = {"sequential": 0.0, "combined": 0.0}
+                for range_, trend_dim, extra in _CASES:
+                    report_filter = ReportsFilter(range=range_, **extra)
+                    expected = _normalize(_sequential(db, community, report_filter, trend_dim))
+                    actual = _normalize(_combined(db, community, report_filter, trend_dim))
+                    if expected != actual:
+                        msg = f"结果不一致: range={range_} trend_dim={trend_dim} {extra}"
+                        raise AssertionError(msg)
+                    for label, run in (("sequential", _sequential), ("combined", _combined)):
+                        elapsed = _best(
+                            lambda run=run, report_filter=report_filter, trend_dim=trend_dim: run(
+                                db, community, report_filter, trend_dim
+                            ),
+                            args.rounds,
+                        )
+                        totals[label] += elapsed
+                    db.rollback()
+                source = "rollup" if use_rollups else "raw"
+                print(
+                    f"[{source:6}] {len(_CASES)} 组参数结果一致; 平均耗时 "
+                    f"sequential {totals['sequential'] / len(_CASES) * 1000:.1f} ms, "
+                    f"combined {totals['combined'] / len(_CASES) * 1000:.1f} ms"
+                )
+        finally:
+            db.rollback()
+            db.execute(delete(PropertyCurrent).where(PropertyCurrent.community_id == community.id))
+            refresh_market_rollups(db, [community.id])
+            db.execute(delete(Community).where(Community.id == community.id))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""加密字段解密开销基准.
+
+在内存 SQLite 中构造项目与业主数据（每个项目若干业主，电话/身份证号/银行卡号均加密），
+两种方式均运行同一导出路径 ``build_projects_export``，对比每行耗时：
+
+- eager：实体加载时解密全部加密列（通过 ``load`` 事件模拟加密列在结果处理阶段解密的旧行为）
+- lazy：当前行为（只在读取属性时解密，导出只读取主业主电话）
+
+需配置 ENCRYPTION_KEY。
+
+运行方式::
+
+    cd backend
+    python -m scripts.benchmark_encrypted_export
+    python -m scripts.benchmark_encrypted_export --projects 2000 --owners 3
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.orm import QueryContext, Session
+from sqlalchemy.pool import StaticPool
+
+from models import Base, Project, ProjectOwner
+from models.common import ProjectStatus
+from models.common.encrypted import EncryptedAttribute
+from services.projects.core import ProjectCoreService
+
+
+def _seed(db: Session, projects: int, owners: int) -> None:
+    now = datetime.now(timezone.utc)
+    for index in range(projects):
+        project = Project(
+            name=f"基准小区 {index}号",
+            community_name="基准小区",
+            address=f"{index}号",
+            status=ProjectStatus.SIGNING,
+            created_at=now,
+            updated_at=now,
+        )
+        db.add(project)
+        db.flush()
+        db.add_all(
+            ProjectOwner(
+                project_id=project.id,
+                owner_name=f"业主{index}-{seq}",
+                owner_phone=f"138{index:04d}{seq:04d}",
+                owner_id_card=f"11010119900101{seq:04d}",
+                bank_card_number=f"6222{index:08d}{seq:04d}",
+                created_at=now,
+                updated_at=now,
+            )
+            for seq in range(owners)
+        )
+    db.commit()
+
+
+def _decrypt_all_on_load(target: object, _context: QueryContext) -> None:
+    """加载实体时读取全部加密属性（触发解密并缓存），等价于加载即解密的旧行为."""
+    for name, attr in vars(type(target)).items():
+        if isinstance(attr, EncryptedAttribute):
+            getattr(target, name)
+
+
+def _time_export(engine: Engine, *, eager: bool, rounds: int) -> tuple[float, int]:
+    """每轮使用新会话（实体与解密缓存均不复用），取最快一轮."""
+    if eager:
+        event.listen(Base, "load", _decrypt_all_on_load, propagate=True)
+    try:
+        best, count = float("inf"), 0
+        for _ in range(rounds):
+            with Session(engine) as db:
+                start = time.perf_counter()
+                _, rows = ProjectCoreService(db).build_projects_export()
+                best = min(best, time.perf_counter() - start)
+                count = len(rows)
+        return best, count
+    finally:
+        if eager:
+            event.remove(Base, "load", _decrypt_all_on_load)
+
+
+def main() -> None:
+    """脚本入口."""
+    parser = argparse.ArgumentParser(description="加密字段解密开销基准")
+    parser.add_argument("--projects", type=int, default=1000, help="项目数")
+    parser.add_argument("--owners", type=int, default=2, help="每个项目的业主数")
+    parser.add_argument("--rounds", type=int, default=3, help="重复轮数（取最快一轮）")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        _seed(db, args.projects, args.owners)
+
+    for label, eager in (("eager", True), ("lazy", False)):
+        elapsed, count = _time_export(engine, eager=eager, rounds=args.rounds)
+        print(
+            f"build_projects_export [{label:5}] {count} 行: {elapsed * 1000:.1f} ms, {elapsed / count * 1e6:.1f} µs/行"
+        )
+
+
+if __name__ == "__main__":
+    main()
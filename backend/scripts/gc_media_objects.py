@@ -0,0 +1,50 @@
+"""媒体存储垃圾回收脚本.
+
+删除内容寻址存储（``media_objects``）中不再被 ``property_media`` / ``community_images`` /
+营销媒体引用的户型图对象及其缩略图，最近 ``MEDIA_GC_GRACE_HOURS`` 小时内使用过的对象保留。
+建议由定时任务每日运行一次。
+
+运行方式::
+
+    cd backend
+    python -m scripts.gc_media_objects --dry-run
+    python -m scripts.gc_media_objects
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+
+from services.market.media_store import get_media_store
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """脚本入口."""
+    parser = argparse.ArgumentParser(description="媒体存储垃圾回收")
+    parser.add_argument("--dry-run", action="store_true", help="仅统计可回收对象，不删除")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+
+    try:
+        result = get_media_store().collect_garbage(dry_run=args.dry_run)
+    except Exception:
+        logger.exception("媒体存储垃圾回收失败")
+        sys.exit(1)
+
+    print(f"\n=== 媒体存储垃圾回收完成{'（试运行）' if args.dry_run else ''} ===")
+    print(f"未引用对象数: {result.scanned}")
+    print(f"回收对象数:   {result.deleted}")
+    print(f"释放空间:     {result.freed_bytes / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""房源导入工作进程池.
+
+从 ``property_import_tasks`` 持久化队列领取 CSV 导入任务，多个进程并发处理不同任务。
+可与 API 进程内的导入工作线程（``settings.import_embedded_workers``）同时运行，
+任务领取使用 ``FOR UPDATE SKIP LOCKED``，不会重复处理。
+
+运行方式::
+
+    cd backend
+    python -m scripts.run_import_workers            # 进程数取 settings.import_worker_processes
+    python -m scripts.run_import_workers --processes 4
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from services.market.import_task_queue import run_import_worker_pool
+
+
+def main() -> None:
+    """脚本入口."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+    parser = argparse.ArgumentParser(description="房源导入工作进程池")
+    parser.add_argument("--processes", type=int, default=None, help="工作进程数")
+    args = parser.parse_args()
+
+    run_import_worker_pool(args.processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""微信小程序服务端接口本地桩.
+
+本地联调 / 测试招募小程序码时替代微信服务器，避免消耗真实接口配额：
+
+- ``GET /cgi-bin/token``：返回固定 access_token
+- ``POST /wxa/getwxacodeunlimit``：按 scene 生成一张确定的 PNG（相同 scene 内容相同），
+  scene 为空时返回微信格式的错误 JSON
+
+每次调用会打印 scene，便于确认缓存命中后不再调用接口；``--latency-ms`` 模拟上游耗时。
+
+运行方式::
+
+    cd backend
+    python -m scripts.wechat_api_stub --port 8765 --latency-ms 200
+
+    # 另一终端，将后端指向桩服务后启动
+    export WECHAT_MINIAPP_TOKEN_URL=http://127.0.0.1:8765/cgi-bin/token
+    export WECHAT_MINIAPP_QRCODE_URL=http://127.0.0.1:8765/wxa/getwxacodeunlimit
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image, ImageDraw
+
+_ACCESS_TOKEN = "stub-access-token"  # noqa: S105
+_IMAGE_SIZE = 280
+
+
+def _render_qrcode(scene: str) -> bytes:
+    """按 scene 哈希绘制 16x16 色块图（模拟小程序码，相同 scene 输出相同）."""
+    digest = hashlib.sha256(scene.encode()).digest()
+    cell = _IMAGE_SIZE // 16
+    image = Image.new("RGB", (_IMAGE_SIZE, _IMAGE_SIZE), "white")
+    draw = ImageDraw.Draw(image)
+    for index in range(256):
+        if digest[index % len(digest)] >> (index % 8) & 1:
+            x, y = index % 16 * cell, index // 16 * cell
+            draw.rectangle((x, y, x + cell - 1, y + cell - 1), fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class _StubState:
+    """桩服务运行参数与调用计数."""
+
+    def __init__(self, latency_ms: int) -> None:
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self.lock = threading.Lock()
+
+
+def _make_handler(state: _StubState) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if not self.path.startswith("/cgi-bin/token"):
+                self.send_error(404)
+                return
+            self._send_json({"access_token": _ACCESS_TOKEN, "expires_in": 7200})
+
+        def do_POST(self) -> None:
+            if not self.path.startswith("/wxa/getwxacodeunlimit"):
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            scene = str(payload.get("scene") or "")
+            with state.lock:
+                state.calls += 1
+                calls = state.calls
+            print(f"[wechat-stub] getwxacodeunlimit #{calls}: scene={scene}")
+            time.sleep(state.latency_ms / 1000)
+            if not scene:
+                self._send_json({"errcode": 40169, "errmsg": "invalid length for scene"})
+                return
+            content = _render_qrcode(scene)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format: str, *args: object) -> None:
+            """关闭默认访问日志（调用记录由上方 print 输出）."""
+
+        def _send_json(self, data: dict) -> None:
+            body = json.dumps(data).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def main() -> None:
+    """脚本入口."""
+    parser = argparse.ArgumentParser(description="微信小程序服务端接口本地桩")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--latency-ms", type=int, default=0, help="模拟小程序码接口耗时（毫秒）")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(_StubState(args.latency_ms)))
+    print(f"微信接口桩已启动: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""后台导出任务模块.
+
+大数据量导出以任务形式排队，由工作线程生成文件并上传至存储后端，
+客户端轮询任务状态获取下载地址；相同参数的导出在复用窗口内共享文件。
+
+使用方式:
+    from services.exports import get_export_job_service, start_export_job
+"""
+
+from .generators import (
+    EXPORT_GENERATORS,
+    EXPORT_INVESTMENT_XLSX,
+    EXPORT_LEDGER_XLSX,
+    EXPORT_PROJECTS_CSV,
+    EXPORT_PROPERTIES_CSV,
+    ExportGenerator,
+)
+from .service import ExportJobService, export_params_hash, get_export_job_service
+from .worker import run_export_worker, start_embedded_export_workers, start_export_job
+
+__all__ = [
+    "EXPORT_GENERATORS",
+    "EXPORT_INVESTMENT_XLSX",
+    "EXPORT_LEDGER_XLSX",
+    "EXPORT_PROJECTS_CSV",
+    "EXPORT_PROPERTIES_CSV",
+    "ExportGenerator",
+    "ExportJobService",
+    "export_params_hash",
+    "get_export_job_service",
+    "run_export_worker",
+    "start_embedded_export_workers",
+    "start_export_job",
+]
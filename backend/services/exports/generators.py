@@ -0,0 +1,96 @@
+"""导出类型注册表.
+
+每种导出类型对应一个生成器：根据任务保存的筛选参数（JSON）在给定会话中查询数据，
+写入本地临时文件并返回数据行数。查询与行格式复用同步导出接口的服务方法，
+两种方式导出的文件内容一致。
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from models.common import ProjectStatus, SettlementStatus
+from services import FinanceService, ProjectService
+from services.investment import InvestmentService
+from services.market import PROPERTY_EXPORT_HEADERS, get_property_query_service, property_export_row
+from utils.csv_exporter import export_filename, write_csv_file
+from utils.query_params import PropertyExportParams
+from utils.xlsx_exporter import write_xlsx
+
+# 导出类型标识
+EXPORT_LEDGER_XLSX = "ledger_xlsx"
+EXPORT_INVESTMENT_XLSX = "investment_xlsx"
+EXPORT_PROJECTS_CSV = "projects_csv"
+EXPORT_PROPERTIES_CSV = "properties_csv"
+
+
+@dataclass(frozen=True)
+class ExportGenerator:
+    """导出类型定义."""
+
+    # 文件扩展名（含点）
+    extension: str
+    # 下载文件名生成函数
+    filename: Callable[[], str]
+    # 生成函数：(会话, 筛选参数, 输出路径) -> 数据行数
+    build: Callable[[Session, dict[str, Any], Path], int]
+
+
+def _dated_filename(prefix: str, extension: str) -> Callable[[], str]:
+    """中文前缀 + 日期的文件名（与同步导出一致），如 资金账本_20260707.xlsx."""
+    return lambda: f"{prefix}_{datetime.now(tz=timezone.utc).strftime('%Y%m%d')}{extension}"
+
+
+def _build_ledger(db: Session, params: dict[str, Any], path: Path) -> int:
+    headers, rows = FinanceService(db).build_ledger_export(
+        search=params.get("search"),
+        project_status=params.get("project_status"),
+    )
+    return write_xlsx(path, "资金账本", headers, rows)
+
+
+def _build_investment(db: Session, params: dict[str, Any], path: Path) -> int:
+    project_status = params.get("project_status")
+    settlement_status = params.get("settlement_status")
+    headers, rows = InvestmentService(db).build_investment_export(
+        search=params.get("search"),
+        project_status=ProjectStatus(project_status) if project_status else None,
+        settlement_status=SettlementStatus(settlement_status) if settlement_status else None,
+    )
+    return write_xlsx(path, "跟投列表", headers, rows)
+
+
+def _build_projects(db: Session, params: dict[str, Any], path: Path) -> int:
+    headers, rows = ProjectService(db).build_projects_export(
+        status_filter=params.get("status"),
+        community_name=params.get("community_name"),
+    )
+    return write_csv_file(path, headers, rows)
+
+
+def _build_properties(_db: Session, params: dict[str, Any], path: Path) -> int:
+    results = get_property_query_service().stream_properties_for_export(PropertyExportParams.model_validate(params))
+    rows = (property_export_row(prop, community) for prop, community in results)
+    return write_csv_file(path, PROPERTY_EXPORT_HEADERS, rows)
+
+
+EXPORT_GENERATORS: dict[str, ExportGenerator] = {
+    EXPORT_LEDGER_XLSX: ExportGenerator(".xlsx", _dated_filename("资金账本", ".xlsx"), _build_ledger),
+    EXPORT_INVESTMENT_XLSX: ExportGenerator(".xlsx", _dated_filename("跟投列表", ".xlsx"), _build_investment),
+    EXPORT_PROJECTS_CSV: ExportGenerator(".csv", lambda: export_filename("projects_export"), _build_projects),
+    EXPORT_PROPERTIES_CSV: ExportGenerator(".csv", lambda: export_filename("properties_export"), _build_properties),
+}
+
+
+__all__ = [
+    "EXPORT_GENERATORS",
+    "EXPORT_INVESTMENT_XLSX",
+    "EXPORT_LEDGER_XLSX",
+    "EXPORT_PROJECTS_CSV",
+    "EXPORT_PROPERTIES_CSV",
+    "ExportGenerator",
+]
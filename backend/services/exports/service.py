@@ -0,0 +1,351 @@
+"""后台导出任务服务.
+
+``export_jobs`` 表本身即持久化队列：导出接口只写入 pending 任务并立即返回任务ID，
+导出工作线程以 ``FOR UPDATE SKIP LOCKED`` 领取后生成文件、上传至存储后端，
+客户端轮询任务状态获取下载地址。
+
+- 复用：同一用户相同导出类型与参数（``params_hash``）在 ``settings.export_job_reuse_seconds``
+  内已生成过文件时，新任务直接指向该文件，不再重复查询；相同参数的导出仍在排队/生成中时
+  返回该任务。文件不跨用户复用：各用户的导出在创建时各自经过接口的权限校验
+- 心跳：生成期间每 ``settings.export_job_heartbeat_seconds`` 刷新 ``heartbeat_at``，
+  超过 ``settings.export_job_stale_seconds`` 无心跳的任务才被其他工作线程重新领取；
+  完成时按 ``worker_id`` 校验归属，任务已被重新领取时丢弃本次生成的文件
+- 下载地址：存储键含随机任务ID（UUID，不可枚举），下载地址只通过仅任务创建者可查询的
+  状态接口返回，文件在保留期后删除；与其他上传文件相同，由存储后端（本地静态目录 /
+  公共读 OSS）直接提供下载，不另行签名
+- 清理：文件生成超过 ``settings.export_job_retention_hours`` 后删除存储文件，
+  任务标记为 expired
+"""
+
+import hashlib
+import json
+import logging
+import tempfile
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import ColumnElement, and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from db import SessionLocal
+from models import ExportJob
+from models.common import ExportJobStatus
+from services.system.exceptions import ResourceNotFoundError, ValidationError
+from settings import settings
+from utils.storage import get_storage_backend
+
+from .generators import EXPORT_GENERATORS
+
+logger = logging.getLogger(__name__)
+
+# 单个任务最多领取次数（超过后不再重新领取，由清理流程标记失败）
+_MAX_ATTEMPTS = 3
+
+# 错误信息最大长度
+_ERROR_MESSAGE_MAX_LENGTH = 500
+
+
+def export_params_hash(export_type: str, params: dict[str, Any]) -> str:
+    """导出类型 + 规范化参数（键排序的 JSON）的 SHA-256，用于复用匹配."""
+    canonical = json.dumps(params, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{export_type}:{canonical}".encode()).hexdigest()
+
+
+class ExportJobService:
+    """后台导出任务服务."""
+
+    def enqueue(self, db: Session, user_id: str, export_type: str, params: dict[str, Any]) -> ExportJob:
+        """创建导出任务（或复用该用户已有的文件/进行中的任务）.
+
+        Args:
+            db: 数据库会话
+            user_id: 发起导出的用户ID
+            export_type: 导出类型（见 ``EXPORT_GENERATORS``）
+            params: 导出筛选参数（需可 JSON 序列化）
+
+        Returns:
+            导出任务：复用时为已完成状态，否则为 pending（调用方需通知工作线程）
+
+        Raises:
+            ValidationError: 导出类型未注册时
+
+        """
+        if export_type not in EXPORT_GENERATORS:
+            msg = f"不支持的导出类型: {export_type}"
+            raise ValidationError(msg)
+
+        params_hash = export_params_hash(export_type, params)
+        now = datetime.now(timezone.utc)
+
+        # 1. 同一用户相同参数的导出仍在排队/生成中：直接返回该任务，避免重复提交
+        in_flight = db.scalars(
+            select(ExportJob)
+            .where(
+                ExportJob.user_id == user_id,
+                ExportJob.export_type == export_type,
+                ExportJob.params_hash == params_hash,
+                ExportJob.status.in_([ExportJobStatus.PENDING, ExportJobStatus.PROCESSING]),
+            )
+            .order_by(ExportJob.created_at.desc())
+            .limit(1)
+        ).first()
+        if in_flight is not None:
+            return in_flight
+
+        # 2. 复用窗口内该用户已生成的文件：新任务直接指向同一存储文件
+        source = None
+        if settings.export_job_reuse_seconds > 0:
+            source = db.scalars(
+                select(ExportJob)
+                .where(
+                    ExportJob.user_id == user_id,
+                    ExportJob.export_type == export_type,
+                    ExportJob.params_hash == params_hash,
+                    ExportJob.status == ExportJobStatus.COMPLETED,
+                    ExportJob.completed_at >= now - timedelta(seconds=settings.export_job_reuse_seconds),
+                )
+                .order_by(ExportJob.completed_at.desc())
+                .limit(1)
+            ).first()
+
+        job = ExportJob(
+            user_id=user_id,
+            export_type=export_type,
+            params=params,
+            params_hash=params_hash,
+            created_at=now,
+        )
+        if source is not None:
+            # 复用任务沿用源文件的完成时间，随源文件一同过期清理
+            job.status = ExportJobStatus.COMPLETED
+            job.filename = source.filename
+            job.storage_key = source.storage_key
+            job.download_url = source.download_url
+            job.row_count = source.row_count
+            job.reused_from = source.reused_from or source.id
+            job.started_at = now
+            job.completed_at = source.completed_at
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        if source is not None:
+            logger.info("导出任务复用已有文件: %s -> %s", job.id, job.reused_from)
+        return job
+
+    def get_job(self, db: Session, job_id: str, user_id: str) -> ExportJob:
+        """获取当前用户的导出任务.
+
+        Raises:
+            ResourceNotFoundError: 任务不存在或不属于该用户时
+
+        """
+        job = db.get(ExportJob, job_id)
+        if job is None or job.user_id != user_id:
+            msg = "导出任务不存在"
+            raise ResourceNotFoundError(msg)
+        return job
+
+    def claim_next_job(self, worker_id: str, db: Session) -> str | None:
+        """从持久化队列领取一个待处理导出任务（``FOR UPDATE SKIP LOCKED``，多进程安全）.
+
+        可领取的任务：pending 任务（先进先出），以及超过
+        ``settings.export_job_stale_seconds`` 无心跳的 processing 任务（工作线程崩溃/重启）。
+
+        Returns:
+            领取到的任务ID，队列为空时返回 None
+
+        """
+        now = datetime.now(timezone.utc)
+        candidate = (
+            select(ExportJob.id)
+            .where(
+                ExportJob.attempts < _MAX_ATTEMPTS,
+                or_(
+                    ExportJob.status == ExportJobStatus.PENDING,
+                    and_(ExportJob.status == ExportJobStatus.PROCESSING, _is_stale(now)),
+                ),
+            )
+            .order_by(ExportJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job_id = db.execute(
+            update(ExportJob)
+            .where(ExportJob.id == candidate.scalar_subquery())
+            .values(
+                status=ExportJobStatus.PROCESSING,
+                worker_id=worker_id,
+                started_at=now,
+                heartbeat_at=now,
+                attempts=ExportJob.attempts + 1,
+            )
+            .returning(ExportJob.id)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        db.commit()
+        return job_id
+
+    def process_job(self, job_id: str, worker_id: str) -> None:
+        """生成导出文件并上传至存储后端（使用独立会话，失败时记录错误信息）.
+
+        生成期间定期刷新心跳；完成时任务已被其他工作线程重新领取（本线程失去归属）则删除
+        本次上传的文件，不覆盖新领取者的结果。
+        """
+        with SessionLocal() as db:
+            job = db.get(ExportJob, job_id)
+            if job is None:
+                return
+            generator = EXPORT_GENERATORS[job.export_type]
+            try:
+                with _heartbeat(job_id, worker_id), tempfile.TemporaryDirectory(prefix="export_") as tmp:
+                    path = Path(tmp) / f"{job.id}{generator.extension}"
+                    row_count = generator.build(db, job.params, path)
+                    # 存储键带领取次数：重新领取的任务与原工作线程各写各的文件，互不覆盖
+                    key = (
+                        f"exports/{datetime.now(timezone.utc).strftime('%Y%m%d')}/"
+                        f"{job.id}_{job.attempts}{generator.extension}"
+                    )
+                    url = get_storage_backend().upload_file(path, key)
+            except Exception as e:
+                logger.exception("导出任务失败: %s", job_id)
+                db.rollback()
+                self._finish(
+                    db,
+                    job_id,
+                    worker_id,
+                    status=ExportJobStatus.FAILED,
+                    error_message=str(e)[:_ERROR_MESSAGE_MAX_LENGTH],
+                )
+                return
+
+            owned = self._finish(
+                db,
+                job_id,
+                worker_id,
+                status=ExportJobStatus.COMPLETED,
+                filename=generator.filename(),
+                storage_key=key,
+                download_url=url,
+                row_count=row_count,
+            )
+            if not owned:
+                get_storage_backend().delete_file(key)
+                logger.warning("导出任务已被其他工作线程重新领取，丢弃本次结果: %s (%s)", job_id, worker_id)
+                return
+            logger.info("导出任务完成: %s (%s, %s 行)", job_id, job.export_type, row_count)
+
+    def purge_expired(self, db: Session) -> int:
+        """删除超过保留时长的导出文件并标记任务为 expired；超过最大领取次数仍未完成的任务标记为失败.
+
+        复用任务与源任务共享存储文件且完成时间相同，同批过期，每个存储键只删除一次。
+
+        Returns:
+            删除的过期文件数
+
+        """
+        now = datetime.now(timezone.utc)
+        expire_before = now - timedelta(hours=settings.export_job_retention_hours)
+        expired = db.execute(
+            update(ExportJob)
+            .where(ExportJob.status == ExportJobStatus.COMPLETED, ExportJob.completed_at < expire_before)
+            .values(status=ExportJobStatus.EXPIRED, download_url=None)
+            .returning(ExportJob.storage_key)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+        keys = {key for key in expired if key}
+        db.execute(
+            update(ExportJob)
+            .where(
+                ExportJob.status == ExportJobStatus.PROCESSING,
+                ExportJob.attempts >= _MAX_ATTEMPTS,
+                _is_stale(now),
+            )
+            .values(status=ExportJobStatus.FAILED, error_message="导出多次中断，请重新发起导出", completed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+        storage = get_storage_backend()
+        for key in keys:
+            if not storage.delete_file(key):
+                logger.warning("删除过期导出文件失败: %s", key)
+        if keys:
+            logger.info("已清理过期导出文件: %s 个", len(keys))
+        return len(keys)
+
+    @staticmethod
+    def _finish(db: Session, job_id: str, worker_id: str, **values: object) -> bool:
+        """写入任务结果（仅当任务仍由该工作线程处理时），返回是否写入."""
+        result = db.execute(
+            update(ExportJob)
+            .where(
+                ExportJob.id == job_id,
+                ExportJob.worker_id == worker_id,
+                ExportJob.status == ExportJobStatus.PROCESSING,
+            )
+            .values(completed_at=datetime.now(timezone.utc), **values)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount > 0
+
+
+def _is_stale(now: datetime) -> ColumnElement[bool]:
+    """返回 processing 任务心跳超时条件（无心跳记录时按开始时间判断）."""
+    stale_before = now - timedelta(seconds=settings.export_job_stale_seconds)
+    return func.coalesce(ExportJob.heartbeat_at, ExportJob.started_at) < stale_before
+
+
+def _touch_heartbeat(job_id: str, worker_id: str) -> None:
+    """刷新任务心跳（仅当任务仍由该工作线程处理时），失败只记录日志."""
+    try:
+        with SessionLocal() as db:
+            db.execute(
+                update(ExportJob)
+                .where(
+                    ExportJob.id == job_id,
+                    ExportJob.worker_id == worker_id,
+                    ExportJob.status == ExportJobStatus.PROCESSING,
+                )
+                .values(heartbeat_at=datetime.now(timezone.utc))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+    except Exception:
+        logger.exception("刷新导出任务心跳失败: %s", job_id)
+
+
+@contextmanager
+def _heartbeat(job_id: str, worker_id: str) -> Iterator[None]:
+    """上下文内由后台线程定期刷新任务心跳，防止长时间生成的任务被误判为崩溃而重复生成."""
+    stop = threading.Event()
+
+    def beat() -> None:
+        while not stop.wait(settings.export_job_heartbeat_seconds):
+            _touch_heartbeat(job_id, worker_id)
+
+    thread = threading.Thread(target=beat, name=f"ExportHeartbeat-{job_id[:8]}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+_export_job_service: ExportJobService | None = None
+
+
+def get_export_job_service() -> ExportJobService:
+    """获取导出任务服务实例（单例）."""
+    global _export_job_service
+    if _export_job_service is None:
+        _export_job_service = ExportJobService()
+    return _export_job_service
+
+
+__all__ = ["ExportJobService", "export_params_hash", "get_export_job_service"]
@@ -0,0 +1,100 @@
+"""后台导出工作线程.
+
+API 进程 lifespan 内启动 ``settings.export_embedded_workers`` 个守护线程，
+以 ``FOR UPDATE SKIP LOCKED`` 从 ``export_jobs`` 领取任务（多进程部署时各进程的
+工作线程并发领取互不冲突）；队列空闲时顺带清理过期导出文件。
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+
+from db import SessionLocal
+from settings import settings
+
+from .service import get_export_job_service
+
+logger = logging.getLogger(__name__)
+
+# 过期导出文件清理间隔（秒）
+_PURGE_INTERVAL_SECONDS = 600
+
+# 新任务入队通知：唤醒本进程内空闲的工作线程，免等轮询间隔
+_job_available = threading.Event()
+
+_embedded_workers: list[threading.Thread] = []
+_embedded_lock = threading.Lock()
+
+# 上次清理过期文件的时间（monotonic），进程内各工作线程共享
+_last_purge = 0.0
+_purge_lock = threading.Lock()
+
+
+def _worker_identity() -> str:
+    """当前工作线程标识（主机名:进程号:线程名）."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+
+def _purge_if_due() -> None:
+    """距上次清理超过 ``_PURGE_INTERVAL_SECONDS`` 时清理过期导出文件."""
+    global _last_purge
+    with _purge_lock:
+        now = time.monotonic()
+        if _last_purge and now - _last_purge < _PURGE_INTERVAL_SECONDS:
+            return
+        _last_purge = now
+    try:
+        with SessionLocal() as db:
+            get_export_job_service().purge_expired(db)
+    except Exception:
+        logger.exception("清理过期导出文件失败")
+
+
+def run_export_worker(stop_event: threading.Event | None = None) -> None:
+    """导出工作循环：领取任务 -> 生成文件 -> 继续领取，队列为空时清理过期文件并等待通知或轮询.
+
+    Args:
+        stop_event: 停止信号（为 None 时持续运行，用于守护线程）
+
+    """
+    worker_id = _worker_identity()
+    service = get_export_job_service()
+    logger.info("导出工作线程已启动: %s", worker_id)
+
+    while stop_event is None or not stop_event.is_set():
+        try:
+            with SessionLocal() as db:
+                job_id = service.claim_next_job(worker_id, db)
+        except Exception:
+            logger.exception("领取导出任务失败: %s", worker_id)
+            job_id = None
+
+        if job_id:
+            service.process_job(job_id, worker_id)
+            continue
+
+        _purge_if_due()
+        _job_available.wait(settings.export_worker_poll_seconds)
+        _job_available.clear()
+
+
+def start_embedded_export_workers() -> None:
+    """在 API 进程内启动导出工作线程（幂等，数量取 ``settings.export_embedded_workers``）."""
+    with _embedded_lock:
+        if _embedded_workers:
+            return
+        for index in range(settings.export_embedded_workers):
+            thread = threading.Thread(target=run_export_worker, name=f"ExportWorker-{index}", daemon=True)
+            thread.start()
+            _embedded_workers.append(thread)
+
+
+def start_export_job(job_id: str) -> None:
+    """通知工作线程有新导出任务入队（任务已以 pending 状态持久化）."""
+    _job_available.set()
+    logger.info("导出任务已入队: %s", job_id)
+
+
+__all__ = ["run_export_worker", "start_embedded_export_workers", "start_export_job"]
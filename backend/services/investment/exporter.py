@@ -1,7 +1,10 @@
 """跟投列表 Excel 导出."""
 
+import io
+
 from models.common import ProjectStatus, SettlementStatus
 from utils.csv_exporter import sanitize_csv_cell
+from utils.xlsx_exporter import write_xlsx
 
 
 class _ExporterMixin:
@@ -9,17 +12,13 @@ class _ExporterMixin:
 
     # ==================== Excel 导出 ====================
 
-    def export_excel(
+    def build_investment_export(
         self,
         search: str | None = None,
         project_status: ProjectStatus | None = None,
         settlement_status: SettlementStatus | None = None,
-    ) -> bytes:
-        """导出全量跟投列表为 .xlsx（openpyxl）。文件名 跟投列表_YYYYMMDD.xlsx."""
-        import io
-
-        from openpyxl import Workbook
-
+    ) -> tuple[list[str], list[list[object]]]:
+        """构建全量跟投列表导出数据（headers + rows，单元格已做公式注入转义）."""
         items, _ = self.list_investments(
             search=search,
             project_status=project_status,
@@ -28,9 +27,6 @@ class _ExporterMixin:
             page_size=100000,  # 导出需全量数据，非普通查询
         )
 
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "跟投列表"
         headers = [
             "项目编号",
             "小区",
@@ -41,7 +37,6 @@ class _ExporterMixin:
             "回报率(%)",
             "投资方数量",
         ]
-        ws.append(headers)
 
         status_label = {
             ProjectStatus.SIGNING: "签约",
@@ -55,23 +50,33 @@ class _ExporterMixin:
             SettlementStatus.SETTLED: "已结算",
         }
 
-        for it in items:
-            ws.append(
-                [
-                    sanitize_csv_cell(it.project_code),
-                    sanitize_csv_cell(it.project_name),
-                    status_label.get(it.project_status, "-") if it.project_status else "-",
-                    settle_label.get(it.settlement_status, "-"),
-                    float(it.total_investment),
-                    float(it.total_return) if it.total_return is not None else 0,
-                    round(it.return_ratio, 2),
-                    it.investor_count,
-                ],
-            )
-
-        for col_idx in range(1, len(headers) + 1):
-            ws.column_dimensions[ws.cell(row=1, column=col_idx).column_letter].width = 18
+        rows: list[list[object]] = [
+            [
+                sanitize_csv_cell(it.project_code),
+                sanitize_csv_cell(it.project_name),
+                status_label.get(it.project_status, "-") if it.project_status else "-",
+                settle_label.get(it.settlement_status, "-"),
+                float(it.total_investment),
+                float(it.total_return) if it.total_return is not None else 0,
+                round(it.return_ratio, 2),
+                it.investor_count,
+            ]
+            for it in items
+        ]
+        return headers, rows
 
+    def export_excel(
+        self,
+        search: str | None = None,
+        project_status: ProjectStatus | None = None,
+        settlement_status: SettlementStatus | None = None,
+    ) -> bytes:
+        """导出全量跟投列表为 .xlsx（openpyxl 只写模式）。文件名 跟投列表_YYYYMMDD.xlsx."""
+        headers, rows = self.build_investment_export(
+            search=search,
+            project_status=project_status,
+            settlement_status=settlement_status,
+        )
         buffer = io.BytesIO()
-        wb.save(buffer)
+        write_xlsx(buffer, "跟投列表", headers, rows)
         return buffer.getvalue()
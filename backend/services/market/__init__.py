@@ -8,7 +8,9 @@
 """
 
 from .batch_importer import CSVBatchImporter
+from .bulk_importer import BulkPropertyImporter
 from .community_image_service import CommunityImageService, get_community_image_service
+from .community_index import CommunityResolutionIndex, get_community_index, invalidate_community_index
 from .community_service import (
     CommunityQueryService,
     get_community_service,
@@ -16,30 +18,37 @@ from .community_service import (
 from .csv_parser import CSVParser
 from .failed_record_handler import FailedRecordHandler
 from .filters import apply_filters
-from .import_task_processor import (
-    ImportTaskProcessor,
-    get_task_processor,
-    start_import_task,
-)
+from .import_task_processor import ImportTaskProcessor, get_task_processor
+from .import_task_queue import run_import_worker, start_embedded_import_workers, start_import_task
 from .import_task_service import ImportTaskService, get_import_task_service
 from .importer import PropertyImporter
+from .media_downloader import MediaDownloadWorker, get_media_download_worker, start_media_downloads
+from .media_store import MediaGcResult, MediaStore, get_media_store
 from .merger import CommunityMerger, MergeResult
 from .parser import FloorInfo, FloorParser
+from .property_export import PROPERTY_EXPORT_HEADERS, property_export_row
 from .property_service import PropertyService, get_property_service
 from .query import PropertyQueryService, get_property_query_service
 from .sorting import apply_sorting
+from .stats_rollup import mark_market_rollups_stale, rebuild_market_rollups, refresh_market_rollups
 
 __all__ = [
+    "PROPERTY_EXPORT_HEADERS",
+    "BulkPropertyImporter",
     "CSVBatchImporter",
     "CSVParser",
     "CommunityImageService",
     "CommunityMerger",
     "CommunityQueryService",
+    "CommunityResolutionIndex",
     "FailedRecordHandler",
     "FloorInfo",
     "FloorParser",
     "ImportTaskProcessor",
     "ImportTaskService",
+    "MediaDownloadWorker",
+    "MediaGcResult",
+    "MediaStore",
     "MergeResult",
     "PropertyImporter",
     "PropertyQueryService",
@@ -47,10 +56,21 @@ __all__ = [
     "apply_filters",
     "apply_sorting",
     "get_community_image_service",
+    "get_community_index",
     "get_community_service",
     "get_import_task_service",
+    "get_media_download_worker",
+    "get_media_store",
     "get_property_query_service",
     "get_property_service",
     "get_task_processor",
+    "invalidate_community_index",
+    "mark_market_rollups_stale",
+    "property_export_row",
+    "rebuild_market_rollups",
+    "refresh_market_rollups",
+    "run_import_worker",
+    "start_embedded_import_workers",
     "start_import_task",
+    "start_media_downloads",
 ]
@@ -4,7 +4,6 @@
 """
 
 import csv
-import io
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
@@ -20,6 +19,7 @@ from services.system import save_failed_record
 from services.system.exceptions import FileProcessingError
 from utils.error_formatters import format_validation_error
 
+from .csv_parser import CSVParser, CSVRowStream
 from .importer import PropertyImporter
 
 logger = logging.getLogger(__name__)
@@ -62,81 +62,7 @@ class CSVBatchImporter:
     def __init__(self) -> None:
         """初始化导入器."""
         self.importer = PropertyImporter()
-
-    def _decode_file_content(self, content: bytes) -> str:
-        """解码文件内容，尝试多种编码格式."""
-        if content.startswith(b"\xef\xbb\xbf"):
-            encodings = ["utf-8-sig", "utf-8"]
-        elif content.startswith((b"\xff\xfe", b"\xfe\xff")):
-            encodings = ["utf-16"]
-        else:
-            encodings = ["utf-8", "gbk", "gb2312", "latin1"]
-
-        for encoding in encodings:
-            try:
-                decoded = content.decode(encoding)
-            except UnicodeDecodeError:
-                continue
-            else:
-                logger.info("文件解码成功，使用编码: %s", encoding)
-                return decoded
-
-        logger.warning("所有编码尝试失败，使用 UTF-8 忽略错误模式")
-        return content.decode("utf-8", errors="ignore")
-
-    def parse_csv_file(self, file_content: str) -> tuple[list[dict[str, Any]], list[str]]:
-        """安全解析 CSV 内容，容忍字段缺失或格式异常.
-
-        返回解析后的行数据和原始字段顺序.
-        """
-        try:
-            f = io.StringIO(file_content)
-            sample = f.read(1024)
-            f.seek(0)
-
-            sniffer = csv.Sniffer()
-            delimiter = ","
-            try:
-                if sniffer.has_header(sample):
-                    delimiter = sniffer.sniff(sample, delimiters=",;\t").delimiter
-            except csv.Error:
-                pass
-
-            reader = csv.reader(f, delimiter=delimiter)
-            headers = next(reader, None)
-            if not headers:
-                msg = "CSV 文件无表头"
-                raise FileProcessingError(msg)
-
-            clean_headers = []
-            for h in headers:
-                key = (h or "").lstrip("\ufeff").strip()
-                clean_headers.append(key)
-
-            rows = []
-            for _line_num, raw_row in enumerate(reader, start=2):
-                padded_row = raw_row + [""] * (len(clean_headers) - len(raw_row))
-                trimmed_row = padded_row[: len(clean_headers)]
-
-                row_dict = {}
-                for key, value in zip(clean_headers, trimmed_row, strict=False):
-                    if key == "":
-                        continue
-                    val = value.strip() if isinstance(value, str) else value
-                    row_dict[key] = None if val == "" else val
-
-                for date_key in ["上架时间", "成交时间"]:
-                    if date_key in row_dict and isinstance(row_dict[date_key], str):
-                        row_dict[date_key] = _normalize_date(row_dict[date_key])
-
-                rows.append(row_dict)
-
-        except Exception:
-            logger.exception("CSV 解析失败")
-            msg = "CSV 文件格式无效或内容损坏"
-            raise FileProcessingError(msg) from None
-        else:
-            return rows, clean_headers
+        self.csv_parser = CSVParser()
 
     def batch_import_csv(
         self,
@@ -152,20 +78,18 @@ class CSVBatchImporter:
         original_headers = []
 
         try:
-            content = file.file.read()
-            if not content:
-                msg = "上传的 CSV 文件为空"
-                raise FileProcessingError(msg)
-
-            file_content = self._decode_file_content(content)
-            rows, original_headers = self.parse_csv_file(file_content)
-            total = len(rows)
-
-            logger.info("开始处理 CSV 文件，共 %s 条记录", total)
-
-            for batch_start in range(0, total, _BATCH_SIZE):
-                batch_end = min(batch_start + _BATCH_SIZE, total)
-                batch_rows = rows[batch_start:batch_end]
+            stream = self._open_stream(file)
+            original_headers = stream.headers
+
+            logger.info("开始流式处理 CSV 文件: %s", file.filename)
+
+            # 逐批读取、校验、导入：每批提交后才读取下一批，内存占用与文件大小无关
+            for batch_rows in stream.iter_batches(_BATCH_SIZE):
+                batch_start = total
+                total += len(batch_rows)
+                batch_end = total
+                for row in batch_rows:
+                    self._normalize_row_dates(row)
                 validated_batch = []
 
                 for idx_in_batch, row in enumerate(batch_rows):
@@ -301,6 +225,26 @@ class CSVBatchImporter:
                 failed_file_url=failed_file_url,
             )
 
+    def _open_stream(self, file: UploadFile) -> CSVRowStream:
+        """打开上传文件的流式读取器（仅根据文件前缀探测编码与分隔符）."""
+        raw = file.file
+        if not raw.read(1):
+            msg = "上传的 CSV 文件为空"
+            raise FileProcessingError(msg)
+        raw.seek(0)
+        try:
+            return self.csv_parser.open_stream(raw)
+        except Exception:
+            logger.exception("CSV 解析失败")
+            msg = "CSV 文件格式无效或内容损坏"
+            raise FileProcessingError(msg) from None
+
+    def _normalize_row_dates(self, row: dict[str, Any]) -> None:
+        """规范化行内日期字段（支持 dateutil 兜底的多种格式）."""
+        for date_key in ["上架时间", "成交时间"]:
+            if date_key in row and isinstance(row[date_key], str):
+                row[date_key] = _normalize_date(row[date_key])
+
     def _format_validation_error(self, error: ValidationError) -> str:
         return format_validation_error(error)
 
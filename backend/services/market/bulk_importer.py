@@ -0,0 +1,515 @@
+"""房源批量（集合式）导入服务.
+
+``PropertyImporter.import_property`` 逐行处理：savepoint + 小区查询 + 存量查询 +
+flush + 历史快照，5 万行 CSV 需要数十万次数据库往返。本模块提供集合式批量模式：
+
+1. 批内按名称一次性解析小区（名称 / 别名 / 缺失小区批量创建）
+2. ``COPY`` 整批数据到临时暂存表（``ON COMMIT DROP``）
+3. 一条 ``INSERT ... SELECT`` 对比 ``property_current`` 写入 ``property_history`` 快照
+4. 一条 ``INSERT ... ON CONFLICT (data_source, source_property_id) DO UPDATE`` 完成 upsert
+
+批内重复的唯一键以最后一行写入 ``property_current``，前序行依次写入历史快照（与逐行导入一致）。
+集合式处理任一步骤失败（含 COPY 与构造暂存行）时回滚到批次 savepoint，降级为逐行 ``import_property``，
+由逐行路径负责把失败记录写入失败记录表（与原行为一致）。
+仅支持 PostgreSQL（COPY / ON CONFLICT），其他方言直接走逐行路径。
+"""
+
+import logging
+import uuid
+from datetime import datetime, timezone
+from itertools import pairwise
+
+import psycopg
+from sqlalchemy import Column, ColumnElement, Integer, MetaData, Table, case, cast, literal, select, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from models import ChangeType, Community, CommunityAlias, PropertyCurrent, PropertyHistory, PropertyStatus
+from schemas import ImportResult, PropertyIngestionModel
+from services.reports.cache_tags import mark_reports_stale
+
+from .community_index import get_community_index
+from .importer import PropertyImporter
+from .stats_rollup import mark_market_rollups_stale
+
+logger = logging.getLogger(__name__)
+
+# 暂存表携带的 property_current 业务列（与 PropertyImporter._map_data_to_property 一一对应）
+_STAGED_COLUMNS = (
+    "data_source",
+    "source_property_id",
+    "community_id",
+    "status",
+    "property_type",
+    "rooms",
+    "halls",
+    "baths",
+    "orientation",
+    "floor_original",
+    "floor_number",
+    "total_floors",
+    "floor_level",
+    "build_area",
+    "inner_area",
+    "listed_price_wan",
+    "listed_date",
+    "sold_price_wan",
+    "sold_date",
+    "build_year",
+    "building_structure",
+    "decoration",
+    "elevator",
+    "ownership_type",
+    "ownership_years",
+    "last_transaction",
+    "heating_method",
+    "listing_remarks",
+    "owner_id",
+)
+
+# 历史快照保留的列（与 PropertyImporter._create_history_snapshot 一致）
+_HISTORY_COLUMNS = (
+    "status",
+    "community_id",
+    "rooms",
+    "build_area",
+    "listed_price_wan",
+    "sold_price_wan",
+    "listed_date",
+    "sold_date",
+    "floor_original",
+    "orientation",
+    "decoration",
+)
+
+# 批内首次出现行的对比列（存量房源快照的变更类型以批内第一行判定，与逐行导入一致）
+_FIRST_COLUMNS = ("status", "listed_price_wan", "sold_price_wan")
+
+# 暂存表定义在独立 MetaData 中，避免被 Base.metadata.create_all 建成持久表
+_staging_metadata = MetaData()
+_staging_table = Table(
+    "_property_import_staging",
+    _staging_metadata,
+    Column("row_no", Integer, nullable=False),
+    *(Column(name, PropertyCurrent.__table__.c[name].type) for name in _STAGED_COLUMNS),
+    *(Column(f"first_{name}", PropertyCurrent.__table__.c[name].type) for name in _FIRST_COLUMNS),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+# 批内行：(调用方行号, 已校验数据)
+BatchItem = tuple[int, PropertyIngestionModel]
+
+
+def _transaction_aborted(db: Session) -> bool:
+    """PostgreSQL 事务是否因语句失败处于中止状态（只能回滚）."""
+    dbapi_connection = db.connection().connection.dbapi_connection
+    return dbapi_connection.info.transaction_status == psycopg.pq.TransactionStatus.INERROR
+
+
+class BulkPropertyImporter(PropertyImporter):
+    """集合式批量导入器.
+
+    继承 ``PropertyImporter``：复用字段映射、楼层解析、户型图保存与逐行降级路径。
+    """
+
+    def import_batch(self, items: list[BatchItem], db: Session, user_id: str = "") -> dict[int, ImportResult]:
+        """以集合式语句导入一个批次.
+
+        Args:
+            items: ``(行号, 已校验数据)`` 列表，行号由调用方定义（用于回填结果）
+            db: 数据库会话
+            user_id: 用户ID（写入 owner_id）
+
+        Returns:
+            行号 -> 导入结果
+
+        Note:
+            与 ``import_property`` 一致，不调用 ``db.commit()``，事务由调用方管理。
+            同批内重复的 ``(data_source, source_property_id)`` 以最后一行为准，
+            前序重复行写入历史快照、视为成功并返回同一房源 ID（不保存其户型图）。
+
+        """
+        if not items:
+            return {}
+
+        if db.get_bind().dialect.name != "postgresql":
+            return self._import_rows(items, db, user_id)
+
+        nested = db.begin_nested()
+        try:
+            results, community_ids, written = self._process_bulk(items, db, user_id)
+            nested.commit()
+        except Exception:
+            # 任何异常都须回滚 savepoint：数据库错误（COPY 经底层 psycopg 游标执行，抛出 psycopg.Error
+            # 而非 SQLAlchemyError）会让会话停留在已中止的事务中；构造暂存行时的 ValueError / KeyError
+            # 等非数据库异常则会留下已写入的部分 COPY / upsert 结果，被调用方随批次提交
+            nested.rollback()
+            logger.warning("集合式导入失败，批次降级为逐行导入（%s 行）", len(items), exc_info=True)
+            return self._import_rows(items, db, user_id)
+
+        # 户型图仍按行处理（外站下载），失败不影响已提交的房源数据；
+        # 批内被后续行覆盖的重复行不保存户型图
+        for row_no, data in written:
+            if data.image_urls and results[row_no].success:
+                self._save_media_in_savepoint(data, db, community_ids[data.community_name.strip()])
+        return results
+
+    def _save_media_in_savepoint(self, data: PropertyIngestionModel, db: Session, community_id: str) -> None:
+        """在独立 savepoint 中保存单行户型图.
+
+        ``_save_property_media`` 吞掉异常只记日志，其中的数据库错误会让外层事务停留在已中止状态；
+        失败时只回滚本行 savepoint，不影响同批其他行的户型图与批次提交。
+        """
+        nested = db.begin_nested()
+        self._save_property_media(data, db, community_id)
+        # 语句失败后 RELEASE SAVEPOINT 同样失败且不会回滚到 savepoint，须先检查事务状态
+        if nested.is_active and not _transaction_aborted(db):
+            nested.commit()
+            return
+        nested.rollback()
+        logger.warning("保存房源 %s 户型图失败，已回滚该行", data.source_property_id)
+
+    def _import_rows(self, items: list[BatchItem], db: Session, user_id: str) -> dict[int, ImportResult]:
+        """逐行降级路径：失败记录由 import_property 写入失败记录表."""
+        return {row_no: self.import_property(data, db, user_id) for row_no, data in items}
+
+    def _process_bulk(
+        self,
+        items: list[BatchItem],
+        db: Session,
+        user_id: str,
+    ) -> tuple[dict[int, ImportResult], dict[str, str], list[BatchItem]]:
+        """集合式处理核心：小区解析 -> COPY 暂存 -> 历史快照 -> upsert.
+
+        Returns:
+            (行号 -> 导入结果, 小区名称 -> 小区ID, 实际写入 property_current 的行)
+
+        """
+        community_ids = self._resolve_communities(items, db)
+
+        # 批内按唯一键分组，最后一行生效（ON CONFLICT 不允许同一语句两次命中同一行）
+        occurrences: dict[tuple[str, str], list[PropertyIngestionModel]] = {}
+        latest: dict[tuple[str, str], BatchItem] = {}
+        for row_no, data in items:
+            key = (data.data_source, data.source_property_id)
+            occurrences.setdefault(key, []).append(data)
+            latest[key] = (row_no, data)
+
+        written = list(latest.values())
+        self._stage_rows(written, occurrences, community_ids, db, user_id)
+        self._mark_touched_communities(db)
+        snapshots = self._insert_history_snapshots(db)
+        snapshots += self._insert_batch_duplicate_snapshots(occurrences, community_ids, db)
+        property_ids = self._upsert_from_staging(db)
+
+        logger.info(
+            "集合式导入批次完成: 行数=%s, 去重后=%s, 历史快照=%s",
+            len(items),
+            len(latest),
+            snapshots,
+        )
+
+        results = {
+            row_no: ImportResult(
+                success=True,
+                property_id=property_ids.get((data.data_source, data.source_property_id)),
+                error=None,
+            )
+            for row_no, data in items
+        }
+        return results, community_ids, written
+
+    def _resolve_communities(self, items: list[BatchItem], db: Session) -> dict[str, str]:
+        """批量解析小区名称 -> 小区ID（解析索引 -> 名称匹配 -> 别名匹配 -> 批量创建）."""
+        first_by_name: dict[str, PropertyIngestionModel] = {}
+        for _row_no, data in items:
+            first_by_name.setdefault(data.community_name.strip(), data)
+
+        # 1. 进程级解析索引：命中的名称不再查库，仅加载需要补充信息的小区
+        index = get_community_index()
+        indexed = index.lookup_many(first_by_name, db)
+        to_supplement = {
+            entry.community_id: name for name, entry in indexed.items() if entry.needs_update(first_by_name[name])
+        }
+        if to_supplement:
+            for community in db.query(Community).filter(Community.id.in_(to_supplement)).all():
+                self._update_community_info_if_needed(community, first_by_name[to_supplement[community.id]], db)
+        community_ids = {name: entry.community_id for name, entry in indexed.items()}
+
+        # 2. 未命中（索引构建后新增的小区）：回退数据库名称/别名匹配
+        names = [n for n in first_by_name if n not in community_ids]
+        if not names:
+            return community_ids
+
+        resolved: dict[str, Community] = {
+            c.name: c
+            for c in db.query(Community).filter(Community.name.in_(names), Community.is_active.is_(True)).all()
+        }
+
+        pending = [n for n in names if n not in resolved]
+        if pending:
+            alias_rows = (
+                db.query(CommunityAlias.alias_name, CommunityAlias.community_id)
+                .filter(CommunityAlias.alias_name.in_(pending), CommunityAlias.is_deleted.is_(False))
+                .all()
+            )
+            alias_targets = dict(alias_rows)
+            if alias_targets:
+                by_id = {
+                    c.id: c for c in db.query(Community).filter(Community.id.in_(set(alias_targets.values()))).all()
+                }
+                for alias_name, community_id in alias_targets.items():
+                    community = by_id.get(community_id)
+                    if community is not None:
+                        resolved[alias_name] = community
+
+        for name, community in resolved.items():
+            self._update_community_info_if_needed(community, first_by_name[name], db)
+            community_ids[name] = community.id
+            index.remember(db, name, community.id)
+
+        # 3. 批量创建缺失小区（事务提交后并入索引）
+        missing = [n for n in names if n not in community_ids]
+        if missing:
+            created = self._create_communities(missing, first_by_name, db)
+            for name, community_id in created.items():
+                index.remember(db, name, community_id)
+            community_ids.update(created)
+        return community_ids
+
+    def _create_communities(
+        self,
+        names: list[str],
+        first_by_name: dict[str, PropertyIngestionModel],
+        db: Session,
+    ) -> dict[str, str]:
+        """一条 INSERT 批量创建缺失小区；并发创建导致的名称冲突回查已有记录."""
+        now = datetime.now(timezone.utc)
+        values = [
+            {
+                "id": str(uuid.uuid4()),
+                "name": name,
+                "city_id": first_by_name[name].city_id,
+                "district": first_by_name[name].district,
+                "business_circle": first_by_name[name].business_circle,
+                "total_properties": 0,
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for name in names
+        ]
+        stmt = (
+            pg_insert(Community)
+            .values(values)
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(Community.name, Community.id)
+        )
+        created = dict(db.execute(stmt).all())
+        logger.info("批量创建新小区: %s 个", len(created))
+
+        conflicted = [n for n in names if n not in created]
+        if conflicted:
+            created.update(
+                dict(db.query(Community.name, Community.id).filter(Community.name.in_(conflicted)).all()),
+            )
+        return created
+
+    def _stage_rows(
+        self,
+        items: list[BatchItem],
+        occurrences: dict[tuple[str, str], list[PropertyIngestionModel]],
+        community_ids: dict[str, str],
+        db: Session,
+        user_id: str,
+    ) -> None:
+        """建临时暂存表并通过 COPY 写入整批数据（每个唯一键一行，附带批内首行的对比列）."""
+        connection = db.connection()
+        connection.execute(CreateTable(_staging_table, if_not_exists=True))
+        connection.execute(_staging_table.delete())
+
+        columns = ", ".join(("row_no", *_STAGED_COLUMNS, *(f"first_{name}" for name in _FIRST_COLUMNS)))
+        # 使用底层 psycopg 连接执行 COPY（与 Session 共享同一事务）
+        driver_connection = connection.connection.driver_connection
+        with (
+            driver_connection.cursor() as cursor,
+            cursor.copy(f"COPY {_staging_table.name} ({columns}) FROM STDIN") as copy,
+        ):
+            for row_no, data in items:
+                first = occurrences[(data.data_source, data.source_property_id)][0]
+                copy.write_row(
+                    (
+                        *self._staging_row(row_no, data, community_ids, user_id),
+                        PropertyStatus(first.status.value).name,
+                        first.listed_price_wan,
+                        first.sold_price_wan,
+                    )
+                )
+
+    def _staging_row(
+        self,
+        row_no: int,
+        data: PropertyIngestionModel,
+        community_ids: dict[str, str],
+        user_id: str,
+    ) -> tuple:
+        """将导入数据映射为暂存表行（列顺序与 _STAGED_COLUMNS 一致）."""
+        floor_info = self.floor_parser.parse_floor(data.floor_original)
+        return (
+            row_no,
+            data.data_source,
+            data.source_property_id,
+            community_ids[data.community_name.strip()],
+            # SQLEnum(PropertyStatus) 在 PG 中存储的是枚举成员名
+            PropertyStatus(data.status.value).name,
+            data.property_type,
+            data.rooms,
+            data.halls,
+            data.baths,
+            data.orientation,
+            data.floor_original,
+            floor_info.floor_number,
+            floor_info.total_floors,
+            floor_info.floor_level,
+            data.build_area,
+            data.inner_area,
+            data.listed_price_wan,
+            data.listed_date,
+            data.sold_price_wan,
+            data.sold_date,
+            data.build_year,
+            data.building_structure,
+            data.decoration,
+            data.elevator,
+            data.ownership_type,
+            data.ownership_years,
+            data.last_transaction,
+            data.heating_method,
+            data.listing_remarks,
+            user_id,
+        )
+
+    def _mark_touched_communities(self, db: Session) -> None:
+        """登记本批涉及的小区（写入的小区 + 已有房源的原小区）与数据来源.
+
+        提交前重算汇总行，提交后使相关报表缓存失效。
+        upsert 不经过 ORM flush，须在 upsert 前读取原小区，房源换小区时两边都会重算。
+        """
+        current = PropertyCurrent.__table__
+        staged = _staging_table.c
+        previous = select(current.c.community_id).join_from(
+            current,
+            _staging_table,
+            (current.c.data_source == staged.data_source) & (current.c.source_property_id == staged.source_property_id),
+        )
+        touched = db.execute(select(staged.community_id).union(previous)).scalars().all()
+        mark_market_rollups_stale(db, touched)
+        mark_reports_stale(db, touched, db.execute(select(staged.data_source).distinct()).scalars())
+
+    def _insert_history_snapshots(self, db: Session) -> int:
+        """对已存在的房源写入变更前快照（一条 INSERT ... SELECT）.
+
+        变更类型判定与 ``PropertyImporter._determine_change_type`` 一致：
+        状态变化 > 对应状态价格变化 > 其他信息变化。对比对象为批内该房源的第一行
+        （逐行导入时存量记录先被第一行覆盖）。
+        """
+        current = PropertyCurrent.__table__
+        staged = _staging_table.c
+        change_type_col = PropertyHistory.__table__.c.change_type
+
+        def _change(value: ChangeType) -> ColumnElement:
+            # 绑定参数在 CASE 中按 text 推断，须显式转换为枚举类型
+            return cast(literal(value, change_type_col.type), change_type_col.type)
+
+        is_for_sale = staged.first_status == PropertyStatus.FOR_SALE
+        change_type = case(
+            (current.c.status != staged.first_status, _change(ChangeType.STATUS_CHANGE)),
+            (
+                is_for_sale & current.c.listed_price_wan.is_distinct_from(staged.first_listed_price_wan),
+                _change(ChangeType.PRICE_CHANGE),
+            ),
+            (
+                ~is_for_sale & current.c.sold_price_wan.is_distinct_from(staged.first_sold_price_wan),
+                _change(ChangeType.PRICE_CHANGE),
+            ),
+            else_=_change(ChangeType.INFO_CHANGE),
+        )
+
+        snapshot_select = select(
+            current.c.data_source,
+            current.c.source_property_id,
+            change_type,
+            literal(datetime.now(timezone.utc), PropertyHistory.__table__.c.captured_at.type),
+            *(current.c[name] for name in _HISTORY_COLUMNS),
+        ).join_from(
+            current,
+            _staging_table,
+            (current.c.data_source == staged.data_source) & (current.c.source_property_id == staged.source_property_id),
+        )
+        stmt = PropertyHistory.__table__.insert().from_select(
+            ["data_source", "source_property_id", "change_type", "captured_at", *_HISTORY_COLUMNS],
+            snapshot_select,
+        )
+        return db.execute(stmt).rowcount
+
+    def _insert_batch_duplicate_snapshots(
+        self,
+        occurrences: dict[tuple[str, str], list[PropertyIngestionModel]],
+        community_ids: dict[str, str],
+        db: Session,
+    ) -> int:
+        """批内重复行：每个被后续行覆盖的行写入一条历史快照（与逐行导入依次覆盖的结果一致）."""
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "data_source": previous.data_source,
+                "source_property_id": previous.source_property_id,
+                # 仅比较状态与价格，批内前一行与存量记录的比较口径相同
+                "change_type": self._determine_change_type(previous, following),
+                "captured_at": now,
+                "status": PropertyStatus(previous.status.value),
+                "community_id": community_ids[previous.community_name.strip()],
+                "rooms": previous.rooms,
+                "build_area": previous.build_area,
+                "listed_price_wan": previous.listed_price_wan,
+                "sold_price_wan": previous.sold_price_wan,
+                "listed_date": previous.listed_date,
+                "sold_date": previous.sold_date,
+                "floor_original": previous.floor_original,
+                "orientation": previous.orientation,
+                "decoration": previous.decoration,
+            }
+            for rows_of_key in occurrences.values()
+            for previous, following in pairwise(rows_of_key)
+        ]
+        if rows:
+            db.execute(PropertyHistory.__table__.insert(), rows)
+        return len(rows)
+
+    def _upsert_from_staging(self, db: Session) -> dict[tuple[str, str], int]:
+        """暂存表 upsert 到 property_current，返回唯一键 -> 房源ID."""
+        now = datetime.now(timezone.utc)
+        current = PropertyCurrent.__table__
+        staged = _staging_table.c
+
+        insert_stmt = pg_insert(current).from_select(
+            [*_STAGED_COLUMNS, "is_active", "created_at", "updated_at"],
+            select(
+                *(staged[name] for name in _STAGED_COLUMNS),
+                true(),
+                literal(now, current.c.created_at.type),
+                literal(now, current.c.updated_at.type),
+            ),
+        )
+        update_columns = [name for name in _STAGED_COLUMNS if name not in ("data_source", "source_property_id")]
+        stmt = insert_stmt.on_conflict_do_update(
+            constraint="uq_source_property",
+            set_={
+                **{name: insert_stmt.excluded[name] for name in update_columns},
+                "updated_at": insert_stmt.excluded.updated_at,
+            },
+        ).returning(current.c.data_source, current.c.source_property_id, current.c.id)
+
+        return {(data_source, source_id): pid for data_source, source_id, pid in db.execute(stmt).all()}
@@ -230,15 +230,16 @@ class CommunityImageService:
         community_id: str | None,
         url: str,
         source_property_id: str | None = None,
+        thumbnail_url: str | None = None,
     ) -> None:
         """推送房源时自动归类户型图到小区户型图库.
 
         接收已选好的户型图 URL（选择逻辑在 importer 层用 ``get_floor_plan`` 完成）。
         - ``community_id`` 为空时跳过，不报错
-        - 重复 URL（同小区未删除）跳过，不报错
-        - 同 ``source_property_id`` 的未删除记录已存在时，**更新其 URL**
-          （房源重新导入时下载会生成新本地 URL，按 URL 去重会无限累积，
-          按来源房源 ID 覆盖 URL 才能保持一房一图）
+        - 重复 URL（同小区未删除）跳过，不报错；已有记录缺缩略图时补写 ``thumbnail_url``
+        - 同 ``source_property_id`` 的未删除记录已存在时，**更新其 URL 与缩略图 URL**
+          （外站图片经内容寻址存储后同一图片 URL 稳定，按 URL 去重即可命中；
+          房源更换户型图或由外站 URL 回写为存储 URL 时，按来源房源 ID 覆盖保持一房一图）
         - ``source=scraped``，``source_property_id`` 填房源来源 ID
 
         Args:
@@ -246,6 +247,7 @@ class CommunityImageService:
             community_id: 小区ID（可空，空时跳过）
             url: 户型图 URL（已下载到本地存储后的 URL 或外站 URL）
             source_property_id: 来源房源ID
+            thumbnail_url: 缩略图 URL（复用已下载图片时传入，外站 URL 时为空）
 
         """
         if not community_id:
@@ -263,6 +265,10 @@ class CommunityImageService:
             .first()
         )
         if existing_by_url is not None:
+            if thumbnail_url and existing_by_url.thumbnail_url != thumbnail_url:
+                existing_by_url.thumbnail_url = thumbnail_url
+                existing_by_url.updated_at = datetime.now(timezone.utc)
+                CommunityImageService._flush_in_savepoint(db, community_id, source_property_id)
             logger.debug("户型图已存在，跳过归类: community_id=%s, url=%s", community_id, url)
             return
 
@@ -280,21 +286,9 @@ class CommunityImageService:
             )
             if existing_by_source is not None:
                 existing_by_source.url = url
+                existing_by_source.thumbnail_url = thumbnail_url
                 existing_by_source.updated_at = datetime.now(timezone.utc)
-                # 使用 savepoint 保护：flush 失败时仅回滚 savepoint，
-                # 不污染外层事务（importer / 脚本批处理仍可正常提交其余记录）
-                nested = db.begin_nested()
-                try:
-                    db.flush()
-                    nested.commit()
-                except SQLAlchemyError:
-                    nested.rollback()
-                    logger.exception(
-                        "更新户型图 URL 失败: community_id=%s, source_property_id=%s",
-                        community_id,
-                        source_property_id,
-                    )
-                else:
+                if CommunityImageService._flush_in_savepoint(db, community_id, source_property_id):
                     logger.info(
                         "更新户型图 URL: community_id=%s, source_property_id=%s, url=%s",
                         community_id,
@@ -306,7 +300,7 @@ class CommunityImageService:
         image = CommunityImage(
             community_id=community_id,
             url=url,
-            thumbnail_url=None,
+            thumbnail_url=thumbnail_url,
             source=CommunityImageSource.SCRAPED,
             source_property_id=source_property_id,
             description=None,
@@ -329,6 +323,26 @@ class CommunityImageService:
             return
         logger.info("归类户型图成功: community_id=%s, url=%s", community_id, url)
 
+    @staticmethod
+    def _flush_in_savepoint(db: Session, community_id: str, source_property_id: str | None) -> bool:
+        """在 savepoint 内 flush 已修改的户型图记录，返回是否成功.
+
+        flush 失败时仅回滚 savepoint，不污染外层事务（importer / 脚本批处理仍可正常提交其余记录）。
+        """
+        nested = db.begin_nested()
+        try:
+            db.flush()
+            nested.commit()
+        except SQLAlchemyError:
+            nested.rollback()
+            logger.exception(
+                "更新户型图 URL 失败: community_id=%s, source_property_id=%s",
+                community_id,
+                source_property_id,
+            )
+            return False
+        return True
+
 
 def get_community_image_service() -> CommunityImageService:
     """获取小区户型图库服务实例."""
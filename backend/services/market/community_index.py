@@ -0,0 +1,214 @@
+"""小区名称/别名解析索引.
+
+导入时每行都要把小区名称解析为小区ID（名称匹配 -> 别名匹配），一个导入文件通常
+只涉及几百个小区却重复出现成千上万次。本模块在进程内维护
+``名称/有效别名 -> 小区ID`` 字典，命中时不再访问数据库。
+
+一致性设计：
+- 全局索引只从已提交数据构建（两条查询：有效小区名称 + 未删除别名），名称优先于别名
+- 导入事务中新建/回查到的小区先记入会话级暂存（``Session.info``），外层事务提交后才
+  并入全局索引；保存点或事务回滚时丢弃对应条目，不会把已回滚的小区ID留在索引里
+- 小区合并、改名/停用、别名变更后调用 ``invalidate_community_index``：递增 Redis 中的
+  索引代数，各进程（含独立导入工作进程）最多 ``_GENERATION_CHECK_SECONDS`` 秒内感知并重建；
+  Redis 不可用时退化为本地定时重建
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+from models.property import Community, CommunityAlias
+from utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Redis 中的索引代数 key：小区/别名变更时 INCR，各进程比对后重建
+_GENERATION_KEY = "market:community_index:generation"
+
+# 两次检查 Redis 索引代数的最小间隔（秒）
+_GENERATION_CHECK_SECONDS = 1.0
+
+# Redis 不可用时本地索引的最长使用时间（秒）
+_LOCAL_TTL_SECONDS = 60.0
+
+# Session.info 中会话级暂存条目的 key
+_PENDING_KEY = "community_index_pending"
+
+# 导入时可补充的小区信息字段（与 PropertyImporter._update_community_info_if_needed 一致）
+_SUPPLEMENT_FIELDS = ("city_id", "district", "business_circle")
+
+
+@dataclass(frozen=True)
+class CommunityIndexEntry:
+    """索引条目：小区ID + 构建时仍缺失的补充信息字段."""
+
+    community_id: str
+    missing_fields: frozenset[str] = frozenset()
+
+    def needs_update(self, data: object) -> bool:
+        """导入数据能否补充该小区缺失的信息（需要加载小区对象更新时返回 True）."""
+        return any(getattr(data, field, None) for field in self.missing_fields)
+
+
+class CommunityResolutionIndex:
+    """进程级小区名称/别名解析索引（线程安全）."""
+
+    def __init__(self) -> None:
+        """初始化空索引（首次查询时构建）."""
+        self._entries: dict[str, CommunityIndexEntry] | None = None
+        self._generation: int | None = None
+        self._built_at = 0.0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def lookup(self, name: str, db: Session) -> CommunityIndexEntry | None:
+        """按名称或别名查找小区，未命中返回 None（调用方回退数据库查询）."""
+        return self.lookup_many([name], db).get(name)
+
+    def lookup_many(self, names: Iterable[str], db: Session) -> dict[str, CommunityIndexEntry]:
+        """批量查找，只返回命中的名称.
+
+        会话级暂存条目优先（本事务内新建/回查到的小区），其次为全局索引。
+        """
+        entries = self._ensure_fresh(db)
+        pending: dict[str, tuple[CommunityIndexEntry, SessionTransaction]] = db.info.get(_PENDING_KEY, {})
+        found: dict[str, CommunityIndexEntry] = {}
+        for name in names:
+            if name in pending:
+                found[name] = pending[name][0]
+            elif name in entries:
+                found[name] = entries[name]
+        return found
+
+    def remember(self, db: Session, name: str, community_id: str) -> None:
+        """记录本事务内新建或回查到的小区，外层事务提交后并入全局索引."""
+        transaction = db.get_nested_transaction() or db.get_transaction()
+        if transaction is None:
+            return
+        db.info.setdefault(_PENDING_KEY, {})[name] = (CommunityIndexEntry(community_id), transaction)
+
+    def invalidate(self) -> None:
+        """使索引失效：本进程立即重建，其他进程通过 Redis 索引代数感知."""
+        with self._lock:
+            self._entries = None
+        try:
+            get_redis_client().incr(_GENERATION_KEY)
+        except RedisError:
+            logger.warning("递增小区索引代数失败，其他进程将在本地 TTL 到期后重建")
+
+    def promote_pending(self, session: Session) -> None:
+        """外层事务提交后，将会话级暂存条目并入全局索引（保存点提交时不处理）."""
+        if session.in_nested_transaction():
+            return
+        pending = session.info.pop(_PENDING_KEY, None)
+        if not pending:
+            return
+        with self._lock:
+            if self._entries is not None:
+                self._entries.update({name: entry for name, (entry, _txn) in pending.items()})
+
+    def discard_pending(self, session: Session, rolled_back: SessionTransaction) -> None:
+        """保存点/事务回滚后丢弃其中记录的暂存条目."""
+        pending = session.info.get(_PENDING_KEY)
+        if not pending:
+            return
+        for name, (_entry, transaction) in list(pending.items()):
+            current: SessionTransaction | None = transaction
+            while current is not None:
+                if current is rolled_back:
+                    del pending[name]
+                    break
+                current = current.parent
+
+    def _ensure_fresh(self, db: Session) -> dict[str, CommunityIndexEntry]:
+        """返回可用的全局索引，代数变化或本地 TTL 到期时重建."""
+        now = time.monotonic()
+        with self._lock:
+            entries = self._entries
+            if entries is not None and now - self._checked_at < _GENERATION_CHECK_SECONDS:
+                return entries
+
+            generation = self._remote_generation()
+            self._checked_at = now
+            if entries is not None:
+                if generation is not None and generation == self._generation:
+                    return entries
+                if generation is None and now - self._built_at < _LOCAL_TTL_SECONDS:
+                    return entries
+
+            entries = self._build(db)
+            self._entries = entries
+            self._generation = generation
+            self._built_at = now
+            return entries
+
+    @staticmethod
+    def _remote_generation() -> int | None:
+        """读取 Redis 中的索引代数，Redis 不可用时返回 None."""
+        try:
+            value = get_redis_client().get(_GENERATION_KEY)
+        except RedisError:
+            return None
+        return int(value) if value is not None else 0
+
+    @staticmethod
+    def _build(db: Session) -> dict[str, CommunityIndexEntry]:
+        """从数据库构建索引（别名先写入，名称覆盖，保证名称匹配优先）.
+
+        使用独立会话查询，只读取已提交数据，不会混入调用方事务中尚未提交的小区。
+        """
+        entries: dict[str, CommunityIndexEntry] = {}
+        with Session(bind=db.get_bind()) as snapshot:
+            alias_rows = snapshot.query(CommunityAlias.alias_name, CommunityAlias.community_id).filter(
+                CommunityAlias.is_deleted.is_(False)
+            )
+            for alias_name, community_id in alias_rows:
+                entries.setdefault(alias_name, CommunityIndexEntry(community_id))
+
+            community_rows = snapshot.query(
+                Community.name, Community.id, Community.city_id, Community.district, Community.business_circle
+            ).filter(Community.is_active.is_(True))
+            for name, community_id, *supplements in community_rows:
+                missing = frozenset(
+                    field for field, value in zip(_SUPPLEMENT_FIELDS, supplements, strict=True) if value in (None, "")
+                )
+                entries[name] = CommunityIndexEntry(community_id, missing)
+
+        logger.info("小区解析索引已构建: %s 个名称/别名", len(entries))
+        return entries
+
+
+_index = CommunityResolutionIndex()
+
+
+def get_community_index() -> CommunityResolutionIndex:
+    """获取进程级小区解析索引."""
+    return _index
+
+
+def invalidate_community_index() -> None:
+    """小区合并、改名/停用或别名变更后调用，使所有进程的解析索引失效."""
+    _index.invalidate()
+
+
+@event.listens_for(Session, "after_commit")
+def _promote_pending_entries(session: Session) -> None:
+    _index.promote_pending(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_entries(session: Session, previous_transaction: SessionTransaction) -> None:
+    _index.discard_pending(session, previous_transaction)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_pending_entries(session: Session, transaction: SessionTransaction) -> None:
+    # 外层事务结束（提交后已并入全局索引；close 等未提交结束的情况直接丢弃）
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
@@ -21,6 +21,7 @@ from schemas.community import (
     DictionaryResponse,
 )
 from schemas.public import PublicCommunitySearchItem
+from services.market.community_index import invalidate_community_index
 from services.system.exceptions import ConflictError, ResourceNotFoundError, ServiceException, ValidationError
 from settings import settings
 from utils.formatters import escape_like
@@ -268,6 +269,8 @@ class CommunityQueryService:
             db.commit()
             db.refresh(new_community)
             logger.info("创建新小区成功: %s (ID: %s)", new_community.name, new_community.id)
+            # 新名称可能与已有别名相同（名称匹配优先），导入解析索引需重建
+            invalidate_community_index()
         except IntegrityError as e:
             db.rollback()
             logger.warning("创建小区时发生唯一约束冲突: %s, 错误: %s", body.name, e)
@@ -318,6 +321,9 @@ class CommunityQueryService:
             db.commit()
             db.refresh(community)
             logger.info("更新小区成功: %s (ID: %s)", community.name, community.id)
+            if {"name", "is_active"} & update_data.keys():
+                # 改名/停用会改变名称解析结果，导入解析索引需重建
+                invalidate_community_index()
         except IntegrityError as e:
             db.rollback()
             logger.warning("更新小区时发生唯一约束冲突: %s, 错误: %s", community_id, e)
@@ -1,80 +1,169 @@
 """CSV 文件解析模块.
 
 负责 CSV 文件的读取、解码和解析.
+
+大文件按流式读取：编码按候选顺序分块校验全文（首个能完整解码全文的编码），分隔符由文件前缀
+探测，之后逐行严格解码、逐批产出行字典，内存占用与文件大小无关（见 ``CSVRowStream``）。
 """
 
+import codecs
 import csv
 import io
 import logging
+from collections.abc import Callable, Iterator
 from datetime import datetime
-from pathlib import Path
-from typing import Any
+from itertools import islice
+from typing import Any, BinaryIO
 
 logger = logging.getLogger(__name__)
 
 _MIN_DATE_PARTS = 3
 
+# 分隔符探测读取的文件前缀大小（字节）
+_DETECT_PREFIX_BYTES = 64 * 1024
+
+# 编码校验每次读取的块大小（字节）
+_ENCODING_CHECK_CHUNK_BYTES = 1024 * 1024
+
+# 分隔符探测样本长度（字符）
+_DELIMITER_SAMPLE_CHARS = 1024
+
+
+class CSVRowStream:
+    """CSV 流式读取器.
+
+    由 ``CSVParser.open_stream`` 创建；构造时读取表头，之后通过
+    ``iter_rows`` / ``iter_batches`` 逐行解析。底层二进制流由调用方负责关闭。
+    """
+
+    def __init__(
+        self,
+        raw: BinaryIO,
+        encoding: str,
+        delimiter: str,
+        process_row: Callable[[list[str], list[str]], dict[str, Any]],
+    ) -> None:
+        """初始化读取器并读取表头.
+
+        Raises:
+            ValueError: 当 CSV 文件无表头时
+
+        """
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self._raw = raw
+        self._process_row = process_row
+        raw.seek(0, io.SEEK_END)
+        self.total_bytes = raw.tell()
+        raw.seek(0)
+        # 编码已校验过全文，严格解码：不把无法解码的字节静默替换为 U+FFFD
+        self._text = io.TextIOWrapper(raw, encoding=encoding, errors="strict", newline="")
+        self._reader = csv.reader(self._text, delimiter=delimiter)
+
+        headers = next(self._reader, None)
+        if not headers:
+            msg = "CSV 文件无表头"
+            raise ValueError(msg)
+        self.headers = [h.lstrip("\ufeff").strip() if h else "" for h in headers]
+
+    @property
+    def bytes_read(self) -> int:
+        """已从底层流读取的字节数（含预读缓冲，用于估算进度）."""
+        return self._raw.tell()
+
+    @property
+    def fraction_read(self) -> float:
+        """已读取比例（0-1）."""
+        if not self.total_bytes:
+            return 1.0
+        return min(1.0, self.bytes_read / self.total_bytes)
+
+    def iter_rows(self) -> Iterator[dict[str, Any]]:
+        """逐行产出处理后的行字典."""
+        for raw_row in self._reader:
+            yield self._process_row(raw_row, self.headers)
+
+    def iter_batches(self, batch_size: int, skip: int = 0) -> Iterator[list[dict[str, Any]]]:
+        """按固定大小分批产出行字典.
+
+        Args:
+            batch_size: 每批行数
+            skip: 跳过的前导数据行数（任务续跑时跳过已提交的行）
+
+        """
+        rows = self.iter_rows()
+        if skip:
+            # 仅消费不保存，内存占用不随跳过行数增长
+            next(islice(rows, skip, skip), None)
+        while batch := list(islice(rows, batch_size)):
+            yield batch
+
 
 class CSVParser:
     """CSV 文件解析器."""
 
-    def parse_file(self, file_path: str) -> tuple[list[dict[str, Any]], list[str]]:
-        """解析 CSV 文件.
+    def open_stream(self, raw: BinaryIO) -> CSVRowStream:
+        """从二进制流创建流式读取器（流需支持 seek）.
+
+        编码分块校验全文、分隔符根据文件前缀探测，均不整体读入文件。
 
         Args:
-            file_path: CSV 文件路径
+            raw: 以二进制模式打开的 CSV 文件/上传文件流
 
         Returns:
-            Tuple of (rows as list of dicts, list of header names)
+            已读取表头的 ``CSVRowStream``
 
         Raises:
-            ValueError: 当 CSV 文件格式不正确时
+            ValueError: 当 CSV 文件无表头或无法确定文件编码时
 
         """
-        content = Path(file_path).read_bytes()
+        encoding = self._detect_encoding(raw)
+        prefix = raw.read(_DETECT_PREFIX_BYTES)
+        raw.seek(0)
+        sample = codecs.getincrementaldecoder(encoding)().decode(prefix, final=False)
+        delimiter = self._detect_delimiter(sample[:_DELIMITER_SAMPLE_CHARS])
+        logger.info("CSV 格式探测: 编码=%s, 分隔符=%r", encoding, delimiter)
+        return CSVRowStream(raw, encoding, delimiter, self._process_row)
 
-        decoded = self._decode_content(content)
+    def _detect_encoding(self, raw: BinaryIO) -> str:
+        """探测文件编码：返回候选编码中首个能完整解码全文的编码.
 
-        return self._parse_csv_content(decoded)
+        与整体解码的候选顺序一致，但分块增量解码，内存占用与文件大小无关；
+        前缀为 UTF-8、后文含 GBK 字节的文件会回退到 gbk，而不是在导入中途出现乱码。
 
-    def _decode_content(self, content: bytes) -> str:
-        """解码文件内容，尝试多种编码."""
-        if content.startswith(b"\xef\xbb\xbf"):
+        Raises:
+            ValueError: 所有候选编码都无法完整解码时（带 BOM 的文件不回退到其他编码）
+
+        """
+        head = raw.read(3)
+        raw.seek(0)
+        if head.startswith(b"\xef\xbb\xbf"):
             encodings = ["utf-8-sig", "utf-8"]
+        elif head.startswith((b"\xff\xfe", b"\xfe\xff")):
+            encodings = ["utf-16"]
         else:
             encodings = ["utf-8", "gbk", "gb2312", "latin1"]
 
         for encoding in encodings:
-            try:
-                return content.decode(encoding)
-            except UnicodeDecodeError:
-                continue
+            if self._decodes_fully(raw, encoding):
+                return encoding
 
-        logger.warning("无法确定文件编码，使用 utf-8 并忽略错误字符")
-        return content.decode("utf-8", errors="ignore")
+        msg = f"无法确定文件编码（尝试: {', '.join(encodings)}）"
+        raise ValueError(msg)
 
-    def _parse_csv_content(self, content: str) -> tuple[list[dict[str, Any]], list[str]]:
-        """解析 CSV 内容."""
-        f = io.StringIO(content)
-        sample = f.read(1024)
-        f.seek(0)
-
-        delimiter = self._detect_delimiter(sample)
-
-        reader = csv.reader(f, delimiter=delimiter)
-        headers = next(reader, None)
-        if not headers:
-            msg = "CSV 文件无表头"
-            raise ValueError(msg)
-
-        clean_headers = [h.lstrip("\ufeff").strip() if h else "" for h in headers]
-
-        rows = []
-        for raw_row in reader:
-            row_dict = self._process_row(raw_row, clean_headers)
-            rows.append(row_dict)
-
-        return rows, clean_headers
+    @staticmethod
+    def _decodes_fully(raw: BinaryIO, encoding: str) -> bool:
+        """分块校验全文能否以 encoding 解码（结束后流回到开头）."""
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            while chunk := raw.read(_ENCODING_CHECK_CHUNK_BYTES):
+                decoder.decode(chunk, final=False)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return False
+        finally:
+            raw.seek(0)
+        return True
 
     def _detect_delimiter(self, sample: str) -> str:
         """检测 CSV 分隔符."""
@@ -4,6 +4,7 @@
 """
 
 import csv
+import json
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
@@ -22,18 +23,98 @@ class FailedRecordHandler:
         """初始化处理器."""
         self.upload_dir = upload_dir
 
-    def save_failed_record_sync(self, row: dict, error: str, _task_id: str) -> None:
+    def save_failed_record_sync(
+        self,
+        row: dict,
+        error: str,
+        _task_id: str,
+        failure_type: str = "csv_validation_error",
+    ) -> None:
         """同步保存失败记录到数据库."""
         try:
             save_failed_record(
                 data=row,
                 error_message=error,
-                failure_type="csv_validation_error",
-                data_source=row.get("数据源"),
+                failure_type=failure_type,
+                data_source=row.get("数据源", row.get("data_source")),
             )
         except Exception:
             logger.warning("保存失败记录时出错: %s", error)
 
+    def _journal_path(self, task_id: str) -> Path:
+        """任务失败记录日志文件路径（JSON Lines，每行一条失败记录）."""
+        return Path(self.upload_dir) / f"{task_id}.failed.jsonl"
+
+    def append_failed_records(self, task_id: str, records: list[dict[str, Any]]) -> None:
+        """追加批次失败记录到任务日志文件.
+
+        失败记录随批次落盘而不是常驻内存，任务续跑时可恢复此前批次的失败记录。
+        """
+        if not records:
+            return
+        with self._journal_path(task_id).open("a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, default=str))
+                f.write("\n")
+
+    def load_failed_records(self, task_id: str, max_row_number: int | None = None) -> list[dict[str, Any]]:
+        """读取任务日志文件中的失败记录.
+
+        Args:
+            task_id: 任务ID
+            max_row_number: 只保留行号不超过该值的记录（续跑时丢弃未提交批次写入的记录）
+
+        Returns:
+            按行号排序的失败记录列表
+
+        """
+        path = self._journal_path(task_id)
+        if not path.exists():
+            return []
+        records = []
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if max_row_number is None or record["row_number"] <= max_row_number:
+                    records.append(record)
+        records.sort(key=lambda record: record["row_number"])
+        return records
+
+    def reset_failed_records(self, task_id: str, max_row_number: int) -> None:
+        """续跑前截断失败记录日志，仅保留已提交批次（行号 ≤ max_row_number）的记录."""
+        records = self.load_failed_records(task_id, max_row_number)
+        self._journal_path(task_id).unlink(missing_ok=True)
+        self.append_failed_records(task_id, records)
+
+    def remove_failed_records(self, task_id: str) -> None:
+        """删除任务失败记录日志文件."""
+        self._journal_path(task_id).unlink(missing_ok=True)
+
+    def _errors_path(self, task_id: str) -> Path:
+        """推送任务错误详情文件路径（JSON 数组）."""
+        return Path(self.upload_dir) / f"{task_id}.errors.json"
+
+    def save_push_errors(self, task_id: str, errors: list[dict[str, Any]]) -> None:
+        """保存推送任务的逐条错误详情（供任务状态接口返回）."""
+        path = self._errors_path(task_id)
+        if not errors:
+            path.unlink(missing_ok=True)
+            return
+        path.write_text(json.dumps(errors, ensure_ascii=False, default=str), encoding="utf-8")
+
+    def load_push_errors(self, task_id: str) -> list[dict[str, Any]]:
+        """读取推送任务的逐条错误详情（任务未完成或无失败记录时为空列表）."""
+        path = self._errors_path(task_id)
+        if not path.exists():
+            return []
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def remove_push_errors(self, task_id: str) -> None:
+        """删除推送任务错误详情文件."""
+        self._errors_path(task_id).unlink(missing_ok=True)
+
     def generate_failed_csv(
         self,
         failed_records: list[dict[str, Any]],
@@ -1,6 +1,7 @@
 """房源导入任务后台处理器.
 
-在后台线程中执行 CSV 导入任务.
+由导入工作进程/线程（见 ``import_task_queue``）领取任务后执行导入：CSV 上传任务
+与 JSON 推送异步任务（``source_type=push``，见 ``push_payload``）共用同一分批导入流程.
 
 文件行数说明：
 本文件约360行代码（超过250行限制）。未进一步拆分的原因：
@@ -12,37 +13,51 @@
 
 import logging
 import threading
+from pathlib import Path
 from typing import Any
 
 from pydantic import ValidationError
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
-from models import ImportTaskStatus
+from models import ImportTaskStatus, PropertyImportTask
 from schemas import PropertyIngestionModel
-from services.market.csv_parser import CSVParser
+from services.market.bulk_importer import BulkPropertyImporter
+from services.market.csv_parser import CSVParser, CSVRowStream
 from services.market.failed_record_handler import FailedRecordHandler
-from services.market.import_task_service import UPLOAD_DIR, ImportTaskService, get_import_task_service
-from services.market.importer import PropertyImporter
+from services.market.import_task_service import (
+    TASK_SOURCE_PUSH,
+    UPLOAD_DIR,
+    ImportTaskService,
+    get_import_task_service,
+)
+from services.market.media_downloader import current_import_task_id, start_media_downloads
+from services.market.push_payload import JSONRowStream, to_push_errors
+from services.reports.warmer import request_report_cache_warm
 from settings import settings
 from utils.error_formatters import format_validation_error
 
 logger = logging.getLogger(__name__)
 
-_processing_lock = threading.Lock()
-
 BATCH_SIZE = 100
 
+# 失败记录类型（写入失败记录表）
+_CSV_FAILURE_TYPE = "csv_validation_error"
+_PUSH_FAILURE_TYPE = "json_validation_error"
+
 
 class ImportTaskProcessor:
     """导入任务处理器.
 
-    在独立线程中执行导入任务，支持进度更新和取消检测
+    在独立线程中执行导入任务，支持进度更新和取消检测。
+    ``bulk_upsert=True`` 时每批走集合式 upsert（见 ``BulkPropertyImporter``），
+    否则逐行导入；未显式指定时取 ``settings.import_bulk_upsert``。
     """
 
-    def __init__(self) -> None:
+    def __init__(self, *, bulk_upsert: bool | None = None) -> None:
         """初始化处理器."""
-        self.importer = PropertyImporter()
+        self.importer = BulkPropertyImporter()
+        self.bulk_upsert = settings.import_bulk_upsert if bulk_upsert is None else bulk_upsert
         self.csv_parser = CSVParser()
         self.failed_handler = FailedRecordHandler(str(UPLOAD_DIR))
 
@@ -54,24 +69,32 @@ class ImportTaskProcessor:
         )
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
 
-    def process_task(self, task_id: str) -> None:
+    def process_task(self, task_id: str, worker_id: str | None = None) -> None:
         """处理导入任务的主入口.
 
-        在独立线程中执行.
+        在工作线程中执行；``worker_id`` 为领取该任务的工作进程标识，任务被其他
+        工作进程重新领取（心跳超时）后本进程在下一批次前停止处理。
         """
         thread_name = threading.current_thread().name
         logger.info("[%s] 开始处理导入任务: %s", thread_name, task_id)
 
         db = self.SessionLocal()
         task_service = get_import_task_service()
+        # 导入过程中登记的户型图下载任务关联到本任务，用于媒体下载进度计数
+        task_token = current_import_task_id.set(task_id)
 
         try:
             if not self._prepare_task(task_id, db, task_service):
                 return
 
-            result = self._execute_import(task_id, db, task_service)
+            result = self._execute_import(task_id, db, task_service, worker_id)
+            if result.get("released"):
+                logger.warning("[%s] 任务已被其他工作进程接管，停止处理: %s", thread_name, task_id)
+                return
 
             self._finalize_task(task_id, result, db, task_service)
+            # 导入数据已全部提交，预热默认报表视图，避免导入后首个用户承担聚合耗时
+            request_report_cache_warm()
 
             logger.info("[%s] 导入任务处理完成: %s", thread_name, task_id)
 
@@ -79,7 +102,10 @@ class ImportTaskProcessor:
             logger.exception("处理导入任务时发生错误")
             self._handle_task_error(task_id, e, db, task_service)
         finally:
+            current_import_task_id.reset(task_token)
             db.close()
+            # 已提交批次中登记的户型图在导入结束后统一下载，不占用导入事务
+            start_media_downloads()
 
     def _prepare_task(
         self,
@@ -97,7 +123,9 @@ class ImportTaskProcessor:
             logger.info("任务已被取消，跳过处理: %s", task_id)
             return False
 
-        task_service.update_task_status(task_id, ImportTaskStatus.PROCESSING, db)
+        # 队列领取时已置为 processing，直接调用时在此补置
+        if task.status != ImportTaskStatus.PROCESSING.value:
+            task_service.update_task_status(task_id, ImportTaskStatus.PROCESSING, db)
         return True
 
     def _execute_import(
@@ -105,97 +133,151 @@ class ImportTaskProcessor:
         task_id: str,
         db: Session,
         task_service: ImportTaskService,
+        worker_id: str | None = None,
     ) -> dict[str, Any]:
-        """执行实际的 CSV 导入逻辑."""
+        """执行实际的导入逻辑.
+
+        CSV 以流式读取、逐批解析导入，内存占用与文件大小无关，首批数据在文件
+        读完前即已提交。``processed_records`` 与批次数据同事务提交，非零即为上次
+        崩溃前最后提交的批次位置：跳过已提交的行并沿用已累计的成功/失败计数续跑。
+        推送任务读取 JSON 数组文件，房源归属推送用户。
+        """
         task = task_service.get_task(task_id, db)
         if not task:
             return {"success": False, "error": "任务不存在"}
 
-        rows, original_headers = self.csv_parser.parse_file(task.file_path)
-        total = len(rows)
+        if task.source_type == TASK_SOURCE_PUSH:
+            return self._import_stream(task, JSONRowStream(Path(task.file_path)), db, task_service, worker_id)
 
-        logger.info("[%s] CSV 解析完成: 共 %s 条记录", task_id, total)
+        with Path(task.file_path).open("rb") as raw:
+            return self._import_stream(task, self.csv_parser.open_stream(raw), db, task_service, worker_id)
 
-        task.total_records = total
-        db.commit()
+    def _import_stream(
+        self,
+        task: PropertyImportTask,
+        stream: CSVRowStream | JSONRowStream,
+        db: Session,
+        task_service: ImportTaskService,
+        worker_id: str | None,
+    ) -> dict[str, Any]:
+        """从行流逐批导入，完成后生成失败记录文件（推送任务保存逐条错误详情）."""
+        task_id = task.id
+        push = task.source_type == TASK_SOURCE_PUSH
+
+        resume_from = task.processed_records or 0
+        if resume_from:
+            logger.info("[%s] 从第 %s 条记录续跑", task_id, resume_from + 1)
+            self.failed_handler.reset_failed_records(task_id, resume_from)
+            success, failed = task.success_count, task.failed_count
+        else:
+            self.failed_handler.remove_failed_records(task_id)
+            success, failed = 0, 0
 
         result = self._process_batches(
             task_id,
-            rows,
-            total,
+            stream,
             db,
             task_service,
+            start=resume_from,
+            success=success,
+            failed=failed,
+            worker_id=worker_id,
+            owner_id=task.user_id if push else "",
+            failure_type=_PUSH_FAILURE_TYPE if push else _CSV_FAILURE_TYPE,
         )
+        if not result.get("success"):
+            return result
 
-        if result.get("failed_records"):
+        result["failed_records"] = self.failed_handler.load_failed_records(task_id)
+        if push:
+            self.failed_handler.save_push_errors(task_id, to_push_errors(result["failed_records"]))
+        elif result["failed_records"]:
             result["failed_file_url"] = self.failed_handler.generate_failed_csv(
                 result["failed_records"],
-                original_headers,
+                stream.headers,
                 task_id,
             )
+        self.failed_handler.remove_failed_records(task_id)
 
         return result
 
     def _process_batches(
         self,
         task_id: str,
-        rows: list,
-        total: int,
+        stream: CSVRowStream | JSONRowStream,
         db: Session,
         task_service: ImportTaskService,
+        *,
+        start: int = 0,
+        success: int = 0,
+        failed: int = 0,
+        worker_id: str | None = None,
+        owner_id: str = "",
+        failure_type: str = _CSV_FAILURE_TYPE,
     ) -> dict[str, Any]:
-        """分批处理数据."""
-        processed = 0
-        success = 0
-        failed = 0
-        failed_records = []
+        """分批处理数据，每批提交前把失败记录追加到任务日志文件.
 
-        for batch_start in range(0, total, BATCH_SIZE):
+        总行数在读完文件前未知：``total_records`` 记为已读取行数，进度百分比按已读取
+        字节比例估算，文件读完后二者即为准确值。
+        """
+        processed = start
+
+        for batch_rows in stream.iter_batches(BATCH_SIZE, skip=start):
             db.refresh(task_service.get_task(task_id, db))
             task = task_service.get_task(task_id, db)
             if task and task.status == ImportTaskStatus.CANCELLED.value:
                 logger.info("[%s] 任务被取消，停止处理", task_id)
                 return {"cancelled": True}
+            if task and worker_id and task.worker_id != worker_id:
+                return {"released": True}
 
             batch_result = self._process_single_batch(
-                task_id,
-                rows,
-                batch_start,
-                total,
-                db,
+                task_id, batch_rows, processed, db, owner_id=owner_id, failure_type=failure_type
             )
 
             processed += batch_result["processed"]
             success += batch_result["success"]
             failed += batch_result["failed"]
-            failed_records.extend(batch_result["failed_records"])
+            self.failed_handler.append_failed_records(task_id, batch_result["failed_records"])
+
+            self._commit_batch(
+                task_id,
+                processed,
+                success,
+                failed,
+                processed,
+                db,
+                task_service,
+                progress_percent=round(stream.fraction_read * 100, 2),
+            )
 
-            self._commit_batch(task_id, processed, success, failed, total, db, task_service)
+        # 文件读完：总数即已处理数（空文件/续跑时已全部提交的情况同样需要落库）
+        self._commit_batch(task_id, processed, success, failed, processed, db, task_service)
+        logger.info("[%s] 导入完成: 共 %s 条记录", task_id, processed)
 
         return {
             "success": True,
-            "total": total,
+            "total": processed,
             "success_count": success,
             "failed_count": failed,
-            "failed_records": failed_records,
         }
 
     def _process_single_batch(
         self,
         task_id: str,
-        rows: list,
+        batch_rows: list[dict[str, Any]],
         batch_start: int,
-        total: int,
         db: Session,
+        *,
+        owner_id: str = "",
+        failure_type: str = _CSV_FAILURE_TYPE,
     ) -> dict[str, Any]:
-        """处理单个批次."""
-        batch_end = min(batch_start + BATCH_SIZE, total)
-        batch_rows = rows[batch_start:batch_end]
-
+        """处理单个批次（``batch_start`` 为批次前已处理的行数，用于计算行号）."""
         processed = 0
         success = 0
         failed = 0
         failed_records: list = []
+        validated: list[tuple[int, PropertyIngestionModel]] = []
 
         for idx_in_batch, row in enumerate(batch_rows):
             global_index = batch_start + idx_in_batch + 1
@@ -210,11 +292,16 @@ class ImportTaskProcessor:
                         "error": validation_result["error"],
                     },
                 )
-                self.failed_handler.save_failed_record_sync(row, validation_result["error"], task_id)
+                self.failed_handler.save_failed_record_sync(row, validation_result["error"], task_id, failure_type)
                 processed += 1
                 continue
 
-            import_result = self._import_row(validation_result["data"], db)
+            validated.append((global_index, validation_result["data"]))
+
+        import_results = self._import_validated(validated, db, owner_id)
+        for global_index, _data in validated:
+            row = batch_rows[global_index - batch_start - 1]
+            import_result = import_results[global_index]
             if import_result["success"]:
                 success += 1
             else:
@@ -230,10 +317,14 @@ class ImportTaskProcessor:
                     row,
                     import_result["error"] or "导入失败",
                     task_id,
+                    failure_type,
                 )
 
             processed += 1
 
+        # 校验失败与导入失败分两轮收集，按行号恢复原始顺序
+        failed_records.sort(key=lambda record: record["row_number"])
+
         return {
             "processed": processed,
             "success": success,
@@ -254,14 +345,33 @@ class ImportTaskProcessor:
         else:
             return {"data": validated_data, "error": None}
 
+    def _import_validated(
+        self,
+        validated: list[tuple[int, PropertyIngestionModel]],
+        db: Session,
+        owner_id: str = "",
+    ) -> dict[int, dict[str, Any]]:
+        """导入批内已校验的行，返回行号 -> 导入结果（``owner_id`` 写入房源归属用户）."""
+        if not self.bulk_upsert:
+            return {global_index: self._import_row(data, db, owner_id) for global_index, data in validated}
+
+        try:
+            results = self.importer.import_batch(validated, db, owner_id)
+        except Exception as e:
+            return {global_index: {"success": False, "error": f"导入异常: {e!s}"} for global_index, _ in validated}
+        return {
+            global_index: {"success": result.success, "error": result.error} for global_index, result in results.items()
+        }
+
     def _import_row(
         self,
         validated_data: PropertyIngestionModel,
         db: Session,
+        owner_id: str = "",
     ) -> dict[str, Any]:
         """导入单行数据."""
         try:
-            result = self.importer.import_property(validated_data, db)
+            result = self.importer.import_property(validated_data, db, owner_id)
         except Exception as e:
             return {"success": False, "error": f"导入异常: {e!s}"}
         else:
@@ -276,12 +386,14 @@ class ImportTaskProcessor:
         total: int,
         db: Session,
         task_service: ImportTaskService,
+        progress_percent: float | None = None,
     ) -> None:
-        """提交批次并更新进度."""
+        """提交批次并更新进度（批次数据与进度同一事务，进度即续跑断点）."""
         try:
-            db.commit()
-            task_service.update_task_progress(task_id, processed, success, failed, total, db)
-            logger.info("[%s] 进度更新: %s/%s", task_id, processed, total)
+            task_service.update_task_progress(
+                task_id, processed, success, failed, total, db, progress_percent=progress_percent
+            )
+            logger.info("[%s] 进度更新: 已处理 %s 条", task_id, processed)
         except Exception:
             db.rollback()
             logger.exception("[%s] 批次提交失败", task_id)
@@ -340,21 +452,3 @@ def get_task_processor() -> ImportTaskProcessor:
     if _processor is None:
         _processor = ImportTaskProcessor()
     return _processor
-
-
-def start_import_task(task_id: str) -> None:
-    """启动导入任务（在后台线程中执行）.
-
-    这个函数应该在 API 路由中调用，创建后台线程处理任务
-    """
-    processor = get_task_processor()
-
-    def run_task() -> None:
-        with _processing_lock:
-            processor.process_task(task_id)
-
-    thread = threading.Thread(target=run_task, name=f"ImportTask-{task_id[:8]}")
-    thread.daemon = True
-    thread.start()
-
-    logger.info("导入任务已在后台启动: %s", task_id)
@@ -0,0 +1,131 @@
+"""房源导入任务持久化队列与工作池.
+
+``property_import_tasks`` 表本身即持久化队列：上传接口只写入 pending 任务，
+工作线程以 ``FOR UPDATE SKIP LOCKED`` 领取（见 ``ImportTaskService.claim_next_task``），
+不同任务在不同工作线程/进程中并发导入；进程重启不丢任务，心跳超时的任务会被
+重新领取并从最后提交的批次续跑。
+
+两种部署方式可同时使用：
+- API 进程内：lifespan 启动 ``settings.import_embedded_workers`` 个工作线程
+- 独立进程：``python -m scripts.run_import_workers`` 启动
+  ``settings.import_worker_processes`` 个工作进程（API 进程可将内嵌线程数设为 0）
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from multiprocessing.synchronize import Event as ProcessEvent
+
+from db import SessionLocal
+from services.market.import_task_processor import get_task_processor
+from services.market.import_task_service import get_import_task_service
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 新任务入队通知：唤醒本进程内空闲的工作线程，免等轮询间隔
+_task_available = threading.Event()
+
+_embedded_workers: list[threading.Thread] = []
+_embedded_lock = threading.Lock()
+
+
+def _worker_identity() -> str:
+    """当前工作线程标识（主机名:进程号:线程名）."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+
+def run_import_worker(stop_event: threading.Event | ProcessEvent | None = None) -> None:
+    """导入工作循环：领取任务 -> 处理 -> 继续领取，队列为空时等待通知或轮询.
+
+    Args:
+        stop_event: 停止信号（为 None 时持续运行，用于守护线程）
+
+    """
+    worker_id = _worker_identity()
+    processor = get_task_processor()
+    task_service = get_import_task_service()
+    logger.info("导入工作线程已启动: %s", worker_id)
+
+    while stop_event is None or not stop_event.is_set():
+        try:
+            with SessionLocal() as db:
+                task_id = task_service.claim_next_task(worker_id, db)
+        except Exception:
+            logger.exception("领取导入任务失败: %s", worker_id)
+            task_id = None
+
+        if task_id:
+            processor.process_task(task_id, worker_id)
+            continue
+
+        _task_available.wait(settings.import_worker_poll_seconds)
+        _task_available.clear()
+
+
+def start_embedded_import_workers() -> None:
+    """在 API 进程内启动导入工作线程（幂等，数量取 ``settings.import_embedded_workers``）."""
+    with _embedded_lock:
+        if _embedded_workers:
+            return
+        for index in range(settings.import_embedded_workers):
+            thread = threading.Thread(target=run_import_worker, name=f"ImportWorker-{index}", daemon=True)
+            thread.start()
+            _embedded_workers.append(thread)
+
+
+def start_import_task(task_id: str) -> None:
+    """通知工作线程有新任务入队.
+
+    任务在创建时已以 pending 状态持久化，此处只负责唤醒本进程内的工作线程；
+    未启用内嵌工作线程时由独立工作进程轮询领取。
+    """
+    _task_available.set()
+    logger.info("导入任务已入队: %s", task_id)
+
+
+def _process_main(stop_event: ProcessEvent) -> None:
+    """工作进程入口（spawn 启动，需在子进程内重新配置日志）.
+
+    忽略 SIGINT：Ctrl+C 由主进程转为 ``stop_event``，子进程处理完当前任务再退出。
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(processName)s %(name)s: %(message)s",
+    )
+    run_import_worker(stop_event)
+
+
+def run_import_worker_pool(processes: int | None = None) -> None:
+    """启动导入工作进程池并阻塞到 Ctrl+C.
+
+    停止时各进程处理完当前任务后退出；被强制终止的任务在心跳超时后由其他
+    工作进程从最后提交的批次续跑。
+
+    Args:
+        processes: 工作进程数，默认取 ``settings.import_worker_processes``
+
+    """
+    count = max(1, processes or settings.import_worker_processes)
+    ctx = multiprocessing.get_context("spawn")
+    stop_event = ctx.Event()
+    workers = [
+        ctx.Process(target=_process_main, args=(stop_event,), name=f"ImportWorker-{index}") for index in range(count)
+    ]
+    for worker in workers:
+        worker.start()
+    logger.info("导入工作进程池已启动: %s 个进程", count)
+
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        logger.info("收到停止信号，等待工作进程完成当前任务...")
+    finally:
+        stop_event.set()
+        for worker in workers:
+            worker.join()
@@ -3,15 +3,19 @@
 负责任务的创建、状态更新、查询.
 """
 
+import json
 import logging
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Any
 
 from fastapi import UploadFile
+from sqlalchemy import and_, func, or_, select, update
 from sqlalchemy.orm import Session
 
 from models import ImportTaskStatus, PropertyImportTask
+from services.market.failed_record_handler import FailedRecordHandler
 from services.system.exceptions import FileProcessingError
 from settings import settings
 
@@ -19,6 +23,13 @@ logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = Path.cwd() / settings.import_upload_dir
 
+# 任务来源（PropertyImportTask.source_type）
+TASK_SOURCE_CSV = "csv"
+TASK_SOURCE_PUSH = "push"
+
+# 单个任务最多领取次数（超过后不再重新领取，心跳超时即标记失败）
+_MAX_ATTEMPTS = 3
+
 
 class ImportTaskService:
     """导入任务管理服务."""
@@ -72,6 +83,46 @@ class ImportTaskService:
         logger.info("导入任务已创建: %s, 用户: %s, 文件: %s", task_id, user_id, file.filename)
         return task
 
+    def create_push_task(self, records: list[dict[str, Any]], user_id: str, db: Session) -> PropertyImportTask:
+        """创建 JSON 推送异步导入任务.
+
+        推送数据原样写为 JSON 数组文件（不做模型校验，由导入工作进程逐条校验一次），
+        任务与 CSV 上传任务共用持久化队列。
+        """
+        task_id = str(uuid.uuid4())
+        file_path = UPLOAD_DIR / f"{task_id}.json"
+
+        try:
+            content = json.dumps(records, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            file_path.write_bytes(content)
+        except Exception as e:
+            logger.exception("保存推送数据时出错")
+            msg = "保存推送数据失败"
+            raise FileProcessingError(msg) from e
+
+        task = PropertyImportTask(
+            id=task_id,
+            user_id=user_id,
+            status=ImportTaskStatus.PENDING.value,
+            source_type=TASK_SOURCE_PUSH,
+            filename=f"push_{task_id}.json",
+            file_path=str(file_path),
+            file_size=len(content),
+            total_records=len(records),
+            processed_records=0,
+            success_count=0,
+            failed_count=0,
+            progress_percent=0.0,
+            created_at=datetime.now(timezone.utc),
+        )
+
+        db.add(task)
+        db.commit()
+        db.refresh(task)
+
+        logger.info("推送导入任务已创建: %s, 用户: %s, 记录数: %s", task_id, user_id, len(records))
+        return task
+
     def get_task(self, task_id: str, db: Session) -> PropertyImportTask | None:
         """获取任务信息."""
         return db.query(PropertyImportTask).filter(PropertyImportTask.id == task_id).first()
@@ -91,6 +142,77 @@ class ImportTaskService:
 
         return query.order_by(PropertyImportTask.created_at.desc()).limit(limit).all()
 
+    def claim_next_task(self, worker_id: str, db: Session) -> str | None:
+        """从持久化队列领取一个待处理任务（``FOR UPDATE SKIP LOCKED``，多进程安全）.
+
+        可领取的任务：
+        - pending 任务，按创建时间先进先出
+        - 心跳超过 ``settings.import_task_stale_seconds`` 的 processing 任务
+          （原工作进程崩溃/重启），由新工作进程从 ``processed_records`` 处续跑
+
+        已领取 ``_MAX_ATTEMPTS`` 次仍心跳超时的任务不再领取（避免反复导致工作进程崩溃的任务
+        无限重试），领取前统一标记为失败。
+
+        Args:
+            worker_id: 工作进程标识
+            db: 数据库会话
+
+        Returns:
+            领取到的任务ID，队列为空时返回 None
+
+        """
+        now = datetime.now(timezone.utc)
+        stale_before = now - timedelta(seconds=settings.import_task_stale_seconds)
+        stale = func.coalesce(PropertyImportTask.heartbeat_at, PropertyImportTask.started_at) < stale_before
+        exhausted = db.execute(
+            update(PropertyImportTask)
+            .where(
+                PropertyImportTask.status == ImportTaskStatus.PROCESSING.value,
+                PropertyImportTask.attempts >= _MAX_ATTEMPTS,
+                stale,
+            )
+            .values(
+                status=ImportTaskStatus.FAILED.value,
+                error_message="导入多次中断，请重新上传文件",
+                completed_at=now,
+            )
+            .returning(PropertyImportTask.id)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+        for exhausted_id in exhausted:
+            logger.warning("导入任务领取次数耗尽，已标记失败: %s", exhausted_id)
+
+        candidate = (
+            select(PropertyImportTask.id)
+            .where(
+                PropertyImportTask.attempts < _MAX_ATTEMPTS,
+                or_(
+                    PropertyImportTask.status == ImportTaskStatus.PENDING.value,
+                    and_(PropertyImportTask.status == ImportTaskStatus.PROCESSING.value, stale),
+                ),
+            )
+            .order_by(PropertyImportTask.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        task_id = db.execute(
+            update(PropertyImportTask)
+            .where(PropertyImportTask.id == candidate.scalar_subquery())
+            .values(
+                status=ImportTaskStatus.PROCESSING.value,
+                worker_id=worker_id,
+                heartbeat_at=now,
+                attempts=PropertyImportTask.attempts + 1,
+                started_at=func.coalesce(PropertyImportTask.started_at, now),
+            )
+            .returning(PropertyImportTask.id)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        db.commit()
+        if task_id:
+            logger.info("导入任务已领取: %s, worker: %s", task_id, worker_id)
+        return task_id
+
     def update_task_status(
         self,
         task_id: str,
@@ -135,8 +257,14 @@ class ImportTaskService:
         failed: int,
         total: int,
         db: Session,
+        progress_percent: float | None = None,
     ) -> None:
-        """更新任务进度."""
+        """更新任务进度并提交.
+
+        与批次导入数据共用一次提交：``processed_records`` 即续跑断点，
+        同时刷新心跳 ``heartbeat_at``。``progress_percent`` 未指定时按
+        ``processed / total`` 计算（流式导入读完文件前总数未知，由调用方按字节估算）。
+        """
         task = self.get_task(task_id, db)
         if not task:
             return
@@ -146,7 +274,11 @@ class ImportTaskService:
         task.failed_count = failed
         task.total_records = total
 
-        if total > 0:
+        task.heartbeat_at = datetime.now(timezone.utc)
+
+        if progress_percent is not None:
+            task.progress_percent = progress_percent
+        elif total > 0:
             task.progress_percent = round((processed / total) * 100, 2)
 
         db.commit()
@@ -172,7 +304,7 @@ class ImportTaskService:
         return True
 
     def cleanup_task_file(self, task_id: str, db: Session) -> None:
-        """清理任务文件."""
+        """清理任务文件（上传/推送数据文件及推送错误详情文件）."""
         task = self.get_task(task_id, db)
         if task:
             fp = Path(task.file_path)
@@ -182,6 +314,10 @@ class ImportTaskService:
                     logger.info("任务文件已清理: %s", task.file_path)
                 except Exception:
                     logger.warning("清理任务文件失败: %s", task.file_path)
+        try:
+            FailedRecordHandler(str(UPLOAD_DIR)).remove_push_errors(task_id)
+        except OSError:
+            logger.warning("清理推送错误详情文件失败: %s", task_id)
 
 
 _import_task_service: ImportTaskService | None = None
@@ -22,10 +22,12 @@ from models import (
 )
 from schemas import ImportResult, PropertyIngestionModel
 from services.market.community_image_service import CommunityImageService
+from services.market.community_index import get_community_index
+from services.market.media_downloader import enqueue_media_download
 from services.system import save_failed_record
 from utils.error_formatters import format_database_error
 from utils.floor_plan import get_floor_plan
-from utils.image_download import download_external_image
+from utils.image_download import DownloadedImage
 
 from .parser import FloorParser
 
@@ -123,15 +125,28 @@ class PropertyImporter:
         else:
             name = data.community_name.strip()
 
-        # 1. 尝试查找 (名称匹配或别名匹配)
+        # 1. 进程级解析索引命中：仅当导入数据能补充小区缺失信息时才加载小区对象
+        index = get_community_index()
+        entry = index.lookup(name, db)
+        if entry is not None:
+            if entry.needs_update(data):
+                community = db.get(Community, entry.community_id)
+                if community is not None:
+                    self._update_community_info_if_needed(community, data, db)
+            return entry.community_id
+
+        # 2. 索引未命中（索引构建后新增的小区）：回退数据库查找 (名称匹配或别名匹配)
         community = self._find_community_by_name_or_alias(name, db)
 
         if community:
             self._update_community_info_if_needed(community, data, db)
+            index.remember(db, name, community.id)
             return community.id
 
-        # 2. 创建新小区
-        return self._create_community(name, data, db)
+        # 3. 创建新小区（事务提交后并入索引）
+        community_id = self._create_community(name, data, db)
+        index.remember(db, name, community_id)
+        return community_id
 
     def _find_community_by_name_or_alias(self, name: str, db: Session) -> Community | None:
         """通过名称或别名查找小区对象."""
@@ -368,8 +383,10 @@ class PropertyImporter:
         不下载、不保存。流程：
         1. 用 ``get_floor_plan(data.data_source, data.image_urls)`` 从图片列表选出户型图 URL
         2. 选不到户型图（返回 None）时不保存任何记录
-        3. 外站图片（http/https）下载到本地存储，失败时回退原 URL（仍保存到 property_media）
-        4. 下载/保存成功后调用 ``CommunityImageService.classify_to_community`` 归类到
+        3. 外站图片（http/https）不在导入事务内下载：先保存外站原 URL 并登记下载任务，
+           由 ``media_downloader`` 工作池在导入提交后下载、生成缩略图并回写 URL
+           （同一 URL 已下载过时直接复用存储后的原图与缩略图 URL）
+        4. 保存后调用 ``CommunityImageService.classify_to_community`` 归类到
            ``community_images``（``source=scraped``）
         5. 归类失败不影响主流程（log warning，继续），不回滚 property_media 已保存的记录
 
@@ -399,19 +416,23 @@ class PropertyImporter:
                 PropertyMedia.source_property_id == data.source_property_id,
             ).delete()
 
-            # 3. 外站图片下载到本地存储，失败时回退原 URL
-            stored_url = floor_plan_url
+            # 3. 外站图片登记异步下载，先保存原 URL（admin 端可加载外站 URL）
+            stored = DownloadedImage(url=floor_plan_url)
             if floor_plan_url.startswith(("http://", "https://")):
-                downloaded = download_external_image(floor_plan_url)
-                if downloaded:
-                    stored_url = downloaded
-                # 下载失败保留原外站 URL（admin 端可加载外站 URL）
+                stored = enqueue_media_download(
+                    db,
+                    data_source=data.data_source,
+                    source_property_id=data.source_property_id,
+                    source_url=floor_plan_url,
+                    community_id=community_id,
+                )
 
             media_record = PropertyMedia(
                 data_source=data.data_source,
                 source_property_id=data.source_property_id,
                 media_type=MediaType.OTHER,  # 统一作为"其他"类型，前端自行选择展示
-                url=stored_url,
+                url=stored.url,
+                thumbnail_url=stored.thumbnail_url,
                 sort_order=0,
                 created_at=datetime.now(timezone.utc),
             )
@@ -421,7 +442,7 @@ class PropertyImporter:
                 "保存房源 %s 的户型图: %s -> %s",
                 data.source_property_id,
                 floor_plan_url,
-                stored_url,
+                stored.url,
             )
 
             # 4. 归类到 community_images（community_id 为空时由 Service 跳过）
@@ -429,7 +450,8 @@ class PropertyImporter:
                 CommunityImageService.classify_to_community(
                     db=db,
                     community_id=community_id,
-                    url=stored_url,
+                    url=stored.url,
+                    thumbnail_url=stored.thumbnail_url,
                     source_property_id=data.source_property_id,
                 )
             except Exception as classify_err:
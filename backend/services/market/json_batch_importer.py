@@ -10,6 +10,8 @@ from sqlalchemy.orm import Session
 
 from schemas import PropertyIngestionModel, PushResult
 from services.market import PropertyImporter
+from services.market.media_downloader import start_media_downloads
+from services.market.push_payload import extract_source_id
 from services.system import save_failed_record
 from utils.error_formatters import format_validation_error
 
@@ -25,7 +27,12 @@ class JSONBatchImporter:
         """初始化导入器."""
         self.importer = PropertyImporter()
 
-    def batch_import_json(self, properties: list[dict], db: Session, user_id: str) -> PushResult:
+    def batch_import_json(
+        self,
+        properties: list[dict | PropertyIngestionModel],
+        db: Session,
+        user_id: str,
+    ) -> PushResult:
         """批量导入 JSON 数组.
 
         流程:
@@ -36,7 +43,7 @@ class JSONBatchImporter:
         5. 返回处理结果统计
 
         Args:
-            properties: 原始房源数据字典列表
+            properties: 原始房源数据字典或已校验模型列表（已校验模型不再重复校验）
             db: 数据库会话
             user_id: 推送用户的ID，将保存到房源的owner_id字段
 
@@ -58,11 +65,18 @@ class JSONBatchImporter:
         logger.info("开始处理 JSON 推送，共 %s 条记录", total)
 
         try:
-            for index, raw_data in enumerate(properties):
+            for index, item in enumerate(properties):
+                raw_data = (
+                    item.model_dump(by_alias=True, exclude_unset=True)
+                    if isinstance(item, PropertyIngestionModel)
+                    else item
+                )
                 try:
                     # 使用 SAVEPOINT 隔离每条记录：单条失败只回滚该条，不影响其他记录
                     with db.begin_nested():
-                        validated_data = PropertyIngestionModel(**raw_data)
+                        validated_data = (
+                            item if isinstance(item, PropertyIngestionModel) else PropertyIngestionModel(**raw_data)
+                        )
                         result = self.importer.import_property(validated_data, db, user_id)
                         if not result.success:
                             # 业务失败：主动抛异常让 SAVEPOINT 回滚
@@ -117,6 +131,8 @@ class JSONBatchImporter:
 
             db.commit()
             logger.info("JSON 推送处理完成并已提交: 总数=%s, 成功=%s, 失败=%s", total, success, failed)
+            # 提交后再下载户型图，推送请求不等待外站图床
+            start_media_downloads()
 
         except Exception as e:
             db.rollback()
@@ -144,8 +160,10 @@ class JSONBatchImporter:
             errors=errors,
         )
 
-    def _extract_source_id(self, raw_data: dict) -> str:
-        return raw_data.get("房源ID", raw_data.get("source_property_id", "unknown"))
+    def _extract_source_id(self, raw_data: dict | PropertyIngestionModel) -> str:
+        if isinstance(raw_data, PropertyIngestionModel):
+            return raw_data.source_property_id
+        return extract_source_id(raw_data)
 
     def _format_validation_error(self, error: ValidationError) -> str:
         """格式化验证错误信息（使用统一的错误处理器）.
@@ -0,0 +1,136 @@
+"""房源列表游标（keyset）分页.
+
+OFFSET 分页需要数据库先扫描并丢弃前面所有行，页码越深越慢。游标分页按
+``(排序值, id)`` 记住上一页最后一行，下一页直接从该位置继续扫描，每页代价与页码无关：
+
+- 排序：``排序表达式 + id`` 同向排序，id 保证顺序唯一；可空排序字段的 NULL 统一排在最后
+- 游标：上一页末行的排序字段、方向、排序值与 id，URL-safe base64 编码的 JSON；
+  排序参数与游标不一致时拒绝（避免跨排序续翻得到错乱结果）
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+from sqlalchemy import and_, asc, desc, or_, tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement
+
+from models import PropertyCurrent
+from services.system.exceptions import ValidationError
+
+from .sorting import resolve_sort_expression
+
+# 游标中排序值的类型标记
+_TYPE_DATETIME = "dt"
+_TYPE_DECIMAL = "dec"
+_TYPE_INT = "int"
+_TYPE_NULL = "null"
+
+
+def _is_nullable(expression: ColumnElement) -> bool:
+    """排序表达式是否可能为 NULL（非空列可省略 NULL 排序键，直接走 (列, id) 索引）."""
+    return getattr(expression, "nullable", True)
+
+
+def _encode_value(value: Any) -> list[Any]:
+    if value is None:
+        return [_TYPE_NULL, None]
+    if isinstance(value, datetime):
+        return [_TYPE_DATETIME, value.isoformat()]
+    if isinstance(value, Decimal | float):
+        return [_TYPE_DECIMAL, str(value)]
+    return [_TYPE_INT, int(value)]
+
+
+def _decode_value(kind: str, raw: Any) -> Any:
+    if kind == _TYPE_NULL:
+        return None
+    if kind == _TYPE_DATETIME:
+        return datetime.fromisoformat(raw)
+    if kind == _TYPE_DECIMAL:
+        return Decimal(raw)
+    if kind == _TYPE_INT:
+        return int(raw)
+    msg = f"未知的游标值类型: {kind}"
+    raise ValueError(msg)
+
+
+def encode_cursor(sort_by: str, sort_order: str, sort_value: Any, property_id: int) -> str:
+    """将上一页末行编码为游标字符串."""
+    payload = [sort_by, sort_order, *_encode_value(sort_value), property_id]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> tuple[Any, int]:
+    """解析游标，返回 (排序值, id).
+
+    Raises:
+        ValidationError: 游标格式非法或与当前排序参数不一致
+
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort_by, cursor_order, kind, value, property_id = json.loads(raw)
+        sort_value = _decode_value(kind, value)
+        property_id = int(property_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, InvalidOperation):
+        msg = "无效的分页游标"
+        raise ValidationError(msg) from None
+    if (cursor_sort_by, cursor_order) != (sort_by, sort_order):
+        msg = "分页游标与当前排序条件不一致，请从第一页重新查询"
+        raise ValidationError(msg)
+    return sort_value, property_id
+
+
+def apply_keyset(
+    query: Query,
+    sort_by: str,
+    sort_order: str,
+    cursor: str | None,
+) -> tuple[Query, str, ColumnElement]:
+    """应用游标排序与续翻条件.
+
+    Args:
+        query: 已应用筛选条件的查询对象
+        sort_by: 排序字段（非白名单字段回退到 updated_at）
+        sort_order: 排序方向（非 asc 视为 desc）
+        cursor: 上一页返回的游标，None 表示第一页
+
+    Returns:
+        tuple[Query, str, ColumnElement]: (排序并续翻后的查询, 校验后的排序字段, 排序表达式)；
+        调用方需把排序表达式加入查询列，以便为本页末行生成游标
+
+    Raises:
+        ValidationError: 游标非法或与排序参数不一致
+
+    """
+    validated_sort_by, expression = resolve_sort_expression(sort_by)
+    ascending = sort_order == "asc"
+    direction = asc if ascending else desc
+    nullable = _is_nullable(expression)
+    row_id = PropertyCurrent.id
+
+    if cursor is not None:
+        sort_value, last_id = decode_cursor(cursor, validated_sort_by, "asc" if ascending else "desc")
+        if sort_value is None:
+            # 已翻到 NULL 段：只在 NULL 行内按 id 续翻
+            id_after = row_id > last_id if ascending else row_id < last_id
+            query = query.filter(and_(expression.is_(None), id_after))
+        else:
+            key = tuple_(expression, row_id)
+            after = key > tuple_(sort_value, last_id) if ascending else key < tuple_(sort_value, last_id)
+            # 非 NULL 段之后是 NULL 段（NULL 统一排在最后）
+            query = query.filter(or_(after, expression.is_(None)) if nullable else after)
+
+    order_by = [direction(expression), direction(row_id)]
+    if nullable:
+        order_by.insert(0, expression.is_(None))
+    return query.order_by(*order_by), validated_sort_by, expression
+
+
+__all__ = ["apply_keyset", "decode_cursor", "encode_cursor"]
@@ -0,0 +1,372 @@
+"""户型图异步下载流水线.
+
+导入阶段只把外站户型图 URL 写入 ``property_media`` / ``community_images`` 并登记
+``media_download_jobs``，不在导入事务内发起任何网络请求；下载由本模块的工作池在
+导入提交后执行：
+
+- 线程池有界并发（``settings.media_download_concurrency``），同一主机额外限流
+  （``settings.media_download_per_host``）：派发前先取得主机并发额度，额度用尽的主机的任务
+  留在派发队列中等待，不占用工作线程，慢图床不会拖住其他主机的下载
+- 领取任务使用 ``FOR UPDATE SKIP LOCKED``，多进程部署可并行消费；领取超时的
+  processing 任务视为进程崩溃遗留，重新领取
+- 下载经 ``media_store`` 内容寻址保存：已下载过的外站 URL 不再请求，相同内容共享存储对象
+- 下载成功：存储后端保存原图 + WebP 缩略图，回写两张表中仍指向外站 URL 的记录
+- 下载失败：指数退避重试（``backoff * 2^(attempts-1)``），超过最大次数标记 failed
+- 关联导入任务的 ``media_total`` / ``media_downloaded`` / ``media_failed`` 计数
+  以 SQL 原子自增维护，可与导入线程并发更新
+"""
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from db import SessionLocal
+from models import CommunityImage, MediaDownloadJob, MediaDownloadStatus, PropertyImportTask, PropertyMedia
+from settings import settings
+from utils.image_download import DownloadedImage
+
+from .media_store import get_media_store
+
+logger = logging.getLogger(__name__)
+
+# 当前导入任务ID：导入任务处理器在任务线程内设置，入队时据此关联进度计数
+current_import_task_id: ContextVar[str | None] = ContextVar("current_import_task_id", default=None)
+
+# processing 状态超过该时长未完成视为遗留任务（进程崩溃/重启），允许重新领取
+_STALE_LOCK_SECONDS = 300
+
+# 等待退避任务时的最长单次休眠（秒），避免长时间占用后台线程
+_MAX_IDLE_WAIT_SECONDS = 60.0
+
+_drain_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+def enqueue_media_download(
+    db: Session,
+    *,
+    data_source: str,
+    source_property_id: str,
+    source_url: str,
+    community_id: str | None,
+) -> DownloadedImage:
+    """登记户型图下载任务，返回当前应写入的 URL 与缩略图 URL.
+
+    同一房源同一外站 URL 已下载完成、或该外站 URL 已在内容寻址存储中登记（其他房源下载过）时
+    直接复用已存储的原图与缩略图 URL（不重复下载），
+    否则重置为 pending 等待工作池下载，返回外站原始 URL（无缩略图）。调用方负责事务提交。
+    已在排队（pending）且已计入某导入任务的下载任务保持原关联任务，不重复计数，
+    保证原任务的 ``media_total`` 能够走完。
+
+    Args:
+        db: 数据库会话（与导入共用事务）
+        data_source: 数据来源
+        source_property_id: 来源房源ID
+        source_url: 外站户型图 URL
+        community_id: 房源关联小区ID（可空）
+
+    Returns:
+        写入 ``property_media`` / ``community_images`` 的 URL 与缩略图 URL
+
+    """
+    job = (
+        db.query(MediaDownloadJob)
+        .filter(
+            MediaDownloadJob.data_source == data_source,
+            MediaDownloadJob.source_property_id == source_property_id,
+            MediaDownloadJob.source_url == source_url,
+        )
+        .first()
+    )
+    if job is not None and job.status == MediaDownloadStatus.DONE and job.stored_url:
+        return DownloadedImage(url=job.stored_url, thumbnail_url=job.thumbnail_url)
+    if job is not None and job.status == MediaDownloadStatus.PROCESSING:
+        # 工作线程正在下载，完成后会回写新写入的外站 URL 记录
+        return DownloadedImage(url=source_url)
+
+    # 仍在排队的任务已计入首个导入任务的 media_total：保持原关联，否则原任务进度永远无法完成
+    counted = job is not None and job.status == MediaDownloadStatus.PENDING and job.import_task_id is not None
+    now = datetime.now(timezone.utc)
+    if job is None:
+        job = MediaDownloadJob(
+            data_source=data_source,
+            source_property_id=source_property_id,
+            source_url=source_url,
+            created_at=now,
+        )
+        db.add(job)
+    job.community_id = community_id
+
+    # 其他房源已下载过同一外站 URL：直接复用内容寻址存储对象，不再排队下载
+    stored = get_media_store().lookup(db, source_url)
+    if stored is not None:
+        job.status = MediaDownloadStatus.DONE
+        job.stored_url = stored.url
+        job.thumbnail_url = stored.thumbnail_url
+        job.last_error = None
+        db.flush()
+        return stored
+
+    task_id = None if counted else current_import_task_id.get()
+    if not counted:
+        job.import_task_id = task_id
+    job.status = MediaDownloadStatus.PENDING
+    job.attempts = 0
+    job.next_attempt_at = now
+    job.locked_at = None
+    job.last_error = None
+    db.flush()
+
+    if task_id:
+        db.execute(
+            update(PropertyImportTask)
+            .where(PropertyImportTask.id == task_id)
+            .values(media_total=PropertyImportTask.media_total + 1)
+        )
+    return DownloadedImage(url=source_url)
+
+
+class MediaDownloadWorker:
+    """户型图下载工作池.
+
+    ``drain()`` 循环领取到期任务并以线程池并发下载，直到无到期任务为止。
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int | None = None,
+        per_host: int | None = None,
+        max_attempts: int | None = None,
+        backoff_seconds: float | None = None,
+    ) -> None:
+        """初始化工作池，未指定的参数取 settings 配置."""
+        self.concurrency = max(1, concurrency or settings.media_download_concurrency)
+        self.per_host = max(1, per_host or settings.media_download_per_host)
+        self.max_attempts = max(1, max_attempts or settings.media_download_max_attempts)
+        self.backoff_seconds = backoff_seconds or settings.media_download_backoff_seconds
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+
+    def drain(self) -> int:
+        """处理全部到期任务，返回本次处理的任务数."""
+        processed = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="MediaDownload") as pool:
+            while True:
+                jobs = self._claim_jobs(self.concurrency * 4)
+                if not jobs:
+                    break
+                self._dispatch(pool, jobs)
+                processed += len(jobs)
+        return processed
+
+    def _dispatch(self, pool: ThreadPoolExecutor, jobs: list[tuple[int, str]]) -> None:
+        """按主机并发额度派发一批任务，全部完成后返回.
+
+        只有取得主机额度的任务才提交到线程池（任务结束时释放额度），
+        其余任务留在队列中，待任一任务完成后重试派发。
+        """
+        waiting = deque(jobs)
+        running: set[Future[None]] = set()
+        while waiting or running:
+            for _ in range(len(waiting)):
+                job_id, source_url = waiting.popleft()
+                slot = self._host_slot(source_url)
+                if slot.acquire(blocking=False):
+                    running.add(pool.submit(self._run_job_in_slot, slot, job_id, source_url))
+                else:
+                    waiting.append((job_id, source_url))
+            if running:
+                _done, running = wait(running, return_when=FIRST_COMPLETED)
+
+    def seconds_until_next_due(self) -> float | None:
+        """返回距最早一条待重试任务到期的秒数，无待处理任务返回 None."""
+        with SessionLocal() as db:
+            next_due = db.scalar(
+                select(func.min(MediaDownloadJob.next_attempt_at)).where(
+                    MediaDownloadJob.status == MediaDownloadStatus.PENDING
+                )
+            )
+        if next_due is None:
+            return None
+        return max(0.0, (next_due - datetime.now(timezone.utc)).total_seconds())
+
+    def _claim_jobs(self, limit: int) -> list[tuple[int, str]]:
+        """领取到期任务并标记为 processing（SKIP LOCKED，多进程安全）."""
+        now = datetime.now(timezone.utc)
+        due = (
+            select(MediaDownloadJob.id)
+            .where(
+                or_(
+                    and_(
+                        MediaDownloadJob.status == MediaDownloadStatus.PENDING,
+                        MediaDownloadJob.next_attempt_at <= now,
+                    ),
+                    and_(
+                        MediaDownloadJob.status == MediaDownloadStatus.PROCESSING,
+                        MediaDownloadJob.locked_at < now - timedelta(seconds=_STALE_LOCK_SECONDS),
+                    ),
+                )
+            )
+            .order_by(MediaDownloadJob.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        with SessionLocal() as db:
+            rows = db.execute(
+                update(MediaDownloadJob)
+                .where(MediaDownloadJob.id.in_(due.scalar_subquery()))
+                .values(
+                    status=MediaDownloadStatus.PROCESSING,
+                    locked_at=now,
+                    attempts=MediaDownloadJob.attempts + 1,
+                    updated_at=now,
+                )
+                .returning(MediaDownloadJob.id, MediaDownloadJob.source_url)
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.commit()
+        return [(row.id, row.source_url) for row in rows]
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """返回 URL 所属主机的并发信号量."""
+        host = urlparse(url).hostname or ""
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host)
+                self._host_slots[host] = slot
+            return slot
+
+    def _run_job_in_slot(self, slot: threading.BoundedSemaphore, job_id: int, source_url: str) -> None:
+        """执行已取得主机额度的任务，结束后释放额度（在任务内释放，先于 Future 完成）."""
+        try:
+            self._run_job(job_id, source_url)
+        finally:
+            slot.release()
+
+    def _run_job(self, job_id: int, source_url: str) -> None:
+        """下载单个任务并落库结果，异常只记录日志."""
+        try:
+            store = get_media_store()
+            # 入队后其他任务可能已下载同一外站 URL：先查 URL 索引，未命中才下载
+            with SessionLocal() as db:
+                downloaded = store.lookup(db, source_url)
+                db.commit()
+            if downloaded is None:
+                downloaded = store.fetch(source_url)
+            with SessionLocal() as db:
+                job = db.get(MediaDownloadJob, job_id)
+                if job is None or job.status != MediaDownloadStatus.PROCESSING:
+                    return
+                if downloaded is None:
+                    self._mark_failed(job, db)
+                else:
+                    self._mark_done(job, downloaded.url, downloaded.thumbnail_url, db)
+                db.commit()
+        except Exception:
+            logger.exception("处理户型图下载任务失败: job_id=%s", job_id)
+
+    def _mark_done(self, job: MediaDownloadJob, stored_url: str, thumbnail_url: str | None, db: Session) -> None:
+        """回写下载结果到 property_media / community_images 并更新任务计数."""
+        now = datetime.now(timezone.utc)
+        db.execute(
+            update(PropertyMedia)
+            .where(
+                PropertyMedia.data_source == job.data_source,
+                PropertyMedia.source_property_id == job.source_property_id,
+                PropertyMedia.url == job.source_url,
+            )
+            .values(url=stored_url, thumbnail_url=thumbnail_url)
+            .execution_options(synchronize_session=False)
+        )
+        if job.community_id:
+            db.execute(
+                update(CommunityImage)
+                .where(
+                    CommunityImage.community_id == job.community_id,
+                    CommunityImage.source_property_id == job.source_property_id,
+                    CommunityImage.url == job.source_url,
+                    CommunityImage.is_deleted.is_(False),
+                )
+                .values(url=stored_url, thumbnail_url=thumbnail_url, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        job.status = MediaDownloadStatus.DONE
+        job.stored_url = stored_url
+        job.thumbnail_url = thumbnail_url
+        job.locked_at = None
+        job.last_error = None
+        self._bump_task_counter(job.import_task_id, PropertyImportTask.media_downloaded, db)
+
+    def _mark_failed(self, job: MediaDownloadJob, db: Session) -> None:
+        """记录失败：未超限时按指数退避重排，超限标记 failed（保留外站 URL）."""
+        job.locked_at = None
+        job.last_error = "下载失败（网络错误、非图片内容或超出大小限制）"
+        if job.attempts >= self.max_attempts:
+            job.status = MediaDownloadStatus.FAILED
+            self._bump_task_counter(job.import_task_id, PropertyImportTask.media_failed, db)
+            logger.warning("户型图下载重试耗尽: %s (%s 次)", job.source_url, job.attempts)
+            return
+        delay = self.backoff_seconds * (2 ** (job.attempts - 1))
+        job.status = MediaDownloadStatus.PENDING
+        job.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+    @staticmethod
+    def _bump_task_counter(task_id: str | None, column: InstrumentedAttribute[int], db: Session) -> None:
+        """原子自增导入任务的媒体计数列."""
+        if not task_id:
+            return
+        db.execute(update(PropertyImportTask).where(PropertyImportTask.id == task_id).values({column: column + 1}))
+
+
+_worker: MediaDownloadWorker | None = None
+
+
+def get_media_download_worker() -> MediaDownloadWorker:
+    """获取下载工作池实例（单例）."""
+    global _worker
+    if _worker is None:
+        _worker = MediaDownloadWorker()
+    return _worker
+
+
+def _drain_until_idle() -> None:
+    """持续处理任务直到没有待处理任务（含等待退避中的任务）."""
+    worker = get_media_download_worker()
+    while True:
+        try:
+            while True:
+                _wakeup.clear()
+                worker.drain()
+                wait_seconds = worker.seconds_until_next_due()
+                if wait_seconds is None and not _wakeup.is_set():
+                    break
+                # 有新入队任务时立即再领取，否则等待最早的退避任务到期
+                _wakeup.wait(min(max(wait_seconds or 0.0, 1.0), _MAX_IDLE_WAIT_SECONDS))
+        except Exception:
+            logger.exception("户型图下载工作池异常退出")
+        finally:
+            _drain_lock.release()
+        # 释放锁与最后一次检查之间有新任务触发时，由本线程继续处理
+        if not _wakeup.is_set() or not _drain_lock.acquire(blocking=False):
+            return
+
+
+def start_media_downloads() -> None:
+    """在后台线程启动下载工作池（已在运行时仅唤醒）.
+
+    导入任务完成、JSON 推送提交后以及应用启动时调用。
+    """
+    _wakeup.set()
+    if not _drain_lock.acquire(blocking=False):
+        return
+    thread = threading.Thread(target=_drain_until_idle, name="MediaDownloadDrain", daemon=True)
+    thread.start()
@@ -0,0 +1,242 @@
+"""内容寻址户型图存储.
+
+外站户型图下载后按内容 SHA-256 寻址保存（``properties/{hash}{ext}`` + ``thumbs/{hash}.webp``），
+取代每次下载生成新 uuid 存储键的方式：
+
+- 外站 URL 索引（``media_source_urls``）：下载前先查询，已下载过的外站 URL
+  （任意房源、任意次重新导入）直接复用存储对象，不发起网络请求
+- 内容去重（``media_objects``）：不同外站 URL / 不同房源的相同图片共享一个存储对象与一张缩略图，
+  同一图片的存储 URL 稳定不变，``community_images`` 按 URL 去重即可保持一房一图
+- 垃圾回收：``collect_garbage`` 删除不再被 ``property_media`` / ``community_images`` /
+  营销媒体引用的存储对象（最近 ``settings.media_gc_grace_hours`` 内使用过的对象保留，
+  避免与正在回写 URL 的下载任务竞争）
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from db import SessionLocal
+from models import (
+    CommunityImage,
+    L4MarketingMedia,
+    L4MarketingProject,
+    MediaDownloadJob,
+    MediaObject,
+    MediaSourceUrl,
+    PropertyMedia,
+)
+from settings import settings
+from utils.image_download import DownloadedImage, fetch_external_image, store_image_bytes
+from utils.storage import get_storage_backend
+
+logger = logging.getLogger(__name__)
+
+# 内容寻址存储键前缀（外站图片子目录，与其他上传文件隔离）
+_KEY_PREFIX = "properties"
+
+# 垃圾回收每批扫描的对象数
+_GC_BATCH_SIZE = 500
+
+
+def _sha256(value: bytes) -> str:
+    return hashlib.sha256(value).hexdigest()
+
+
+@dataclass
+class MediaGcResult:
+    """垃圾回收结果."""
+
+    scanned: int = 0
+    deleted: int = 0
+    freed_bytes: int = 0
+
+
+class MediaStore:
+    """内容寻址户型图存储."""
+
+    def lookup(self, db: Session, source_url: str) -> DownloadedImage | None:
+        """按外站 URL 查询已存储的对象（不发起网络请求），命中时刷新其使用时间.
+
+        调用方负责事务提交。
+        """
+        row = db.execute(
+            select(MediaObject.id, MediaObject.url, MediaObject.thumbnail_url)
+            .join(MediaSourceUrl, MediaSourceUrl.media_object_id == MediaObject.id)
+            .where(MediaSourceUrl.url_hash == _sha256(source_url.encode()))
+        ).first()
+        if row is None:
+            return None
+        self._touch(db, row.id)
+        return DownloadedImage(url=row.url, thumbnail_url=row.thumbnail_url)
+
+    def fetch(self, source_url: str) -> DownloadedImage | None:
+        """下载外站图片并按内容寻址保存，登记 URL 索引.
+
+        内容已存在时不重复上传，直接复用已有对象。下载或上传失败返回 None。
+        """
+        fetched = fetch_external_image(source_url)
+        if fetched is None:
+            return None
+        content_hash = _sha256(fetched.content)
+
+        with SessionLocal() as db:
+            media = db.scalar(select(MediaObject).where(MediaObject.content_hash == content_hash))
+            if media is None:
+                key = f"{_KEY_PREFIX}/{content_hash}{fetched.extension}"
+                try:
+                    # 存储键由内容决定：并发下载同一内容时重复上传只会覆盖为相同文件
+                    stored = store_image_bytes(fetched.content, key, with_thumbnail=True)
+                except Exception:
+                    logger.warning("保存外站图片失败: %s", source_url, exc_info=True)
+                    return None
+                media = self._save_object(
+                    db,
+                    MediaObject(
+                        content_hash=content_hash,
+                        storage_key=key,
+                        url=stored.url,
+                        thumbnail_key=f"thumbs/{content_hash}.webp" if stored.thumbnail_url else None,
+                        thumbnail_url=stored.thumbnail_url,
+                        size_bytes=len(fetched.content),
+                    ),
+                )
+                logger.info("下载外站图片成功: %s -> %s", source_url, media.url)
+            else:
+                self._touch(db, media.id)
+                logger.info("外站图片内容已存在，复用存储对象: %s -> %s", source_url, media.url)
+
+            self._index_source(db, source_url, media.id)
+            return DownloadedImage(url=media.url, thumbnail_url=media.thumbnail_url)
+
+    def collect_garbage(self, *, dry_run: bool = False) -> MediaGcResult:
+        """删除不再被任何业务表引用的存储对象（含缩略图）及其 URL 索引.
+
+        引用来源：``property_media.url``、未删除的 ``community_images.url``、
+        未删除的 ``l4_marketing_media.file_url`` 与 ``l4_marketing_projects.images``。
+        指向被回收对象的已完成下载任务一并删除（重新导入时重新下载）。
+
+        Args:
+            dry_run: 仅统计不删除
+
+        Returns:
+            MediaGcResult: 扫描数、回收数与释放的字节数
+
+        """
+        result = MediaGcResult()
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.media_gc_grace_hours)
+        referenced = (
+            exists().where(PropertyMedia.url == MediaObject.url),
+            exists().where(CommunityImage.url == MediaObject.url, CommunityImage.is_deleted.is_(False)),
+            exists().where(L4MarketingMedia.file_url == MediaObject.url, L4MarketingMedia.is_deleted.is_(False)),
+        )
+        storage = get_storage_backend()
+        last_id = 0
+        with SessionLocal() as db:
+            marketing_urls = self._marketing_project_urls(db)
+            while True:
+                batch = db.execute(
+                    select(
+                        MediaObject.id,
+                        MediaObject.url,
+                        MediaObject.storage_key,
+                        MediaObject.thumbnail_key,
+                        MediaObject.size_bytes,
+                    )
+                    .where(MediaObject.id > last_id, MediaObject.last_used_at < cutoff, *(~ref for ref in referenced))
+                    .order_by(MediaObject.id)
+                    .limit(_GC_BATCH_SIZE)
+                ).all()
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                garbage = [row for row in batch if row.url not in marketing_urls]
+                result.scanned += len(batch)
+                result.deleted += len(garbage)
+                result.freed_bytes += sum(row.size_bytes for row in garbage)
+                if dry_run or not garbage:
+                    continue
+
+                ids = [row.id for row in garbage]
+                db.execute(delete(MediaSourceUrl).where(MediaSourceUrl.media_object_id.in_(ids)))
+                db.execute(
+                    delete(MediaDownloadJob).where(MediaDownloadJob.stored_url.in_([row.url for row in garbage]))
+                )
+                db.execute(delete(MediaObject).where(MediaObject.id.in_(ids)))
+                db.commit()
+
+                # 数据库记录先提交再删文件：删除失败只留下存储孤儿文件，不会留下指向已删文件的记录
+                for row in garbage:
+                    for key in (row.storage_key, row.thumbnail_key):
+                        if key and not storage.delete_file(key):
+                            logger.warning("删除媒体存储文件失败: %s", key)
+
+        logger.info(
+            "媒体垃圾回收%s: 扫描 %s 个未引用对象，回收 %s 个（%s bytes）",
+            "（试运行）" if dry_run else "",
+            result.scanned,
+            result.deleted,
+            result.freed_bytes,
+        )
+        return result
+
+    @staticmethod
+    def _marketing_project_urls(db: Session) -> set[str]:
+        """营销项目图片列表（JSON 数组）中引用的全部 URL."""
+        urls: set[str] = set()
+        for images in db.scalars(select(L4MarketingProject.images)):
+            for item in images or []:
+                if isinstance(item, str):
+                    urls.add(item)
+                elif isinstance(item, dict):
+                    urls.update(value for key in ("url", "thumbnail_url") if isinstance(value := item.get(key), str))
+        return urls
+
+    @staticmethod
+    def _touch(db: Session, media_object_id: int) -> None:
+        db.execute(
+            update(MediaObject)
+            .where(MediaObject.id == media_object_id)
+            .values(last_used_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _save_object(db: Session, media: MediaObject) -> MediaObject:
+        """写入存储对象；并发写入相同内容时返回先写入的记录."""
+        db.add(media)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return db.scalars(select(MediaObject).where(MediaObject.content_hash == media.content_hash)).one()
+        return media
+
+    @staticmethod
+    def _index_source(db: Session, source_url: str, media_object_id: int) -> None:
+        """登记外站 URL → 存储对象索引（已登记时忽略）."""
+        db.add(
+            MediaSourceUrl(
+                url_hash=_sha256(source_url.encode()), source_url=source_url, media_object_id=media_object_id
+            )
+        )
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+
+
+_media_store: MediaStore | None = None
+
+
+def get_media_store() -> MediaStore:
+    """获取内容寻址户型图存储实例（单例）."""
+    global _media_store
+    if _media_store is None:
+        _media_store = MediaStore()
+    return _media_store
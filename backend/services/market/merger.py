@@ -10,6 +10,9 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from models.property import Community, CommunityAlias, PropertyCurrent
+from services.market.community_index import invalidate_community_index
+from services.market.stats_rollup import mark_market_rollups_stale
+from services.reports.cache_tags import mark_reports_stale
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +55,8 @@ class CommunityMerger:
             self._refresh_primary_stats(primary_community, db)
 
             db.commit()
+            # 被合并小区已停用、名称转为主小区别名：导入解析索引需重建
+            invalidate_community_index()
 
             success_msg = (
                 f"成功合并 {len(merge_ids)} 个小区到 '{primary_community.name}'，共迁移 {affected_count} 套房源"
@@ -196,6 +201,9 @@ class CommunityMerger:
             {PropertyCurrent.community_id: primary_id},
             synchronize_session=False,
         )
+        # bulk update 不经过 ORM flush，显式登记主小区与被合并小区的汇总行重算与报表缓存失效
+        mark_market_rollups_stale(db, [primary_id, *merge_ids])
+        mark_reports_stale(db, [primary_id, *merge_ids])
 
     def _archive_communities(self, communities: list[Community]) -> None:
         """软删除被合并的小区."""
@@ -0,0 +1,122 @@
+"""房源导出行格式.
+
+同步导出接口（流式 CSV）与后台导出任务共用：格式与批量上传模板保持一致，
+参考 PropertyIngestionModel 的字段别名。
+"""
+
+from datetime import datetime
+
+from models import Community, PropertyCurrent
+from models.common.base import MediaType
+
+PROPERTY_EXPORT_HEADERS = [
+    "数据源",
+    "房源ID",
+    "状态",
+    "小区名",
+    "室",
+    "厅",
+    "卫",
+    "朝向",
+    "楼层",
+    "面积",
+    "套内面积",
+    "挂牌价",
+    "上架时间",
+    "成交价",
+    "成交时间",
+    "物业类型",
+    "建筑年代",
+    "建筑结构",
+    "装修情况",
+    "电梯",
+    "产权性质",
+    "产权年限",
+    "上次交易",
+    "供暖方式",
+    "房源描述",
+    "图片链接",
+    "城市ID",
+    "行政区",
+    "商圈",
+]
+
+# 导出图片链接包含的媒体类型
+_IMAGE_TYPES = {
+    MediaType.INTERIOR.value,
+    MediaType.EXTERIOR.value,
+    MediaType.FLOOR_PLAN.value,
+    MediaType.OTHER.value,
+}
+
+
+def property_export_row(prop: PropertyCurrent, community: Community) -> list[object]:
+    """房源导出行（与 PROPERTY_EXPORT_HEADERS 一一对应）."""
+    orientation = prop.orientation if prop.orientation and str(prop.orientation).strip() else "未知"
+    return [
+        prop.data_source,
+        prop.source_property_id,
+        prop.status.value if hasattr(prop.status, "value") else prop.status,
+        community.name if community else (prop.community_name if hasattr(prop, "community_name") else ""),
+        prop.rooms,
+        prop.halls or 0,
+        prop.baths or 0,
+        orientation,
+        prop.floor_original,
+        prop.build_area,
+        prop.inner_area or "",
+        prop.listed_price_wan or "",
+        _format_datetime(prop.listed_date),
+        prop.sold_price_wan or "",
+        _format_datetime(prop.sold_date),
+        prop.property_type or "",
+        prop.build_year or "",
+        prop.building_structure or "",
+        prop.decoration or "",
+        _format_bool(prop.elevator),
+        prop.ownership_type or "",
+        prop.ownership_years or "",
+        prop.last_transaction or "",
+        prop.heating_method or "",
+        prop.listing_remarks or "",
+        _get_image_urls(prop),
+        community.city_id if community and hasattr(community, "city_id") else "",
+        community.district if community and hasattr(community, "district") else "",
+        community.business_circle if community and hasattr(community, "business_circle") else "",
+    ]
+
+
+def _format_datetime(value: object) -> str:
+    """格式化日期时间为字符串."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+def _format_bool(value: object) -> str:
+    """格式化布尔值为大写英文字符串."""
+    if value is True:
+        return "TRUE"
+    if value is False:
+        return "FALSE"
+    return ""
+
+
+def _get_image_urls(prop: PropertyCurrent) -> str:
+    """从 property_media 关系中获取图片URL列表."""
+    if not hasattr(prop, "property_media") or not prop.property_media:
+        return ""
+
+    urls = []
+    for media in prop.property_media:
+        if hasattr(media, "media_type"):
+            media_type_value = media.media_type.value
+            if media_type_value in _IMAGE_TYPES and media.url:
+                urls.append(media.url)
+
+    return ",".join(urls) if urls else ""
+
+
+__all__ = ["PROPERTY_EXPORT_HEADERS", "property_export_row"]
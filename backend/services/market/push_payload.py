@@ -0,0 +1,78 @@
+"""JSON 推送异步任务数据.
+
+推送接口的异步模式把请求体原样保存为 JSON 数组文件（见 ``ImportTaskService.create_push_task``），
+导入工作进程通过 ``JSONRowStream`` 按与 CSV 相同的批次接口读取，逐条校验一次后导入；
+失败记录转换为与同步推送 ``PushResult.errors`` 相同的格式供状态接口返回。
+"""
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+
+class JSONRowStream:
+    """JSON 推送数据读取器（与 ``CSVRowStream`` 的批次接口一致）.
+
+    推送数据量受接口上限约束，整体读入内存；进度按已产出记录数计算。
+    """
+
+    def __init__(self, path: Path) -> None:
+        """读取 JSON 数组文件.
+
+        Raises:
+            TypeError: 文件内容不是 JSON 数组时
+
+        """
+        with path.open(encoding="utf-8") as f:
+            records = json.load(f)
+        if not isinstance(records, list):
+            msg = "推送数据不是 JSON 数组"
+            raise TypeError(msg)
+        # 推送数据无表头（失败记录以 JSON 错误详情返回，不生成 CSV）
+        self.headers: list[str] = []
+        self._records: list[Any] = records
+        self._consumed = 0
+
+    @property
+    def total(self) -> int:
+        """记录总数."""
+        return len(self._records)
+
+    @property
+    def fraction_read(self) -> float:
+        """已读取比例（0-1）."""
+        if not self._records:
+            return 1.0
+        return self._consumed / len(self._records)
+
+    def iter_batches(self, batch_size: int, skip: int = 0) -> Iterator[list[dict[str, Any]]]:
+        """按固定大小分批产出记录（``skip`` 为续跑时跳过的已提交记录数）.
+
+        非对象元素按空字典产出，由校验环节记为失败，保持行号与原数组下标对应。
+        """
+        self._consumed = min(skip, len(self._records))
+        while self._consumed < len(self._records):
+            batch = self._records[self._consumed : self._consumed + batch_size]
+            self._consumed += len(batch)
+            yield [record if isinstance(record, dict) else {} for record in batch]
+
+
+def extract_source_id(raw_data: dict) -> str:
+    """推送记录的来源房源ID（中文/英文字段名均可，缺失时为 unknown）."""
+    return raw_data.get("房源ID", raw_data.get("source_property_id", "unknown"))
+
+
+def to_push_errors(failed_records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """将导入失败记录（1 起始行号）转换为推送结果错误详情（0 起始数组下标）."""
+    return [
+        {
+            "index": record["row_number"] - 1,
+            "source_property_id": extract_source_id(record["data"]),
+            "reason": record["error"],
+        }
+        for record in failed_records
+    ]
+
+
+__all__ = ["JSONRowStream", "extract_source_id", "to_push_errors"]
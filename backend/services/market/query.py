@@ -3,21 +3,35 @@
 处理房源数据的查询、筛选、排序逻辑.
 """
 
+import hashlib
+import json
 import logging
+from collections.abc import Iterator
+from typing import Any
 
+from redis.exceptions import RedisError
 from sqlalchemy import func
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Query, Session, selectinload
 
+from db import SessionLocal
 from models import Community, PropertyCurrent
-from schemas import PaginatedPropertyResponse, PropertyResponse
+from schemas import CursorPropertyResponse, PaginatedPropertyResponse, PropertyResponse
 from settings import settings
-from utils.query_params import PropertyExportParams
+from utils.query_params import PropertyExportParams, PropertyScrollParams
+from utils.redis_client import get_redis_client
 
 from .filters import apply_filters
+from .keyset import apply_keyset, encode_cursor
 from .sorting import apply_sorting
 
 logger = logging.getLogger(__name__)
 
+# 游标分页总数缓存 key 前缀
+_COUNT_CACHE_PREFIX = "properties:count:"
+
+# 导出时服务端游标每批取回的行数（图片按批 SELECT IN 预加载）
+_EXPORT_BATCH_SIZE = 1000
+
 
 class PropertyQueryService:
     """房源查询服务."""
@@ -139,24 +153,24 @@ class PropertyQueryService:
             items=items,
         )
 
-    def query_properties_for_export(
-        self,
-        db: Session,
-        params: PropertyExportParams,
-    ) -> list[tuple[PropertyCurrent, Community]]:
-        """查询房源数据用于导出（无分页限制）.
+    def scroll_properties(self, db: Session, params: PropertyScrollParams) -> CursorPropertyResponse:
+        """游标分页查询房源（每页代价与翻页深度无关）.
 
-        返回原始对象以便导出函数可以访问所有字段.
+        - 排序为 ``排序字段 + id``，下一页从上一页末行之后继续扫描，不使用 OFFSET
+        - 总数可选：``none`` 不统计；``estimated`` 取数据库执行计划估算行数；
+          ``cached`` 精确 COUNT 并按筛选条件缓存 ``settings.property_count_cache_seconds`` 秒
 
         Args:
             db: 数据库会话
-            params: PropertyExportParams 导出参数对象
+            params: 筛选、排序与游标分页参数
 
         Returns:
-            List[tuple[PropertyCurrent, Community]]: 房源和社区原始对象列表
+            CursorPropertyResponse: 本页房源与下一页游标
+
+        Raises:
+            ValidationError: 游标非法或与排序参数不一致
 
         """
-        # 构建基础查询
         query = (
             db.query(PropertyCurrent, Community)
             .join(
@@ -165,38 +179,129 @@ class PropertyQueryService:
             )
             .filter(PropertyCurrent.is_active.is_(True))
         )
-
-        # 关键优化：使用selectinload预加载图片
-        query = query.options(
-            selectinload(PropertyCurrent.property_media),
+        query = apply_filters(query, **params.filter_kwargs())
+
+        total: int | None = None
+        if params.total_mode == "cached":
+            total = self._cached_count(db, query, params)
+        elif params.total_mode == "estimated":
+            total = self._estimated_count(db, query)
+
+        sort_order = "asc" if params.sort_order == "asc" else "desc"
+        page_query, sort_by, sort_expression = apply_keyset(query, params.sort_by, sort_order, params.cursor)
+        # 多取一行判断是否还有下一页
+        rows = (
+            page_query.add_columns(sort_expression)
+            .options(selectinload(PropertyCurrent.property_media))
+            .limit(params.page_size + 1)
+            .all()
         )
-
-        # 应用筛选条件
-        query = apply_filters(
-            query,
-            status=params.status,
-            community_name=params.community_name,
-            community_ids=params.community_ids,
-            districts=params.districts,
-            business_circles=params.business_circles,
-            orientations=params.orientations,
-            floor_levels=params.floor_levels,
-            min_price=params.min_price,
-            max_price=params.max_price,
-            min_area=params.min_area,
-            max_area=params.max_area,
-            rooms=params.rooms,
-            rooms_gte=params.rooms_gte,
+        has_more = len(rows) > params.page_size
+        rows = rows[: params.page_size]
+
+        items = [
+            PropertyResponse.from_orm_with_calculations(property_obj, community, property_obj.property_media)
+            for property_obj, community, _sort_value in rows
+        ]
+        next_cursor = None
+        if has_more:
+            last_property, _, last_sort_value = rows[-1]
+            next_cursor = encode_cursor(sort_by, sort_order, last_sort_value, last_property.id)
+
+        return CursorPropertyResponse(
+            items=items,
+            page_size=params.page_size,
+            next_cursor=next_cursor,
+            total=total,
+            total_estimated=params.total_mode == "estimated",
         )
 
-        # 应用排序
-        query = apply_sorting(query, params.sort_by, params.sort_order)
+    @staticmethod
+    def _count(db: Session, query: Query) -> int:
+        count_query = query.statement.with_only_columns(func.count()).order_by(None)
+        return db.execute(count_query).scalar() or 0
+
+    def _cached_count(self, db: Session, query: Query, params: PropertyScrollParams) -> int:
+        """精确总数，按筛选条件缓存（翻页期间不重复 COUNT；Redis 不可用时直接统计）."""
+        filters: dict[str, Any] = params.filter_kwargs()
+        digest = hashlib.sha256(json.dumps(filters, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:32]
+        key = f"{_COUNT_CACHE_PREFIX}{digest}"
+        try:
+            redis_client = get_redis_client()
+            cached = redis_client.get(key)
+        except RedisError:
+            return self._count(db, query)
+        if cached is not None:
+            return int(cached)
+        total = self._count(db, query)
+        try:
+            redis_client.set(key, total, ex=settings.property_count_cache_seconds)
+        except RedisError:
+            logger.warning("房源总数缓存写入失败，跳过缓存")
+        return total
+
+    @staticmethod
+    def _estimated_count(db: Session, query: Query) -> int | None:
+        """数据库执行计划估算的行数（仅 PostgreSQL，不执行查询）."""
+        bind = db.get_bind()
+        if bind.dialect.name != "postgresql":
+            return None
+        compiled = query.statement.compile(dialect=bind.dialect, compile_kwargs={"render_postcompile": True})
+        plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def stream_properties_for_export(
+        self,
+        params: PropertyExportParams,
+    ) -> Iterator[tuple[PropertyCurrent, Community]]:
+        """逐行产出待导出的房源（无分页限制，内存占用与总行数无关）.
+
+        使用独立会话（流式响应在路由返回后才迭代，请求会话此时可能已关闭）；
+        ``yield_per`` 走服务端游标分批取回，每批的图片由 selectinload 一次预加载。
+        迭代结束或客户端断开（生成器关闭）时释放会话与游标。
+
+        Args:
+            params: PropertyExportParams 导出参数对象
+
+        Yields:
+            tuple[PropertyCurrent, Community]: 房源和社区原始对象
+
+        """
+        with SessionLocal() as db:
+            query = (
+                db.query(PropertyCurrent, Community)
+                .join(
+                    Community,
+                    PropertyCurrent.community_id == Community.id,
+                )
+                .filter(PropertyCurrent.is_active.is_(True))
+                .options(selectinload(PropertyCurrent.property_media))
+            )
+
+            # 应用筛选条件
+            query = apply_filters(
+                query,
+                status=params.status,
+                community_name=params.community_name,
+                community_ids=params.community_ids,
+                districts=params.districts,
+                business_circles=params.business_circles,
+                orientations=params.orientations,
+                floor_levels=params.floor_levels,
+                min_price=params.min_price,
+                max_price=params.max_price,
+                min_area=params.min_area,
+                max_area=params.max_area,
+                rooms=params.rooms,
+                rooms_gte=params.rooms_gte,
+            )
 
-        # 执行查询（无分页限制）
-        results: list[tuple[PropertyCurrent, Community]] = query.all()
+            # 应用排序
+            query = apply_sorting(query, params.sort_by, params.sort_order)
 
-        logger.info("导出查询完成: 总数=%s", len(results))
-        return results
+            yield from query.yield_per(_EXPORT_BATCH_SIZE)
 
 
 # 依赖注入工厂函数
@@ -5,21 +5,20 @@
 
 from sqlalchemy import asc, case, desc, func
 from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement
 
 from models import PropertyCurrent, PropertyStatus
 from utils.query_params import validate_sort_field
 
 
-def apply_sorting(query: Query, sort_by: str, sort_order: str) -> Query:
-    """应用排序到查询对象.
+def resolve_sort_expression(sort_by: str) -> tuple[str, ColumnElement]:
+    """解析排序字段为排序表达式.
 
     Args:
-        query: SQLAlchemy 查询对象
-        sort_by: 排序字段
-        sort_order: 排序方向
+        sort_by: 排序字段（非白名单字段回退到 updated_at）
 
     Returns:
-        Query: 应用排序后的查询对象
+        tuple[str, ColumnElement]: (校验后的排序字段, 排序表达式)
 
     """
     # 映射排序字段
@@ -53,7 +52,22 @@ def apply_sorting(query: Query, sort_by: str, sort_order: str) -> Query:
 
     # 获取排序字段（白名单验证，非白名单字段回退到默认）
     validated_sort_by = validate_sort_field(sort_by, sort_field_map.keys(), "updated_at")
-    sort_field = sort_field_map[validated_sort_by]
+    return validated_sort_by, sort_field_map[validated_sort_by]
+
+
+def apply_sorting(query: Query, sort_by: str, sort_order: str) -> Query:
+    """应用排序到查询对象.
+
+    Args:
+        query: SQLAlchemy 查询对象
+        sort_by: 排序字段
+        sort_order: 排序方向
+
+    Returns:
+        Query: 应用排序后的查询对象
+
+    """
+    _, sort_field = resolve_sort_expression(sort_by)
 
     # 应用排序方向
     return query.order_by(asc(sort_field)) if sort_order == "asc" else query.order_by(desc(sort_field))
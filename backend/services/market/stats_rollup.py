@@ -0,0 +1,196 @@
+"""报表市场统计汇总表维护.
+
+``market_stats_rollups`` 按小区整片维护：房源写入后，在同一事务提交前删除受影响小区的
+汇总行并从 ``property_current`` 重新聚合写入，汇总表与明细表同事务可见，不存在中间态。
+
+受影响小区的收集方式：
+- ORM 写入（逐行导入、房源编辑）：``before_flush`` 自动收集新增/变更/删除房源的小区ID，
+  小区ID 被修改时同时收集原小区
+- 集合式语句写入（批量 upsert、小区合并的 bulk update）：调用方显式调用
+  ``mark_market_rollups_stale``
+
+汇总粒度：小区 × 数据源 × 状态 × 户型 × 楼层 × 成交日（UTC）。报表时间窗口以数据最新成交日
+（UTC）的当天结束为基准按整天回溯（见 ``get_range_bounds``），趋势再按 UTC 周/月截断，
+成交日粒度足以精确命中所有窗口，同一小区同日同户型的成交合并为一行。
+
+并发：重算前按小区获取事务级 advisory lock（按锁键排序获取，避免死锁），只有写入同一小区的
+导入工作进程互相等待；后提交的事务重算时能看到先提交事务的明细，不会出现重复汇总行。
+全量重建以表锁与增量重算互斥。
+"""
+
+import logging
+import zlib
+from collections.abc import Iterable
+from itertools import chain
+
+from sqlalchemy import Integer, Select, bindparam, delete, event, func, insert, inspect, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session, SessionTransaction, UOWTransaction
+from sqlalchemy.sql.elements import ColumnElement
+
+from models import MarketStatsRollup, PropertyCurrent
+from services.reports.stats_source import unit_price_expr, utc_date_trunc, valid_area_expr
+
+logger = logging.getLogger(__name__)
+
+# Session.info 中待重算小区ID集合的 key
+_PENDING_KEY = "market_rollup_pending"
+
+# 汇总表重算的事务级 advisory lock 命名空间（双参数形式的第一个 key，与迁移锁区分）
+_ROLLUP_ADVISORY_LOCK_CLASS = 20261017
+
+# 单条 DELETE / INSERT ... SELECT 处理的小区数上限（控制 IN 列表长度）
+_REFRESH_CHUNK_SIZE = 1000
+
+# 汇总行写入列（顺序与 _rollup_select 一致）
+_ROLLUP_COLUMNS = (
+    "community_id",
+    "data_source",
+    "status",
+    "rooms",
+    "halls",
+    "floor_level",
+    "sold_date",
+    "listing_count",
+    "price_count",
+    "price_sum",
+    "unit_price_count",
+    "unit_price_sum",
+    "area_sum",
+    "valid_area_count",
+    "valid_area_sum",
+)
+
+
+def _rollup_sold_day(sold_date: ColumnElement) -> ColumnElement:
+    """汇总粒度的成交日（成交时间按 UTC 截断到天，不受数据库会话时区影响）."""
+    return utc_date_trunc("day", sold_date)
+
+
+def _rollup_select(*conditions: ColumnElement) -> Select:
+    """从 property_current 聚合汇总行（单价/有效面积口径与报表聚合一致）."""
+    unit_price = unit_price_expr()
+    valid_area = valid_area_expr()
+    dimensions = (
+        PropertyCurrent.community_id,
+        PropertyCurrent.data_source,
+        PropertyCurrent.status,
+        PropertyCurrent.rooms,
+        PropertyCurrent.halls,
+        PropertyCurrent.floor_level,
+        _rollup_sold_day(PropertyCurrent.sold_date),
+    )
+    return (
+        select(
+            *dimensions,
+            func.count(),
+            func.count(PropertyCurrent.sold_price_wan),
+            func.coalesce(func.sum(PropertyCurrent.sold_price_wan), 0),
+            func.count(unit_price),
+            func.coalesce(func.sum(unit_price), 0),
+            func.coalesce(func.sum(PropertyCurrent.build_area), 0),
+            func.count(valid_area),
+            func.coalesce(func.sum(valid_area), 0),
+        )
+        .where(PropertyCurrent.is_active.is_(True), *conditions)
+        .group_by(*dimensions)
+    )
+
+
+def _community_lock_key(community_id: str) -> int:
+    """小区ID 映射为 advisory lock 的 int4 key（跨进程稳定）."""
+    return zlib.crc32(community_id.encode()) - (1 << 31)
+
+
+def _lock_communities(db: Session, community_ids: list[str]) -> None:
+    """按 key 升序获取小区重算锁（事务结束自动释放，仅 PostgreSQL）.
+
+    所有事务按同一顺序加锁，不会互相死锁；key 冲突的小区共用一把锁，只影响并发度。
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    keys = sorted({_community_lock_key(cid) for cid in community_ids})
+    lock_key = func.unnest(bindparam("keys", keys, type_=ARRAY(Integer))).column_valued("lock_key")
+    db.execute(select(func.count(func.pg_advisory_xact_lock(_ROLLUP_ADVISORY_LOCK_CLASS, lock_key))))
+
+
+def _lock_rollup_table(db: Session) -> None:
+    """锁定汇总表，与增量重算互斥（全量重建使用，仅 PostgreSQL）."""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"LOCK TABLE {MarketStatsRollup.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+
+
+def refresh_market_rollups(db: Session, community_ids: Iterable[str]) -> None:
+    """重算指定小区的汇总行（在调用方事务内执行，随事务提交生效）.
+
+    Args:
+        db: 数据库会话
+        community_ids: 需要重算的小区ID
+
+    """
+    ids = sorted({cid for cid in community_ids if cid})
+    if not ids:
+        return
+    _lock_communities(db, ids)
+    for start in range(0, len(ids), _REFRESH_CHUNK_SIZE):
+        chunk = ids[start : start + _REFRESH_CHUNK_SIZE]
+        db.execute(
+            delete(MarketStatsRollup)
+            .where(MarketStatsRollup.community_id.in_(chunk))
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            insert(MarketStatsRollup).from_select(
+                _ROLLUP_COLUMNS,
+                _rollup_select(PropertyCurrent.community_id.in_(chunk)),
+            )
+        )
+    logger.debug("汇总表已重算: %s 个小区", len(ids))
+
+
+def rebuild_market_rollups(db: Session) -> int:
+    """全量重建汇总表（初始化、粒度调整或数据修复时使用），返回汇总行数. 调用方负责提交."""
+    _lock_rollup_table(db)
+    db.execute(delete(MarketStatsRollup).execution_options(synchronize_session=False))
+    db.execute(insert(MarketStatsRollup).from_select(_ROLLUP_COLUMNS, _rollup_select()))
+    db.info.pop(_PENDING_KEY, None)
+    count = db.scalar(select(func.count()).select_from(MarketStatsRollup)) or 0
+    logger.info("汇总表已全量重建: %s 行", count)
+    return count
+
+
+def mark_market_rollups_stale(db: Session, community_ids: Iterable[str | None]) -> None:
+    """登记需要在本事务提交前重算的小区（集合式语句写入房源后调用）."""
+    db.info.setdefault(_PENDING_KEY, set()).update(cid for cid in community_ids if cid)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_communities(session: Session, _flush_context: UOWTransaction, _instances: object) -> None:
+    changed: set[str] = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, PropertyCurrent):
+            continue
+        changed.add(obj.community_id)
+        # 小区ID 被修改时原小区也需要重算
+        changed.update(inspect(obj).attrs.community_id.history.deleted or ())
+    if changed:
+        mark_market_rollups_stale(session, changed)
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_pending_rollups(session: Session) -> None:
+    # 保存点提交不处理，外层事务提交前统一重算
+    if session.in_nested_transaction():
+        return
+    # 先 flush，收集尚未写出的 ORM 变更
+    session.flush()
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        refresh_market_rollups(session, pending)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_pending_rollups(session: Session, transaction: SessionTransaction) -> None:
+    # 外层事务回滚/关闭时丢弃未重算的登记（回滚后明细未变化，无需重算）
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
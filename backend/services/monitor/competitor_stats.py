@@ -0,0 +1,145 @@
+"""多小区分渠道挂牌/成交统计（竞品列表与周边竞品雷达共用）.
+
+任意一组小区的在售与近一年成交统计由一次分组查询得出：按 (community_id, 渠道) 分组，
+FILTER 区分挂牌/成交，渠道由 SQL CASE 对 data_source 归类，不再逐行在 Python 层做子串匹配。
+每组返回套数与单价合计/有效单价套数，汇总后得到每个小区的总量、分渠道套数与均价。
+
+结果通过 ``cached_report`` 缓存，依赖所有涉及小区的 ``community:{id}`` 标签。
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Float, case, func, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from models import PropertyCurrent, PropertyStatus
+from services.reports.cache import cached_report
+from services.reports.cache_tags import community_scope
+
+# 渠道标识
+CHANNEL_BEIKE = "beike"
+CHANNEL_I5I5J = "i5i5j"
+
+# 数据源匹配模式：data_source 为自由文本，使用子串匹配区分渠道（按顺序匹配，先命中者优先）
+# （贝壳与链家同属贝壳系，故合并为 BEIKE 渠道）
+_CHANNEL_PATTERNS = (
+    (CHANNEL_BEIKE, ("beike", "贝壳", "链家")),
+    (CHANNEL_I5I5J, ("5i5j", "我爱")),
+)
+
+# 成交统计默认回看天数
+_DEAL_LOOKBACK_DAYS = 365
+
+
+def channel_expr() -> ColumnElement:
+    """渠道归类表达式：lower(data_source) 命中模式返回渠道标识，无法识别返回空串."""
+    source = func.lower(func.coalesce(PropertyCurrent.data_source, ""))
+    return case(
+        *(
+            (or_(*(source.contains(pattern, autoescape=True) for pattern in patterns)), channel)
+            for channel, patterns in _CHANNEL_PATTERNS
+        ),
+        else_="",
+    )
+
+
+@dataclass
+class ChannelStats:
+    """一个小区的挂牌或成交统计."""
+
+    count: int = 0
+    by_channel: dict[str, int] = field(default_factory=dict)
+    price_sum: float = 0.0
+    price_count: int = 0
+
+    @property
+    def avg_price(self) -> float:
+        """平均单价（元/㎡），无有效价格时为 0."""
+        return self.price_sum / self.price_count if self.price_count else 0.0
+
+    def channel_count(self, channel: str) -> int:
+        """指定渠道的套数."""
+        return self.by_channel.get(channel, 0)
+
+
+@dataclass
+class CommunityCompetitorStats:
+    """一个小区的在售（挂牌）与近期成交统计."""
+
+    listing: ChannelStats = field(default_factory=ChannelStats)
+    deal: ChannelStats = field(default_factory=ChannelStats)
+
+
+@cached_report(tags=community_scope)
+def get_competitor_stats(
+    db: Session,
+    community_ids: list[str],
+    deal_days: int = _DEAL_LOOKBACK_DAYS,
+) -> dict[str, CommunityCompetitorStats]:
+    """批量统计多个小区的分渠道挂牌/成交数据（仅 build_area > 0 的房源）.
+
+    Args:
+        db: 数据库会话
+        community_ids: 小区ID列表
+        deal_days: 成交统计回看天数
+
+    Returns:
+        dict[str, CommunityCompetitorStats]: 小区ID -> 统计（无房源的小区为全 0）
+
+    """
+    stats = {cid: CommunityCompetitorStats() for cid in community_ids}
+    if not community_ids:
+        return stats
+
+    deals_since = datetime.now(timezone.utc) - timedelta(days=deal_days)
+    is_listing = PropertyCurrent.status == PropertyStatus.FOR_SALE
+    is_deal = (PropertyCurrent.status == PropertyStatus.SOLD) & (PropertyCurrent.sold_date >= deals_since)
+    listed_unit_price = func.cast(PropertyCurrent.listed_price_wan, Float) / PropertyCurrent.build_area * 10000
+    sold_unit_price = func.cast(PropertyCurrent.sold_price_wan, Float) / PropertyCurrent.build_area * 10000
+    channel = channel_expr().label("channel")
+
+    rows = db.execute(
+        select(
+            PropertyCurrent.community_id,
+            channel,
+            func.count().filter(is_listing).label("listing_count"),
+            func.sum(listed_unit_price).filter(is_listing).label("listing_price_sum"),
+            func.count(listed_unit_price).filter(is_listing).label("listing_price_count"),
+            func.count().filter(is_deal).label("deal_count"),
+            func.sum(sold_unit_price).filter(is_deal).label("deal_price_sum"),
+            func.count(sold_unit_price).filter(is_deal).label("deal_price_count"),
+        )
+        .where(
+            PropertyCurrent.community_id.in_(community_ids),
+            PropertyCurrent.build_area > 0,
+            or_(is_listing, is_deal),
+        )
+        .group_by(PropertyCurrent.community_id, channel)
+    )
+
+    for row in rows:
+        community = stats[row.community_id]
+        for target, count, price_sum, price_count in (
+            (community.listing, row.listing_count, row.listing_price_sum, row.listing_price_count),
+            (community.deal, row.deal_count, row.deal_price_sum, row.deal_price_count),
+        ):
+            if not count:
+                continue
+            target.count += count
+            target.price_sum += float(price_sum or 0)
+            target.price_count += price_count
+            if row.channel:
+                target.by_channel[row.channel] = target.by_channel.get(row.channel, 0) + count
+    return stats
+
+
+__all__ = [
+    "CHANNEL_BEIKE",
+    "CHANNEL_I5I5J",
+    "ChannelStats",
+    "CommunityCompetitorStats",
+    "channel_expr",
+    "get_competitor_stats",
+]
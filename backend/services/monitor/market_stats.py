@@ -0,0 +1,237 @@
+"""小区市场统计（市场情绪 / 价格趋势 / 项目卡片统计）.
+
+每项统计为一条 SQL 分组聚合（date_trunc 按月分组 + FILTER 区分成交/挂牌），
+数据库只返回每个楼层级别/每个月一行，不再把小区 N 个月的全部房源行拉到 Python 层分组。
+
+结果通过 ``cached_report`` 缓存在进程内 + Redis（多 worker 共享），依赖标签为该小区的
+``community:{id}``：导入批次或房源编辑提交后该标签代数递增，缓存随之失效。
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import DateTime, Float, String, case, cast, func, literal, select, union_all
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from models import PropertyCurrent, PropertyStatus
+from schemas.monitor import CommunityMarketStatsResponse, FloorStats, MarketSentimentResponse, TrendData
+from services.reports.cache import cached_report
+from services.reports.cache_tags import community_scope
+
+# 成交数据新鲜度阈值:最新成交日距今 ≤ 该天数时视为数据仍新鲜,统计窗口右端点用 now()
+_SOLD_DATA_FRESH_DAYS = 7
+
+# 楼层级别映射: DB存储 '高楼层/中楼层/低楼层', API返回 'high/mid/low'
+_FLOOR_LEVELS = {"high": "高楼层", "mid": "中楼层", "low": "低楼层"}
+
+# 合并查询中的行类型标记
+_DEAL = "deal"
+_LISTING = "listing"
+
+
+def _unit_price(price: ColumnElement) -> ColumnElement:
+    """单价（元/㎡）：仅 build_area > 0 且价格非空时计算，否则为 NULL（AVG 忽略）."""
+    return case(
+        (
+            (PropertyCurrent.build_area > 0) & price.isnot(None),
+            cast(price, Float) / PropertyCurrent.build_area * 10000,
+        ),
+        else_=None,
+    )
+
+
+@cached_report(tags=community_scope)
+def get_market_sentiment(db: Session, community_id: str) -> MarketSentimentResponse:
+    """按楼层级别统计在售与近 12 个月成交（套数、均价）及去化周期.
+
+    去重逻辑: 相同 build_area + floor_level + price 的房源视为同一套房；
+    在售与成交两组去重后合并为一次按楼层级别的分组查询。
+    """
+    one_year_ago = datetime.now(timezone.utc) - timedelta(days=365)
+    in_community = PropertyCurrent.community_id == community_id
+    has_floor = PropertyCurrent.floor_level.isnot(None) & PropertyCurrent.build_area.isnot(None)
+
+    listings = (
+        select(
+            literal(_LISTING, String).label("kind"),
+            PropertyCurrent.floor_level,
+            PropertyCurrent.build_area,
+            PropertyCurrent.listed_price_wan.label("price"),
+        )
+        .where(in_community, PropertyCurrent.status == PropertyStatus.FOR_SALE, has_floor)
+        .distinct()
+    )
+    deals = (
+        select(
+            literal(_DEAL, String).label("kind"),
+            PropertyCurrent.floor_level,
+            PropertyCurrent.build_area,
+            PropertyCurrent.sold_price_wan.label("price"),
+        )
+        .where(
+            in_community,
+            PropertyCurrent.status == PropertyStatus.SOLD,
+            PropertyCurrent.sold_date >= one_year_ago,
+            has_floor,
+        )
+        .distinct()
+    )
+    rows = union_all(listings, deals).subquery()
+    is_listing = rows.c.kind == _LISTING
+    is_deal = rows.c.kind == _DEAL
+
+    grouped = {
+        row.floor_level: row
+        for row in db.execute(
+            select(
+                rows.c.floor_level,
+                func.count().filter(is_listing).label("current_count"),
+                func.avg(rows.c.price).filter(is_listing).label("current_avg_price"),
+                func.count().filter(is_deal).label("deals_count"),
+                func.avg(rows.c.price).filter(is_deal).label("deal_avg_price"),
+            ).group_by(rows.c.floor_level)
+        )
+    }
+
+    stats = []
+    for level, db_level in _FLOOR_LEVELS.items():
+        row = grouped.get(db_level)
+        stats.append(
+            FloorStats(
+                type=level,
+                deals_count=row.deals_count if row else 0,
+                deal_avg_price=float(row.deal_avg_price) if row and row.deal_avg_price else 0,
+                current_count=row.current_count if row else 0,
+                current_avg_price=float(row.current_avg_price) if row and row.current_avg_price else 0,
+            ),
+        )
+
+    # Inventory Months 计算
+    total_inventory = sum(s.current_count for s in stats)
+    total_deals_last_year = sum(s.deals_count for s in stats)
+    monthly_avg_deals = total_deals_last_year / 12.0 if total_deals_last_year > 0 else 0
+    inventory_months = total_inventory / monthly_avg_deals if monthly_avg_deals > 0 else 99.9
+
+    return MarketSentimentResponse(
+        floor_stats=stats,
+        inventory_months=round(inventory_months, 1),
+    )
+
+
+@cached_report(tags=community_scope)
+def get_trends(db: Session, community_id: str, months: int) -> list[TrendData]:
+    """按月统计成交量、成交均价与挂牌均价（单价，元/㎡）.
+
+    成交按 sold_date、挂牌按 listed_date 所在月份归组，合并为一次分组查询，每月一行；
+    volume 统计全部成交行，均价仅对面积与价格有效的行计算。
+    """
+    start_date = datetime.now(timezone.utc) - timedelta(days=30 * months)
+    in_community = PropertyCurrent.community_id == community_id
+
+    deals = select(
+        literal(_DEAL, String).label("kind"),
+        func.date_trunc("month", PropertyCurrent.sold_date, type_=DateTime(timezone=True)).label("month"),
+        _unit_price(PropertyCurrent.sold_price_wan).label("unit_price"),
+    ).where(
+        in_community,
+        PropertyCurrent.status == PropertyStatus.SOLD,
+        PropertyCurrent.sold_date >= start_date,
+    )
+    listings = select(
+        literal(_LISTING, String).label("kind"),
+        func.date_trunc("month", PropertyCurrent.listed_date, type_=DateTime(timezone=True)).label("month"),
+        _unit_price(PropertyCurrent.listed_price_wan).label("unit_price"),
+    ).where(
+        in_community,
+        PropertyCurrent.listed_date >= start_date,
+    )
+    rows = union_all(deals, listings).subquery()
+    is_deal = rows.c.kind == _DEAL
+
+    result = db.execute(
+        select(
+            rows.c.month,
+            func.count().filter(is_deal).label("volume"),
+            func.avg(rows.c.unit_price).filter(is_deal).label("deal_price"),
+            func.avg(rows.c.unit_price).filter(rows.c.kind == _LISTING).label("listing_price"),
+        )
+        .group_by(rows.c.month)
+        .order_by(rows.c.month)
+    )
+    return [
+        TrendData(
+            month=row.month.strftime("%Y-%m"),
+            deal_price=round(row.deal_price, 0) if row.deal_price else 0,
+            volume=row.volume,
+            listing_price=round(row.listing_price, 0) if row.listing_price else 0,
+        )
+        for row in result
+    ]
+
+
+@cached_report(tags=community_scope)
+def get_community_market_stats(db: Session, community_id: str) -> CommunityMarketStatsResponse:
+    """小区市场统计（在售数 / 30 日成交均价 / 30 日成交量 / 30 日价格趋势）.
+
+    统计窗口右端点对齐"该小区最新成交日":成交数据存在约 30 天延迟,
+    若用 now() 会导致窗口整段落在数据空窗期。当最新成交日距今 > 7 天时,
+    以最新成交日为右端点;否则(无成交或距今 ≤ 7 天)用 now()。
+    确定右端点后，四项统计由一次 FILTER 聚合得出。
+    """
+    in_community = PropertyCurrent.community_id == community_id
+    is_sold = PropertyCurrent.status == PropertyStatus.SOLD
+
+    # 1. 查询该小区最新成交日,据此对齐统计窗口右端点
+    latest_sold_date = db.scalar(select(func.max(PropertyCurrent.sold_date)).where(in_community, is_sold))
+
+    now = datetime.now(timezone.utc)
+    # 边界:无成交记录或最新成交距今 ≤ 7 天,用 now();否则用 latest_sold_date
+    if latest_sold_date is None:
+        as_of = now
+    else:
+        # 注意时区:latest_sold_date 可能是 offset-naive 或 aware,需统一为 aware (UTC) 比较
+        if latest_sold_date.tzinfo is None:
+            latest_sold_date = latest_sold_date.replace(tzinfo=timezone.utc)
+        delta = now - latest_sold_date
+        as_of = latest_sold_date if delta.days > _SOLD_DATA_FRESH_DAYS else now
+
+    thirty_days_ago = as_of - timedelta(days=30)
+    sixty_days_ago = as_of - timedelta(days=60)
+
+    # 2. 在售数、最近 30 天成交量与成交均价、前 30 天（30-60 天前）成交均价
+    recent = is_sold & (PropertyCurrent.sold_date >= thirty_days_ago) & (PropertyCurrent.sold_date <= as_of)
+    previous = is_sold & (PropertyCurrent.sold_date >= sixty_days_ago) & (PropertyCurrent.sold_date < thirty_days_ago)
+    unit_price = cast(PropertyCurrent.sold_price_wan, Float) / PropertyCurrent.build_area * 10000
+    has_area = PropertyCurrent.build_area > 0
+    row = db.execute(
+        select(
+            func.count().filter(PropertyCurrent.status == PropertyStatus.FOR_SALE).label("on_sale"),
+            func.count().filter(recent).label("volume_30d"),
+            func.avg(unit_price).filter(recent & has_area).label("recent_avg"),
+            func.avg(unit_price).filter(previous & has_area).label("previous_avg"),
+        ).where(in_community, PropertyCurrent.status.in_([PropertyStatus.FOR_SALE, PropertyStatus.SOLD]))
+    ).one()
+
+    recent_avg = float(row.recent_avg) if row.recent_avg else 0.0
+    previous_avg = float(row.previous_avg) if row.previous_avg else 0.0
+
+    # 3. 计算趋势百分比 (比较最近30天 vs 前30天)
+    if previous_avg > 0 and recent_avg > 0:
+        price_trend_30d = ((recent_avg - previous_avg) / previous_avg) * 100
+        is_price_up = price_trend_30d > 0
+    else:
+        # 前30天或最近30天无成交，数据不足，无法判断趋势
+        price_trend_30d = 0.0
+        is_price_up = None
+
+    return CommunityMarketStatsResponse(
+        on_sale=int(row.on_sale or 0),
+        avg_price=round(recent_avg, 0),
+        volume_30d=int(row.volume_30d or 0),
+        price_trend_30d=round(price_trend_30d, 2),
+        is_price_up=is_price_up,
+        data_as_of=as_of,
+    )
+
+
+__all__ = ["get_community_market_stats", "get_market_sentiment", "get_trends"]
@@ -161,6 +161,7 @@ class ProjectCoreService:
         monitor_sort: bool = False,
         keyword: str | None = None,
         contract_sort: bool = False,
+        owner_details: bool = True,
     ) -> dict[str, Any]:
         """获取项目列表.
 
@@ -176,6 +177,8 @@ class ProjectCoreService:
                 需在分页前应用
             keyword: 模糊搜索关键词（匹配小区名称 或 合同编号）
             contract_sort: 按合同编号降序（越新越前），供项目记账列表使用
+            owner_details: 是否构建业主身份证号与业主列表（含银行卡号）；导出只需主业主
+                姓名与电话，传 False 时不解密其余加密字段
 
         Returns:
             包含项目列表和分页信息的字典
@@ -196,7 +199,12 @@ class ProjectCoreService:
 
         items = [
             ProjectResponse.model_validate(
-                self.response_builder.build(p, slim=True, include_interactions=include_interactions),
+                self.response_builder.build(
+                    p,
+                    slim=True,
+                    include_interactions=include_interactions,
+                    owner_details=owner_details,
+                ),
             )
             for p in result["items"]
         ]
@@ -250,6 +258,7 @@ class ProjectCoreService:
 
         分页遍历所有匹配项目（page_size=settings.max_page_size，遵守上限），
         避免单次 page_size=10000 配合 joinedload 瞬时占满内存。
+        导出只含主业主姓名与电话：只解密主业主电话，身份证号/银行卡号不解密。
         """
         rows: list[list[str]] = []
         page = 1
@@ -260,6 +269,7 @@ class ProjectCoreService:
                 community_name=community_name,
                 page=page,
                 page_size=page_size,
+                owner_details=False,
             )
             rows.extend(
                 [
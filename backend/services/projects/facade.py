@@ -120,6 +120,14 @@ class ProjectService:
         """获取项目统计."""
         return self._core_service.get_project_stats()
 
+    def build_projects_export(
+        self,
+        status_filter: str | None = None,
+        community_name: str | None = None,
+    ) -> tuple[list[str], list[list[str]]]:
+        """构建项目导出 CSV（headers + rows）."""
+        return self._core_service.build_projects_export(status_filter=status_filter, community_name=community_name)
+
     def get_my_responsible_projects(
         self,
         user_id: str,
@@ -5,6 +5,8 @@ import io
 import logging
 import uuid
 import zipfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 from decimal import Decimal
 from pathlib import Path
@@ -20,6 +22,7 @@ from settings import settings
 from utils.csv_exporter import sanitize_csv_cell
 from utils.file_security import get_safe_file_path
 from utils.formatters import escape_like
+from utils.xlsx_exporter import write_xlsx
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +33,7 @@ _RECEIPT_DOWNLOAD_TIMEOUT = 30.0
 _RECEIPT_MAX_BYTES = 50 * 1024 * 1024
 
 
-def _fetch_receipt_bytes(url: str, upload_dir: Path) -> bytes | None:
+def _fetch_receipt_bytes(url: str, upload_dir: Path, client: httpx.Client | None = None) -> bytes | None:
     """获取票据文件内容.
 
     - OSS URL (以 http 开头): 通过 HTTP 下载（CDN/公开 Bucket 直连）
@@ -45,6 +48,7 @@ def _fetch_receipt_bytes(url: str, upload_dir: Path) -> bytes | None:
     Args:
         url: 票据文件 URL
         upload_dir: 本地上传目录（仅 local 模式使用）
+        client: 复用的 HTTP 客户端（需 ``trust_env=False``）；为空时单次创建
 
     Returns:
         文件内容 bytes, 失败时返回 None（已记录 warning）
@@ -66,11 +70,11 @@ def _fetch_receipt_bytes(url: str, upload_dir: Path) -> bytes | None:
         if not base_host or not url_host or url_host != base_host:
             logger.warning("拒绝下载非白名单 hostname 票据文件: %s", url)
             return None
+        if client is None:
+            with httpx.Client(trust_env=False) as own_client:
+                return _fetch_receipt_bytes(url, upload_dir, own_client)
         try:
-            with (
-                httpx.Client(trust_env=False) as client,
-                client.stream("GET", url, timeout=_RECEIPT_DOWNLOAD_TIMEOUT, follow_redirects=True) as resp,
-            ):
+            with client.stream("GET", url, timeout=_RECEIPT_DOWNLOAD_TIMEOUT, follow_redirects=True) as resp:
                 resp.raise_for_status()
                 # 校验重定向后最终 URL 的 hostname 仍在白名单内
                 final_host = urlparse(str(resp.url)).hostname
@@ -124,6 +128,92 @@ def _fetch_receipt_bytes(url: str, upload_dir: Path) -> bytes | None:
     return None
 
 
+def _iter_receipts(receipts: Iterable[tuple[str, str]], upload_dir: Path) -> Iterator[tuple[str, bytes]]:
+    """有界并发获取票据，按完成顺序产出 (文件名, 内容)；获取失败的票据跳过.
+
+    在途请求不超过 ``ledger_receipt_fetch_concurrency``，每完成一个再补充一个，
+    同时持有的票据字节有上限；OSS 下载共用一个 HTTP 客户端（连接复用）。
+    生成器提前关闭（客户端断开）时取消尚未开始的请求。
+    """
+    concurrency = max(1, settings.ledger_receipt_fetch_concurrency)
+    pending = iter(receipts)
+    in_flight: dict[Future[bytes | None], str] = {}
+    with httpx.Client(trust_env=False) as client:
+        pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="receipt-fetch")
+
+        def submit_next() -> None:
+            for filename, url in pending:
+                in_flight[pool.submit(_fetch_receipt_bytes, url, upload_dir, client)] = filename
+                return
+
+        try:
+            for _ in range(concurrency):
+                submit_next()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    filename = in_flight.pop(future)
+                    submit_next()
+                    try:
+                        content = future.result()
+                    except OSError:
+                        logger.warning("读取票据文件失败: %s", filename, exc_info=True)
+                        continue
+                    if content is not None:
+                        yield filename, content
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _ZipChunkSink(io.RawIOBase):
+    """zip 流式输出缓冲：``ZipFile`` 写入的字节暂存于此，由调用方逐块取走.
+
+    不可 seek，``ZipFile`` 据此以数据描述符模式写出条目，无需回填本地文件头。
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: bytes) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _stream_records_zip(
+    csv_bytes: bytes,
+    receipts: list[tuple[str, str]],
+    upload_dir: Path,
+    project_id: uuid.UUID,
+) -> Iterator[bytes]:
+    """逐条目产出资金账本 zip：先写流水 CSV，票据按获取完成顺序写入后立即输出."""
+    sink = _ZipChunkSink()
+    receipt_count = 0
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("流水.csv", csv_bytes)
+        yield sink.drain()
+        for filename, content in _iter_receipts(receipts, upload_dir):
+            zip_path = f"receipts/{filename}"
+            try:
+                zf.writestr(zip_path, content)
+            except (OSError, zipfile.BadZipFile):
+                logger.warning("写入票据文件到zip失败: %s", zip_path)
+                continue
+            receipt_count += 1
+            yield sink.drain()
+    # 中央目录
+    yield sink.drain()
+    logger.info("导出项目 %s 流水 zip 完成：%d 个票据", project_id, receipt_count)
+
+
 class _LedgerMixin:
     """资金账本列表/统计/导出方法."""
 
@@ -362,25 +452,20 @@ class _LedgerMixin:
             )
         return items
 
-    def export_ledger_excel(
+    def build_ledger_export(
         self,
         search: str | None,
         project_status: str | None,
-    ) -> bytes:
-        """资金账本：导出全量项目列表为 .xlsx（openpyxl）.
+    ) -> tuple[list[str], list[list[object]]]:
+        """资金账本：构建全量项目列表导出数据（headers + rows，单元格已做公式注入转义）.
 
         列：项目编号、小区、地址、项目状态、总收入、总支出、净现金流、ROI(%)、记录数
         """
-        from openpyxl import Workbook
-
         items = self._list_all_projects_with_stats(
             search=search,
             project_status=project_status,
         )
 
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "资金账本"
         headers = [
             "项目编号",
             "小区",
@@ -392,7 +477,6 @@ class _LedgerMixin:
             "ROI(%)",
             "记录数",
         ]
-        ws.append(headers)
 
         status_label = {
             "signing": "签约",
@@ -402,37 +486,45 @@ class _LedgerMixin:
             "deleted": "已删除",
         }
 
-        for it in items:
-            ws.append(
-                [
-                    sanitize_csv_cell(it["project_code"] or ""),
-                    sanitize_csv_cell(it["project_name"] or ""),
-                    sanitize_csv_cell(it["project_address"] or ""),
-                    status_label.get(it["project_status"], it["project_status"] or "-"),
-                    float(it["total_income"]),
-                    float(it["total_expense"]),
-                    float(it["net_cash_flow"]),
-                    round(it["roi"], 2),
-                    it["record_count"],
-                ],
-            )
-
-        for col_idx in range(1, len(headers) + 1):
-            ws.column_dimensions[ws.cell(row=1, column=col_idx).column_letter].width = 18
+        rows: list[list[object]] = [
+            [
+                sanitize_csv_cell(it["project_code"] or ""),
+                sanitize_csv_cell(it["project_name"] or ""),
+                sanitize_csv_cell(it["project_address"] or ""),
+                status_label.get(it["project_status"], it["project_status"] or "-"),
+                float(it["total_income"]),
+                float(it["total_expense"]),
+                float(it["net_cash_flow"]),
+                round(it["roi"], 2),
+                it["record_count"],
+            ]
+            for it in items
+        ]
+        return headers, rows
 
+    def export_ledger_excel(
+        self,
+        search: str | None,
+        project_status: str | None,
+    ) -> bytes:
+        """资金账本：导出全量项目列表为 .xlsx（openpyxl 只写模式）."""
+        headers, rows = self.build_ledger_export(search=search, project_status=project_status)
         buffer = io.BytesIO()
-        wb.save(buffer)
+        write_xlsx(buffer, "资金账本", headers, rows)
         return buffer.getvalue()
 
-    def export_project_records_zip(self, project_id: uuid.UUID) -> tuple[str, bytes]:
+    def export_project_records_zip(self, project_id: uuid.UUID) -> tuple[str, Iterator[bytes]]:
         """资金账本：导出单项目流水为 zip（含 CSV + 票据图片）.
 
         票据文件可能存储在本地（local 模式）或 OSS（oss 模式）：
         - local: URL 形如 /static/uploads/xxx.jpg → 从本地磁盘读取
         - oss:   URL 形如 https://cdn.example.com/xxx.jpg → 通过 HTTP 下载
 
+        数据库查询在调用时完成；返回的 zip 字节流在迭代时才获取票据（有界并发），
+        每写完一个条目即输出，不在内存中拼装整个压缩包。
+
         Returns:
-            (filename_stem, zip_bytes) - filename_stem 形如 "资金账本_XX001_20260707"
+            (filename_stem, zip_chunks) - filename_stem 形如 "资金账本_XX001_20260707"
 
         """
         records = self.get_records(project_id)
@@ -453,56 +545,36 @@ class _LedgerMixin:
         writer = csv.writer(csv_buffer)
         writer.writerow(["日期", "交易形式", "交易方", "分类", "金额", "票据", "备注"])
 
-        upload_dir = Path(settings.upload_dir).resolve()
+        # 待获取票据 (文件名, URL)，同名文件只取第一个
+        receipts: list[tuple[str, str]] = []
         seen_filenames: set[str] = set()
-        receipt_count = 0
         type_label = {CashFlowType.INCOME.value: "收入", CashFlowType.EXPENSE.value: "支出"}
 
-        # 先开 zip 上下文，遍历中即时 writestr 票据字节（用完即丢），
-        # 任一时刻仅持有一个票据字节，避免累积所有票据导致内存回归。
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-            for rec in records:
-                date_str = rec.record_date.strftime("%Y-%m-%d") if rec.record_date else ""
-                type_val = rec.type.value if rec.type else ""
-                form_str = type_label.get(type_val, type_val)
-                counterparty = rec.counterparty or ""
-                category = rec.category.value if rec.category else ""
-                amount = f"{float(rec.amount):.2f}" if rec.amount is not None else "0.00"
-                remark = rec.remark or ""
-
-                receipt_names: list[str] = []
-                for url in rec.receipt_urls or []:
-                    # 提取文件名: 取 URL 最后路径段（local 与 OSS 均适用）
-                    filename = url.rsplit("/", 1)[-1]
-                    if not filename:
-                        continue
-                    receipt_names.append(filename)
-
-                    if filename in seen_filenames:
-                        continue
-                    seen_filenames.add(filename)
-
-                    content = _fetch_receipt_bytes(url, upload_dir)
-                    if content is None:
-                        continue
-                    zip_path = f"receipts/{filename}"
-                    try:
-                        zf.writestr(zip_path, content)
-                    except (OSError, zipfile.BadZipFile):
-                        logger.warning("写入票据文件到zip失败: %s", zip_path)
-                        continue
-                    receipt_count += 1
-
-                writer.writerow([date_str, form_str, counterparty, category, amount, ";".join(receipt_names), remark])
-
-            # CSV 在票据循环结束后写入 zip
-            zf.writestr("流水.csv", csv_buffer.getvalue().encode("utf-8"))
-
-        logger.info(
-            "导出项目 %s 流水 zip 完成：%d 条记录，%d 个票据",
-            project_id,
-            len(records),
-            receipt_count,
-        )
-        return filename_stem, zip_buffer.getvalue()
+        for rec in records:
+            date_str = rec.record_date.strftime("%Y-%m-%d") if rec.record_date else ""
+            type_val = rec.type.value if rec.type else ""
+            form_str = type_label.get(type_val, type_val)
+            counterparty = rec.counterparty or ""
+            category = rec.category.value if rec.category else ""
+            amount = f"{float(rec.amount):.2f}" if rec.amount is not None else "0.00"
+            remark = rec.remark or ""
+
+            receipt_names: list[str] = []
+            for url in rec.receipt_urls or []:
+                # 提取文件名: 取 URL 最后路径段（local 与 OSS 均适用）
+                filename = url.rsplit("/", 1)[-1]
+                if not filename:
+                    continue
+                receipt_names.append(filename)
+
+                if filename in seen_filenames:
+                    continue
+                seen_filenames.add(filename)
+                receipts.append((filename, url))
+
+            writer.writerow([date_str, form_str, counterparty, category, amount, ";".join(receipt_names), remark])
+
+        logger.info("导出项目 %s 流水 zip：%d 条记录，%d 个票据待获取", project_id, len(records), len(receipts))
+        upload_dir = Path(settings.upload_dir).resolve()
+        csv_bytes = csv_buffer.getvalue().encode("utf-8")
+        return filename_stem, _stream_records_zip(csv_bytes, receipts, upload_dir, project_id)
@@ -49,6 +49,7 @@ class ProjectResponseBuilder:
         slim: bool = False,
         include_interactions: bool = False,
         current_user: "User | None" = None,
+        owner_details: bool = True,
     ) -> dict[str, Any]:
         """构建项目响应数据.
 
@@ -62,6 +63,8 @@ class ProjectResponseBuilder:
                 供工作台重点监控卡片展示项目动态(带看/出价)；slim=False 时始终构建
             current_user: 当前请求用户，用于计算 can_edit_renovation / can_edit_sales
                 业务身份标志；列表页（slim=True）可传 None，此时 can_edit_* 默认为 False
+            owner_details: 是否构建业主身份证号与业主列表；为 False 时只读取主业主姓名/电话，
+                其余加密字段不被访问、不解密（导出使用）
 
         Returns:
             包含项目信息的字典
@@ -69,8 +72,9 @@ class ProjectResponseBuilder:
         """
         response = self._build_base_info(project)
         response.update(self._build_contract_info(project))
-        response.update(self._build_owner_info(project))
-        response.update(self._build_owners_list(project))
+        response.update(self._build_owner_info(project, owner_details=owner_details))
+        if owner_details:
+            response.update(self._build_owners_list(project))
         response.update(self._build_sale_info(project, current_user=current_user))
         response.update(self._build_finance_info(project))
         # renovation 业务身份标志（can_edit_renovation / contact_person_id）始终构建：
@@ -161,7 +165,7 @@ class ProjectResponseBuilder:
             "contract_status": contract.contract_status,
         }
 
-    def _build_owner_info(self, project: "Project") -> dict[str, Any]:
+    def _build_owner_info(self, project: "Project", *, owner_details: bool = True) -> dict[str, Any]:
         """构建业主信息.
 
         通过预加载的 project.owners 关系访问，过滤软删除记录。
@@ -174,7 +178,7 @@ class ProjectResponseBuilder:
         return {
             "owner_name": owner.owner_name,
             "owner_phone": owner.owner_phone,
-            "owner_id_card": owner.owner_id_card,
+            "owner_id_card": owner.owner_id_card if owner_details else None,
             "owner_info": owner.owner_info,
         }
 
@@ -13,6 +13,7 @@ from sqlalchemy.orm import Session
 from models.project._project_base import Project
 from models.project._project_owner import ProjectOwner
 from schemas.project.owner import OwnerInlineCreate, OwnerInlineUpdate
+from utils.crypto import decrypt
 
 logger = logging.getLogger(__name__)
 
@@ -153,7 +154,8 @@ def get_bank_card_number(
     if row is None:
         return None
 
-    bank_card_number = row[0]
+    # 列选取得到密文（加密列仅在实体属性访问时自动解密）
+    bank_card_number = decrypt(row[0]) if row[0] else None
     # 敏感数据访问审计日志
     logger.info(
         "敏感数据访问: 业主银行卡号查看 owner_id=%s operator_id=%s",
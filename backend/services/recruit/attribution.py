@@ -2,6 +2,9 @@
 
 核心归因语义（对齐 9.6）：以手机号 ``phone_hash`` 为唯一键，
 首次留资写入归属员工 ``referrer_employee_id``，重复留资永不覆盖。
+
+访问 / 分享埋点经 ``events`` 模块缓冲后批量落库（Redis 不可用或缓冲关闭时同步写库），
+接口返回的记录 ID 在入队前确定，落库有至多 ``recruit_event_flush_interval_ms`` 的延迟。
 """
 
 import logging
@@ -17,7 +20,6 @@ from models.recruit import (
     RecruitLead,
     RecruitLeadSource,
     RecruitLeadStatus,
-    RecruitShareEvent,
     RecruitShareType,
     RecruitVisit,
 )
@@ -27,9 +29,20 @@ from services.system.wechat import WeChatAuthService
 from settings import settings
 from utils.crypto import hash_phone
 
+from .events import (
+    EVENT_SHARE,
+    EVENT_VISIT,
+    EVENT_VISIT_AUTHED,
+    EVENT_VISIT_EXIT,
+    derive_event_id,
+    enqueue_recruit_event,
+    is_pending_recruit_visit,
+    resolve_deep_view,
+    write_recruit_events,
+)
+
 logger = logging.getLogger(__name__)
 
-_DEEP_VIEW_MIN_MS = 3000
 _NOTIFY_PAGE_PATH = "pages/recruit/detail/index"
 # 订阅消息模板（3826 · 报名结果通知）字段键名
 _NOTIFY_FIELD_ACTIVITY = "thing1"  # 活动名称（campaign.name，thing 类型 ≤20 字符）
@@ -53,58 +66,70 @@ class RecruitAttributionService:
         """由微信 openid（缺失时回退用户 ID）派生稳定 UV 去重键."""
         return hash_phone(user.wechat_openid or user.id)
 
-    def create_visit(self, user: User, data: RecruitVisitCreate) -> RecruitVisit:
-        """创建访问记录（PV +1，UV 按 openid_hash 去重）."""
-        visit = RecruitVisit(
-            id=str(uuid.uuid4()),
-            campaign_id=data.campaign_id,
-            visitor_id=user.id,
-            openid_hash=self.derive_openid_hash(user),
-            referrer_employee_id=data.referrer,
-            source=data.source,
-        )
-        self.db.add(visit)
-        try:
-            self.db.commit()
-            self.db.refresh(visit)
-        except Exception:
-            self.db.rollback()
-            raise
-        else:
-            return visit
+    def create_visit(self, user: User, data: RecruitVisitCreate, *, idempotency_key: str | None = None) -> str:
+        """创建访问记录（PV +1，UV 按 openid_hash 去重），返回访问记录ID.
 
-    def update_visit(self, visit_id: str, data: RecruitVisitUpdate, *, user_id: str) -> RecruitVisit:
+        携带幂等键时客户端重试得到同一记录ID，重复上报只计一次 PV。
+        """
+        event = {
+            "type": EVENT_VISIT,
+            "id": derive_event_id(EVENT_VISIT, user.id, idempotency_key),
+            "campaign_id": data.campaign_id,
+            "visitor_id": user.id,
+            "openid_hash": self.derive_openid_hash(user),
+            "referrer_employee_id": data.referrer,
+            "source": data.source.value,
+            "entered_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if not enqueue_recruit_event(event):
+            self._write_event(event)
+        return event["id"]
+
+    def update_visit(self, visit_id: str, data: RecruitVisitUpdate, *, user_id: str) -> str:
         """上报离开，后端复核 is_deep_view（stayed_ms>=3000 与前端判定取或）.
 
-        校验 visit 归属当前用户（visitor_id == user_id），不存在或不归属时
-        统一抛 ResourceNotFoundError，避免泄露资源存在性（IDOR 防护）。
+        visit 既未落库归属当前用户（visitor_id == user_id），也不是本人入队、尚未落库的访问时
+        抛 ResourceNotFoundError，不泄露资源存在性（IDOR 防护），也不为无效 visit_id 入队。
+        缓冲写入时离开事件入队，落库阶段再次校验归属；尚未落库的访问在进入事件写入后应用。
         """
+        event = {
+            "type": EVENT_VISIT_EXIT,
+            "id": visit_id,
+            "visitor_id": user_id,
+            "stayed_ms": data.stayed_ms,
+            "is_deep_view": data.is_deep_view,
+            "clicked_auth": data.clicked_auth,
+            "exited_at": datetime.now(timezone.utc).isoformat(),
+        }
         visit = (
             self.db.query(RecruitVisit).filter(RecruitVisit.id == visit_id, RecruitVisit.visitor_id == user_id).first()
         )
         if visit is None:
-            msg = "访问记录不存在"
-            raise ResourceNotFoundError(msg)
+            if not is_pending_recruit_visit(visit_id, user_id):
+                msg = "访问记录不存在"
+                raise ResourceNotFoundError(msg)
+            # 访问记录仍在埋点缓冲中：入队离开事件（入队失败时同步写库，此间仍未落库时忽略）
+            if not enqueue_recruit_event(event):
+                self._write_event(event)
+            return visit_id
+        if enqueue_recruit_event(event):
+            return visit_id
 
         visit.stayed_ms = data.stayed_ms
-        visit.exited_at = datetime.now(timezone.utc)
+        visit.exited_at = datetime.fromisoformat(event["exited_at"])
         # 服务端复核：以前端 stayed_ms 与后端 elapsed 取"或"
-        elapsed_ms = 0
-        if visit.entered_at is not None and visit.exited_at is not None:
-            elapsed_ms = int((visit.exited_at - visit.entered_at).total_seconds() * 1000)
-        frontend_deep = data.stayed_ms is not None and data.stayed_ms >= _DEEP_VIEW_MIN_MS
-        server_deep = elapsed_ms >= _DEEP_VIEW_MIN_MS
-        visit.is_deep_view = data.is_deep_view or frontend_deep or server_deep
+        visit.is_deep_view = resolve_deep_view(
+            visit.entered_at, visit.exited_at, stayed_ms=data.stayed_ms, is_deep_view=data.is_deep_view
+        )
         visit.clicked_auth = data.clicked_auth
 
         try:
             self.db.commit()
-            self.db.refresh(visit)
         except Exception:
             self.db.rollback()
             raise
         else:
-            return visit
+            return visit_id
 
     def submit_lead(
         self,
@@ -168,8 +193,12 @@ class RecruitAttributionService:
             self._mark_visit_authed(visit_id, user_id=user_id)
             return lead, True
 
-    def create_share_event(self, user: User, data: RecruitShareEventCreate) -> RecruitShareEvent:
-        """创建分享事件（漏斗第 1 级数据源）.
+    def create_share_event(
+        self, user: User, data: RecruitShareEventCreate, *, idempotency_key: str | None = None
+    ) -> str:
+        """创建分享事件（漏斗第 1 级数据源），返回分享事件ID.
+
+        携带幂等键时客户端重试得到同一事件ID，重复上报只计一次分享。
 
         Raises:
             ResourceNotFoundError: 指定活动不存在
@@ -182,21 +211,26 @@ class RecruitAttributionService:
             if not exists:
                 msg = "招募活动不存在"
                 raise ResourceNotFoundError(msg)
-        event = RecruitShareEvent(
-            id=str(uuid.uuid4()),
-            campaign_id=data.campaign_id,
-            employee_id=user.id,
-            share_type=RecruitShareType.CARD if data.share_type == "card" else RecruitShareType.POSTER,
-        )
-        self.db.add(event)
+        event = {
+            "type": EVENT_SHARE,
+            "id": derive_event_id(EVENT_SHARE, user.id, idempotency_key),
+            "campaign_id": data.campaign_id,
+            "employee_id": user.id,
+            "share_type": (RecruitShareType.CARD if data.share_type == "card" else RecruitShareType.POSTER).value,
+            "shared_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if not enqueue_recruit_event(event):
+            self._write_event(event)
+        return event["id"]
+
+    def _write_event(self, event: dict) -> None:
+        """同步写入单条埋点事件（缓冲关闭或 Redis 不可用时的降级路径）."""
         try:
+            write_recruit_events(self.db, [event])
             self.db.commit()
-            self.db.refresh(event)
         except Exception:
             self.db.rollback()
             raise
-        else:
-            return event
 
     def _backfill_referrer(self, lead: RecruitLead, referrer: str | None) -> None:
         """补充无归属线索的归属员工.
@@ -221,19 +255,29 @@ class RecruitAttributionService:
 
         校验 visit 归属当前用户（visitor_id == user_id），不归属时静默跳过
         （IDOR 防护：不允许通过他人 visit_id 标记 authed 状态）。
+        访问记录是本人入队、尚未落库的访问时改为入队授权事件（入队失败时同步写库）；
+        既未落库也不是本人待落库的访问直接跳过。
         """
         if not visit_id:
             return
         visit = (
             self.db.query(RecruitVisit).filter(RecruitVisit.id == visit_id, RecruitVisit.visitor_id == user_id).first()
         )
-        if visit is not None:
-            visit.authed = True
-            try:
-                self.db.commit()
-            except Exception:
-                self.db.rollback()
-                raise
+        if visit is None:
+            if not is_pending_recruit_visit(visit_id, user_id):
+                return
+            # 访问记录仍在埋点缓冲中：入队授权事件，落库阶段同样校验归属
+            event = {"type": EVENT_VISIT_AUTHED, "id": visit_id, "visitor_id": user_id}
+            if not enqueue_recruit_event(event):
+                # 同步写库：此间访问记录已落库时生效，仍未落库时忽略
+                self._write_event(event)
+            return
+        visit.authed = True
+        try:
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
 
     def _resolve_employee_openids(self, employee_id: str) -> list[str]:
         """解析员工可通知的微信 openid 列表.
@@ -0,0 +1,431 @@
+"""招募访问 / 分享埋点缓冲写入.
+
+C 端每次进入、离开、分享都会上报埋点，逐条同步写库时活动推送期间每个页面浏览都是
+一个写事务。埋点改为追加到 Redis Stream（``recruit:events``），由各 API 进程内的写入线程
+按 ``settings.recruit_event_flush_interval_ms`` 间隔批量落库：
+
+- 进入 / 分享：一条多行 ``INSERT ... ON CONFLICT (id) DO NOTHING``
+- 离开 / 授权成功：按主键批量 UPDATE（校验 visitor_id 归属，不归属时忽略）
+
+投递语义为至少一次：消费组读取后先提交数据库事务再 XACK + XDEL。整批写库失败时二分拆批重写，
+只有单独写入仍失败的条目留在待确认列表（数据库连接故障时整批保留，不拆批），空闲超过
+``settings.recruit_event_reclaim_idle_seconds`` 后由任一写入线程认领重试（含已退出进程遗留的条目），
+投递次数达到上限的条目记错误日志后丢弃。
+重复投递靠幂等键去重：记录 ID 在入队前确定（客户端 ``Idempotency-Key`` 派生或服务端生成），
+重复插入被主键冲突忽略，离开 / 授权为覆盖写，漏斗计数因此保持精确。
+
+离开 / 授权事件可能先于对应的进入事件被其他进程写入，目标记录尚不存在时放入延迟队列
+（``recruit:events:delayed``，按到期时间排序的有序集合），按指数退避（写入间隔 × 2^n，
+上限为认领间隔）到期后移回事件流重试，直到距首次入队超过进入事件的最长滞留时间
+（认领间隔 × 最大投递次数）。进入事件入队时同时登记「待落库访问」标记（同一时长过期），
+离开 / 授权事件只为已落库或本人待落库的访问入队。
+Redis 不可用时调用方降级为同步写库。
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from redis.exceptions import RedisError, ResponseError
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from db import SessionLocal
+from models.recruit import RecruitLeadSource, RecruitShareEvent, RecruitShareType, RecruitVisit
+from settings import settings
+from utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# 埋点事件流与消费组
+_STREAM_KEY = "recruit:events"
+_GROUP = "recruit-event-writers"
+
+# 目标访问记录尚未落库的离开 / 授权事件延迟队列（score 为到期时间戳毫秒）
+_DELAYED_KEY = "recruit:events:delayed"
+
+# 事件类型
+EVENT_VISIT = "visit"
+EVENT_VISIT_EXIT = "visit_exit"
+EVENT_VISIT_AUTHED = "visit_authed"
+EVENT_SHARE = "share"
+
+# 深度浏览判定阈值（毫秒）
+DEEP_VIEW_MIN_MS = 3000
+
+# 待落库访问标记 key 前缀（值为访问者用户ID）
+_PENDING_VISIT_PREFIX = "recruit:pending-visit:"
+
+# 幂等键派生记录 ID 的命名空间
+_IDEMPOTENCY_NAMESPACE = uuid.UUID("5d0c6a52-64a8-4f64-9a8e-3b7d1f0e2c41")
+
+_stop = threading.Event()
+_flusher_thread: threading.Thread | None = None
+_flusher_lock = threading.Lock()
+_group_ready = False
+
+
+def derive_event_id(kind: str, user_id: str, idempotency_key: str | None) -> str:
+    """确定埋点记录 ID：携带幂等键时按（类型, 用户, 幂等键）派生，客户端重试得到同一 ID."""
+    if not idempotency_key:
+        return str(uuid.uuid4())
+    return str(uuid.uuid5(_IDEMPOTENCY_NAMESPACE, f"{kind}:{user_id}:{idempotency_key}"))
+
+
+def resolve_deep_view(
+    entered_at: datetime | None, exited_at: datetime, *, stayed_ms: int | None, is_deep_view: bool
+) -> bool:
+    """后端复核 is_deep_view：前端标记、前端 stayed_ms 与服务端 elapsed 三者取或."""
+    elapsed_ms = int((exited_at - entered_at).total_seconds() * 1000) if entered_at is not None else 0
+    frontend_deep = stayed_ms is not None and stayed_ms >= DEEP_VIEW_MIN_MS
+    return is_deep_view or frontend_deep or elapsed_ms >= DEEP_VIEW_MIN_MS
+
+
+def enqueue_recruit_event(event: dict[str, Any]) -> bool:
+    """追加一条埋点事件到事件流（进入事件同时登记待落库访问标记）.
+
+    Returns:
+        bool: 是否入队成功（缓冲关闭或 Redis 不可用时返回 False，调用方同步写库）
+
+    """
+    if not settings.recruit_event_buffer_enabled:
+        return False
+    try:
+        pipe = get_redis_client().pipeline()
+        pipe.xadd(_STREAM_KEY, {"event": json.dumps(event, default=str)})
+        if event["type"] == EVENT_VISIT:
+            pipe.set(_PENDING_VISIT_PREFIX + event["id"], event["visitor_id"], ex=max(1, int(_max_pending_seconds())))
+        pipe.execute()
+    except RedisError:
+        logger.warning("埋点事件入队失败，降级同步写库: %s", event.get("type"))
+        return False
+    return True
+
+
+def is_pending_recruit_visit(visit_id: str, user_id: str) -> bool:
+    """访问记录是否为该用户入队、可能尚未落库的访问（缓冲关闭或 Redis 不可用时返回 False）."""
+    if not settings.recruit_event_buffer_enabled:
+        return False
+    try:
+        owner = get_redis_client().get(_PENDING_VISIT_PREFIX + visit_id)
+    except RedisError:
+        logger.warning("查询待落库访问标记失败", exc_info=True)
+        return False
+    return owner is not None and owner.decode() == user_id
+
+
+def write_recruit_events(db: Session, events: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+    """批量写入埋点事件（幂等，调用方负责提交事务）.
+
+    同一批内先写进入 / 分享，再按顺序应用离开 / 授权，同批内的先进入后离开可一次落库。
+
+    Returns:
+        list[dict]: 目标访问记录不存在的离开 / 授权事件（可能尚在其他进程的缓冲中）
+
+    """
+    visits = [event for event in events if event["type"] == EVENT_VISIT]
+    shares = [event for event in events if event["type"] == EVENT_SHARE]
+    updates = [event for event in events if event["type"] in (EVENT_VISIT_EXIT, EVENT_VISIT_AUTHED)]
+
+    if visits:
+        db.execute(
+            pg_insert(RecruitVisit)
+            .values(
+                [
+                    {
+                        "id": event["id"],
+                        "campaign_id": event["campaign_id"],
+                        "visitor_id": event["visitor_id"],
+                        "openid_hash": event["openid_hash"],
+                        "referrer_employee_id": event["referrer_employee_id"],
+                        "source": RecruitLeadSource(event["source"]),
+                        "entered_at": datetime.fromisoformat(event["entered_at"]),
+                    }
+                    for event in visits
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
+    if shares:
+        db.execute(
+            pg_insert(RecruitShareEvent)
+            .values(
+                [
+                    {
+                        "id": event["id"],
+                        "campaign_id": event["campaign_id"],
+                        "employee_id": event["employee_id"],
+                        "share_type": RecruitShareType(event["share_type"]),
+                        "shared_at": datetime.fromisoformat(event["shared_at"]),
+                    }
+                    for event in shares
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
+    if not updates:
+        return []
+
+    rows = {
+        row.id: row
+        for row in db.execute(
+            select(RecruitVisit.id, RecruitVisit.visitor_id, RecruitVisit.entered_at).where(
+                RecruitVisit.id.in_({event["id"] for event in updates})
+            )
+        )
+    }
+    missing: list[dict[str, Any]] = []
+    values: dict[str, dict[str, Any]] = {}
+    for event in updates:
+        row = rows.get(event["id"])
+        if row is None:
+            missing.append(event)
+            continue
+        if row.visitor_id != event["visitor_id"]:
+            # IDOR 防护：不归属当前用户的访问记录忽略
+            continue
+        value = values.setdefault(event["id"], {"id": event["id"]})
+        if event["type"] == EVENT_VISIT_AUTHED:
+            value["authed"] = True
+            continue
+        exited_at = datetime.fromisoformat(event["exited_at"])
+        value.update(
+            exited_at=exited_at,
+            stayed_ms=event["stayed_ms"],
+            is_deep_view=resolve_deep_view(
+                row.entered_at, exited_at, stayed_ms=event["stayed_ms"], is_deep_view=event["is_deep_view"]
+            ),
+            clicked_auth=event["clicked_auth"],
+        )
+    # executemany 要求各行列相同：按列集合分组
+    groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+    for value in values.values():
+        groups.setdefault(tuple(sorted(value)), []).append(value)
+    for group in groups.values():
+        db.execute(update(RecruitVisit), group)
+    return missing
+
+
+def flush_recruit_events(consumer: str | None = None) -> int:
+    """读取一批事件写库并确认，返回处理的事件数（Redis 或数据库不可用时返回 0）."""
+    global _group_ready
+    consumer = consumer or _consumer_name()
+    try:
+        redis_client = get_redis_client()
+        _ensure_group(redis_client)
+        _promote_delayed(redis_client)
+        entries = _reclaim(redis_client, consumer)
+        if not entries:
+            response = redis_client.xreadgroup(
+                _GROUP,
+                consumer,
+                {_STREAM_KEY: ">"},
+                count=settings.recruit_event_flush_batch_size,
+            )
+            entries = response[0][1] if response else []
+    except RedisError:
+        # Redis 重启等导致消费组丢失时下次重新创建
+        _group_ready = False
+        logger.warning("读取埋点事件流失败", exc_info=True)
+        return 0
+    if not entries:
+        return 0
+
+    batch: list[tuple[bytes, dict[str, Any]]] = []
+    for entry_id, fields in entries:
+        event = json.loads(fields[b"event"])
+        # 首次入队时间：重新入队的条目沿用原值，否则取条目 ID 的毫秒时间戳
+        event["first_seen_ms"] = int(fields.get(b"first_seen_ms") or entry_id.split(b"-")[0])
+        event["retries"] = int(fields.get(b"retries") or 0)
+        batch.append((entry_id, event))
+
+    try:
+        written, missing = _write_batch(batch)
+    except OperationalError:
+        # 数据库不可用：整批不确认，空闲超时后被认领重试
+        logger.exception("埋点事件批量写库失败（数据库不可用），%d 条待重试", len(batch))
+        return 0
+    if not written:
+        return 0
+
+    entry_ids = [entry_id for entry_id, _event in written]
+    now_ms = int(time.time() * 1000)
+    deadline_ms = now_ms - int(_max_pending_seconds() * 1000)
+    try:
+        pipe = redis_client.pipeline()
+        for event in missing:
+            first_seen_ms = event.pop("first_seen_ms")
+            retries = event.pop("retries") + 1
+            if first_seen_ms < deadline_ms:
+                logger.warning("埋点事件目标访问记录不存在，丢弃: type=%s, id=%s", event["type"], event["id"])
+                continue
+            # 先放入延迟队列再确认原条目：中途失败最多重复投递，不会丢失
+            delayed = {"event": json.dumps(event, default=str), "first_seen_ms": first_seen_ms, "retries": retries}
+            pipe.zadd(_DELAYED_KEY, {json.dumps(delayed): now_ms + _retry_delay_ms(retries)})
+        pipe.xack(_STREAM_KEY, _GROUP, *entry_ids)
+        pipe.xdel(_STREAM_KEY, *entry_ids)
+        pipe.execute()
+    except RedisError:
+        # 已写库未确认：重复投递由幂等写入吸收
+        logger.warning("埋点事件确认失败，将被重复投递", exc_info=True)
+    return len(batch)
+
+
+def _write_batch(
+    batch: list[tuple[bytes, dict[str, Any]]],
+) -> tuple[list[tuple[bytes, dict[str, Any]]], list[dict[str, Any]]]:
+    """写入一批事件（独立事务），返回 (已写入的条目, 目标访问记录不存在的事件).
+
+    整批写库失败（含字段缺失 / 取值非法的畸形事件）时二分拆批分别重写，只有单独写入仍失败的条目
+    不计入已写入（留在待确认列表，由认领重试直至投递次数上限），不拖累同批其他条目。
+    数据库连接故障（``OperationalError``）直接抛出，不做拆批。
+    """
+    try:
+        with SessionLocal() as db:
+            missing = write_recruit_events(db, [event for _entry_id, event in batch])
+            db.commit()
+    except OperationalError:
+        raise
+    except (SQLAlchemyError, KeyError, ValueError):
+        if len(batch) == 1:
+            entry_id, event = batch[0]
+            logger.exception("埋点事件写库失败，待重试: entry=%s, type=%s, id=%s", entry_id, event["type"], event["id"])
+            return [], []
+        middle = len(batch) // 2
+        left_written, left_missing = _write_batch(batch[:middle])
+        right_written, right_missing = _write_batch(batch[middle:])
+        return left_written + right_written, left_missing + right_missing
+    return batch, missing
+
+
+def start_recruit_event_flusher() -> None:
+    """在 API 进程内启动埋点写入线程（幂等，``settings.recruit_event_buffer_enabled`` 关闭时不启动）."""
+    global _flusher_thread
+    if not settings.recruit_event_buffer_enabled:
+        return
+    with _flusher_lock:
+        if _flusher_thread is not None:
+            return
+        _stop.clear()
+        _flusher_thread = threading.Thread(target=_run_flusher, name="RecruitEventFlusher", daemon=True)
+        _flusher_thread.start()
+
+
+def stop_recruit_event_flusher(timeout: float = 5.0) -> None:
+    """停止埋点写入线程（写完当前批次后退出，未确认的条目留在事件流中由其他进程认领）."""
+    global _flusher_thread
+    with _flusher_lock:
+        thread, _flusher_thread = _flusher_thread, None
+    if thread is None:
+        return
+    _stop.set()
+    thread.join(timeout)
+
+
+def _run_flusher() -> None:
+    """写入线程主循环：有积压时连续写入，否则每个写入间隔写入一批."""
+    logger.info("招募埋点写入线程已启动")
+    consumer = _consumer_name()
+    interval_seconds = settings.recruit_event_flush_interval_ms / 1000
+    while not _stop.is_set():
+        try:
+            written = flush_recruit_events(consumer)
+        except Exception:
+            logger.exception("招募埋点写入异常")
+            written = 0
+        if written < settings.recruit_event_flush_batch_size:
+            # 未满一批：等待一个间隔攒批（Redis 不可用时同样退避）
+            _stop.wait(interval_seconds)
+
+
+def _max_pending_seconds() -> float:
+    """进入事件在事件流中的最长滞留时间（认领间隔 × 最大投递次数）."""
+    return settings.recruit_event_reclaim_idle_seconds * settings.recruit_event_max_deliveries
+
+
+def _retry_delay_ms(retries: int) -> int:
+    """目标访问记录不存在的事件第 ``retries`` 次重试前的等待时间（指数退避，上限为认领间隔）."""
+    interval_ms = settings.recruit_event_flush_interval_ms
+    max_delay_ms = int(settings.recruit_event_reclaim_idle_seconds * 1000)
+    return min(interval_ms * 2 ** min(retries, 20), max(interval_ms, max_delay_ms))
+
+
+def _promote_delayed(redis_client: Any) -> None:
+    """将延迟队列中到期的事件移回事件流（多个写入线程并发移动时最多重复投递，由幂等写入吸收）."""
+    due = redis_client.zrangebyscore(
+        _DELAYED_KEY, "-inf", int(time.time() * 1000), start=0, num=settings.recruit_event_flush_batch_size
+    )
+    if not due:
+        return
+    pipe = redis_client.pipeline()
+    for member in due:
+        pipe.xadd(_STREAM_KEY, json.loads(member))
+    pipe.zrem(_DELAYED_KEY, *due)
+    pipe.execute()
+
+
+def _consumer_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _ensure_group(redis_client: Any) -> None:
+    """创建消费组（已存在时忽略）."""
+    global _group_ready
+    if _group_ready:
+        return
+    try:
+        redis_client.xgroup_create(_STREAM_KEY, _GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+    _group_ready = True
+
+
+def _reclaim(redis_client: Any, consumer: str) -> list[tuple[bytes, dict[bytes, bytes]]]:
+    """认领空闲超时的待确认条目（写库失败或消费进程已退出），投递次数超限的条目丢弃."""
+    idle_ms = int(settings.recruit_event_reclaim_idle_seconds * 1000)
+    pending = redis_client.xpending_range(
+        _STREAM_KEY, _GROUP, min="-", max="+", count=settings.recruit_event_flush_batch_size, idle=idle_ms
+    )
+    if not pending:
+        return []
+    dead = [item["message_id"] for item in pending if item["times_delivered"] >= settings.recruit_event_max_deliveries]
+    if dead:
+        logger.error("埋点事件投递次数超限，丢弃 %d 条: %s", len(dead), dead)
+        redis_client.xack(_STREAM_KEY, _GROUP, *dead)
+        redis_client.xdel(_STREAM_KEY, *dead)
+    retry = [item["message_id"] for item in pending if item["message_id"] not in dead]
+    if not retry:
+        return []
+    claimed = redis_client.xclaim(_STREAM_KEY, _GROUP, consumer, idle_ms, retry)
+    # 已被 XDEL 的条目认领结果为空字段，直接确认
+    gone = [entry_id for entry_id, fields in claimed if not fields]
+    if gone:
+        redis_client.xack(_STREAM_KEY, _GROUP, *gone)
+    return [(entry_id, fields) for entry_id, fields in claimed if fields]
+
+
+__all__ = [
+    "DEEP_VIEW_MIN_MS",
+    "EVENT_SHARE",
+    "EVENT_VISIT",
+    "EVENT_VISIT_AUTHED",
+    "EVENT_VISIT_EXIT",
+    "derive_event_id",
+    "enqueue_recruit_event",
+    "flush_recruit_events",
+    "is_pending_recruit_visit",
+    "resolve_deep_view",
+    "start_recruit_event_flusher",
+    "stop_recruit_event_flusher",
+    "write_recruit_events",
+]
@@ -1,17 +1,30 @@
-"""招募活动小程序码生成与短码解析服务."""
+"""招募活动小程序码生成与短码解析服务.
+
+小程序码图片按短码缓存在存储后端（``recruit/qrcodes/{code}.png``，存储键记录在
+``recruit_qr_scenes.image_key``）：同一（活动, 员工）只在首次生成时调用微信接口，
+之后直接读取存储，并通过 ``/public/recruit/qr/{code}/image`` 以可缓存的 URL 提供。
+批量生成在线程池中并发执行，微信接口调用按 ``settings.recruit_qrcode_rate_per_second`` 进程内限速。
+"""
 
 import base64
 import logging
 import secrets
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from db import SessionLocal
 from models.recruit import RecruitCampaign, RecruitCampaignStatus
 from models.recruit.recruit import RecruitQRScene
-from services.system.exceptions import ResourceNotFoundError, ValidationError
+from services.system.exceptions import ResourceNotFoundError, ServiceException, ValidationError
 from services.system.wechat import WeChatAuthService
+from settings import settings
+from utils.image_download import store_image_bytes
+from utils.storage import get_storage_backend
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +32,82 @@ _MAX_RETRY = 5
 _CODE_LENGTH = 8
 _QR_PAGE = "pages/recruit/detail/index"
 
+# 小程序码图片存储键前缀
+_IMAGE_KEY_PREFIX = "recruit/qrcodes"
+
+
+class _IntervalRateLimiter:
+    """进程内调用间隔限速器：相邻两次放行至少间隔 ``1 / rate`` 秒（线程安全）."""
+
+    def __init__(self, rate_per_second: float) -> None:
+        self._interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """阻塞至获得下一个调用时隙."""
+        if self._interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_at)
+            self._next_at = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_wechat_rate_limiter: _IntervalRateLimiter | None = None
+_wechat_rate_limiter_lock = threading.Lock()
+
+_qrcode_executor: ThreadPoolExecutor | None = None
+_qrcode_executor_lock = threading.Lock()
+
+
+def _get_wechat_rate_limiter() -> _IntervalRateLimiter:
+    """微信小程序码接口限速器（单例）."""
+    global _wechat_rate_limiter
+    if _wechat_rate_limiter is not None:
+        return _wechat_rate_limiter
+    with _wechat_rate_limiter_lock:
+        if _wechat_rate_limiter is None:
+            _wechat_rate_limiter = _IntervalRateLimiter(settings.recruit_qrcode_rate_per_second)
+        return _wechat_rate_limiter
+
+
+def _get_qrcode_executor() -> ThreadPoolExecutor:
+    """批量生成小程序码线程池单例（大小取 ``settings.recruit_qrcode_concurrency``）."""
+    global _qrcode_executor
+    if _qrcode_executor is not None:
+        return _qrcode_executor
+    with _qrcode_executor_lock:
+        if _qrcode_executor is None:
+            _qrcode_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.recruit_qrcode_concurrency),
+                thread_name_prefix="RecruitQRCode",
+            )
+        return _qrcode_executor
+
+
+def qrcode_image_url(code: str) -> str:
+    """短码对应的小程序码图片 URL（公开接口，带 HTTP 缓存头）."""
+    return f"{settings.api_prefix}/v1/public/recruit/qr/{code}/image"
+
+
+def _bulk_generate_one(campaign_id: str, employee_id: str) -> dict[str, str]:
+    """在独立 Session 中为单个员工生成（或复用）小程序码.
+
+    失败时返回 ``{employee_id, reason}``（不抛出），由调用方归入失败列表。
+    """
+    try:
+        with SessionLocal() as db:
+            scene = RecruitQRCodeService(db).ensure_cached(campaign_id, employee_id)
+            return {"employee_id": employee_id, "code": scene.code, "image_url": qrcode_image_url(scene.code)}
+    except ServiceException as e:
+        return {"employee_id": employee_id, "reason": e.message}
+    except Exception:
+        logger.exception("批量生成小程序码失败: campaign=%s, employee=%s", campaign_id, employee_id)
+        return {"employee_id": employee_id, "reason": "小程序码生成失败"}
+
 
 class RecruitQRCodeService:
     """招募活动小程序码服务."""
@@ -29,86 +118,95 @@ class RecruitQRCodeService:
     def generate(self, campaign_id: str, employee_id: str | None = None) -> dict[str, str]:
         """生成活动小程序码.
 
-        同一（campaign_id, employee_id）组合复用已有短码。
-        校验活动存在且启用，微信接口生成小程序码图片返回 base64。
+        同一（campaign_id, employee_id）组合复用已有短码与已缓存的图片，
+        仅首次生成时调用微信接口。校验活动存在且启用。
 
         Args:
             campaign_id: 活动ID
             employee_id: 归属员工ID（可选）
 
         Returns:
-            {code: 短码, image_base64: 图片 base64}
+            {code: 短码, image_url: 图片 URL, image_base64: 图片 base64}
 
         Raises:
             ResourceNotFoundError: 活动不存在
             ValidationError: 活动已停用 或 微信接口失败
 
         """
-        # 校验活动存在且启用
-        campaign = self.db.query(RecruitCampaign).filter(RecruitCampaign.id == campaign_id).first()
-        if campaign is None:
-            msg = "招募活动不存在"
+        self._get_enabled_campaign(campaign_id, "招募活动已停用，无法生成小程序码")
+        scene = self._ensure_scene(campaign_id, employee_id)
+        image_bytes = self._ensure_image(scene)
+        image_base64 = base64.b64encode(image_bytes).decode("utf-8")
+
+        return {"code": scene.code, "image_url": qrcode_image_url(scene.code), "image_base64": image_base64}
+
+    def bulk_generate(self, campaign_id: str, employee_ids: list[str]) -> dict[str, list[dict[str, str]]]:
+        """为多个员工批量生成活动小程序码.
+
+        各员工在线程池中并发生成（独立 Session），已缓存图片的员工不调用微信接口；
+        微信接口调用按 ``settings.recruit_qrcode_rate_per_second`` 限速。
+        单个员工失败不影响其余员工，失败原因在 failures 中返回。
+
+        Args:
+            campaign_id: 活动ID
+            employee_ids: 归属员工ID列表（重复ID只生成一次）
+
+        Returns:
+            {items: [{employee_id, code, image_url}], failures: [{employee_id, reason}]}
+
+        Raises:
+            ResourceNotFoundError: 活动不存在
+            ValidationError: 活动已停用
+
+        """
+        self._get_enabled_campaign(campaign_id, "招募活动已停用，无法生成小程序码")
+        executor = _get_qrcode_executor()
+        futures = [
+            executor.submit(_bulk_generate_one, campaign_id, employee_id) for employee_id in dict.fromkeys(employee_ids)
+        ]
+
+        items: list[dict[str, str]] = []
+        failures: list[dict[str, str]] = []
+        for future in futures:
+            result = future.result()
+            (failures if "reason" in result else items).append(result)
+        return {"items": items, "failures": failures}
+
+    def ensure_cached(self, campaign_id: str, employee_id: str | None) -> RecruitQRScene:
+        """确保（campaign_id, employee_id）组合的短码与小程序码图片均已生成（不校验活动状态）."""
+        scene = self._ensure_scene(campaign_id, employee_id)
+        self._ensure_image(scene)
+        return scene
+
+    def get_image_scene(self, code: str) -> RecruitQRScene:
+        """按短码获取可提供图片的短码记录（校验短码存在且活动启用）.
+
+        Args:
+            code: 8位短码
+
+        Returns:
+            短码记录
+
+        Raises:
+            ResourceNotFoundError: 短码或活动不存在
+            ValidationError: 活动已停用
+
+        """
+        scene = self.db.query(RecruitQRScene).filter(RecruitQRScene.code == code).first()
+        if scene is None:
+            msg = "短码无效"
             raise ResourceNotFoundError(msg)
-        if campaign.status != RecruitCampaignStatus.ENABLED:
-            msg = "招募活动已停用，无法生成小程序码"
-            raise ValidationError(msg)
+        self._get_enabled_campaign(scene.campaign_id, "招募活动已停用")
+        return scene
 
-        # 复用已有短码
-        existing = (
-            self.db.query(RecruitQRScene)
-            .filter(
-                RecruitQRScene.campaign_id == campaign_id,
-                RecruitQRScene.employee_id == employee_id,
-            )
-            .first()
-        )
-        if existing is not None:
-            code = existing.code
-        else:
-            # 预检查与插入非原子：并发同组合 / 随机撞码时靠唯一索引兜底，
-            # 捕获 IntegrityError 后复用已有记录或换码重试，而非向用户抛冲突
-            for _attempt in range(_MAX_RETRY):
-                code = self._generate_unique_code()
-                scene = RecruitQRScene(
-                    id=str(uuid.uuid4()),
-                    code=code,
-                    campaign_id=campaign_id,
-                    employee_id=employee_id,
-                )
-                self.db.add(scene)
-                try:
-                    self.db.commit()
-                    self.db.refresh(scene)
-                except IntegrityError:
-                    self.db.rollback()
-                    # 并发下同 (campaign_id, employee_id) 已被插入：复用已有短码
-                    concurrent = (
-                        self.db.query(RecruitQRScene)
-                        .filter(
-                            RecruitQRScene.campaign_id == campaign_id,
-                            RecruitQRScene.employee_id == employee_id,
-                        )
-                        .first()
-                    )
-                    if concurrent is not None:
-                        code = concurrent.code
-                        break
-                    # 否则为短码撞码（同 code 已被其它组合占用）：换码重试
-                    continue
-                except Exception:
-                    self.db.rollback()
-                    raise
-                break
-            else:
-                msg = "短码冲突，请重试"
-                raise ValidationError(msg)
-
-        # 调微信接口生成小程序码
-        scene_param = f"code={code}"
-        image_bytes = WeChatAuthService.fetch_miniapp_unlimited_qrcode(scene_param, _QR_PAGE)
-        image_base64 = base64.b64encode(image_bytes).decode("utf-8")
+    def get_image(self, scene: RecruitQRScene) -> bytes:
+        """获取短码记录的小程序码图片 PNG（未缓存时生成并缓存）.
 
-        return {"code": code, "image_base64": image_base64}
+        Raises:
+            ValidationError: 微信接口失败
+
+        """
+        return self._ensure_image(scene)
 
     def resolve(self, code: str) -> dict[str, str | None]:
         """解析短码获取活动ID与来源员工ID.
@@ -140,6 +238,89 @@ class RecruitQRCodeService:
 
         return {"campaign_id": scene.campaign_id, "referrer": scene.employee_id}
 
+    def _get_enabled_campaign(self, campaign_id: str, disabled_message: str) -> RecruitCampaign:
+        """校验活动存在且启用."""
+        campaign = self.db.query(RecruitCampaign).filter(RecruitCampaign.id == campaign_id).first()
+        if campaign is None:
+            msg = "招募活动不存在"
+            raise ResourceNotFoundError(msg)
+        if campaign.status != RecruitCampaignStatus.ENABLED:
+            raise ValidationError(disabled_message)
+        return campaign
+
+    def _find_scene(self, campaign_id: str, employee_id: str | None) -> RecruitQRScene | None:
+        return (
+            self.db.query(RecruitQRScene)
+            .filter(
+                RecruitQRScene.campaign_id == campaign_id,
+                RecruitQRScene.employee_id == employee_id,
+            )
+            .first()
+        )
+
+    def _ensure_scene(self, campaign_id: str, employee_id: str | None) -> RecruitQRScene:
+        """获取（campaign_id, employee_id）组合的短码记录，不存在时创建."""
+        existing = self._find_scene(campaign_id, employee_id)
+        if existing is not None:
+            return existing
+
+        # 预检查与插入非原子：并发同组合 / 随机撞码时靠唯一索引兜底，
+        # 捕获 IntegrityError 后复用已有记录或换码重试，而非向用户抛冲突
+        for _attempt in range(_MAX_RETRY):
+            scene = RecruitQRScene(
+                id=str(uuid.uuid4()),
+                code=self._generate_unique_code(),
+                campaign_id=campaign_id,
+                employee_id=employee_id,
+            )
+            self.db.add(scene)
+            try:
+                self.db.commit()
+                self.db.refresh(scene)
+            except IntegrityError:
+                self.db.rollback()
+                # 并发下同 (campaign_id, employee_id) 已被插入：复用已有短码
+                concurrent = self._find_scene(campaign_id, employee_id)
+                if concurrent is not None:
+                    return concurrent
+                # 否则为短码撞码（同 code 已被其它组合占用）：换码重试
+                continue
+            except Exception:
+                self.db.rollback()
+                raise
+            return scene
+        msg = "短码冲突，请重试"
+        raise ValidationError(msg)
+
+    def _ensure_image(self, scene: RecruitQRScene) -> bytes:
+        """读取短码的小程序码图片，未缓存（或存储文件已丢失）时调用微信接口生成并写入存储."""
+        storage = get_storage_backend()
+        if scene.image_key:
+            cached = storage.read_file(scene.image_key)
+            if cached is not None:
+                return cached
+            logger.warning("小程序码图片缓存丢失，重新生成: %s", scene.image_key)
+
+        # 调微信接口生成小程序码（进程内限速，避免批量生成时触发微信频率限制）
+        _get_wechat_rate_limiter().acquire()
+        image_bytes = WeChatAuthService.fetch_miniapp_unlimited_qrcode(f"code={scene.code}", _QR_PAGE)
+
+        # 存储键由短码决定：并发生成同一短码时重复上传只会覆盖为等价图片
+        key = f"{_IMAGE_KEY_PREFIX}/{scene.code}.png"
+        try:
+            store_image_bytes(image_bytes, key, with_thumbnail=False)
+        except Exception:
+            # 缓存写入失败不影响本次返回，下次请求重新生成
+            logger.warning("保存小程序码图片失败: %s", key, exc_info=True)
+            return image_bytes
+        scene.image_key = key
+        try:
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return image_bytes
+
     def _generate_unique_code(self) -> str:
         """生成 8 位安全随机码（冲突重试）."""
         for _attempt in range(_MAX_RETRY):
@@ -10,19 +10,25 @@
 - 多商圈对比 (2-5 个商圈)
 
 设计要点:
-- SQL 优先: 聚合在数据库层完成 (func.count / func.avg / func.mode / date_trunc / FILTER)
+- SQL 优先: 聚合在数据库层完成 (func.count / func.avg / date_trunc / FILTER)
+- 数据源: 默认读取 market_stats_rollups 汇总表 (见 stats_source), 价格分段相关统计扫描明细表
 - 同步 SQLAlchemy Session (def 而非 async def)
-- @cached_report() 装饰 5 分钟内存缓存
-- 内部 _impl 函数支持可选 community_id 过滤 (供 get_community_detail 复用, 避免重复实现)
+- @cached_report(tags=...) 装饰 5 分钟缓存, 按筛选范围的标签代数失效 (见 cache_tags)
+- 内部 _impl 函数支持可选 community_id 过滤; get_community_detail 以 GROUPING SETS 合并各面板查询,
+  结果与逐个调用 _impl 一致 (见 scripts/benchmark_community_detail)
 
 参考 spec §6-§17 / frontend mock-analytics.ts.
 """
 
+import threading
 from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone
 from typing import Any, Literal
 
-from sqlalchemy import Select, case, func, or_, select
+from sqlalchemy import Select, case, func, or_, select, tuple_
 from sqlalchemy.orm import Session
 from sqlalchemy.sql.elements import ColumnElement
 
@@ -40,17 +46,29 @@ from schemas.reports.market import (
     KpiData,
     TrendDataPoint,
 )
-from services.reports.bucketing import compute_price_buckets
+from services.reports.bucketing import (
+    build_price_buckets,
+    compute_price_bounds,
+    compute_price_buckets,
+    price_bucket_case,
+)
 from services.reports.cache import cached_report
+from services.reports.cache_tags import comparison_scope, filter_scope
 from services.reports.filter_builder import (
     _UNCATEGORIZED,
     apply_reports_filter,
+    end_of_utc_day,
     get_granularity,
     get_range_bounds,
 )
-
-# 单位换算: 万 -> 元
-_WAN_TO_YUAN = 10000
+from services.reports.stats_source import (
+    RAW_SOURCE,
+    StatsSource,
+    get_stats_source,
+    unit_price_expr,
+    utc_date_trunc,
+    valid_area_expr,
+)
 
 # 户型阈值: >= 此值合并为 "4室+"
 _ROOMS_PLUS_THRESHOLD = 4
@@ -180,22 +198,6 @@ def _safe_qoq(
     return _qoq_ratio(current, previous)
 
 
-def _unit_price_expr() -> ColumnElement:
-    """单价表达式: sold_price_wan * 10000 / build_area (仅 build_area > 0 且 sold_price_wan 非空时计算).
-
-    Returns:
-        ColumnElement: SQLAlchemy CASE 表达式; 不满足条件时返回 None
-
-    """
-    return case(
-        (
-            (PropertyCurrent.build_area > 0) & (PropertyCurrent.sold_price_wan.isnot(None)),
-            PropertyCurrent.sold_price_wan * _WAN_TO_YUAN / PropertyCurrent.build_area,
-        ),
-        else_=None,
-    )
-
-
 def _get_previous_bounds(range_start: datetime, now: datetime) -> tuple[datetime, datetime]:
     """返回上期时间窗口 (range_start - window, range_start).
 
@@ -271,22 +273,72 @@ def _generate_periods(
     return periods
 
 
-def _apply_optional_community(query: Select, community_id: str | None) -> Select:
+def _apply_optional_community(
+    query: Select,
+    community_id: str | None,
+    source: StatsSource = RAW_SOURCE,
+) -> Select:
     """可选地添加 community_id 精确过滤.
 
     Args:
         query: SQLAlchemy Select
         community_id: 小区 ID (UUID 字符串); None 时不过滤
+        source: 统计数据源 (明细表/汇总表)
 
     Returns:
         Select: 应用过滤后的查询
 
     """
     if community_id is not None:
-        return query.where(PropertyCurrent.community_id == community_id)
+        return query.where(source.model.community_id == community_id)
     return query
 
 
+def _weighted_modes(rows: Iterable[tuple[Any, Any, Any]]) -> dict[Any, Any]:
+    """按 (分组键, 取值, 套数) 行求各分组众数.
+
+    与 PostgreSQL ``MODE() WITHIN GROUP (ORDER BY value ASC)`` 口径一致:
+    忽略 NULL 取值, 套数并列时取较小值. 汇总表一行代表多套房源, 无法直接使用 MODE().
+    """
+    best: dict[Any, tuple[Any, int]] = {}
+    for key, value, weight in rows:
+        if value is None:
+            continue
+        count = int(weight or 0)
+        current = best.get(key)
+        if current is None or count > current[1] or (count == current[1] and value < current[0]):
+            best[key] = (value, count)
+    return {key: value for key, (value, _) in best.items()}
+
+
+def _layout_label(rooms: int, halls: int | None) -> str:
+    """户型标签 (与 SQL concat(rooms, '室', halls, '厅') 一致, halls 为 NULL 时省略)."""
+    return f"{rooms}室{halls if halls is not None else ''}厅"
+
+
+def _rooms_label(rooms: int) -> str:
+    """户型桶标签: rooms < 4 → "N室", rooms >= 4 → "4室+"."""
+    return f"{rooms}室" if rooms < _ROOMS_PLUS_THRESHOLD else "4室+"
+
+
+def _dim_stats(volume: Any, avg_unit_price: Any) -> dict[str, int | float | None]:
+    """趋势维度下钻单元格 {volume, avg_unit_price}."""
+    return {
+        "volume": int(volume or 0),
+        "avg_unit_price": float(avg_unit_price) if avg_unit_price is not None else None,
+    }
+
+
+def _distribution_bucket(label: str, count: Any, avg_area: Any, avg_unit_price: Any) -> DistributionBucket:
+    """户型/楼层分布桶."""
+    return DistributionBucket(
+        label=label,
+        count=int(count or 0),
+        avg_area=float(avg_area) if avg_area is not None else None,
+        avg_unit_price=float(avg_unit_price) if avg_unit_price is not None else None,
+    )
+
+
 def _base_filter_no_status(filter: ReportsFilter) -> ReportsFilter:
     """克隆 filter 并清除 status, 供 KPI/Trend 等多状态聚合使用.
 
@@ -304,6 +356,48 @@ def _base_filter_for_comparison(filter: ReportsFilter) -> ReportsFilter:
     return filter.model_copy(update={"business_circles": [], "status": None})
 
 
+class SharedReferenceDate:
+    """多个面板共用的时间窗口基准 (批量面板查询, 见 services.reports.panels).
+
+    首个需要基准日期的面板 (缓存未命中) 查询一次 MAX(sold_date), 其余面板复用; 全部面板命中
+    缓存时不查询. 只替代相同筛选 (清除 status 后) 且不限小区的基准查询, 结果与各面板自行查询一致.
+    """
+
+    def __init__(self, filter: ReportsFilter) -> None:
+        """初始化共享基准.
+
+        Args:
+            filter: 批量面板共用的报表筛选参数
+
+        """
+        self.base_filter = _base_filter_no_status(filter)
+        self.value: datetime | None = None
+        self._lock = threading.Lock()
+
+    def resolve(self, compute: Callable[[], datetime]) -> datetime:
+        """返回基准日期, 尚未计算时调用 compute 计算 (并发调用只计算一次)."""
+        with self._lock:
+            if self.value is None:
+                self.value = compute()
+            return self.value
+
+
+# 当前上下文 (面板线程) 使用的共享时间窗口基准
+_shared_reference_date: ContextVar[SharedReferenceDate | None] = ContextVar(
+    "reports_shared_reference_date", default=None
+)
+
+
+@contextmanager
+def using_reference_date(shared: SharedReferenceDate) -> Iterator[None]:
+    """上下文内的报表查询 (相同筛选、不限小区) 使用共享的时间窗口基准."""
+    token = _shared_reference_date.set(shared)
+    try:
+        yield
+    finally:
+        _shared_reference_date.reset(token)
+
+
 def _get_data_reference_date(
     db: Session,
     base_filter: ReportsFilter,
@@ -321,21 +415,28 @@ def _get_data_reference_date(
         community_id: 可选小区ID精确过滤 (供 community detail 复用)
 
     Returns:
-        datetime: 数据最新 sold_date (tz-aware UTC); 无数据时回退到 now(UTC)
+        datetime: 数据最新 sold_date 所在 UTC 日的结束时刻; 无数据时基于 now(UTC)
 
     """
-    query = select(func.max(PropertyCurrent.sold_date)).where(
-        PropertyCurrent.status == PropertyStatus.SOLD,
-        PropertyCurrent.sold_date.isnot(None),
+    shared = _shared_reference_date.get()
+    if shared is not None and community_id is None and base_filter == shared.base_filter:
+        return shared.resolve(lambda: _query_data_reference_date(db, base_filter, None))
+    return _query_data_reference_date(db, base_filter, community_id)
+
+
+def _query_data_reference_date(db: Session, base_filter: ReportsFilter, community_id: str | None) -> datetime:
+    """查询 MAX(sold_date) 作为时间窗口基准 (见 _get_data_reference_date)."""
+    source = get_stats_source()
+    model = source.model
+    query = select(func.max(model.sold_date)).where(
+        model.status == PropertyStatus.SOLD,
+        model.sold_date.isnot(None),
     )
-    query = apply_reports_filter(query, base_filter, include_time_window=False)
-    query = _apply_optional_community(query, community_id)
+    query = apply_reports_filter(query, base_filter, include_time_window=False, source=source)
+    query = _apply_optional_community(query, community_id, source)
     last_sold = db.execute(query).scalar()
-    if last_sold is not None:
-        if last_sold.tzinfo is None:
-            return last_sold.replace(tzinfo=timezone.utc)
-        return last_sold.astimezone(timezone.utc)
-    return datetime.now(timezone.utc)
+    # 明细表为成交时间、汇总表为 UTC 成交日零点：统一对齐到最新成交日（UTC）结束，两种数据源基准一致
+    return end_of_utc_day(last_sold if last_sold is not None else datetime.now(timezone.utc))
 
 
 # ─── KPI 聚合 ──────────────────────────────────────────────────────────────
@@ -347,7 +448,7 @@ def _get_kpi_data_impl(
     community_id: str | None = None,
     reference_date: datetime | None = None,
 ) -> KpiData:
-    """KPI 实现层, 可选 community_id 过滤 (供 get_community_detail 复用).
+    """KPI 实现层, 可选 community_id 过滤 (小区维度).
 
     - 本期/上期同等时间窗口对比
     - 上期样本 < 3 或上期值为 0 → qoq=null, qoq_direction="unknown"
@@ -362,52 +463,60 @@ def _get_kpi_data_impl(
     range_start, now = get_range_bounds(filter.range, reference_date)
     prev_start, _ = _get_previous_bounds(range_start, now)
 
+    source = get_stats_source()
+    model = source.model
+
     # 本期成交聚合: COUNT(*) / AVG(sold_price_wan) / AVG(sold_price_wan * 10000 / build_area)
     current_query = select(
-        func.count().label("sold_count"),
-        func.avg(PropertyCurrent.sold_price_wan).label("avg_price_wan"),
-        func.avg(_unit_price_expr()).label("avg_unit_price"),
+        source.count().label("sold_count"),
+        source.avg_price().label("avg_price_wan"),
+        source.avg_unit_price().label("avg_unit_price"),
     ).where(
-        PropertyCurrent.status == PropertyStatus.SOLD,
-        PropertyCurrent.sold_date >= range_start,
-        PropertyCurrent.sold_date <= now,
+        model.status == PropertyStatus.SOLD,
+        model.sold_date >= range_start,
+        model.sold_date <= now,
     )
-    current_query = apply_reports_filter(current_query, base_filter, include_time_window=False)
-    current_query = _apply_optional_community(current_query, community_id)
+    current_query = apply_reports_filter(current_query, base_filter, include_time_window=False, source=source)
+    current_query = _apply_optional_community(current_query, community_id, source)
     current = db.execute(current_query).one()
 
     # 上期成交聚合 - 用于环比
     prev_query = select(
-        func.count().label("sold_count"),
-        func.avg(PropertyCurrent.sold_price_wan).label("avg_price_wan"),
-        func.avg(_unit_price_expr()).label("avg_unit_price"),
+        source.count().label("sold_count"),
+        source.avg_price().label("avg_price_wan"),
+        source.avg_unit_price().label("avg_unit_price"),
     ).where(
-        PropertyCurrent.status == PropertyStatus.SOLD,
-        PropertyCurrent.sold_date >= prev_start,
-        PropertyCurrent.sold_date < range_start,
+        model.status == PropertyStatus.SOLD,
+        model.sold_date >= prev_start,
+        model.sold_date < range_start,
     )
-    prev_query = apply_reports_filter(prev_query, base_filter, include_time_window=False)
-    prev_query = _apply_optional_community(prev_query, community_id)
+    prev_query = apply_reports_filter(prev_query, base_filter, include_time_window=False, source=source)
+    prev_query = _apply_optional_community(prev_query, community_id, source)
     prev = db.execute(prev_query).one()
 
     # 在售统计 - 无时间窗口
     on_sale_query = select(
-        func.count().label("on_sale_count"),
+        source.count().label("on_sale_count"),
     ).where(
-        PropertyCurrent.status == PropertyStatus.FOR_SALE,
+        model.status == PropertyStatus.FOR_SALE,
     )
-    on_sale_query = apply_reports_filter(on_sale_query, base_filter, include_time_window=False)
-    on_sale_query = _apply_optional_community(on_sale_query, community_id)
+    on_sale_query = apply_reports_filter(on_sale_query, base_filter, include_time_window=False, source=source)
+    on_sale_query = _apply_optional_community(on_sale_query, community_id, source)
     on_sale = db.execute(on_sale_query).one()
 
+    return _build_kpi_data(current, prev, on_sale.on_sale_count)
+
+
+def _build_kpi_data(current: Sequence[Any], prev: Sequence[Any], on_sale_count: Any) -> KpiData:
+    """由本期/上期成交聚合 (sold_count, avg_price_wan, avg_unit_price) 与在售套数构建 KPI 4 卡片."""
     # 提取并转换类型
-    current_sold_count = int(current.sold_count or 0)
-    prev_sold_count = int(prev.sold_count or 0)
-    current_avg_price = float(current.avg_price_wan) if current.avg_price_wan is not None else None
-    prev_avg_price = float(prev.avg_price_wan) if prev.avg_price_wan is not None else None
-    current_avg_unit = float(current.avg_unit_price) if current.avg_unit_price is not None else None
-    prev_avg_unit = float(prev.avg_unit_price) if prev.avg_unit_price is not None else None
-    on_sale_count = int(on_sale.on_sale_count or 0)
+    current_sold_count = int(current[0] or 0)
+    prev_sold_count = int(prev[0] or 0)
+    current_avg_price = float(current[1]) if current[1] is not None else None
+    prev_avg_price = float(prev[1]) if prev[1] is not None else None
+    current_avg_unit = float(current[2]) if current[2] is not None else None
+    prev_avg_unit = float(prev[2]) if prev[2] is not None else None
+    on_sale_count = int(on_sale_count or 0)
 
     # 环比: 上期样本 < 3 或上期值为 0/None → null
     sold_qoq = _safe_qoq(float(current_sold_count), float(prev_sold_count), prev_sold_count)
@@ -422,7 +531,7 @@ def _get_kpi_data_impl(
     )
 
 
-@cached_report()
+@cached_report(tags=filter_scope)
 def get_kpi_data(db: Session, filter: ReportsFilter) -> KpiData:
     """KPI 4 卡片聚合: sold_count / avg_price_wan / avg_unit_price / on_sale_count.
 
@@ -471,37 +580,35 @@ def _compute_trend_dim_breakdown(
         dict[period, dict[dim_key, {volume, avg_unit_price}]]
 
     """
-    period_expr = func.date_trunc(granularity, PropertyCurrent.sold_date).label("period")
     base_filter = _base_filter_no_status(filter)
     result: dict[datetime, dict[str, dict[str, int | float | None]]] = defaultdict(dict)
+    source = get_stats_source()
+    model = source.model
+    period_expr = utc_date_trunc(granularity, model.sold_date).label("period")
 
     if trend_dim == _PRICE_TREND_ROOMS_DIM:
         # 按户型分组: rooms >= 4 合并为 "4室+"
         query = (
             select(
                 period_expr,
-                PropertyCurrent.rooms.label("dim_value"),
-                func.count().label("volume"),
-                func.avg(_unit_price_expr()).label("avg_unit_price"),
+                model.rooms.label("dim_value"),
+                source.count().label("volume"),
+                source.avg_unit_price().label("avg_unit_price"),
             )
             .where(
-                PropertyCurrent.status == PropertyStatus.SOLD,
-                PropertyCurrent.sold_date >= range_start,
-                PropertyCurrent.sold_date <= now,
-                PropertyCurrent.sold_date.isnot(None),
-                PropertyCurrent.rooms.isnot(None),
+                model.status == PropertyStatus.SOLD,
+                model.sold_date >= range_start,
+                model.sold_date <= now,
+                model.sold_date.isnot(None),
+                model.rooms.isnot(None),
             )
-            .group_by(period_expr, PropertyCurrent.rooms)
+            .group_by(period_expr, model.rooms)
         )
-        query = apply_reports_filter(query, base_filter, include_time_window=False)
-        query = _apply_optional_community(query, community_id)
+        query = apply_reports_filter(query, base_filter, include_time_window=False, source=source)
+        query = _apply_optional_community(query, community_id, source)
         for row in db.execute(query).all():
-            rooms_val = int(row.dim_value)
-            key = f"{rooms_val}室" if rooms_val < _ROOMS_PLUS_THRESHOLD else "4室+"
-            result[_normalize_period(row.period)][key] = {
-                "volume": int(row.volume or 0),
-                "avg_unit_price": float(row.avg_unit_price) if row.avg_unit_price is not None else None,
-            }
+            key = _rooms_label(int(row.dim_value))
+            result[_normalize_period(row.period)][key] = _dim_stats(row.volume, row.avg_unit_price)
         return result
 
     if trend_dim == _PRICE_TREND_FLOOR_DIM:
@@ -509,62 +616,38 @@ def _compute_trend_dim_breakdown(
         query = (
             select(
                 period_expr,
-                PropertyCurrent.floor_level.label("dim_value"),
-                func.count().label("volume"),
-                func.avg(_unit_price_expr()).label("avg_unit_price"),
+                model.floor_level.label("dim_value"),
+                source.count().label("volume"),
+                source.avg_unit_price().label("avg_unit_price"),
             )
             .where(
-                PropertyCurrent.status == PropertyStatus.SOLD,
-                PropertyCurrent.sold_date >= range_start,
-                PropertyCurrent.sold_date <= now,
-                PropertyCurrent.sold_date.isnot(None),
-                PropertyCurrent.floor_level.isnot(None),
+                model.status == PropertyStatus.SOLD,
+                model.sold_date >= range_start,
+                model.sold_date <= now,
+                model.sold_date.isnot(None),
+                model.floor_level.isnot(None),
             )
-            .group_by(period_expr, PropertyCurrent.floor_level)
+            .group_by(period_expr, model.floor_level)
         )
-        query = apply_reports_filter(query, base_filter, include_time_window=False)
-        query = _apply_optional_community(query, community_id)
+        query = apply_reports_filter(query, base_filter, include_time_window=False, source=source)
+        query = _apply_optional_community(query, community_id, source)
         for row in db.execute(query).all():
-            result[_normalize_period(row.period)][str(row.dim_value)] = {
-                "volume": int(row.volume or 0),
-                "avg_unit_price": float(row.avg_unit_price) if row.avg_unit_price is not None else None,
-            }
+            result[_normalize_period(row.period)][str(row.dim_value)] = _dim_stats(row.volume, row.avg_unit_price)
         return result
 
     if trend_dim == _PRICE_TREND_DIM:
         # 按价格段分组, 复用 compute_price_buckets 的等宽分段边界 (与分布图一致)
-        price_buckets = compute_price_buckets(db, filter, community_id, reference_date=reference_date)
-        # 提取 (lower, upper, label) 列表, 与 _query_buckets_by_bounds 输入格式对齐
-        # PriceBucket.lower 为 int (首部边缘桶为 0), upper 为 int | None (尾部边缘桶为 None)
-        # 通过 label 形态还原为首部边缘桶 (None, upper, label) 格式:
-        #   - label 以 "<" 开头 → 首部边缘桶
-        #   - upper 为 None → 尾部边缘桶
-        trend_bounds: list[tuple[int | None, int | None, str]] = []
-        for b in price_buckets:
-            if b.label.startswith("<"):
-                trend_bounds.append((None, b.upper, b.label))
-            elif b.upper is None:
-                trend_bounds.append((b.lower, None, b.label))
-            else:
-                trend_bounds.append((b.lower, b.upper, b.label))
-
-        whens: list[tuple[Any, int]] = []
-        for idx, (lower, upper, _) in enumerate(trend_bounds):
-            if lower is None:
-                condition = PropertyCurrent.sold_price_wan < upper
-            elif upper is None:
-                condition = PropertyCurrent.sold_price_wan >= lower
-            else:
-                condition = (PropertyCurrent.sold_price_wan >= lower) & (PropertyCurrent.sold_price_wan < upper)
-            whens.append((condition, idx))
-        bucket_expr = case(*whens, else_=None)
+        trend_bounds = compute_price_bounds(db, filter, community_id, reference_date=reference_date)
+        bucket_expr = price_bucket_case(trend_bounds)
 
+        # 价格段依赖单套成交价, 汇总表无法还原, 始终扫描明细表
+        raw_period_expr = utc_date_trunc(granularity, PropertyCurrent.sold_date).label("period")
         query = (
             select(
-                period_expr,
+                raw_period_expr,
                 bucket_expr.label("bucket_idx"),
                 func.count().label("volume"),
-                func.avg(_unit_price_expr()).label("avg_unit_price"),
+                func.avg(unit_price_expr()).label("avg_unit_price"),
             )
             .where(
                 PropertyCurrent.status == PropertyStatus.SOLD,
@@ -573,7 +656,7 @@ def _compute_trend_dim_breakdown(
                 PropertyCurrent.sold_date.isnot(None),
                 PropertyCurrent.sold_price_wan.isnot(None),
             )
-            .group_by(period_expr, bucket_expr)
+            .group_by(raw_period_expr, bucket_expr)
         )
         query = apply_reports_filter(query, base_filter, include_time_window=False)
         query = _apply_optional_community(query, community_id)
@@ -581,10 +664,7 @@ def _compute_trend_dim_breakdown(
             if row.bucket_idx is None:
                 continue
             label = trend_bounds[int(row.bucket_idx)][2]
-            result[_normalize_period(row.period)][label] = {
-                "volume": int(row.volume or 0),
-                "avg_unit_price": float(row.avg_unit_price) if row.avg_unit_price is not None else None,
-            }
+            result[_normalize_period(row.period)][label] = _dim_stats(row.volume, row.avg_unit_price)
         return result
 
     return result
@@ -597,7 +677,7 @@ def _get_trend_data_impl(
     community_id: str | None = None,
     reference_date: datetime | None = None,
 ) -> list[TrendDataPoint]:
-    """趋势实现层, 可选 community_id 过滤 (供 get_community_detail 复用)."""
+    """趋势实现层, 可选 community_id 过滤 (小区维度)."""
     granularity = get_granularity(filter.range)
     base_filter = _base_filter_no_status(filter)
     # 时间窗口基准: 数据最新 sold_date (避免显示无数据的最新周期)
@@ -605,40 +685,36 @@ def _get_trend_data_impl(
         reference_date = _get_data_reference_date(db, base_filter, community_id)
     range_start, now = get_range_bounds(filter.range, reference_date)
 
-    period_expr = func.date_trunc(granularity, PropertyCurrent.sold_date).label("period")
+    source = get_stats_source()
+    model = source.model
+    period_expr = utc_date_trunc(granularity, model.sold_date).label("period")
 
     # 1. 主聚合: 每周期 volume / avg_price_wan / avg_unit_price
     agg_query = (
         select(
             period_expr,
-            func.count().label("volume"),
-            func.avg(PropertyCurrent.sold_price_wan).label("avg_price_wan"),
-            func.avg(_unit_price_expr()).label("avg_unit_price"),
+            source.count().label("volume"),
+            source.avg_price().label("avg_price_wan"),
+            source.avg_unit_price().label("avg_unit_price"),
         )
         .where(
-            PropertyCurrent.status == PropertyStatus.SOLD,
-            PropertyCurrent.sold_date >= range_start,
-            PropertyCurrent.sold_date <= now,
-            PropertyCurrent.sold_date.isnot(None),
+            model.status == PropertyStatus.SOLD,
+            model.sold_date >= range_start,
+            model.sold_date <= now,
+            model.sold_date.isnot(None),
         )
         .group_by(period_expr)
         .order_by(period_expr)
     )
-    agg_query = apply_reports_filter(agg_query, base_filter, include_time_window=False)
-    agg_query = _apply_optional_community(agg_query, community_id)
-
-    agg_rows: dict[datetime, Any] = {_normalize_period(row.period): row for row in db.execute(agg_query).all()}
+    agg_query = apply_reports_filter(agg_query, base_filter, include_time_window=False, source=source)
+    agg_query = _apply_optional_community(agg_query, community_id, source)
 
-    # 2. 生成所有周期 (空周期补 0)
-    # 终止时间取数据中最新周期, 避免显示无数据的最新月/周
-    # (如数据更新到6月时不再显示7月 volume=0 的误导性数据点)
-    if agg_rows:
-        last_data_period = max(agg_rows.keys())
-        periods = _generate_periods(range_start, last_data_period, granularity)
-    else:
-        periods = []
+    aggregates = {
+        _normalize_period(row.period): (row.volume, row.avg_price_wan, row.avg_unit_price)
+        for row in db.execute(agg_query).all()
+    }
 
-    # 3. 计算 dim_breakdown (若需要)
+    # 计算 dim_breakdown (若需要)
     dim_data: dict[datetime, dict[str, dict[str, int | float | None]]] = {}
     if trend_dim != "overall":
         dim_data = _compute_trend_dim_breakdown(
@@ -652,18 +728,50 @@ def _get_trend_data_impl(
             reference_date=reference_date,
         )
 
-    # 4. 构造 TrendDataPoint 列表, 计算 volume_qoq / price_qoq
+    return _build_trend_points(aggregates, dim_data, range_start, granularity, trend_dim)
+
+
+def _build_trend_points(
+    aggregates: dict[datetime, tuple[Any, Any, Any]],
+    dim_data: dict[datetime, dict[str, dict[str, int | float | None]]],
+    range_start: datetime,
+    granularity: Literal["week", "month"],
+    trend_dim: str,
+) -> list[TrendDataPoint]:
+    """由各周期成交聚合 (volume, avg_price_wan, avg_unit_price) 与维度下钻构建趋势数据点.
+
+    Args:
+        aggregates: 周期 (已规范化) → 成交聚合, 仅含有成交的周期
+        dim_data: 周期 → 维度下钻 (trend_dim 为 overall 时为空)
+        range_start: 时间窗口起始
+        granularity: 粒度 ('week' / 'month')
+        trend_dim: 趋势维度
+
+    Returns:
+        list[TrendDataPoint]: 趋势数据点列表
+
+    """
+    # 1. 生成所有周期 (空周期补 0)
+    # 终止时间取数据中最新周期, 避免显示无数据的最新月/周
+    # (如数据更新到6月时不再显示7月 volume=0 的误导性数据点)
+    if aggregates:
+        last_data_period = max(aggregates.keys())
+        periods = _generate_periods(range_start, last_data_period, granularity)
+    else:
+        periods = []
+
+    # 2. 构造 TrendDataPoint 列表, 计算 volume_qoq / price_qoq
     points: list[TrendDataPoint] = []
     prev_volume: int | None = None
     prev_avg_price: float | None = None
     prev_period_existed = False
 
     for period in periods:
-        agg = agg_rows.get(period)
+        agg = aggregates.get(period)
         if agg is not None:
-            volume = int(agg.volume or 0)
-            avg_price = float(agg.avg_price_wan) if agg.avg_price_wan is not None else None
-            avg_unit = float(agg.avg_unit_price) if agg.avg_unit_price is not None else None
+            volume = int(agg[0] or 0)
+            avg_price = float(agg[1]) if agg[1] is not None else None
+            avg_unit = float(agg[2]) if agg[2] is not None else None
         else:
             volume = 0
             avg_price = None
@@ -697,7 +805,7 @@ def _get_trend_data_impl(
     return points
 
 
-@cached_report()
+@cached_report(tags=filter_scope)
 def get_trend_data(
     db: Session,
     filter: ReportsFilter,
@@ -748,7 +856,7 @@ def _get_price_distribution_impl(
     return {"buckets": buckets, "total": total}
 
 
-@cached_report()
+@cached_report(tags=filter_scope)
 def get_price_distribution(db: Session, filter: ReportsFilter) -> dict:
     """价格分布. 调用 bucketing.compute_price_buckets 或 build_fallback_buckets.
 
@@ -766,21 +874,13 @@ def get_price_distribution(db: Session, filter: ReportsFilter) -> dict:
 # ─── 户型分布 ──────────────────────────────────────────────────────────────
 
 
-def _build_area_expr() -> ColumnElement:
-    """面积表达式: 仅 build_area > 0 时返回原值, 否则 None (过滤脏数据)."""
-    return case(
-        (PropertyCurrent.build_area > 0, PropertyCurrent.build_area),
-        else_=None,
-    )
-
-
 def _get_rooms_distribution_impl(
     db: Session,
     filter: ReportsFilter,
     community_id: str | None = None,
     reference_date: datetime | None = None,
 ) -> dict:
-    """户型分布实现层, 可选 community_id 过滤 (供 get_community_detail 复用).
+    """户型分布实现层, 可选 community_id 过滤 (小区维度).
 
     - 按 PropertyCurrent.rooms 分组, rooms >= 4 合并为 "4室+"
     - 桶按 rooms 升序: 1室 → 2室 → 3室 → 4室+
@@ -792,56 +892,52 @@ def _get_rooms_distribution_impl(
     if reference_date is None:
         reference_date = _get_data_reference_date(db, base_filter, community_id)
     range_start, now = get_range_bounds(filter.range, reference_date)
+    source = get_stats_source()
+    model = source.model
 
     # 桶标签: rooms < 4 → "N室", rooms >= 4 → "4室+"
     label_expr = case(
         (
-            PropertyCurrent.rooms < _ROOMS_PLUS_THRESHOLD,
-            func.concat(PropertyCurrent.rooms, "室"),
+            model.rooms < _ROOMS_PLUS_THRESHOLD,
+            func.concat(model.rooms, "室"),
         ),
         else_="4室+",
     )
     # 排序键: rooms >= 4 合并为 _ROOMS_PLUS_THRESHOLD, 保证 4室+ 排在末尾
     sort_key_expr = case(
-        (PropertyCurrent.rooms >= _ROOMS_PLUS_THRESHOLD, _ROOMS_PLUS_THRESHOLD),
-        else_=PropertyCurrent.rooms,
+        (model.rooms >= _ROOMS_PLUS_THRESHOLD, _ROOMS_PLUS_THRESHOLD),
+        else_=model.rooms,
     )
 
     query = (
         select(
             label_expr.label("label"),
             func.min(sort_key_expr).label("sort_key"),
-            func.count().label("count"),
-            func.avg(_build_area_expr()).label("avg_area"),
-            func.avg(_unit_price_expr()).label("avg_unit_price"),
+            source.count().label("count"),
+            source.avg_valid_area().label("avg_area"),
+            source.avg_unit_price().label("avg_unit_price"),
         )
         .where(
-            PropertyCurrent.status == PropertyStatus.SOLD,
-            PropertyCurrent.sold_date.isnot(None),
-            PropertyCurrent.sold_date >= range_start,
-            PropertyCurrent.sold_date <= now,
-            PropertyCurrent.rooms.isnot(None),
+            model.status == PropertyStatus.SOLD,
+            model.sold_date.isnot(None),
+            model.sold_date >= range_start,
+            model.sold_date <= now,
+            model.rooms.isnot(None),
         )
         .group_by(label_expr)
         .order_by(func.min(sort_key_expr).asc())
     )
-    query = apply_reports_filter(query, base_filter, include_time_window=False)
-    query = _apply_optional_community(query, community_id)
+    query = apply_reports_filter(query, base_filter, include_time_window=False, source=source)
+    query = _apply_optional_community(query, community_id, source)
 
     buckets: list[DistributionBucket] = [
-        DistributionBucket(
-            label=row.label,
-            count=int(row.count or 0),
-            avg_area=float(row.avg_area) if row.avg_area is not None else None,
-            avg_unit_price=(float(row.avg_unit_price) if row.avg_unit_price is not None else None),
-        )
-        for row in db.execute(query).all()
+        _distribution_bucket(row.label, row.count, row.avg_area, row.avg_unit_price) for row in db.execute(query).all()
     ]
     total = sum(b.count for b in buckets)
     return {"buckets": buckets, "total": total}
 
 
-@cached_report()
+@cached_report(tags=filter_scope)
 def get_rooms_distribution(db: Session, filter: ReportsFilter, community_id: str | None = None) -> dict:
     """户型分布. 按 rooms 分组, >=4 室合并为 "4室+".
 
@@ -866,7 +962,7 @@ def _get_floor_distribution_impl(
     community_id: str | None = None,
     reference_date: datetime | None = None,
 ) -> dict:
-    """楼层分布实现层, 可选 community_id 过滤 (供 get_community_detail 复用).
+    """楼层分布实现层, 可选 community_id 过滤 (小区维度).
 
     - 按 PropertyCurrent.floor_level 分组 (低楼层 / 中楼层 / 高楼层)
     - 桶按 floor_level 升序: 低楼层 → 中楼层 → 高楼层 (其余取值置末)
@@ -878,51 +974,47 @@ def _get_floor_distribution_impl(
     if reference_date is None:
         reference_date = _get_data_reference_date(db, base_filter, community_id)
     range_start, now = get_range_bounds(filter.range, reference_date)
+    source = get_stats_source()
+    model = source.model
 
     # 排序键: 低楼层=1, 中楼层=2, 高楼层=3, 其余=4 (置末)
     sort_key_expr = case(
-        (PropertyCurrent.floor_level == "低楼层", _FLOOR_LOW_SORT),
-        (PropertyCurrent.floor_level == "中楼层", _FLOOR_MID_SORT),
-        (PropertyCurrent.floor_level == "高楼层", _FLOOR_HIGH_SORT),
+        (model.floor_level == "低楼层", _FLOOR_LOW_SORT),
+        (model.floor_level == "中楼层", _FLOOR_MID_SORT),
+        (model.floor_level == "高楼层", _FLOOR_HIGH_SORT),
         else_=_FLOOR_OTHER_SORT,
     )
 
     query = (
         select(
-            PropertyCurrent.floor_level.label("label"),
+            model.floor_level.label("label"),
             func.min(sort_key_expr).label("sort_key"),
-            func.count().label("count"),
-            func.avg(_build_area_expr()).label("avg_area"),
-            func.avg(_unit_price_expr()).label("avg_unit_price"),
+            source.count().label("count"),
+            source.avg_valid_area().label("avg_area"),
+            source.avg_unit_price().label("avg_unit_price"),
         )
         .where(
-            PropertyCurrent.status == PropertyStatus.SOLD,
-            PropertyCurrent.sold_date.isnot(None),
-            PropertyCurrent.sold_date >= range_start,
-            PropertyCurrent.sold_date <= now,
-            PropertyCurrent.floor_level.isnot(None),
-            PropertyCurrent.floor_level != "",
+            model.status == PropertyStatus.SOLD,
+            model.sold_date.isnot(None),
+            model.sold_date >= range_start,
+            model.sold_date <= now,
+            model.floor_level.isnot(None),
+            model.floor_level != "",
         )
-        .group_by(PropertyCurrent.floor_level)
+        .group_by(model.floor_level)
         .order_by(func.min(sort_key_expr).asc())
     )
-    query = apply_reports_filter(query, base_filter, include_time_window=False)
-    query = _apply_optional_community(query, community_id)
+    query = apply_reports_filter(query, base_filter, include_time_window=False, source=source)
+    query = _apply_optional_community(query, community_id, source)
 
     buckets: list[DistributionBucket] = [
-        DistributionBucket(
-            label=row.label,
-            count=int(row.count or 0),
-            avg_area=float(row.avg_area) if row.avg_area is not None else None,
-            avg_unit_price=(float(row.avg_unit_price) if row.avg_unit_price is not None else None),
-        )
-        for row in db.execute(query).all()
+        _distribution_bucket(row.label, row.count, row.avg_area, row.avg_unit_price) for row in db.execute(query).all()
     ]
     total = sum(b.count for b in buckets)
     return {"buckets": buckets, "total": total}
 
 
-@cached_report()
+@cached_report(tags=filter_scope)
 def get_floor_distribution(db: Session, filter: ReportsFilter, community_id: str | None = None) -> dict:
     """楼层分布. 按 floor_level 分组.
 
@@ -973,7 +1065,7 @@ def _build_bc_match_predicate(business_circles: list[str]) -> ColumnElement:
     return or_(*conditions)
 
 
-@cached_report()
+@cached_report(tags=filter_scope)
 def get_business_district_rows(
     db: Session,
     filter: ReportsFilter,
@@ -984,7 +1076,7 @@ def get_business_district_rows(
 ) -> dict:
     """商圈列表. 按 communities.business_circle 聚合.
 
-    - district 取众数 (PostgreSQL MODE() WITHIN GROUP)
+    - district 取众数 (按套数加权, 与 MODE() WITHIN GROUP 口径一致)
     - absorption_months = on_sale_count / (近3月成交套数 / 3), 分母为 0 → null
     - 支持 7 个排序字段: sold_count / avg_price_wan / avg_unit_price / on_sale_count /
       absorption_months / price_qoq / volume_qoq
@@ -1012,67 +1104,34 @@ def get_business_district_rows(
     three_months_ago = now - timedelta(days=_ABSORPTION_RECENT_DAYS)
 
     bc_expr = _build_bc_expr()
-    district_mode = func.mode().within_group(Community.district.asc())
+    source = get_stats_source()
+    model = source.model
+    is_sold = model.status == PropertyStatus.SOLD
+    in_current = is_sold & (model.sold_date >= range_start) & (model.sold_date <= now)
+    in_previous = is_sold & (model.sold_date >= prev_start) & (model.sold_date < range_start)
 
     # 主聚合: 一次取出所有需要的指标 (FILTER 子句按状态/时间窗口分别计数)
     query = (
         select(
             bc_expr,
-            district_mode.label("district"),
             # 本期成交
-            func.count()
-            .filter(
-                (PropertyCurrent.status == PropertyStatus.SOLD)
-                & (PropertyCurrent.sold_date >= range_start)
-                & (PropertyCurrent.sold_date <= now),
-            )
-            .label("sold_count"),
-            func.avg(PropertyCurrent.sold_price_wan)
-            .filter(
-                (PropertyCurrent.status == PropertyStatus.SOLD)
-                & (PropertyCurrent.sold_date >= range_start)
-                & (PropertyCurrent.sold_date <= now)
-                & (PropertyCurrent.sold_price_wan.isnot(None)),
-            )
-            .label("avg_price_wan"),
-            func.avg(_unit_price_expr())
-            .filter(
-                (PropertyCurrent.status == PropertyStatus.SOLD)
-                & (PropertyCurrent.sold_date >= range_start)
-                & (PropertyCurrent.sold_date <= now),
-            )
-            .label("avg_unit_price"),
+            source.count(in_current).label("sold_count"),
+            source.avg_price(in_current).label("avg_price_wan"),
+            source.avg_unit_price(in_current).label("avg_unit_price"),
             # 在售 - 无时间窗口
-            func.count().filter(PropertyCurrent.status == PropertyStatus.FOR_SALE).label("on_sale_count"),
+            source.count(model.status == PropertyStatus.FOR_SALE).label("on_sale_count"),
             # 近 3 月成交 - 用于去化周期
-            func.count()
-            .filter(
-                (PropertyCurrent.status == PropertyStatus.SOLD)
-                & (PropertyCurrent.sold_date >= three_months_ago)
-                & (PropertyCurrent.sold_date <= now),
-            )
-            .label("recent_3m_sold"),
+            source.count(is_sold & (model.sold_date >= three_months_ago) & (model.sold_date <= now)).label(
+                "recent_3m_sold"
+            ),
             # 上期成交 (用于 qoq)
-            func.count()
-            .filter(
-                (PropertyCurrent.status == PropertyStatus.SOLD)
-                & (PropertyCurrent.sold_date >= prev_start)
-                & (PropertyCurrent.sold_date < range_start),
-            )
-            .label("prev_sold_count"),
-            func.avg(PropertyCurrent.sold_price_wan)
-            .filter(
-                (PropertyCurrent.status == PropertyStatus.SOLD)
-                & (PropertyCurrent.sold_date >= prev_start)
-                & (PropertyCurrent.sold_date < range_start)
-                & (PropertyCurrent.sold_price_wan.isnot(None)),
-            )
-            .label("prev_avg_price_wan"),
+            source.count(in_previous).label("prev_sold_count"),
+            source.avg_price(in_previous).label("prev_avg_price_wan"),
         )
-        .select_from(PropertyCurrent)
+        .select_from(model)
         .join(
             Community,
-            PropertyCurrent.community_id == Community.id,
+            model.community_id == Community.id,
         )
         .where(
             Community.is_active.is_(True),
@@ -1081,10 +1140,30 @@ def get_business_district_rows(
     )
 
     # 已显式 JOIN Community, 关闭 auto_join_community 避免重复 JOIN
-    query = apply_reports_filter(query, base_filter, include_time_window=False, auto_join_community=False)
+    query = apply_reports_filter(
+        query, base_filter, include_time_window=False, auto_join_community=False, source=source
+    )
 
     rows = db.execute(query).all()
 
+    # district 取众数: 按 (商圈, 区域) 汇总套数后取套数最多者 (汇总行代表多套房源, 不能直接 MODE())
+    district_query = (
+        select(bc_expr, Community.district, source.count())
+        .select_from(model)
+        .join(
+            Community,
+            model.community_id == Community.id,
+        )
+        .where(
+            Community.is_active.is_(True),
+        )
+        .group_by(bc_expr, Community.district)
+    )
+    district_query = apply_reports_filter(
+        district_query, base_filter, include_time_window=False, auto_join_community=False, source=source
+    )
+    district_modes = _weighted_modes(db.execute(district_query).all())
+
     # 构造 BusinessDistrictRow
     items: list[BusinessDistrictRow] = []
     for row in rows:
@@ -1109,7 +1188,7 @@ def get_business_district_rows(
         items.append(
             BusinessDistrictRow(
                 business_circle=bc,
-                district=row.district,
+                district=district_modes.get(bc),
                 sold_count=sold_count,
                 avg_price_wan=avg_price,
                 avg_unit_price=avg_unit,
@@ -1150,7 +1229,7 @@ def get_business_district_rows(
 # ─── 小区明细列表 ──────────────────────────────────────────────────────────
 
 
-@cached_report()
+@cached_report(tags=filter_scope)
 def get_community_rows(
     db: Session,
     filter: ReportsFilter,
@@ -1158,7 +1237,7 @@ def get_community_rows(
 ) -> dict:
     """小区明细列表. 基于 filter.range + reference_date 动态时间窗口.
 
-    - main_layout 取成交占比最高的 rooms+halls 组合 (如 '3室2厅', 用 PostgreSQL MODE())
+    - main_layout 取成交占比最高的 rooms+halls 组合 (如 '3室2厅', 按套数取众数)
     - main_floor 取成交占比最高的 floor_level
     - 过滤 sold_count < min_sold_count 的小区
     - status 强制为 '成交' (小区列表天然只关心成交, 即使 filter.status='在售' 也只统计成交)
@@ -1180,38 +1259,34 @@ def get_community_rows(
     range_start, now = get_range_bounds(filter.range, reference_date)
     prev_start, _ = _get_previous_bounds(range_start, now)
 
-    # 主力户型表达式: rooms || '室' || halls || '厅'
-    layout_expr = func.concat(PropertyCurrent.rooms, "室", PropertyCurrent.halls, "厅")
-    main_layout_expr = func.mode().within_group(layout_expr.asc())
-    main_floor_expr = func.mode().within_group(PropertyCurrent.floor_level.asc())
+    source = get_stats_source()
+    model = source.model
 
     # 主查询: 时间窗口内成交按 community_id 聚合
     query = (
         select(
-            PropertyCurrent.community_id.label("community_id"),
+            model.community_id.label("community_id"),
             Community.name.label("community_name"),
             Community.business_circle.label("business_circle"),
             Community.district.label("district"),
-            func.count().label("sold_count"),
-            func.avg(PropertyCurrent.sold_price_wan).label("avg_price_wan"),
-            func.avg(_unit_price_expr()).label("avg_unit_price"),
-            func.avg(PropertyCurrent.build_area).label("avg_area"),
-            main_layout_expr.label("main_layout"),
-            main_floor_expr.label("main_floor"),
+            source.count().label("sold_count"),
+            source.avg_price().label("avg_price_wan"),
+            source.avg_unit_price().label("avg_unit_price"),
+            source.avg_area().label("avg_area"),
         )
-        .select_from(PropertyCurrent)
+        .select_from(model)
         .join(
             Community,
-            PropertyCurrent.community_id == Community.id,
+            model.community_id == Community.id,
         )
         .where(
-            PropertyCurrent.status == PropertyStatus.SOLD,
-            PropertyCurrent.sold_date >= range_start,
-            PropertyCurrent.sold_date <= now,
+            model.status == PropertyStatus.SOLD,
+            model.sold_date >= range_start,
+            model.sold_date <= now,
             Community.is_active.is_(True),
         )
         .group_by(
-            PropertyCurrent.community_id,
+            model.community_id,
             Community.name,
             Community.business_circle,
             Community.district,
@@ -1220,33 +1295,57 @@ def get_community_rows(
     # 应用 sources/rooms/floor_levels/business_circles/community_name 等过滤
     # (status 已强制为 SOLD, 通过 base_filter 清除避免重复; 时间窗口已手动追加)
     # 已显式 JOIN Community, 关闭 auto_join_community 避免重复 JOIN
-    query = apply_reports_filter(query, base_filter, include_time_window=False, auto_join_community=False)
+    query = apply_reports_filter(
+        query, base_filter, include_time_window=False, auto_join_community=False, source=source
+    )
 
     rows = db.execute(query).all()
 
-    # 上期均价查询 - 仅查询主查询涉及的小区，避免全表聚合
+    # 上期均价 / 主力户型 / 主力楼层 - 仅查询主查询涉及的小区，避免全表聚合
     community_ids = [row.community_id for row in rows]
+    main_layouts: dict[str, str] = {}
+    main_floors: dict[str, str] = {}
     if community_ids:
-        # prev_query 不 join Community, 清除 business_circles/community_name 避免依赖 Community join
+        # 以下查询不 join Community, 清除 business_circles/community_name 避免依赖 Community join
         # (community_id.in_() 已通过主查询的 community_ids 间接应用 business_circles 过滤)
         prev_filter = base_filter.model_copy(update={"business_circles": [], "community_name": None})
         prev_query = (
             select(
-                PropertyCurrent.community_id.label("community_id"),
-                func.avg(PropertyCurrent.sold_price_wan).label("prev_avg_price_wan"),
-                func.count().label("prev_sold_count"),
+                model.community_id.label("community_id"),
+                source.avg_price().label("prev_avg_price_wan"),
+                source.count().label("prev_sold_count"),
             )
             .where(
-                PropertyCurrent.status == PropertyStatus.SOLD,
-                PropertyCurrent.sold_date >= prev_start,
-                PropertyCurrent.sold_date < range_start,
-                PropertyCurrent.community_id.in_(community_ids),
+                model.status == PropertyStatus.SOLD,
+                model.sold_date >= prev_start,
+                model.sold_date < range_start,
+                model.community_id.in_(community_ids),
             )
-            .group_by(PropertyCurrent.community_id)
+            .group_by(model.community_id)
         )
         # 应用 sources/rooms/floor_levels 过滤 (与主查询保持一致, 确保 qoq 同口径)
-        prev_query = apply_reports_filter(prev_query, prev_filter, include_time_window=False)
+        prev_query = apply_reports_filter(prev_query, prev_filter, include_time_window=False, source=source)
         prev_rows = {row.community_id: row for row in db.execute(prev_query).all()}
+
+        # 主力户型 (rooms+halls 组合) / 主力楼层: 本期成交按套数取众数
+        structure_query = (
+            select(model.community_id, model.rooms, model.halls, model.floor_level, source.count().label("count"))
+            .where(
+                model.status == PropertyStatus.SOLD,
+                model.sold_date >= range_start,
+                model.sold_date <= now,
+                model.community_id.in_(community_ids),
+            )
+            .group_by(model.community_id, model.rooms, model.halls, model.floor_level)
+        )
+        structure_query = apply_reports_filter(structure_query, prev_filter, include_time_window=False, source=source)
+        layout_counts: dict[tuple[str, str], int] = defaultdict(int)
+        floor_counts: dict[tuple[str, str | None], int] = defaultdict(int)
+        for row in db.execute(structure_query).all():
+            layout_counts[(row.community_id, _layout_label(row.rooms, row.halls))] += int(row.count or 0)
+            floor_counts[(row.community_id, row.floor_level)] += int(row.count or 0)
+        main_layouts = _weighted_modes((cid, layout, n) for (cid, layout), n in layout_counts.items())
+        main_floors = _weighted_modes((cid, floor, n) for (cid, floor), n in floor_counts.items())
     else:
         prev_rows = {}
 
@@ -1273,8 +1372,8 @@ def get_community_rows(
                 sold_count=sold_count,
                 avg_price_wan=avg_price,
                 avg_unit_price=(float(row.avg_unit_price) if row.avg_unit_price is not None else None),
-                main_layout=row.main_layout,
-                main_floor=row.main_floor,
+                main_layout=main_layouts.get(row.community_id),
+                main_floor=main_floors.get(row.community_id),
                 avg_area=float(row.avg_area) if row.avg_area is not None else None,
                 price_qoq=price_qoq,
             )
@@ -1286,7 +1385,243 @@ def get_community_rows(
 # ─── 小区成交分析详情 ──────────────────────────────────────────────────────
 
 
-@cached_report()
+def _has_row_filters(filter: ReportsFilter) -> bool:
+    """筛选是否含时间范围/状态以外的条件 (来源/商圈/小区名/区域/户型/楼层)."""
+    return bool(
+        filter.sources
+        or filter.business_circles
+        or filter.community_name
+        or (filter.district and filter.district.strip())
+        or filter.rooms
+        or filter.floor_levels
+    )
+
+
+def _main_layout_query(source: StatsSource, community_id: str, now: datetime) -> Select:
+    """main_layout 统计: 近 12 月成交按 rooms+halls 分组套数 (不受报表筛选影响)."""
+    model = source.model
+    query = (
+        select(model.rooms, model.halls, source.count().label("count"))
+        .where(
+            model.status == PropertyStatus.SOLD,
+            model.sold_date >= now - timedelta(days=_COMMUNITY_LIST_DAYS),
+            model.sold_date <= now,
+            model.community_id == community_id,
+        )
+        .group_by(model.rooms, model.halls)
+    )
+    return source.where_active(query)
+
+
+def _main_layout(layout_rows: Iterable[tuple[int, int | None, Any]]) -> str | None:
+    """按 (rooms, halls, 套数) 求占比最高的户型标签, 无成交时为 None."""
+    layout_counts: dict[str, int] = defaultdict(int)
+    for rooms, halls, count in layout_rows:
+        layout_counts[_layout_label(rooms, halls)] += int(count or 0)
+    return _weighted_modes((None, layout, n) for layout, n in layout_counts.items()).get(None)
+
+
+def _query_community_panels(
+    db: Session,
+    community_id: str,
+    filter: ReportsFilter,
+    trend_dim: str,
+    reference_date: datetime,
+) -> dict[str, Any]:
+    """一次 GROUPING SETS 查询得出 KPI / 趋势 (含户型、楼层维度) / 户型分布 / 楼层分布 / main_layout.
+
+    各面板的分组对应一个 grouping set, 各自的时间窗口与状态条件写成聚合的 FILTER 子句,
+    数值与逐面板查询 (``_get_kpi_data_impl`` 等) 一致. 分组集合由 ``GROUPING()`` 区分;
+    某分组集合内 FILTER 条件下无数据的分组 (逐面板查询不会返回) 按套数为 0 跳过.
+    main_layout 不受报表筛选影响, 筛选含来源/户型等条件时由调用方单独查询.
+
+    Returns:
+        dict: kpi / trend_aggregates / trend_dims / rooms_distribution / floor_distribution / layout_rows
+
+    """
+    base_filter = _base_filter_no_status(filter)
+    with_layout = not _has_row_filters(base_filter)
+    granularity = get_granularity(filter.range)
+    range_start, now = get_range_bounds(filter.range, reference_date)
+    prev_start, _ = _get_previous_bounds(range_start, now)
+    layout_now = end_of_utc_day(datetime.now(timezone.utc))
+
+    source = get_stats_source()
+    model = source.model
+    sold = model.status == PropertyStatus.SOLD
+    in_window = sold & (model.sold_date >= range_start) & (model.sold_date <= now)
+    in_prev = sold & (model.sold_date >= prev_start) & (model.sold_date < range_start)
+    in_layout = (
+        sold & (model.sold_date >= layout_now - timedelta(days=_COMMUNITY_LIST_DAYS)) & (model.sold_date <= layout_now)
+    )
+    for_sale = model.status == PropertyStatus.FOR_SALE
+
+    period_expr = utc_date_trunc(granularity, model.sold_date)
+    rooms_key = case((model.rooms >= _ROOMS_PLUS_THRESHOLD, _ROOMS_PLUS_THRESHOLD), else_=model.rooms)
+    dim_column = {_PRICE_TREND_ROOMS_DIM: model.rooms, _PRICE_TREND_FLOOR_DIM: model.floor_level}.get(trend_dim)
+    # 各分组集合由 GROUPING() 标记区分 (0 = 该列参与分组), 仅选取参与某一分组集合的列
+    grouping_sets = [tuple_(), tuple_(period_expr), tuple_(rooms_key), tuple_(model.floor_level)]
+    columns = [
+        func.grouping(period_expr).label("g_period"),
+        func.grouping(rooms_key).label("g_rooms_key"),
+        func.grouping(model.floor_level).label("g_floor"),
+        period_expr.label("period"),
+        rooms_key.label("rooms_key"),
+        model.floor_level,
+    ]
+    if dim_column is not None:
+        grouping_sets.append(tuple_(period_expr, dim_column))
+        columns += [func.grouping(dim_column).label("g_dim"), dim_column.label("dim_value")]
+    if with_layout:
+        grouping_sets.append(tuple_(model.rooms, model.halls))
+        columns += [func.grouping(model.halls).label("g_layout"), model.rooms.label("layout_rooms"), model.halls]
+
+    query = (
+        select(
+            *columns,
+            source.count(in_window).label("count"),
+            source.avg_price(in_window).label("avg_price_wan"),
+            source.avg_unit_price(in_window).label("avg_unit_price"),
+            source.avg_valid_area(in_window).label("avg_area"),
+            source.count(in_prev).label("prev_count"),
+            source.avg_price(in_prev).label("prev_avg_price_wan"),
+            source.avg_unit_price(in_prev).label("prev_avg_unit_price"),
+            source.count(for_sale).label("on_sale_count"),
+            source.count(in_layout).label("layout_count"),
+        )
+        .where(model.community_id == community_id, or_(in_window, in_prev, in_layout, for_sale))
+        .group_by(func.grouping_sets(*grouping_sets))
+    )
+    query = apply_reports_filter(query, base_filter, include_time_window=False, source=source)
+
+    kpi = _build_kpi_data((0, None, None), (0, None, None), 0)
+    trend_aggregates: dict[datetime, tuple[Any, Any, Any]] = {}
+    trend_dims: dict[datetime, dict[str, dict[str, int | float | None]]] = defaultdict(dict)
+    rooms_buckets: list[tuple[int, DistributionBucket]] = []
+    floor_buckets: list[tuple[int, str, DistributionBucket]] = []
+    layout_rows: list[tuple[int, int | None, Any]] = []
+
+    for row in db.execute(query).all():
+        if with_layout and row.g_layout == 0:
+            # (rooms, halls): main_layout
+            if row.layout_count:
+                layout_rows.append((row.layout_rooms, row.halls, row.layout_count))
+        elif row.g_period == 0:
+            if not row.count:
+                continue
+            period = _normalize_period(row.period)
+            if dim_column is None or row.g_dim == 1:
+                trend_aggregates[period] = (row.count, row.avg_price_wan, row.avg_unit_price)
+            elif row.dim_value is not None:
+                # rooms 维度按原始 rooms 分组, >= 4 室同一标签 (与 _compute_trend_dim_breakdown 一致)
+                key = _rooms_label(int(row.dim_value)) if trend_dim == _PRICE_TREND_ROOMS_DIM else str(row.dim_value)
+                trend_dims[period][key] = _dim_stats(row.count, row.avg_unit_price)
+        elif row.g_rooms_key == 0:
+            if row.count and row.rooms_key is not None:
+                bucket = _distribution_bucket(
+                    _rooms_label(int(row.rooms_key)), row.count, row.avg_area, row.avg_unit_price
+                )
+                rooms_buckets.append((int(row.rooms_key), bucket))
+        elif row.g_floor == 0:
+            if row.count and row.floor_level:
+                bucket = _distribution_bucket(row.floor_level, row.count, row.avg_area, row.avg_unit_price)
+                floor_buckets.append((_floor_sort_key(row.floor_level), row.floor_level, bucket))
+        else:
+            # (): KPI
+            kpi = _build_kpi_data(
+                (row.count, row.avg_price_wan, row.avg_unit_price),
+                (row.prev_count, row.prev_avg_price_wan, row.prev_avg_unit_price),
+                row.on_sale_count,
+            )
+
+    rooms_distribution = [bucket for _, bucket in sorted(rooms_buckets, key=lambda item: item[0])]
+    floor_distribution = [bucket for *_, bucket in sorted(floor_buckets, key=lambda item: item[:2])]
+    return {
+        "kpi": kpi,
+        "trend_aggregates": trend_aggregates,
+        "trend_dims": trend_dims,
+        "rooms_distribution": {"buckets": rooms_distribution, "total": sum(b.count for b in rooms_distribution)},
+        "floor_distribution": {"buckets": floor_distribution, "total": sum(b.count for b in floor_distribution)},
+        "layout_rows": layout_rows if with_layout else None,
+    }
+
+
+def _floor_sort_key(floor_level: str) -> int:
+    """楼层分布排序键: 低楼层 → 中楼层 → 高楼层, 其余取值置末."""
+    return {"低楼层": _FLOOR_LOW_SORT, "中楼层": _FLOOR_MID_SORT, "高楼层": _FLOOR_HIGH_SORT}.get(
+        floor_level, _FLOOR_OTHER_SORT
+    )
+
+
+def _query_community_price_panels(
+    db: Session,
+    community_id: str,
+    filter: ReportsFilter,
+    reference_date: datetime,
+    *,
+    with_trend: bool,
+) -> tuple[dict, dict[datetime, dict[str, dict[str, int | float | None]]]]:
+    """价格分布 + (可选) 趋势价格维度: 分段边界计算一次, 两者的分段统计合并为一次查询.
+
+    价格分布与趋势价格维度使用同一组分段 (筛选条件相同, 见调用方), 趋势部分只统计成交
+    (``FILTER (WHERE status = SOLD)``), 数值与 ``_get_price_distribution_impl`` /
+    ``_compute_trend_dim_breakdown`` 一致.
+
+    Returns:
+        (价格分布 {buckets, total}, 趋势价格维度 {period: {label: {volume, avg_unit_price}}})
+
+    """
+    bounds = compute_price_bounds(db, filter, community_id, reference_date=reference_date)
+    bucket_expr = price_bucket_case(bounds)
+    range_start, now = get_range_bounds(filter.range, reference_date)
+    period_expr = utc_date_trunc(get_granularity(filter.range), PropertyCurrent.sold_date)
+    sold = PropertyCurrent.status == PropertyStatus.SOLD
+    grouping_sets = [tuple_(bucket_expr)]
+    trend_columns = []
+    if with_trend:
+        grouping_sets.append(tuple_(period_expr, bucket_expr))
+        trend_columns = [func.grouping(period_expr).label("g_period"), period_expr.label("period")]
+
+    query = (
+        select(
+            *trend_columns,
+            bucket_expr.label("bucket_idx"),
+            func.count().label("count"),
+            func.avg(valid_area_expr()).label("avg_area"),
+            func.avg(unit_price_expr()).label("avg_unit_price"),
+            func.count().filter(sold).label("sold_count"),
+            func.avg(unit_price_expr()).filter(sold).label("sold_avg_unit_price"),
+        )
+        .where(
+            PropertyCurrent.sold_price_wan.isnot(None),
+            PropertyCurrent.sold_date >= range_start,
+            PropertyCurrent.sold_date <= now,
+            PropertyCurrent.community_id == community_id,
+        )
+        .group_by(func.grouping_sets(*grouping_sets))
+    )
+    query = apply_reports_filter(query, filter, include_time_window=False)
+
+    stats_by_idx: dict[int, dict[str, int | float | None]] = {}
+    trend_dims: dict[datetime, dict[str, dict[str, int | float | None]]] = defaultdict(dict)
+    for row in db.execute(query).all():
+        if row.bucket_idx is None:
+            continue
+        if not with_trend or row.g_period == 1:
+            stats_by_idx[int(row.bucket_idx)] = {
+                "count": int(row.count or 0),
+                "avg_area": float(row.avg_area) if row.avg_area is not None else None,
+                "avg_unit_price": float(row.avg_unit_price) if row.avg_unit_price is not None else None,
+            }
+        elif row.sold_count:
+            label = bounds[int(row.bucket_idx)][2]
+            trend_dims[_normalize_period(row.period)][label] = _dim_stats(row.sold_count, row.sold_avg_unit_price)
+
+    buckets = build_price_buckets(bounds, stats_by_idx)
+    return {"buckets": buckets, "total": sum(b.count for b in buckets)}, trend_dims
+
+
+@cached_report(tags=filter_scope)
 def get_community_detail(
     db: Session,
     community: Community,
@@ -1297,6 +1632,8 @@ def get_community_detail(
 
     - 参数为 Community ORM 对象 (由依赖项提供, 不再查库)
     - 组合 KPI / 趋势 / 价格分布 + 户型分布 + 楼层分布 + main_layout
+    - 合并执行: 基准日期 1 次 + 统计面板 1 次 GROUPING SETS + 价格分段 2 次,
+      替代逐面板约 10 次查询 (结果与各 _impl 函数一致)
 
     Args:
         db: SQLAlchemy 同步 Session
@@ -1308,31 +1645,36 @@ def get_community_detail(
         dict: CommunityDetailResponse 校验结构
 
     """
-    # 预计算 reference_date，避免 _impl 函数各自重复查询 MAX(sold_date)
+    # 预计算 reference_date，各面板共用同一时间窗口
     base_filter = _base_filter_no_status(filter)
     ref_date = _get_data_reference_date(db, base_filter, community.id)
 
-    kpi = _get_kpi_data_impl(db, filter, community_id=community.id, reference_date=ref_date)
-    trend = _get_trend_data_impl(db, filter, trend_dim, community_id=community.id, reference_date=ref_date)
-    price_distribution = _get_price_distribution_impl(db, filter, community_id=community.id, reference_date=ref_date)
-    rooms_distribution = _get_rooms_distribution_impl(db, filter, community_id=community.id, reference_date=ref_date)
-    floor_distribution = _get_floor_distribution_impl(db, filter, community_id=community.id, reference_date=ref_date)
+    panels = _query_community_panels(db, community.id, filter, trend_dim, ref_date)
 
-    # main_layout: 近 12 月成交中占比最高的 rooms+halls 组合
-    now = datetime.now(timezone.utc)
-    range_start_12m = now - timedelta(days=_COMMUNITY_LIST_DAYS)
-    layout_expr = func.concat(PropertyCurrent.rooms, "室", PropertyCurrent.halls, "厅")
-    main_layout_query = select(
-        func.mode().within_group(layout_expr.asc()).label("main_layout"),
-    ).where(
-        PropertyCurrent.status == PropertyStatus.SOLD,
-        PropertyCurrent.sold_date >= range_start_12m,
-        PropertyCurrent.sold_date <= now,
-        PropertyCurrent.is_active.is_(True),
-        PropertyCurrent.community_id == community.id,
+    # 价格分布按原始 filter 筛选, 趋势价格维度按清除 status 的 filter 筛选; 二者一致时合并查询
+    price_trend_merged = trend_dim == _PRICE_TREND_DIM and filter.status is None
+    price_distribution, price_trend_dims = _query_community_price_panels(
+        db, community.id, filter, ref_date, with_trend=price_trend_merged
     )
-    main_layout_row = db.execute(main_layout_query).one_or_none()
-    main_layout = main_layout_row.main_layout if main_layout_row is not None else None
+
+    range_start, now = get_range_bounds(filter.range, ref_date)
+    granularity = get_granularity(filter.range)
+    dim_data = panels["trend_dims"]
+    if trend_dim == _PRICE_TREND_DIM:
+        dim_data = (
+            price_trend_dims
+            if price_trend_merged
+            else _compute_trend_dim_breakdown(
+                db, base_filter, trend_dim, range_start, now, granularity, community.id, reference_date=ref_date
+            )
+        )
+    trend = _build_trend_points(panels["trend_aggregates"], dim_data, range_start, granularity, trend_dim)
+
+    # main_layout: 近 12 月成交中占比最高的 rooms+halls 组合
+    layout_rows = panels["layout_rows"]
+    if layout_rows is None:
+        layout_query = _main_layout_query(get_stats_source(), community.id, end_of_utc_day(datetime.now(timezone.utc)))
+        layout_rows = [(row.rooms, row.halls, row.count) for row in db.execute(layout_query).all()]
 
     return {
         "community": {
@@ -1342,19 +1684,19 @@ def get_community_detail(
             # district 列可空（导入/创建均允许 NULL），归一化为空串以满足响应模型 str 约束
             "district": community.district or "",
         },
-        "kpi": kpi,
+        "kpi": panels["kpi"],
         "trend": trend,
         "price_distribution": price_distribution,
-        "rooms_distribution": rooms_distribution,
-        "floor_distribution": floor_distribution,
-        "main_layout": main_layout,
+        "rooms_distribution": panels["rooms_distribution"],
+        "floor_distribution": panels["floor_distribution"],
+        "main_layout": _main_layout(layout_rows),
     }
 
 
 # ─── 多商圈对比 ──────────────────────────────────────────────────────────────
 
 
-@cached_report()
+@cached_report(tags=comparison_scope)
 def get_comparison_data(
     db: Session,
     business_circles: list[str],
@@ -1393,60 +1735,30 @@ def get_comparison_data(
     bc_expr = _build_bc_expr()
     bc_match = _build_bc_match_predicate(business_circles)
 
+    source = get_stats_source()
+    model = source.model
+    is_sold = model.status == PropertyStatus.SOLD
+    in_current = is_sold & (model.sold_date >= range_start) & (model.sold_date <= now)
+    in_previous = is_sold & (model.sold_date >= prev_start) & (model.sold_date < range_start)
+
     # 1. summary: 一次 SQL 取出每个商圈的所有指标
     summary_query = (
         select(
             bc_expr,
-            func.count()
-            .filter(
-                (PropertyCurrent.status == PropertyStatus.SOLD)
-                & (PropertyCurrent.sold_date >= range_start)
-                & (PropertyCurrent.sold_date <= now),
-            )
-            .label("sold_count"),
-            func.avg(PropertyCurrent.sold_price_wan)
-            .filter(
-                (PropertyCurrent.status == PropertyStatus.SOLD)
-                & (PropertyCurrent.sold_date >= range_start)
-                & (PropertyCurrent.sold_date <= now)
-                & (PropertyCurrent.sold_price_wan.isnot(None)),
-            )
-            .label("avg_price_wan"),
-            func.avg(_unit_price_expr())
-            .filter(
-                (PropertyCurrent.status == PropertyStatus.SOLD)
-                & (PropertyCurrent.sold_date >= range_start)
-                & (PropertyCurrent.sold_date <= now),
-            )
-            .label("avg_unit_price"),
-            func.count().filter(PropertyCurrent.status == PropertyStatus.FOR_SALE).label("on_sale_count"),
-            func.count()
-            .filter(
-                (PropertyCurrent.status == PropertyStatus.SOLD)
-                & (PropertyCurrent.sold_date >= three_months_ago)
-                & (PropertyCurrent.sold_date <= now),
-            )
-            .label("recent_3m_sold"),
-            func.count()
-            .filter(
-                (PropertyCurrent.status == PropertyStatus.SOLD)
-                & (PropertyCurrent.sold_date >= prev_start)
-                & (PropertyCurrent.sold_date < range_start),
-            )
-            .label("prev_sold_count"),
-            func.avg(PropertyCurrent.sold_price_wan)
-            .filter(
-                (PropertyCurrent.status == PropertyStatus.SOLD)
-                & (PropertyCurrent.sold_date >= prev_start)
-                & (PropertyCurrent.sold_date < range_start)
-                & (PropertyCurrent.sold_price_wan.isnot(None)),
-            )
-            .label("prev_avg_price_wan"),
+            source.count(in_current).label("sold_count"),
+            source.avg_price(in_current).label("avg_price_wan"),
+            source.avg_unit_price(in_current).label("avg_unit_price"),
+            source.count(model.status == PropertyStatus.FOR_SALE).label("on_sale_count"),
+            source.count(is_sold & (model.sold_date >= three_months_ago) & (model.sold_date <= now)).label(
+                "recent_3m_sold"
+            ),
+            source.count(in_previous).label("prev_sold_count"),
+            source.avg_price(in_previous).label("prev_avg_price_wan"),
         )
-        .select_from(PropertyCurrent)
+        .select_from(model)
         .join(
             Community,
-            PropertyCurrent.community_id == Community.id,
+            model.community_id == Community.id,
         )
         .where(
             bc_match,
@@ -1457,7 +1769,7 @@ def get_comparison_data(
 
     # 已显式 JOIN Community, 关闭 auto_join_community 避免重复 JOIN
     summary_query = apply_reports_filter(
-        summary_query, base_filter, include_time_window=False, auto_join_community=False
+        summary_query, base_filter, include_time_window=False, auto_join_community=False, source=source
     )
     summary_rows = {row.bc: row for row in db.execute(summary_query).all()}
 
@@ -1500,24 +1812,22 @@ def get_comparison_data(
     ]
 
     # 2. volume_trend / price_trend: 周期 + 商圈透视
-    period_expr = func.date_trunc(granularity, PropertyCurrent.sold_date).label("period")
+    period_expr = utc_date_trunc(granularity, model.sold_date).label("period")
     trend_query = (
         select(
             period_expr,
             bc_expr,
-            func.count().label("volume"),
-            func.avg(PropertyCurrent.sold_price_wan).label("avg_price_wan"),
+            source.count().label("volume"),
+            source.avg_price().label("avg_price_wan"),
         )
-        .select_from(PropertyCurrent)
+        .select_from(model)
         .join(
             Community,
-            PropertyCurrent.community_id == Community.id,
+            model.community_id == Community.id,
         )
         .where(
-            PropertyCurrent.status == PropertyStatus.SOLD,
-            PropertyCurrent.sold_date >= range_start,
-            PropertyCurrent.sold_date <= now,
-            PropertyCurrent.sold_date.isnot(None),
+            in_current,
+            model.sold_date.isnot(None),
             bc_match,
             Community.is_active.is_(True),
         )
@@ -1525,7 +1835,9 @@ def get_comparison_data(
         .order_by(period_expr)
     )
     # 已显式 JOIN Community, 关闭 auto_join_community 避免重复 JOIN
-    trend_query = apply_reports_filter(trend_query, base_filter, include_time_window=False, auto_join_community=False)
+    trend_query = apply_reports_filter(
+        trend_query, base_filter, include_time_window=False, auto_join_community=False, source=source
+    )
 
     trend_rows = db.execute(trend_query).all()
 
@@ -1561,26 +1873,26 @@ def get_comparison_data(
     floor_query = (
         select(
             bc_expr,
-            PropertyCurrent.floor_level.label("floor_level"),
-            func.count().label("count"),
+            model.floor_level.label("floor_level"),
+            source.count().label("count"),
         )
-        .select_from(PropertyCurrent)
+        .select_from(model)
         .join(
             Community,
-            PropertyCurrent.community_id == Community.id,
+            model.community_id == Community.id,
         )
         .where(
-            PropertyCurrent.status == PropertyStatus.SOLD,
-            PropertyCurrent.sold_date >= range_start,
-            PropertyCurrent.sold_date <= now,
-            PropertyCurrent.sold_date.isnot(None),
+            in_current,
+            model.sold_date.isnot(None),
             bc_match,
             Community.is_active.is_(True),
         )
-        .group_by(bc_expr, PropertyCurrent.floor_level)
+        .group_by(bc_expr, model.floor_level)
     )
     # 已显式 JOIN Community, 关闭 auto_join_community 避免重复 JOIN
-    floor_query = apply_reports_filter(floor_query, base_filter, include_time_window=False, auto_join_community=False)
+    floor_query = apply_reports_filter(
+        floor_query, base_filter, include_time_window=False, auto_join_community=False, source=source
+    )
     floor_rows = db.execute(floor_query).all()
 
     floor_data: dict[str, dict[str, int]] = {bc: {"low": 0, "mid": 0, "high": 0} for bc in business_circles}
@@ -1605,26 +1917,26 @@ def get_comparison_data(
     room_query = (
         select(
             bc_expr,
-            PropertyCurrent.rooms.label("rooms"),
-            func.count().label("count"),
+            model.rooms.label("rooms"),
+            source.count().label("count"),
         )
-        .select_from(PropertyCurrent)
+        .select_from(model)
         .join(
             Community,
-            PropertyCurrent.community_id == Community.id,
+            model.community_id == Community.id,
         )
         .where(
-            PropertyCurrent.status == PropertyStatus.SOLD,
-            PropertyCurrent.sold_date >= range_start,
-            PropertyCurrent.sold_date <= now,
-            PropertyCurrent.sold_date.isnot(None),
+            in_current,
+            model.sold_date.isnot(None),
             bc_match,
             Community.is_active.is_(True),
         )
-        .group_by(bc_expr, PropertyCurrent.rooms)
+        .group_by(bc_expr, model.rooms)
     )
     # 已显式 JOIN Community, 关闭 auto_join_community 避免重复 JOIN
-    room_query = apply_reports_filter(room_query, base_filter, include_time_window=False, auto_join_community=False)
+    room_query = apply_reports_filter(
+        room_query, base_filter, include_time_window=False, auto_join_community=False, source=source
+    )
     room_rows = db.execute(room_query).all()
 
     room_data: dict[str, dict[str, int]] = {bc: {"r1": 0, "r2": 0, "r3": 0, "r4plus": 0} for bc in business_circles}
@@ -1663,6 +1975,7 @@ def get_comparison_data(
 
 
 __all__ = [
+    "SharedReferenceDate",
     "get_business_district_rows",
     "get_community_detail",
     "get_community_rows",
@@ -1672,4 +1985,5 @@ __all__ = [
     "get_price_distribution",
     "get_rooms_distribution",
     "get_trend_data",
+    "using_reference_date",
 ]
@@ -12,6 +12,7 @@ from typing import Any
 
 from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
 
 from models import PropertyCurrent
 from schemas.reports.common import ReportsFilter
@@ -80,6 +81,25 @@ def compute_price_buckets(
     Returns:
         list[PriceBucket]: 价格分段列表；样本量 < 30 时返回固定分段
 
+    """
+    bounds = compute_price_bounds(db, filter, community_id, reference_date)
+    return _query_buckets_by_bounds(db, filter, bounds, community_id, reference_date)
+
+
+def compute_price_bounds(
+    db: Session,
+    filter: ReportsFilter,
+    community_id: str | None = None,
+    reference_date: datetime | None = None,
+) -> list[tuple[int | None, int | None, str]]:
+    """计算价格分段边界 (compute_price_buckets 的分段部分, 不统计各段数据).
+
+    供需要在同一查询中统计多组分段数据的调用方复用 (如小区成交分析一次查询出
+    价格分布与趋势价格维度).
+
+    Returns:
+        list of (lower, upper, label) 元组; 样本量 < 30 或数据范围过小时为固定分段
+
     """
     # 1. 单次查询: count + P5 + P95 + min + max (用于判断是否需要边缘桶)
     base_query = select(
@@ -104,7 +124,7 @@ def compute_price_buckets(
 
     # 2. 样本量 < 30: 回退兜底分段
     if total < _MIN_SAMPLE_FOR_PERCENTILE:
-        return _query_buckets_by_bounds(db, filter, FALLBACK_PRICE_BUCKETS, community_id, reference_date)
+        return FALLBACK_PRICE_BUCKETS
 
     # 3. P5/P95 可能为 None (理论上不会, 防御性处理)
     p5 = float(row.p5) if row.p5 is not None else float(row.min_price or 0)
@@ -115,12 +135,42 @@ def compute_price_buckets(
     has_below = row.min_price is not None and float(row.min_price) < lower_bound
     # has_above 判断需要在确定 selected_upper 后再做, 见 _build_equal_width_bounds 内部
     bounds = _build_equal_width_bounds(p5, p95, has_below, row.max_price)
+    return bounds if bounds is not None else FALLBACK_PRICE_BUCKETS
 
-    if bounds is None:
-        return _query_buckets_by_bounds(db, filter, FALLBACK_PRICE_BUCKETS, community_id, reference_date)
 
-    # 5. 查询分段统计
-    return _query_buckets_by_bounds(db, filter, bounds, community_id, reference_date)
+def price_bucket_case(bounds: list[tuple[int | None, int | None, str]]) -> ColumnElement:
+    """价格分段 CASE 表达式: 返回 sold_price_wan 所属分段在 bounds 中的下标, 不属于任何分段时为 NULL."""
+    whens: list[tuple[Any, int]] = []
+    for idx, (lower, upper, _) in enumerate(bounds):
+        if lower is None:
+            condition = PropertyCurrent.sold_price_wan < upper
+        elif upper is None:
+            condition = PropertyCurrent.sold_price_wan >= lower
+        else:
+            condition = (PropertyCurrent.sold_price_wan >= lower) & (PropertyCurrent.sold_price_wan < upper)
+        whens.append((condition, idx))
+    return case(*whens, else_=None)
+
+
+def build_price_buckets(
+    bounds: list[tuple[int | None, int | None, str]],
+    stats_by_idx: dict[int, dict[str, int | float | None]],
+) -> list[PriceBucket]:
+    """按分段下标的统计结果 ({count, avg_area, avg_unit_price}) 构建价格分段列表, 无数据的分段计 0."""
+    buckets: list[PriceBucket] = []
+    for idx, (lower, upper, label) in enumerate(bounds):
+        stats = stats_by_idx.get(idx, {"count": 0, "avg_area": None, "avg_unit_price": None})
+        buckets.append(
+            PriceBucket(
+                label=label,
+                lower=lower if lower is not None else 0,
+                upper=upper,
+                count=int(stats["count"] or 0),
+                avg_area=stats["avg_area"],
+                avg_unit_price=stats["avg_unit_price"],
+            )
+        )
+    return buckets
 
 
 def _build_equal_width_bounds(
@@ -229,18 +279,7 @@ def _query_buckets_by_bounds(
     if not bounds:
         return []
 
-    # 构建 CASE WHEN 分组表达式
-    whens: list[tuple[Any, int]] = []
-    for idx, (lower, upper, _) in enumerate(bounds):
-        if lower is None:
-            condition = PropertyCurrent.sold_price_wan < upper
-        elif upper is None:
-            condition = PropertyCurrent.sold_price_wan >= lower
-        else:
-            condition = (PropertyCurrent.sold_price_wan >= lower) & (PropertyCurrent.sold_price_wan < upper)
-        whens.append((condition, idx))
-
-    bucket_idx_expr = case(*whens, else_=None)
+    bucket_idx_expr = price_bucket_case(bounds)
 
     # build_area > 0 时计算 avg_area / avg_unit_price，避免脏数据
     area_expr = case(
@@ -285,21 +324,7 @@ def _query_buckets_by_bounds(
             "avg_unit_price": (float(result_row.avg_unit_price) if result_row.avg_unit_price is not None else None),
         }
 
-    buckets: list[PriceBucket] = []
-    for idx, (lower, upper, label) in enumerate(bounds):
-        stats = result_map.get(idx, {"count": 0, "avg_area": None, "avg_unit_price": None})
-        buckets.append(
-            PriceBucket(
-                label=label,
-                lower=lower if lower is not None else 0,
-                upper=upper,
-                count=int(stats["count"]),
-                avg_area=stats["avg_area"],
-                avg_unit_price=stats["avg_unit_price"],
-            )
-        )
-
-    return buckets
+    return build_price_buckets(bounds, result_map)
 
 
 def build_fallback_buckets(sold_records: list) -> list[PriceBucket]:
@@ -524,7 +549,10 @@ def _finalize_breakdown(
 __all__ = [
     "FALLBACK_PRICE_BUCKETS",
     "build_fallback_buckets",
+    "build_price_buckets",
     "compute_floor_breakdown",
+    "compute_price_bounds",
     "compute_price_buckets",
     "compute_rooms_breakdown",
+    "price_bucket_case",
 ]
@@ -1,7 +1,16 @@
-"""报表服务 5 分钟缓存装饰器（Redis 后端）.
+"""报表服务 5 分钟缓存装饰器（进程内 LRU + Redis 两级缓存）.
 
-为相同参数组合的聚合查询结果提供 TTL 缓存（Redis 存储），
-避免在 5 分钟内重复执行昂贵的 SQL 聚合查询，多 worker 共享缓存。
+为相同参数组合的聚合查询结果提供 TTL 缓存，避免在 5 分钟内重复执行昂贵的 SQL 聚合查询：
+
+- 一级：进程内 LRU（条目数 + 存活时间双重上限），命中时直接返回对象，无网络往返与反序列化
+- 二级：Redis，多 worker 共享；值为带 HMAC 签名的 pickle 字节，反序列化不再逐层
+  ``model_validate`` 嵌套 Pydantic 模型
+- 未命中合并（single flight）：同一 worker 内并发未命中同一 key 只有一个线程计算，
+  其余线程等待结果；跨 worker 以 Redis ``SET NX`` 计算锁协调，未抢到锁的 worker
+  轮询 Redis 等待结果，避免 TTL 同时到期时并发打满 PostgreSQL
+- 按标签代数失效：缓存 key 包含所依赖标签（小区/商圈/数据来源等）的当前代数，数据变更后
+  只递增受影响标签的代数（O(1)），旧 key 不再命中、随 TTL 自然过期，无关报表缓存保持有效；
+  标签定义与写入侧登记见 ``services.reports.cache_tags``
 
 参考 spec §5 分钟内存缓存（Requirement: 5 分钟内存缓存）.
 """
@@ -10,30 +19,24 @@ from __future__ import annotations
 
 import functools
 import hashlib
-import json
+import hmac
+import inspect
 import logging
-from collections.abc import Callable
-from typing import Any, TypeVar
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, NamedTuple, TypeVar
 
-from pydantic import BaseModel
 from redis import Redis
 from redis.exceptions import RedisError
 from sqlalchemy.orm import Session
 
-from schemas.reports.common import KpiCard
-from schemas.reports.communities import CommunityRow
-from schemas.reports.market import (
-    BusinessDistrictRow,
-    ComparisonData,
-    ComparisonFloorStructure,
-    ComparisonRoomStructure,
-    ComparisonSummaryRow,
-    ComparisonTrendPoint,
-    DistributionBucket,
-    KpiData,
-    PriceBucket,
-    TrendDataPoint,
-)
+from settings import settings
 from utils.redis_client import get_redis_client
 
 logger = logging.getLogger(__name__)
@@ -46,97 +49,367 @@ _DEFAULT_TTL_SECONDS = 300
 # Redis key 前缀，避免与其他 Redis key 冲突
 _CACHE_PREFIX = "reports:cache:"
 
-# Pydantic 模型注册表: 类名 -> 类, 用于 JSON 反序列化时恢复类型.
-# 缓存值可能包含嵌套的 Pydantic 模型 (如 KpiData / list[TrendDataPoint] /
-# dict 含 list[PriceBucket] 等), 用类名标记保证反序列化后类型保真.
-_PYDANTIC_REGISTRY: dict[str, type[BaseModel]] = {
-    cls.__name__: cls
-    for cls in (
-        KpiCard,
-        KpiData,
-        TrendDataPoint,
-        PriceBucket,
-        DistributionBucket,
-        BusinessDistrictRow,
-        CommunityRow,
-        ComparisonData,
-        ComparisonSummaryRow,
-        ComparisonTrendPoint,
-        ComparisonFloorStructure,
-        ComparisonRoomStructure,
-    )
-}
-
-# Pydantic 模型在 JSON 中的类型标记键 (与普通 dict 区分, 避免误判)
-# 使用 dunder 前缀降低与业务字段碰撞概率
-_PYDANTIC_MARKER = "__pydantic__"
-
-# 标记 payload 的键数量 (仅 __pydantic__ + data), 用于精确识别模型 dict
-_PYDANTIC_PAYLOAD_LEN = 2
-
-
-class _PydanticEncoder(json.JSONEncoder):
-    """JSON 编码器: 将 Pydantic BaseModel 实例包装为带类型标记的 dict.
-
-    输出形如 ``{"__pydantic__": "KpiData", "data": {...}}``,
-    反序列化时通过 ``_PYDANTIC_REGISTRY`` 恢复为对应模型实例.
-    """
+# 跨 worker 计算锁 key 前缀（不以 _CACHE_PREFIX 开头，清空缓存时不会误删正在持有的锁）
+_LOCK_PREFIX = "reports:lock:"
 
-    def default(self, o: Any) -> Any:
-        if isinstance(o, BaseModel):
-            return {
-                _PYDANTIC_MARKER: o.__class__.__name__,
-                "data": o.model_dump(mode="json"),
-            }
-        return super().default(o)
+# Redis 中的标签代数 hash：field 为标签，值为代数（不以 _CACHE_PREFIX 开头）
+_GENERATIONS_KEY = "reports:generations"
 
+# 两次从 Redis 读取同一标签代数的最小间隔（秒），即其他 worker 数据变更的最大感知延迟
+_GENERATION_CHECK_SECONDS = 1.0
 
-def _pydantic_object_hook(obj: dict[str, Any]) -> Any:
-    """JSON object_hook: 检测带 ``__pydantic__`` 标记的 dict 并恢复为对应模型实例.
+# 所有报表缓存都依赖的标签：递增即整体失效
+GLOBAL_TAG = "global"
 
-    仅当 dict 恰好包含 ``__pydantic__`` 与 ``data`` 两个键时触发,
-    避免与业务字段冲突. object_hook 自底向上调用, 内层模型先被重建,
-    外层 model_validate 接收的 dict 中已包含模型实例, Pydantic v2 原生支持.
-    """
-    if len(obj) == _PYDANTIC_PAYLOAD_LEN and _PYDANTIC_MARKER in obj and "data" in obj:
-        cls = _PYDANTIC_REGISTRY.get(obj[_PYDANTIC_MARKER])
-        if cls is not None:
-            return cls.model_validate(obj["data"])
-    return obj
+# 任意数据变更都会递增的标签：未声明更窄依赖的报表缓存依赖此标签
+ALL_TAG = "all"
+
+# 等待其他 worker 计算结果时的轮询间隔（秒）
+_LOCK_POLL_SECONDS = 0.05
+
+# 缓存值格式版本前缀：格式变化时旧值签名校验失败，自动失效重算
+_PAYLOAD_VERSION = b"RC3"
+
+# HMAC 签名密钥：由 JWT 密钥派生（强制从环境变量读取），Redis 被写入伪造字节时签名校验失败，
+# 不会进入 pickle.loads（避免 pickle 反序列化 RCE）
+_SIGNING_KEY = hashlib.sha256(b"reports-cache:" + settings.jwt_secret_key.encode()).digest()
+
+_SIGNATURE_LEN = hashlib.sha256().digest_size
+
+# Redis 中的缓存命中计数 hash（各 worker 定期并入）
+_METRICS_KEY = "reports:metrics"
+
+# 计数项：requests=业务调用次数，hits=命中次数，warmed_hits=命中预热生成条目的次数，
+# warm_refreshed=预热重算次数，warm_skipped=预热时条目仍新鲜而跳过的次数
+_METRIC_NAMES = ("requests", "hits", "warmed_hits", "warm_refreshed", "warm_skipped")
+
+# 预热调用标记：Redis 剩余存活时间低于该秒数的条目重算（None=业务调用）
+_warm_refresh_below: ContextVar[float | None] = ContextVar("reports_cache_warm_refresh_below", default=None)
+
+# 当前上下文最近一次报表缓存调用是否命中（批量面板查询据此返回各面板的命中情况）
+_last_hit: ContextVar[bool | None] = ContextVar("reports_cache_last_hit", default=None)
+
+
+class _Entry(NamedTuple):
+    """缓存条目：结果 + 是否由预热生成."""
+
+    value: Any
+    warmed: bool
+
+
+class _LocalLRU:
+    """进程内 LRU 缓存（线程安全），条目按各自的过期时间失效."""
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """返回 (是否命中, 值)，过期条目顺带删除."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        """写入条目，超出容量时淘汰最久未使用的条目."""
+        max_entries = settings.reports_cache_local_max_entries
+        ttl = min(ttl_seconds, settings.reports_cache_local_ttl_seconds)
+        if max_entries <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空全部条目."""
+        with self._lock:
+            self._entries.clear()
+
+
+class _Flight:
+    """一次进行中的计算：领头线程写入结果后唤醒等待线程."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.ok = False
+        self.value: Any = None
+
+
+class _SingleFlight:
+    """同 key 并发调用合并：同一时刻只有一个线程执行计算."""
+
+    def __init__(self) -> None:
+        self._flights: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, compute: Callable[[], T]) -> T:
+        """执行或等待 key 对应的计算.
+
+        领头线程计算失败时异常只抛给领头线程，等待线程各自重新计算（不共享异常对象）。
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+        if not leader:
+            flight.done.wait()
+            return flight.value if flight.ok else compute()
+
+        try:
+            flight.value = compute()
+            flight.ok = True
+            return flight.value
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+
+class _Generations:
+    """标签代数视图：Redis 为准，进程内按 ``_GENERATION_CHECK_SECONDS`` 缓存读取结果."""
+
+    def __init__(self) -> None:
+        self._values: dict[str, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def current(self, tags: Sequence[str]) -> tuple[int, ...]:
+        """返回各标签的当前代数（与 tags 顺序一致）.
+
+        Redis 不可用时沿用上次读到的代数（本进程的递增仍实时生效）。
+        """
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                tag
+                for tag in dict.fromkeys(tags)
+                if tag not in self._values or now - self._values[tag][1] >= _GENERATION_CHECK_SECONDS
+            ]
+        if stale:
+            try:
+                fetched = get_redis_client().hmget(_GENERATIONS_KEY, stale)
+            except RedisError:
+                fetched = None
+            with self._lock:
+                for index, tag in enumerate(stale):
+                    value = int(fetched[index] or 0) if fetched is not None else self._values.get(tag, (0, 0.0))[0]
+                    self._values[tag] = (value, now)
+        with self._lock:
+            return tuple(self._values[tag][0] for tag in tags)
+
+    def bump(self, tags: Iterable[str]) -> None:
+        """递增标签代数（Redis 不可用时只在本进程生效）."""
+        unique = list(dict.fromkeys(tags))
+        if not unique:
+            return
+        now = time.monotonic()
+        try:
+            pipe = get_redis_client().pipeline(transaction=False)
+            for tag in unique:
+                pipe.hincrby(_GENERATIONS_KEY, tag, 1)
+            values = [int(value) for value in pipe.execute()]
+        except RedisError:
+            logger.warning("递增报表缓存代数失败，其他 worker 将在缓存 TTL 到期后刷新", exc_info=True)
+            with self._lock:
+                values = [self._values.get(tag, (0, 0.0))[0] + 1 for tag in unique]
+        with self._lock:
+            for tag, value in zip(unique, values, strict=True):
+                self._values[tag] = (value, now)
+
+
+class _Metrics:
+    """本进程缓存命中计数（线程安全），由 ``flush_report_cache_metrics`` 定期并入 Redis."""
+
+    def __init__(self) -> None:
+        self._counts = dict.fromkeys(_METRIC_NAMES, 0)
+        self._lock = threading.Lock()
+
+    def record_request(self, *, hit: bool, warmed: bool) -> None:
+        """记录一次业务调用."""
+        with self._lock:
+            self._counts["requests"] += 1
+            self._counts["hits"] += hit
+            self._counts["warmed_hits"] += warmed
+
+    def record_warm(self, *, computed: bool) -> None:
+        """记录一次预热调用."""
+        with self._lock:
+            self._counts["warm_refreshed" if computed else "warm_skipped"] += 1
+
+    def peek(self) -> dict[str, int]:
+        """返回当前计数副本."""
+        with self._lock:
+            return dict(self._counts)
+
+    def drain(self) -> dict[str, int]:
+        """取出并清零当前计数."""
+        with self._lock:
+            counts, self._counts = self._counts, dict.fromkeys(_METRIC_NAMES, 0)
+            return counts
+
+    def restore(self, counts: Mapping[str, int]) -> None:
+        """并入未能上报的计数."""
+        with self._lock:
+            for name, count in counts.items():
+                self._counts[name] += count
+
+
+_local_cache = _LocalLRU()
+_single_flight = _SingleFlight()
+_generations = _Generations()
+_metrics = _Metrics()
 
 
 def _dumps(value: Any) -> bytes:
-    """将缓存值序列化为 JSON bytes.
+    """序列化缓存值：版本前缀 + HMAC-SHA256 签名 + pickle 字节."""
+    body = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    signature = hmac.new(_SIGNING_KEY, body, hashlib.sha256).digest()
+    return _PAYLOAD_VERSION + signature + body
+
+
+def _loads(data: bytes) -> Any:
+    """校验签名后反序列化缓存值.
+
+    Raises:
+        ValueError: 版本前缀不符或签名校验失败（含旧 JSON 格式缓存）
 
-    Pydantic 模型实例会被包装为 ``{"__pydantic__": "ClassName", "data": {...}}``
-    以保留类型信息, 反序列化时通过 ``_PYDANTIC_REGISTRY`` 恢复.
     """
-    return json.dumps(value, cls=_PydanticEncoder, ensure_ascii=False).encode("utf-8")
+    if not data.startswith(_PAYLOAD_VERSION):
+        msg = "缓存值格式版本不符"
+        raise ValueError(msg)
+    offset = len(_PAYLOAD_VERSION)
+    signature = data[offset : offset + _SIGNATURE_LEN]
+    body = data[offset + _SIGNATURE_LEN :]
+    expected = hmac.new(_SIGNING_KEY, body, hashlib.sha256).digest()
+    if not hmac.compare_digest(signature, expected):
+        msg = "缓存值签名校验失败"
+        raise ValueError(msg)
+    return pickle.loads(body)  # noqa: S301 - 已校验 HMAC 签名，仅反序列化本服务写入的字节
 
 
-def _loads(data: bytes) -> Any:
-    """从 JSON bytes 反序列化缓存值, 恢复嵌套的 Pydantic 模型实例."""
-    return json.loads(data, object_hook=_pydantic_object_hook)
+def _read_redis(redis_client: Redis, key: str) -> tuple[_Entry | None, float | None]:
+    """读取 Redis 缓存，返回 (条目, 剩余存活秒数)，未命中时条目为 None.
+
+    反序列化失败时删除损坏 key 并视为未命中。
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.get(key)
+    pipe.pttl(key)
+    cached, pttl = pipe.execute()
+    if cached is None:
+        return None, None
+    try:
+        entry: _Entry = _loads(cached)
+    except Exception:
+        # 捕获所有反序列化异常（签名不符/版本不符/pickle 错误等），删除损坏 key 并回退重算.
+        # 同时兼容历史缓存格式: 格式切换后首次读取会触发异常, 自动失效并重算.
+        logger.warning("缓存反序列化失败，key=%s，将重新计算", key, exc_info=True)
+        redis_client.delete(key)
+        return None, None
+    remaining = pttl / 1000 if pttl and pttl > 0 else None
+    return entry, remaining
+
+
+def _compute_with_redis(
+    key: str,
+    ttl_seconds: int,
+    compute: Callable[[], Any],
+    refresh_below: float | None,
+) -> tuple[_Entry, bool]:
+    """二级缓存读取 + 跨 worker 计算锁，返回 (条目, 是否命中) 并回填进程内缓存.
+
+    ``refresh_below`` 非 None 时为预热调用：Redis 剩余存活时间不足该秒数的条目视为未命中，
+    重算后覆盖写入（条目标记为预热生成）。
+    Redis 故障时降级为直接计算（缓存是优化手段，不应导致业务 500）。
+    """
+    warming = refresh_below is not None
 
+    def _fresh(entry: _Entry | None, remaining: float | None) -> bool:
+        return entry is not None and not (warming and (remaining or 0) < refresh_below)
 
-def cached_report(ttl_seconds: int = _DEFAULT_TTL_SECONDS) -> Callable[[Callable[..., T]], Callable[..., T]]:
-    """5 分钟缓存装饰器（Redis 后端）.
+    # 获取 Redis 客户端：连接失败时降级为直接计算
+    # （避免在 threadpool 中 sys.exit 导致 worker 静默死亡）
+    try:
+        redis_client: Redis = get_redis_client()
+    except RedisError:
+        logger.warning("Redis 客户端初始化失败，跳过报表 Redis 缓存")
+        entry = _Entry(compute(), warming)
+        _local_cache.set(key, entry, ttl_seconds)
+        return entry, False
+
+    lock_key = f"{_LOCK_PREFIX}{key.removeprefix(_CACHE_PREFIX)}"
+    lock_token = uuid.uuid4().hex.encode()
+    lock_seconds = settings.reports_cache_lock_seconds
+    locked = False
+    try:
+        entry, remaining = _read_redis(redis_client, key)
+        if _fresh(entry, remaining):
+            _local_cache.set(key, entry, remaining or ttl_seconds)
+            return entry, True
+        locked = bool(redis_client.set(lock_key, lock_token, nx=True, px=int(lock_seconds * 1000)))
+        if not locked:
+            # 其他 worker 正在计算：轮询等待结果，超时后自行计算
+            deadline = time.monotonic() + lock_seconds
+            while time.monotonic() < deadline:
+                time.sleep(_LOCK_POLL_SECONDS)
+                entry, remaining = _read_redis(redis_client, key)
+                if _fresh(entry, remaining):
+                    _local_cache.set(key, entry, remaining or ttl_seconds)
+                    return entry, True
+                if not redis_client.exists(lock_key):
+                    break
+    except RedisError:
+        logger.warning("报表缓存读取失败，降级为直接计算 (key=%s)", key, exc_info=True)
 
-    基于 Redis get/set + TTL 实现缓存，多 worker 共享。
+    entry = _Entry(compute(), warming)
+    _local_cache.set(key, entry, ttl_seconds)
 
-    - key 格式：``reports:cache:{module}.{qualname}:{sha256(args/kwargs)[:32]}``，
-      包含函数限定名以避免不同函数同签名时 key 碰撞；
-      args 部分取 SHA256 前 32 位（128bit）固定长度，避免 filter 含大量
+    # 写入缓存并释放计算锁：Redis 故障时跳过（不影响返回值）
+    try:
+        redis_client.set(key, _dumps(entry), ex=ttl_seconds)
+        if locked and redis_client.get(lock_key) == lock_token:
+            redis_client.delete(lock_key)
+    except RedisError:
+        logger.warning("报表缓存写入失败，跳过缓存 (key=%s)", key, exc_info=True)
+    return entry, False
+
+
+def cached_report(
+    ttl_seconds: int = _DEFAULT_TTL_SECONDS,
+    tags: Callable[[Mapping[str, Any]], Iterable[str]] | None = None,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """5 分钟缓存装饰器（进程内 LRU + Redis）.
+
+    - key 格式：``reports:cache:{module}.{qualname}:{sha256(参数 + 标签代数)[:32]}``，
+      包含函数限定名以避免不同函数同签名时 key 碰撞；参数按函数签名绑定并填充默认值，
+      位置/关键字传参方式不同的等价调用命中同一 key（预热与路由调用方式可以不同）；
+      hash 部分取 SHA256 前 32 位（128bit）固定长度，避免 filter 含大量
       community_ids 时 key 长达数 KB 浪费 Redis 内存
-    - 命中：``redis.get(key)`` → JSON 反序列化（异常时删除损坏 key 并回退重算）
-    - 未命中：执行函数 → ``redis.set(key, _dumps(result), ex=ttl_seconds)``
-    - 缓存值可能是 Pydantic 模型、list、dict 等任意 Python 对象，
-      通过自定义 JSON 编解码器保留 Pydantic 类型保真
+    - 依赖标签：``tags(绑定后的参数字典)`` 返回结果所依赖的标签（未提供时依赖 ``ALL_TAG``），
+      另固定依赖 ``GLOBAL_TAG``；任一标签代数递增后 key 随之变化
+    - 进程内命中：直接返回缓存对象（存活时间取 ``ttl_seconds`` 与
+      ``settings.reports_cache_local_ttl_seconds`` 较小值）
+    - Redis 命中：校验签名后反序列化，回填进程内缓存（存活时间不超过 Redis 剩余 TTL）
+    - 未命中：同 key 并发调用合并为一次计算 → ``redis.set(key, _dumps(条目), ex=ttl_seconds)``
+    - 预热（``warming`` 上下文内调用）：跳过进程内缓存，刷新即将过期的 Redis 条目
 
-    安全性：使用 JSON 替代 pickle，避免 Redis 被注入恶意 pickle 字节导致的 RCE 风险。
+    安全性：pickle 字节带 HMAC 签名，签名不符的值不会被反序列化，避免 Redis 被注入
+    恶意 pickle 字节导致的 RCE 风险。
 
     Args:
         ttl_seconds: 缓存存活秒数，默认 300（5 分钟）
+        tags: 由函数参数计算依赖标签的回调（参数名 -> 值，已填充默认值）
 
     Returns:
         Callable: 装饰器函数
@@ -151,78 +424,114 @@ def cached_report(ttl_seconds: int = _DEFAULT_TTL_SECONDS) -> Callable[[Callable
         raise ValueError(msg)
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        signature = inspect.signature(func)
+
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> T:
-            # 获取 Redis 客户端：连接失败时降级为直接计算
-            # （避免在 threadpool 中 sys.exit 导致 worker 静默死亡）
-            try:
-                redis_client: Redis = get_redis_client()
-            except RedisError:
-                logger.warning("Redis 客户端初始化失败，跳过报表缓存")
-                return func(*args, **kwargs)
-
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            scope = [ALL_TAG] if tags is None else sorted(set(tags(bound.arguments)))
+            dependencies = [GLOBAL_TAG, *scope]
             # 缓存键包含函数限定名，避免不同函数同签名时 key 碰撞
             # （如 get_kpi_data 与 get_price_distribution 均接受 (db, filter)）
             # args 部分做 SHA256 hash 固定长度，避免 filter 含大量 community_ids 时
             # key 过长浪费 Redis 内存（32MB 限制）
-            raw_key = repr(_make_cache_key(args, kwargs))
+            # 标签代数计算在执行查询之前读取：并发写入提交后递增代数，本次结果只会写入旧 key
+            generations = tuple(zip(dependencies, _generations.current(dependencies), strict=True))
+            raw_key = repr((_make_cache_key((), bound.arguments), generations))
             key_hash = hashlib.sha256(raw_key.encode()).hexdigest()[:32]
             key = f"{_CACHE_PREFIX}{func.__module__}.{func.__qualname__}:{key_hash}"
 
-            # 读取缓存：Redis 故障时降级为直接计算（缓存是优化手段，不应导致业务 500）
-            try:
-                cached = redis_client.get(key)
-                if cached is not None:
-                    try:
-                        return _loads(cached)
-                    except Exception:
-                        # 捕获所有反序列化异常（JSONDecodeError/ValidationError/
-                        # KeyError 等），删除损坏 key 并回退重算.
-                        # 同时兼容历史 pickle 缓存: 切换到 JSON 后首次读取
-                        # pickle 字节会触发异常, 自动失效并重算.
-                        logger.warning("缓存反序列化失败，key=%s，将重新计算", key, exc_info=True)
-                        redis_client.delete(key)
-            except RedisError:
-                logger.warning("报表缓存读取失败，降级为直接计算 (key=%s)", key, exc_info=True)
-
-            result = func(*args, **kwargs)
-
-            # 写入缓存：Redis 故障时跳过（不影响返回值）
-            try:
-                redis_client.set(key, _dumps(result), ex=ttl_seconds)
-            except RedisError:
-                logger.warning("报表缓存写入失败，跳过缓存 (key=%s)", key, exc_info=True)
-            return result
+            refresh_below = _warm_refresh_below.get()
+            if refresh_below is None:
+                hit, entry = _local_cache.get(key)
+                if hit:
+                    _metrics.record_request(hit=True, warmed=entry.warmed)
+                    _last_hit.set(True)
+                    return entry.value
+            entry, hit = _single_flight.run(
+                key,
+                lambda: _compute_with_redis(key, ttl_seconds, lambda: func(*args, **kwargs), refresh_below),
+            )
+            if refresh_below is None:
+                _metrics.record_request(hit=hit, warmed=hit and entry.warmed)
+            else:
+                _metrics.record_warm(computed=not hit)
+            _last_hit.set(hit)
+            return entry.value
 
         return wrapper
 
     return decorator
 
 
-def invalidate_reports_cache() -> None:
-    """清空所有报表缓存.
+@contextmanager
+def warming(refresh_below_seconds: float) -> Iterator[None]:
+    """预热上下文：其内的报表缓存调用刷新剩余存活时间不足 ``refresh_below_seconds`` 的条目.
 
-    通过 SCAN 匹配 ``reports:cache:*`` 并批量 DELETE，跨 worker 生效。
-    SCAN 循环直到游标为 0，DELETE 支持批量删除。
-    Redis 不可用时静默跳过（缓存自然过期，不影响业务正确性）。
+    预热调用不计入请求命中率，单独统计刷新/跳过次数。
     """
+    token = _warm_refresh_below.set(refresh_below_seconds)
     try:
-        redis_client: Redis = get_redis_client()
-    except RedisError:
-        logger.warning("Redis 不可用，跳过报表缓存清空")
+        yield
+    finally:
+        _warm_refresh_below.reset(token)
+
+
+def last_report_cache_hit() -> bool | None:
+    """当前上下文（线程）最近一次报表缓存调用是否命中，尚未调用时为 None."""
+    return _last_hit.get()
+
+
+def flush_report_cache_metrics() -> None:
+    """将本进程累计的缓存计数并入 Redis（各 worker 定期调用，Redis 不可用时保留到下次）."""
+    counts = _metrics.drain()
+    if not any(counts.values()):
         return
     try:
-        cursor = 0
-        while True:
-            cursor, keys = redis_client.scan(cursor=cursor, match=f"{_CACHE_PREFIX}*", count=100)
-            if keys:
-                redis_client.delete(*keys)
-            if cursor == 0:
-                break
+        pipe = get_redis_client().pipeline(transaction=False)
+        for name, count in counts.items():
+            if count:
+                pipe.hincrby(_METRICS_KEY, name, count)
+        pipe.execute()
+    except RedisError:
+        logger.warning("报表缓存计数写入失败，下次重试")
+        _metrics.restore(counts)
+
+
+def get_report_cache_metrics() -> dict[str, int]:
+    """读取全部 worker 已上报的缓存计数（含本进程尚未上报的部分）."""
+    totals = dict.fromkeys(_METRIC_NAMES, 0)
+    try:
+        stored = get_redis_client().hgetall(_METRICS_KEY)
     except RedisError:
-        # SCAN 中途 Redis 断开：已删除的 key 生效，剩余 key 将在 TTL 后自然过期。
-        # 缓存清空是优化手段，不应导致业务数据变更操作返回 500。
-        logger.warning("报表缓存清空中途 Redis 断开，剩余 key 将在 TTL 后自然过期", exc_info=True)
+        logger.warning("读取报表缓存计数失败，仅返回本进程计数")
+        stored = {}
+    for name, value in stored.items():
+        field_name = name.decode() if isinstance(name, bytes) else name
+        if field_name in totals:
+            totals[field_name] = int(value)
+    for name, count in _metrics.peek().items():
+        totals[name] += count
+    return totals
+
+
+def bump_report_generations(tags: Iterable[str]) -> None:
+    """递增标签代数，使依赖这些标签的报表缓存失效（数据变更提交后调用）.
+
+    本进程立即生效；其他 worker 在 ``_GENERATION_CHECK_SECONDS`` 内感知。
+    Redis 不可用时只在本进程生效（其他 worker 的缓存随 TTL 自然过期）。
+    """
+    _generations.bump(tags)
+
+
+def invalidate_reports_cache() -> None:
+    """使所有报表缓存失效（递增 ``GLOBAL_TAG`` 代数，O(1)）.
+
+    旧 key 不再命中，随 TTL 自然过期；同时清空本进程 LRU 释放内存。
+    """
+    _local_cache.clear()
+    bump_report_generations([GLOBAL_TAG])
 
 
 def _make_cache_key(args: tuple, kwargs: dict) -> tuple:
@@ -278,4 +587,14 @@ def _serialize_arg(arg: Any) -> Any:
     return (type(arg).__name__, repr(arg))
 
 
-__all__ = ["cached_report", "invalidate_reports_cache"]
+__all__ = [
+    "ALL_TAG",
+    "GLOBAL_TAG",
+    "bump_report_generations",
+    "cached_report",
+    "flush_report_cache_metrics",
+    "get_report_cache_metrics",
+    "invalidate_reports_cache",
+    "last_report_cache_hit",
+    "warming",
+]
@@ -0,0 +1,268 @@
+"""报表缓存依赖标签.
+
+报表缓存 key 包含所依赖标签的代数（见 ``services.reports.cache``）。本模块定义标签，
+并负责两端：
+
+读取侧（``report_scope_tags``）按筛选范围取最窄的一个维度作为依赖：
+- 限定小区（``community_id`` / 小区详情 / 市场监控小区统计）：``community:{id}``
+- 商圈关键词筛选：``bc:{关键词}``（关键词登记到 Redis 集合，写入侧据此匹配）
+- 数据来源筛选：``source:{来源}`` + ``communities``（小区名称/商圈/区域变更）
+- 其余：``all``
+
+写入侧在外层事务提交后递增受影响的标签：
+- ORM 写入（逐行导入、房源编辑、小区编辑/合并归档）：``before_flush`` 自动收集
+- 集合式语句写入（批量 upsert、小区合并的 bulk update）：调用方显式调用 ``mark_reports_stale``
+- 提交前按小区ID查出所属商圈，提交后递增 ``all`` / 来源 / 小区 / 匹配该商圈的关键词标签；
+  回滚时丢弃登记，不产生无效失效
+"""
+
+import logging
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Any
+
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, SessionTransaction, UOWTransaction
+
+from models import Community, PropertyCurrent
+from schemas.reports import ReportsFilter
+from services.reports.cache import ALL_TAG, bump_report_generations
+from services.reports.filter_builder import _UNCATEGORIZED
+from utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# 小区名称/商圈/区域/启用状态变更时递增（按来源筛选的报表会 JOIN 小区表展示或过滤这些字段）
+COMMUNITIES_TAG = "communities"
+
+# Redis 中已被报表筛选使用过的商圈关键词集合
+_KEYWORDS_KEY = "reports:bc_keywords"
+
+# Session.info 中待失效范围（flush 收集）与待递增标签（提交前解析完成）的 key
+_PENDING_KEY = "reports_cache_pending"
+_COMMIT_KEY = "reports_cache_commit"
+
+# 影响报表展示/过滤的小区字段
+_COMMUNITY_FIELDS = ("name", "business_circle", "district", "is_active")
+
+# 单条查询解析商圈的小区数上限（控制 IN 列表长度）
+_RESOLVE_CHUNK_SIZE = 1000
+
+# 本进程已登记到 Redis 的商圈关键词（避免每次读取都 SADD）
+_registered_keywords: set[str] = set()
+_registered_lock = threading.Lock()
+
+
+def community_tag(community_id: str) -> str:
+    """小区标签."""
+    return f"community:{community_id}"
+
+
+def source_tag(data_source: str) -> str:
+    """数据来源标签."""
+    return f"source:{data_source}"
+
+
+def business_circle_tag(keyword: str) -> str:
+    """商圈关键词标签."""
+    return f"bc:{keyword}"
+
+
+def report_scope_tags(
+    filter: ReportsFilter,
+    community_id: str | None = None,
+    *,
+    match_business_circles: bool = True,
+) -> list[str]:
+    """按报表筛选范围返回依赖标签（取最窄的一个维度）.
+
+    Args:
+        filter: 报表筛选参数
+        community_id: 限定小区ID（小区详情 / 小区维度分布）
+        match_business_circles: 结果是否受 ``filter.business_circles`` 限定
+            （多商圈对比清除该筛选，须传 False）
+
+    Returns:
+        list[str]: 依赖标签
+
+    """
+    if community_id:
+        return [community_tag(community_id)]
+    keywords = [bc for bc in filter.business_circles if bc] if match_business_circles else []
+    if keywords:
+        _register_keywords(keywords)
+        return [business_circle_tag(keyword) for keyword in keywords]
+    if filter.sources:
+        return [COMMUNITIES_TAG, *(source_tag(source) for source in filter.sources)]
+    return [ALL_TAG]
+
+
+def filter_scope(arguments: Mapping[str, Any]) -> list[str]:
+    """``cached_report(tags=...)`` 回调：按 ``filter`` / ``community_id`` / ``community`` 参数取依赖标签."""
+    community = arguments.get("community")
+    community_id = community.id if community is not None else arguments.get("community_id")
+    return report_scope_tags(arguments["filter"], community_id)
+
+
+def community_scope(arguments: Mapping[str, Any]) -> list[str]:
+    """``cached_report(tags=...)`` 回调：按 ``community_id`` / ``community_ids`` 参数依赖相应小区标签."""
+    if "community_ids" in arguments:
+        return [community_tag(cid) for cid in arguments["community_ids"]]
+    return [community_tag(arguments["community_id"])]
+
+
+def comparison_scope(arguments: Mapping[str, Any]) -> list[str]:
+    """``cached_report(tags=...)`` 回调：多商圈对比（时间基准跨全部商圈，不按商圈收窄）."""
+    return report_scope_tags(arguments["filter"], match_business_circles=False)
+
+
+def _register_keywords(keywords: Iterable[str]) -> None:
+    """登记商圈关键词，写入侧递增与变更商圈匹配的关键词标签.
+
+    登记先于读取代数与执行查询：登记前已提交的写入，本次查询必然可见。
+    """
+    with _registered_lock:
+        new = [keyword for keyword in keywords if keyword not in _registered_keywords]
+    if not new:
+        return
+    try:
+        get_redis_client().sadd(_KEYWORDS_KEY, *new)
+    except RedisError:
+        logger.warning("登记报表商圈关键词失败，下次读取时重试")
+        return
+    with _registered_lock:
+        _registered_keywords.update(new)
+
+
+def _matching_keyword_tags(business_circles: Iterable[str | None]) -> list[str]:
+    """返回与变更商圈匹配的关键词标签（与 apply_reports_filter 的 LIKE 匹配口径一致）."""
+    circles = {bc or "" for bc in business_circles}
+    if not circles:
+        return []
+    with _registered_lock:
+        keywords = set(_registered_keywords)
+    try:
+        keywords.update(
+            value.decode() if isinstance(value, bytes) else value
+            for value in get_redis_client().smembers(_KEYWORDS_KEY)
+        )
+    except RedisError:
+        logger.warning("读取报表商圈关键词失败，仅匹配本进程登记的关键词")
+    return [
+        business_circle_tag(keyword)
+        for keyword in keywords
+        if any((circle == "") if keyword == _UNCATEGORIZED else (keyword in circle) for circle in circles)
+    ]
+
+
+@dataclass
+class _StaleScope:
+    """一个事务内待失效的报表范围."""
+
+    community_ids: set[str] = field(default_factory=set)
+    sources: set[str] = field(default_factory=set)
+    business_circles: set[str | None] = field(default_factory=set)
+    communities_changed: bool = False
+
+    def tags(self) -> list[str]:
+        """待递增标签（商圈关键词标签提交后再匹配）."""
+        tags = [ALL_TAG]
+        tags.extend(community_tag(cid) for cid in sorted(self.community_ids))
+        tags.extend(source_tag(source) for source in sorted(self.sources))
+        if self.communities_changed:
+            tags.append(COMMUNITIES_TAG)
+        return tags
+
+
+def _pending(db: Session) -> _StaleScope:
+    return db.info.setdefault(_PENDING_KEY, _StaleScope())
+
+
+def mark_reports_stale(
+    db: Session,
+    community_ids: Iterable[str | None] = (),
+    sources: Iterable[str | None] = (),
+) -> None:
+    """登记本事务写入影响的小区与数据来源，外层事务提交后使相关报表缓存失效.
+
+    集合式语句写入房源（不经过 ORM flush）后调用；小区所属商圈在提交前自动解析。
+    """
+    scope = _pending(db)
+    scope.community_ids.update(cid for cid in community_ids if cid)
+    scope.sources.update(source for source in sources if source)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_scope(session: Session, _flush_context: UOWTransaction, _instances: object) -> None:
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, PropertyCurrent):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            state = inspect(obj)
+            mark_reports_stale(
+                session,
+                [obj.community_id, *(state.attrs.community_id.history.deleted or ())],
+                [obj.data_source, *(state.attrs.data_source.history.deleted or ())],
+            )
+        elif isinstance(obj, Community) and obj not in session.new:
+            # 新建小区尚无房源，不影响报表结果
+            state = inspect(obj)
+            if obj in session.dirty and not any(state.attrs[name].history.has_changes() for name in _COMMUNITY_FIELDS):
+                continue
+            scope = _pending(session)
+            scope.community_ids.add(obj.id)
+            scope.business_circles.update(state.attrs.business_circle.history.deleted or ())
+            scope.communities_changed = True
+
+
+@event.listens_for(Session, "before_commit")
+def _resolve_pending_scope(session: Session) -> None:
+    # 保存点提交不处理，外层事务提交前统一解析
+    if session.in_nested_transaction():
+        return
+    # 先 flush，收集尚未写出的 ORM 变更
+    session.flush()
+    scope: _StaleScope | None = session.info.pop(_PENDING_KEY, None)
+    if scope is None:
+        return
+    ids = sorted(scope.community_ids)
+    for start in range(0, len(ids), _RESOLVE_CHUNK_SIZE):
+        chunk = ids[start : start + _RESOLVE_CHUNK_SIZE]
+        scope.business_circles.update(
+            session.scalars(select(Community.business_circle).where(Community.id.in_(chunk)).distinct())
+        )
+    session.info[_COMMIT_KEY] = scope
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_scope(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    scope: _StaleScope | None = session.info.pop(_COMMIT_KEY, None)
+    if scope is None:
+        return
+    bump_report_generations([*scope.tags(), *_matching_keyword_tags(scope.business_circles)])
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_pending_scope(session: Session, transaction: SessionTransaction) -> None:
+    # 外层事务回滚/关闭时丢弃登记（回滚后数据未变化，无需失效）
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+        session.info.pop(_COMMIT_KEY, None)
+
+
+__all__ = [
+    "COMMUNITIES_TAG",
+    "business_circle_tag",
+    "community_scope",
+    "community_tag",
+    "comparison_scope",
+    "filter_scope",
+    "mark_reports_stale",
+    "report_scope_tags",
+    "source_tag",
+]
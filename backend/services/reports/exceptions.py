@@ -33,4 +33,17 @@ class InvalidCompareIdsError(ValidationError):
         super().__init__(message)
 
 
-__all__ = ["CommunityNotFoundError", "InvalidCompareIdsError"]
+class InvalidReportPanelsError(ValidationError):
+    """批量面板查询的 panels 参数非法（未知面板）（400）."""
+
+    def __init__(self, message: str = "不支持的报表面板") -> None:
+        """初始化面板参数校验错误.
+
+        Args:
+            message: 错误消息，如 "不支持的报表面板: xxx"
+
+        """
+        super().__init__(message)
+
+
+__all__ = ["CommunityNotFoundError", "InvalidCompareIdsError", "InvalidReportPanelsError"]
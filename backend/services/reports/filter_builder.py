@@ -7,13 +7,14 @@
 新增 data_source / sold_date 时间窗口 / is_active 软删除过滤.
 """
 
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time, timedelta, timezone
 from typing import Any, Literal
 
 from sqlalchemy import Select, or_
 
-from models import Community, PropertyCurrent, PropertyStatus
+from models import Community, PropertyStatus
 from schemas.reports import ReportsFilter
+from services.reports.stats_source import RAW_SOURCE, StatsSource
 from utils.formatters import escape_like
 from utils.param_parser import parse_comma_separated_list
 
@@ -85,6 +86,7 @@ def apply_reports_filter(
     *,
     include_time_window: bool = True,
     auto_join_community: bool = True,
+    source: StatsSource = RAW_SOURCE,
 ) -> Select:
     """将 ReportsFilter 应用到 SQLAlchemy 查询.
 
@@ -113,27 +115,30 @@ def apply_reports_filter(
             True 适用于未显式 JOIN Community 的查询（KPI/Trend/Distribution 等）；
             False 适用于已显式 JOIN Community 的查询（business_district_rows /
             community_rows / comparison_* 等），避免重复 JOIN 报错
+        source: 统计数据源；汇总表与明细表维度列同名，条件作用于 ``source.model``
 
     Returns:
         Select: 应用筛选后的查询对象
 
     """
-    # 软删除过滤：PropertyCurrent.is_active
-    query = query.where(PropertyCurrent.is_active.is_(True))
+    model = source.model
+
+    # 软删除过滤：PropertyCurrent.is_active（汇总表只收录有效房源）
+    query = source.where_active(query)
 
     # 数据来源多选过滤
     if filter.sources:
-        query = query.where(PropertyCurrent.data_source.in_(filter.sources))
+        query = query.where(model.data_source.in_(filter.sources))
 
     # 商圈多关键词模糊匹配（OR LIKE）
     # 当 auto_join_community=True 时自动 JOIN Community，避免笛卡尔积
-    # 使用 join_from 显式指定左表 (PropertyCurrent), 避免在 select() 无显式
+    # 使用 join_from 显式指定左表 (数据源表), 避免在 select() 无显式
     # select_from 时 SQLAlchemy 无法推断 JOIN 左侧 (InvalidRequestError)
     needs_community_join = auto_join_community and bool(
         filter.business_circles or filter.community_name or filter.district
     )
     if needs_community_join:
-        query = query.join_from(PropertyCurrent, Community, PropertyCurrent.community_id == Community.id)
+        query = query.join_from(model, Community, model.community_id == Community.id)
         # 软删除过滤：仅在此 JOIN Community 后统一附加一次，
         # 替代往在各条件分支重复添加 Community.is_active，避免冗余 SQL 条件
         query = query.where(Community.is_active.is_(True))
@@ -173,9 +178,9 @@ def apply_reports_filter(
 
     # 状态过滤（报表只处理"在售"与"成交"，"过期"不在范围内）
     if filter.status == "在售":
-        query = query.where(PropertyCurrent.status == PropertyStatus.FOR_SALE)
+        query = query.where(model.status == PropertyStatus.FOR_SALE)
     elif filter.status == "成交":
-        query = query.where(PropertyCurrent.status == PropertyStatus.SOLD)
+        query = query.where(model.status == PropertyStatus.SOLD)
 
     # 户型过滤：解析 "1,2,4plus" -> rooms IN (1,2) OR rooms >= 4
     if filter.rooms:
@@ -193,15 +198,15 @@ def apply_reports_filter(
 
         room_conditions: list[Any] = []
         if exact_rooms:
-            room_conditions.append(PropertyCurrent.rooms.in_(exact_rooms))
+            room_conditions.append(model.rooms.in_(exact_rooms))
         if include_plus:
-            room_conditions.append(PropertyCurrent.rooms >= _ROOMS_PLUS_THRESHOLD)
+            room_conditions.append(model.rooms >= _ROOMS_PLUS_THRESHOLD)
         if room_conditions:
             query = query.where(or_(*room_conditions))
 
     # 楼层级别多选过滤
     if filter.floor_levels:
-        query = query.where(PropertyCurrent.floor_level.in_(filter.floor_levels))
+        query = query.where(model.floor_level.in_(filter.floor_levels))
 
     # 时间窗口过滤（基于 sold_date）：
     # 仅当 include_time_window=True 且 status 为成交或未指定时应用；
@@ -209,8 +214,8 @@ def apply_reports_filter(
     if include_time_window and filter.status in (None, "成交"):
         range_start, range_end = get_range_bounds(filter.range)
         query = query.where(
-            PropertyCurrent.sold_date >= range_start,
-            PropertyCurrent.sold_date <= range_end,
+            model.sold_date >= range_start,
+            model.sold_date <= range_end,
         )
 
     return query
@@ -224,7 +229,7 @@ def get_range_bounds(
 
     Args:
         range_option: 时间范围选项（4w/8w/6m/12m/24m）
-        reference_date: 时间窗口终止基准；None 时用 now(UTC)。
+        reference_date: 时间窗口终止基准（对齐到所在 UTC 日结束）；None 时用 now(UTC)。
             传入数据最新 sold_date 可避免数据更新延迟时显示无数据的最新周期
             （如数据最新到6月，现在7月，"近4周"应基于6月而非7月计算）
 
@@ -233,11 +238,22 @@ def get_range_bounds(
 
     """
     days = _RANGE_DAYS.get(range_option, _DEFAULT_RANGE_DAYS)
-    end = reference_date if reference_date is not None else datetime.now(timezone.utc)
+    end = end_of_utc_day(reference_date if reference_date is not None else datetime.now(timezone.utc))
     start = end - timedelta(days=days)
     return start, end
 
 
+def end_of_utc_day(moment: datetime) -> datetime:
+    """返回 moment 所在 UTC 自然日的最后一刻（naive 视为 UTC）.
+
+    时间窗口按整天划分：汇总表成交日为 UTC 零点，窗口终点对齐到当天结束后，
+    明细表与汇总表命中同一批成交日，结果一致。
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return datetime.combine(moment.astimezone(timezone.utc).date(), time.max, tzinfo=timezone.utc)
+
+
 def get_granularity(range_option: str) -> Literal["week", "month"]:
     """返回趋势粒度.
 
@@ -259,6 +275,7 @@ def get_granularity(range_option: str) -> Literal["week", "month"]:
 __all__ = [
     "apply_reports_filter",
     "build_reports_filter",
+    "end_of_utc_day",
     "get_granularity",
     "get_range_bounds",
 ]
@@ -0,0 +1,104 @@
+"""报表面板批量查询.
+
+报表页的 KPI / 趋势 / 价格、户型、楼层分布由各自的端点在同一个 Session 上串行计算，
+页面耗时为各面板耗时之和。``get_report_panels`` 在一个请求内并发计算所选面板：
+
+- 每个面板在线程池中使用独立 Session（连接池中的独立连接）执行
+- 调用各面板原有的缓存函数：缓存仍新鲜的面板直接命中，与单面板端点共享缓存条目
+- 未命中缓存的面板共用同一个时间窗口基准（``SharedReferenceDate``，MAX(sold_date) 只查询一次）
+- 返回各面板耗时与是否命中缓存
+"""
+
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from db import SessionLocal
+from schemas.reports.common import ReportPanel, ReportsFilter
+from services.reports import aggregations
+from services.reports.cache import last_report_cache_hit
+from settings import settings
+
+# 面板 → 缓存函数 (db, filter, trend_dim)
+_PANEL_FUNCS: dict[ReportPanel, Callable[[Session, ReportsFilter, str], Any]] = {
+    ReportPanel.KPI: lambda db, report_filter, _trend_dim: aggregations.get_kpi_data(db, report_filter),
+    ReportPanel.TREND: aggregations.get_trend_data,
+    ReportPanel.PRICE_DISTRIBUTION: lambda db, report_filter, _trend_dim: aggregations.get_price_distribution(
+        db, report_filter
+    ),
+    ReportPanel.ROOMS_DISTRIBUTION: lambda db, report_filter, _trend_dim: aggregations.get_rooms_distribution(
+        db, report_filter
+    ),
+    ReportPanel.FLOOR_DISTRIBUTION: lambda db, report_filter, _trend_dim: aggregations.get_floor_distribution(
+        db, report_filter
+    ),
+}
+
+_panel_executor: ThreadPoolExecutor | None = None
+_panel_executor_lock = threading.Lock()
+
+
+def _get_panel_executor() -> ThreadPoolExecutor:
+    """面板查询线程池单例（大小取 ``settings.reports_panel_concurrency``）."""
+    global _panel_executor
+    if _panel_executor is not None:
+        return _panel_executor
+    with _panel_executor_lock:
+        if _panel_executor is None:
+            _panel_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.reports_panel_concurrency),
+                thread_name_prefix="ReportPanel",
+            )
+        return _panel_executor
+
+
+def _run_panel(
+    panel: ReportPanel,
+    filter: ReportsFilter,
+    trend_dim: str,
+    shared: aggregations.SharedReferenceDate,
+) -> tuple[Any, float, bool]:
+    """在独立 Session 中计算单个面板，返回 (结果, 耗时毫秒, 是否命中缓存)."""
+    started = time.perf_counter()
+    with aggregations.using_reference_date(shared), SessionLocal() as db:
+        value = _PANEL_FUNCS[panel](db, filter, trend_dim)
+        cached = bool(last_report_cache_hit())
+    return value, (time.perf_counter() - started) * 1000, cached
+
+
+def get_report_panels(filter: ReportsFilter, panels: Sequence[ReportPanel], trend_dim: str = "overall") -> dict:
+    """并发计算报表页的多个面板.
+
+    Args:
+        filter: 报表筛选参数（各面板共用）
+        panels: 要计算的面板（已去重）
+        trend_dim: 趋势维度（仅 trend 面板使用）
+
+    Returns:
+        dict: ReportPanelsResponse 校验结构（未请求的面板缺省为 null）
+
+    Raises:
+        Exception: 任一面板计算失败时抛出其异常（其余面板照常完成并写入缓存）
+
+    """
+    started = time.perf_counter()
+    shared = aggregations.SharedReferenceDate(filter)
+    executor = _get_panel_executor()
+    futures = [(panel, executor.submit(_run_panel, panel, filter, trend_dim, shared)) for panel in panels]
+
+    result: dict[str, Any] = {}
+    timings: list[dict[str, Any]] = []
+    for panel, future in futures:
+        value, elapsed_ms, cached = future.result()
+        result[panel.value] = value
+        timings.append({"panel": panel, "elapsed_ms": round(elapsed_ms, 2), "cached": cached})
+    result["timings"] = timings
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+__all__ = ["get_report_panels"]
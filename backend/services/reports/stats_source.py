@@ -0,0 +1,154 @@
+"""报表统计数据源.
+
+报表聚合可以读取两种数据源，二者维度列同名，筛选/分组表达式可以共用，只有度量写法不同：
+
+- ``property_current`` 明细表：``COUNT(*)`` / ``AVG(col)``
+- ``market_stats_rollups`` 汇总表：``SUM(listing_count)`` / ``SUM(sum) / SUM(count)``
+
+``settings.reports_use_rollups`` 开启时（默认），KPI / 趋势（总体、户型、楼层维度）/
+户型与楼层分布 / 商圈列表 / 小区列表 / 多商圈对比均读汇总表；依赖单套价格的统计
+（价格分布 P5/P95 分段、趋势价格维度）仍扫描明细表。
+"""
+
+from dataclasses import dataclass
+
+from sqlalchemy import DateTime, Numeric, Select, case, func, type_coerce
+from sqlalchemy.sql.elements import ColumnElement
+
+from models import MarketStatsRollup, PropertyCurrent
+from settings import settings
+
+# 单位换算: 万 -> 元
+_WAN_TO_YUAN = 10000
+
+
+def _filtered(aggregate: ColumnElement, where: ColumnElement | None) -> ColumnElement:
+    """为聚合函数附加 FILTER (WHERE ...) 子句."""
+    return aggregate.filter(where) if where is not None else aggregate
+
+
+def _ratio(numerator: ColumnElement, denominator: ColumnElement) -> ColumnElement:
+    """SUM(sum) / SUM(count)，分母为 0 时返回 NULL（与 AVG 空集结果一致）.
+
+    结果类型不沿用合计列的 Numeric(20, 2)，避免结果处理按 2 位小数截断均值。
+    """
+    return type_coerce(numerator / func.nullif(denominator, 0), Numeric())
+
+
+@dataclass(frozen=True)
+class StatsSource:
+    """报表统计数据源（明细表或汇总表）.
+
+    ``model`` 提供维度列（status / community_id / data_source / rooms / halls /
+    floor_level / sold_date），度量由各方法生成，可选 ``where`` 生成 FILTER 子句。
+    """
+
+    model: type[PropertyCurrent] | type[MarketStatsRollup]
+
+    @property
+    def is_rollup(self) -> bool:
+        """是否为汇总表数据源."""
+        return self.model is MarketStatsRollup
+
+    def where_active(self, query: Select) -> Select:
+        """追加有效房源过滤（汇总表只收录有效房源，无需过滤）."""
+        if self.is_rollup:
+            return query
+        return query.where(PropertyCurrent.is_active.is_(True))
+
+    def count(self, where: ColumnElement | None = None) -> ColumnElement:
+        """房源套数."""
+        if self.is_rollup:
+            return _filtered(func.sum(MarketStatsRollup.listing_count), where)
+        return _filtered(func.count(), where)
+
+    def avg_price(self, where: ColumnElement | None = None) -> ColumnElement:
+        """平均成交价（万）."""
+        if self.is_rollup:
+            return _ratio(
+                _filtered(func.sum(MarketStatsRollup.price_sum), where),
+                _filtered(func.sum(MarketStatsRollup.price_count), where),
+            )
+        return _filtered(func.avg(PropertyCurrent.sold_price_wan), where)
+
+    def avg_unit_price(self, where: ColumnElement | None = None) -> ColumnElement:
+        """平均成交单价（元/㎡，仅 build_area > 0 且有成交价的房源）."""
+        if self.is_rollup:
+            return _ratio(
+                _filtered(func.sum(MarketStatsRollup.unit_price_sum), where),
+                _filtered(func.sum(MarketStatsRollup.unit_price_count), where),
+            )
+        return _filtered(func.avg(unit_price_expr()), where)
+
+    def avg_area(self, where: ColumnElement | None = None) -> ColumnElement:
+        """平均建筑面积（㎡，含面积为 0 的脏数据，与 AVG(build_area) 一致）."""
+        if self.is_rollup:
+            return _ratio(
+                _filtered(func.sum(MarketStatsRollup.area_sum), where),
+                _filtered(func.sum(MarketStatsRollup.listing_count), where),
+            )
+        return _filtered(func.avg(PropertyCurrent.build_area), where)
+
+    def avg_valid_area(self, where: ColumnElement | None = None) -> ColumnElement:
+        """平均建筑面积（㎡，仅 build_area > 0）."""
+        if self.is_rollup:
+            return _ratio(
+                _filtered(func.sum(MarketStatsRollup.valid_area_sum), where),
+                _filtered(func.sum(MarketStatsRollup.valid_area_count), where),
+            )
+        return _filtered(func.avg(valid_area_expr()), where)
+
+
+RAW_SOURCE = StatsSource(PropertyCurrent)
+ROLLUP_SOURCE = StatsSource(MarketStatsRollup)
+
+
+def get_stats_source() -> StatsSource:
+    """返回当前配置的报表统计数据源."""
+    return ROLLUP_SOURCE if settings.reports_use_rollups else RAW_SOURCE
+
+
+def unit_price_expr() -> ColumnElement:
+    """单价表达式: sold_price_wan * 10000 / build_area (仅 build_area > 0 且 sold_price_wan 非空时计算).
+
+    Returns:
+        ColumnElement: SQLAlchemy CASE 表达式; 不满足条件时返回 None
+
+    """
+    return case(
+        (
+            (PropertyCurrent.build_area > 0) & (PropertyCurrent.sold_price_wan.isnot(None)),
+            PropertyCurrent.sold_price_wan * _WAN_TO_YUAN / PropertyCurrent.build_area,
+        ),
+        else_=None,
+    )
+
+
+def utc_date_trunc(field: str, column: ColumnElement) -> ColumnElement:
+    """按 UTC 截断时间到 day/week/month，返回 UTC 零点的 timestamptz.
+
+    ``date_trunc`` 作用于 timestamptz 时按数据库会话 TimeZone 截断；先转为 UTC 本地时间再截断，
+    汇总表的成交日与明细表的趋势周期都以 UTC 划分（与 ``_generate_periods`` 的 UTC 对齐一致），
+    不受会话时区影响。
+    """
+    utc_wall_time = func.timezone("UTC", column)
+    return func.timezone("UTC", func.date_trunc(field, utc_wall_time), type_=DateTime(timezone=True))
+
+
+def valid_area_expr() -> ColumnElement:
+    """面积表达式: 仅 build_area > 0 时返回原值, 否则 None (过滤脏数据)."""
+    return case(
+        (PropertyCurrent.build_area > 0, PropertyCurrent.build_area),
+        else_=None,
+    )
+
+
+__all__ = [
+    "RAW_SOURCE",
+    "ROLLUP_SOURCE",
+    "StatsSource",
+    "get_stats_source",
+    "unit_price_expr",
+    "utc_date_trunc",
+    "valid_area_expr",
+]
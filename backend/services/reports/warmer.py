@@ -0,0 +1,218 @@
+"""报表缓存预热.
+
+报表端点与 C 端小区分析均在首次请求时计算，缓存过期或导入完成后的第一个用户要承担
+完整的聚合耗时。预热线程在以下时机预先计算默认筛选组合并写入报表缓存：
+
+- 导入任务完成后（``request_report_cache_warm``，导入工作进程可独立于 API 进程）
+- 定时（``settings.reports_warm_interval_seconds``），多 worker 通过 Redis 抢占，每个周期只运行一次
+
+预热范围：每个时间范围的 KPI / 各维度趋势 / 价格、户型、楼层分布 / 商圈列表首页，
+以及访问量前 N 个小区在每个时间范围、每个趋势维度下的成交分析。
+预热只重算剩余存活时间不足一个预热周期的条目，仍新鲜的条目直接跳过。
+
+命中统计见 ``get_report_cache_stats``（预热命中率 = 命中预热生成条目次数 / 报表调用次数）。
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+
+from db import SessionLocal
+from models import Community
+from schemas.reports import RangeOption, ReportCacheMetrics, ReportsFilter, TrendDimension
+from services.reports import aggregations
+from services.reports.cache import flush_report_cache_metrics, get_report_cache_metrics, warming
+from settings import settings
+from utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# 小区分析访问量（有序集合，按周期衰减）
+_TRAFFIC_KEY = "reports:warm:community_traffic"
+
+# 导入完成后的预热请求标记（任一 worker 删除成功即负责执行）
+_REQUEST_KEY = "reports:warm:requested"
+
+# 定时预热抢占标记（存活一个预热周期）
+_SCHEDULE_KEY = "reports:warm:schedule"
+
+# 预热线程轮询间隔（秒），同时是缓存命中计数的上报间隔
+_POLL_SECONDS = 5.0
+
+# 每次定时预热后访问量乘以该系数，使排行反映近期访问
+_TRAFFIC_DECAY = 0.95
+
+# 访问量排行保留的小区数上限
+_TRAFFIC_MAX_MEMBERS = 1000
+
+_wake = threading.Event()
+_warmer_thread: threading.Thread | None = None
+_warmer_lock = threading.Lock()
+
+
+def record_community_view(community_id: str) -> None:
+    """记录一次小区分析访问（用于挑选预热小区，Redis 不可用时跳过）."""
+    try:
+        get_redis_client().zincrby(_TRAFFIC_KEY, 1, community_id)
+    except RedisError:
+        logger.debug("记录小区分析访问量失败: %s", community_id)
+
+
+def request_report_cache_warm() -> None:
+    """请求尽快预热报表缓存（导入任务完成后调用）."""
+    try:
+        get_redis_client().set(_REQUEST_KEY, 1)
+    except RedisError:
+        logger.warning("登记报表缓存预热请求失败，等待下次定时预热")
+    _wake.set()
+
+
+def warm_report_cache() -> int:
+    """执行一轮预热，返回预热调用失败次数."""
+    started = time.monotonic()
+    failures = 0
+    # 剩余存活时间撑不到下一轮预热的条目重算
+    refresh_below = settings.reports_warm_interval_seconds + _POLL_SECONDS
+    with warming(refresh_below), SessionLocal() as db:
+        for range_option in RangeOption:
+            report_filter = ReportsFilter(range=range_option.value)
+            failures += _warm(db, aggregations.get_kpi_data, db, report_filter)
+            for trend_dim in TrendDimension:
+                failures += _warm(db, aggregations.get_trend_data, db, report_filter, trend_dim.value)
+            failures += _warm(db, aggregations.get_price_distribution, db, report_filter)
+            failures += _warm(db, aggregations.get_rooms_distribution, db, report_filter)
+            failures += _warm(db, aggregations.get_floor_distribution, db, report_filter)
+            failures += _warm(db, aggregations.get_business_district_rows, db, report_filter)
+
+        for community in _top_communities(db):
+            for range_option in RangeOption:
+                report_filter = ReportsFilter(range=range_option.value)
+                for trend_dim in TrendDimension:
+                    failures += _warm(
+                        db, aggregations.get_community_detail, db, community, report_filter, trend_dim.value
+                    )
+
+    flush_report_cache_metrics()
+    stats = get_report_cache_stats()
+    logger.info(
+        "报表缓存预热完成: 耗时 %.1fs, 失败 %s, 累计重算 %s / 跳过 %s, 命中率 %s, 预热命中率 %s",
+        time.monotonic() - started,
+        failures,
+        stats.warm_refreshed,
+        stats.warm_skipped,
+        stats.hit_ratio,
+        stats.warm_hit_ratio,
+    )
+    return failures
+
+
+def get_report_cache_stats() -> ReportCacheMetrics:
+    """报表缓存命中统计（全部 worker 累计）."""
+    counts = get_report_cache_metrics()
+    requests = counts["requests"]
+    return ReportCacheMetrics(
+        **counts,
+        hit_ratio=round(counts["hits"] / requests, 4) if requests else None,
+        warm_hit_ratio=round(counts["warmed_hits"] / requests, 4) if requests else None,
+    )
+
+
+def _warm(db: Session, func: Callable[..., Any], *args: Any) -> int:
+    """调用一个报表聚合写入缓存，失败时回滚会话并返回 1（不中断本轮其余预热）."""
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("报表缓存预热失败: %s", func.__qualname__)
+        db.rollback()
+        return 1
+    return 0
+
+
+def _top_communities(db: Session) -> list[Community]:
+    """访问量前 N 个有效小区（按访问量降序）."""
+    limit = settings.reports_warm_top_communities
+    if limit <= 0:
+        return []
+    try:
+        ranked = get_redis_client().zrevrange(_TRAFFIC_KEY, 0, limit - 1)
+    except RedisError:
+        return []
+    ids = [member.decode() if isinstance(member, bytes) else member for member in ranked]
+    if not ids:
+        return []
+    communities = {
+        community.id: community
+        for community in db.query(Community).filter(Community.id.in_(ids), Community.is_active.is_(True))
+    }
+    return [communities[cid] for cid in ids if cid in communities]
+
+
+def _decay_traffic() -> None:
+    """访问量按周期衰减并裁剪排行长度."""
+    try:
+        redis_client = get_redis_client()
+        redis_client.zunionstore(_TRAFFIC_KEY, {_TRAFFIC_KEY: _TRAFFIC_DECAY})
+        redis_client.zremrangebyrank(_TRAFFIC_KEY, 0, -_TRAFFIC_MAX_MEMBERS - 1)
+    except RedisError:
+        logger.warning("衰减小区分析访问量失败")
+
+
+def _claim_run() -> tuple[bool, bool]:
+    """抢占一轮预热，返回 (是否执行, 是否为定时预热).
+
+    Redis 不可用时不预热（进程内缓存存活时间远短于预热周期，预热无意义）。
+    """
+    interval_ms = int(settings.reports_warm_interval_seconds * 1000)
+    try:
+        redis_client = get_redis_client()
+        if redis_client.delete(_REQUEST_KEY):
+            # 导入后的预热顺延本周期的定时预热
+            redis_client.set(_SCHEDULE_KEY, 1, px=interval_ms)
+            return True, False
+        scheduled = bool(redis_client.set(_SCHEDULE_KEY, 1, nx=True, px=interval_ms))
+    except RedisError:
+        return False, False
+    return scheduled, scheduled
+
+
+def _run_warmer() -> None:
+    """预热线程主循环：抢占到预热时执行，并定期上报缓存命中计数."""
+    logger.info("报表缓存预热线程已启动")
+    while True:
+        run, scheduled = _claim_run()
+        if run:
+            try:
+                warm_report_cache()
+            except Exception:
+                logger.exception("报表缓存预热异常")
+            if scheduled:
+                _decay_traffic()
+        flush_report_cache_metrics()
+        _wake.wait(_POLL_SECONDS)
+        _wake.clear()
+
+
+def start_report_cache_warmer() -> None:
+    """在 API 进程内启动报表缓存预热线程（幂等，``settings.reports_warm_enabled`` 关闭时不启动）."""
+    global _warmer_thread
+    if not settings.reports_warm_enabled:
+        return
+    with _warmer_lock:
+        if _warmer_thread is not None:
+            return
+        _warmer_thread = threading.Thread(target=_run_warmer, name="ReportCacheWarmer", daemon=True)
+        _warmer_thread.start()
+
+
+__all__ = [
+    "get_report_cache_stats",
+    "record_community_view",
+    "request_report_cache_warm",
+    "start_report_cache_warmer",
+    "warm_report_cache",
+]
@@ -1,22 +1,32 @@
 """API Key 服务层.
 
 处理 API Key 的生成、验证和管理.
+
+已验证的 Key 与所属用户经 ``principal_cache`` 缓存；最后使用时间在进程内缓冲，
+按 ``api_key_last_used_interval_seconds`` 间隔批量写回，不再每次调用更新一行。
 """
 
 import hashlib
 import hmac
 import logging
 import secrets
+import threading
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, joinedload, selectinload
 
+from db import SessionLocal
 from models import ApiKey, User
 from settings import settings
 from utils.security_logger import log_auth_event
 
 from .exceptions import AuthenticationError, ResourceNotFoundError, ServiceException
+from .permission import permission_service
+from .principal_cache import lookup_api_key, lookup_principal
 
 _API_KEY_GEN_FAILED = "API Key生成失败，请稍后重试"
 _API_KEY_REVOKE_FAILED = "API Key撤销失败，请稍后重试"
@@ -26,6 +36,56 @@ logger = logging.getLogger(__name__)
 _API_KEY_PART_COUNT = 3
 
 
+class _LastUsedRecorder:
+    """API Key 最后使用时间的进程内缓冲.
+
+    每次认证只记录到内存；距上次写回超过间隔时，由当次调用以一条 executemany UPDATE
+    批量写回所有缓冲的 Key（独立会话，不占用请求事务）。进程退出前由 ``flush`` 写回剩余记录。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: dict[uuid.UUID, datetime] = {}
+        self._last_flush = time.monotonic()
+
+    def record(self, key_id: uuid.UUID) -> None:
+        """记录一次使用，到达写回间隔时批量写回."""
+        with self._lock:
+            self._pending[key_id] = datetime.now(timezone.utc)
+            if time.monotonic() - self._last_flush < settings.api_key_last_used_interval_seconds:
+                return
+            pending = self._swap()
+        self._write(pending)
+
+    def flush(self) -> None:
+        """立即写回全部缓冲记录."""
+        with self._lock:
+            pending = self._swap()
+        self._write(pending)
+
+    def _swap(self) -> dict[uuid.UUID, datetime]:
+        pending, self._pending = self._pending, {}
+        self._last_flush = time.monotonic()
+        return pending
+
+    @staticmethod
+    def _write(pending: dict[uuid.UUID, datetime]) -> None:
+        if not pending:
+            return
+        try:
+            with SessionLocal() as db:
+                db.execute(
+                    update(ApiKey),
+                    [{"id": key_id, "last_used_at": used_at} for key_id, used_at in pending.items()],
+                )
+                db.commit()
+        except SQLAlchemyError:
+            logger.warning("API Key 最后使用时间写回失败，丢弃 %d 条记录", len(pending))
+
+
+_last_used_recorder = _LastUsedRecorder()
+
+
 class ApiKeyService:
     """API Key 服务."""
 
@@ -176,11 +236,17 @@ class ApiKeyService:
                 logger.exception("API Key撤销失败")
             raise ServiceException(_API_KEY_REVOKE_FAILED) from e
 
+    @staticmethod
+    def flush_last_used() -> None:
+        """写回进程内缓冲的 API Key 最后使用时间（应用关闭时调用）."""
+        _last_used_recorder.flush()
+
     @staticmethod
     def authenticate_by_api_key(db: Session, api_key: str) -> User:
         """通过 API Key 认证用户.
 
-        注意：调用方需要自行提交事务以更新最后使用时间.
+        已验证的 Key 与用户快照命中缓存时不查询数据库；最后使用时间由进程内缓冲批量写回，
+        调用方无需提交事务。
 
         Args:
             db: 数据库会话
@@ -203,6 +269,57 @@ class ApiKeyService:
         prefix = parts[1]
         key_hash = ApiKeyService._hash_key(api_key)
 
+        cached_key = lookup_api_key(key_hash)
+        if cached_key.key_id is not None and cached_key.user_id is not None:
+            key_id, user_id, expires_at = cached_key.key_id, cached_key.user_id, cached_key.expires_at
+        else:
+            key_record = ApiKeyService._find_active_key(db, prefix, key_hash, api_key)
+            cached_key.store(key_record)
+            key_id, user_id, expires_at = key_record.id, key_record.user_id, key_record.expires_at
+
+        if expires_at and expires_at < datetime.now(timezone.utc):
+            log_auth_event("api_key_auth_failure", key_prefix=prefix, reason="expired")
+            msg = "API Key 已过期"
+            raise AuthenticationError(msg)
+
+        _last_used_recorder.record(key_id)
+
+        principal = lookup_principal(db, user_id)
+        user = principal.user
+        if user is None:
+            user = (
+                db.query(User)
+                .options(joinedload(User.role), selectinload(User.roles))
+                .filter(User.id == user_id)
+                .first()
+            )
+            if user is not None:
+                principal.store(user, permission_service.get_user_permission_codes(db, user))
+
+        if user is None or user.status != "active":
+            log_auth_event(
+                "api_key_auth_failure",
+                key_prefix=prefix,
+                reason="user_inactive",
+            )
+            msg = "用户不存在或已被禁用"
+            raise AuthenticationError(msg)
+
+        log_auth_event(
+            "api_key_auth_success",
+            user_id=user.id,
+            key_prefix=prefix,
+        )
+        return user
+
+    @staticmethod
+    def _find_active_key(db: Session, prefix: str, key_hash: str, api_key: str) -> ApiKey:
+        """查询有效的 API Key 记录（兼容旧 SHA-256 哈希并就地升级）.
+
+        Raises:
+            AuthenticationError: Key 不存在或已撤销
+
+        """
         key_record = (
             db.query(ApiKey)
             .filter(
@@ -241,35 +358,4 @@ class ApiKeyService:
             key_record.key_hash = key_hash
             db.flush()
 
-        if key_record.expires_at and key_record.expires_at < datetime.now(timezone.utc):
-            log_auth_event("api_key_auth_failure", key_prefix=prefix, reason="expired")
-            msg = "API Key 已过期"
-            raise AuthenticationError(msg)
-
-        key_record.mark_used()
-
-        user = (
-            db.query(User)
-            .options(joinedload(User.role), selectinload(User.roles))
-            .filter(
-                User.id == key_record.user_id,
-                User.status == "active",
-            )
-            .first()
-        )
-
-        if not user:
-            log_auth_event(
-                "api_key_auth_failure",
-                key_prefix=prefix,
-                reason="user_inactive",
-            )
-            msg = "用户不存在或已被禁用"
-            raise AuthenticationError(msg)
-
-        log_auth_event(
-            "api_key_auth_success",
-            user_id=user.id,
-            key_prefix=prefix,
-        )
-        return user
+        return key_record
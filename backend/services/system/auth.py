@@ -35,6 +35,8 @@ from .exceptions import (
     PermissionDeniedError,
     ResourceNotFoundError,
 )
+from .permission import permission_service
+from .principal_cache import lookup_principal
 
 logger = logging.getLogger(__name__)
 
@@ -282,7 +284,8 @@ class AuthService:
         """通过 JWT token 认证用户 (Sync - Blocking).
 
         验证 token 有效性并返回对应的用户对象，复用 get_user_by_id 方法。
-        同时校验 token_version 以支持服务端撤销。
+        同时校验 token_version 以支持服务端撤销。用户快照与有效权限集经
+        ``principal_cache`` 缓存，命中时不查询数据库。
 
         Args:
             db: 数据库会话
@@ -306,17 +309,24 @@ class AuthService:
             msg = "token 无效"
             raise AuthenticationError(msg)
 
+        # 严格校验 token_version：缺失或不匹配一律拒绝（已签发 Token 被撤销或伪造）
+        token_ver = payload.get("ver")
+
+        # 缓存命中（版本戳与 token_version 均一致）时不查询数据库
+        lookup = lookup_principal(db, user_id, token_ver)
+        if lookup.user is not None:
+            return lookup.user
+
         user = AuthService.get_user_by_id(db, user_id)
         if user is None:
             msg = "用户不存在"
             raise AuthenticationError(msg)
 
-        # 严格校验 token_version：缺失或不匹配一律拒绝（已签发 Token 被撤销或伪造）
-        token_ver = payload.get("ver")
         if token_ver != user.token_version:
             msg = "凭据已失效，请重新登录"
             raise AuthenticationError(msg)
 
+        lookup.store(user, permission_service.get_user_permission_codes(db, user))
         return user
 
     @staticmethod
@@ -16,6 +16,7 @@ from schemas.permission import (
 from settings import settings
 
 from .exceptions import ConflictError, ResourceNotFoundError, ValidationError
+from .principal_cache import cached_permission_codes, remember_permission_codes
 
 
 class PermissionService:
@@ -228,6 +229,11 @@ class PermissionService:
             权限代码集合（set，便于并集运算）
 
         """
+        # 同一事务内已解析（认证缓存命中或先前的权限依赖）时直接复用
+        cached = cached_permission_codes(db, user.id)
+        if cached is not None:
+            return cached
+
         role_ids: set[str] = set()
         if user.role_id:
             role_ids.add(user.role_id)
@@ -245,7 +251,9 @@ class PermissionService:
             .join(role_permissions, role_permissions.c.permission_id == Permission.id)
             .where(role_permissions.c.role_id.in_(role_ids))
         ).fetchall()
-        return {row[0] for row in result}
+        codes = {row[0] for row in result}
+        remember_permission_codes(db, user.id, codes)
+        return codes
 
 
 # 全局服务实例
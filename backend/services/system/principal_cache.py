@@ -0,0 +1,378 @@
+"""认证主体缓存（用户快照 + 有效权限集）.
+
+每个请求的认证（``AuthService.authenticate_by_token``）与权限校验（``PermissionService.get_user_permission_codes``）
+原本各需查询用户、附加角色与权限。本模块把认证结果缓存在 Redis（多 worker 共享）：
+
+- ``auth:principal:{user_id}``：带 HMAC 签名的 JSON 快照，包含用户列值（不含密码哈希与加密列）、
+  主角色/附加角色列值、有效权限代码及写入时的版本戳；TTL 为 ``auth_principal_cache_seconds``
+- 版本戳 = (全局代数, 用户代数)，查询数据库前读取，命中时必须与当前值一致；
+  快照的 token_version 还必须等于 Token 中的 ver
+- 命中后以 ``merge(load=False)`` 把快照挂到当前会话，不发 SQL；未缓存的列（手机号等）访问时按需加载
+- 同一事务内的有效权限集记在 ``Session.info``，多个权限依赖共用
+- API Key：``auth:api_key:{key_hash}`` 缓存已验证 Key 的 ID、所属用户与过期时间，版本戳为
+  (全局代数, Key 代数)；用户本身仍经上面的用户快照解析
+
+失效在外层事务提交后执行（回滚时丢弃）：
+- ORM 修改/删除用户、增删 UserRole：递增该用户代数（token_version 递增随之生效）
+- ORM 修改/删除 API Key（撤销、旧哈希升级）：递增该 Key 哈希的代数
+- ORM 修改/删除角色与权限、对 users/roles/user_roles/role_permissions/permissions 的集合式语句：
+  递增全局代数，所有快照失效
+
+Redis 不可用时直接查询数据库；失效写入失败时快照最长在 TTL 内继续有效。
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import cache
+from itertools import chain
+from typing import Any
+
+from redis.exceptions import RedisError
+from sqlalchemy import DateTime, event, inspect
+from sqlalchemy.orm import ColumnProperty, ORMExecuteState, Session, SessionTransaction, UOWTransaction
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.session import make_transient_to_detached
+
+from models import ApiKey, Permission, Role, User, UserRole
+from models.common.encrypted import EncryptedString
+from settings import settings
+from utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "auth:principal:"
+_GENERATION_KEY = "auth:principal:generation"
+_USER_VERSION_PREFIX = "auth:principal:ver:"
+_API_KEY_PREFIX = "auth:api_key:"
+_API_KEY_VERSION_PREFIX = "auth:api_key:ver:"
+
+# 用户/Key 代数 key 的存活秒数（远大于快照 TTL，过期归零后不会与仍存活的旧快照版本戳相撞）
+_VERSION_TTL_SECONDS = 86400
+
+# lookup_principal 不校验 token_version 时的默认值（API Key 认证）
+_ANY_TOKEN_VERSION = object()
+
+# 快照格式版本（列集合或结构变化时递增，旧快照视为未命中）
+_PAYLOAD_VERSION = 1
+
+# 快照签名密钥：由 JWT 密钥派生，防止 Redis 被写入伪造的权限集
+_SIGNING_KEY = hashlib.sha256(b"auth-principal:" + settings.jwt_secret_key.encode()).digest()
+_SIGNATURE_LEN = hashlib.sha256().digest_size
+
+# 不写入快照的列（密码哈希；加密列另按类型排除，避免明文进入 Redis）
+_EXCLUDED_COLUMNS = frozenset({"password"})
+
+# 集合式语句写入这些表时递增全局代数
+_PRINCIPAL_TABLES = frozenset({"users", "roles", "user_roles", "role_permissions", "permissions"})
+
+# Session.info 中待失效范围与本事务有效权限集的 key
+_PENDING_KEY = "principal_cache_pending"
+_PERMISSIONS_KEY = "principal_permissions"
+
+
+@cache
+def _snapshot_columns(model: type) -> tuple[ColumnProperty, ...]:
+    """写入快照的列属性."""
+    return tuple(
+        attr
+        for attr in inspect(model).column_attrs
+        if attr.key not in _EXCLUDED_COLUMNS and not isinstance(attr.columns[0].type, EncryptedString)
+    )
+
+
+def _dump_columns(obj: User | Role) -> dict[str, Any]:
+    values = {}
+    for attr in _snapshot_columns(type(obj)):
+        value = getattr(obj, attr.key)
+        values[attr.key] = value.isoformat() if isinstance(value, datetime) else value
+    return values
+
+
+def _restore(model: type[User | Role], values: dict[str, Any]) -> User | Role:
+    """由快照列值构造实例（属性按已从数据库加载处理，未包含的列保持未加载）."""
+    obj = inspect(model).class_manager.new_instance()
+    for attr in _snapshot_columns(model):
+        value = values[attr.key]
+        if value is not None and isinstance(attr.columns[0].type, DateTime):
+            value = datetime.fromisoformat(value)
+        set_committed_value(obj, attr.key, value)
+    return obj
+
+
+def _dumps(snapshot: dict[str, Any]) -> bytes:
+    body = json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")).encode()
+    return hmac.new(_SIGNING_KEY, body, hashlib.sha256).digest() + body
+
+
+def _loads(data: bytes) -> dict[str, Any]:
+    signature, body = data[:_SIGNATURE_LEN], data[_SIGNATURE_LEN:]
+    if not hmac.compare_digest(signature, hmac.new(_SIGNING_KEY, body, hashlib.sha256).digest()):
+        msg = "认证主体缓存签名不匹配"
+        raise ValueError(msg)
+    return json.loads(body)
+
+
+def _data_key(user_id: str) -> str:
+    return f"{_KEY_PREFIX}{user_id}"
+
+
+def _version_key(user_id: str) -> str:
+    return f"{_USER_VERSION_PREFIX}{user_id}"
+
+
+def _api_key_version_key(key_hash: str) -> str:
+    return f"{_API_KEY_VERSION_PREFIX}{key_hash}"
+
+
+def cached_permission_codes(db: Session, user_id: str) -> set[str] | None:
+    """本事务内已解析的用户有效权限集（未解析时为 None）."""
+    codes = db.info.get(_PERMISSIONS_KEY, {}).get(user_id)
+    return set(codes) if codes is not None else None
+
+
+def remember_permission_codes(db: Session, user_id: str, codes: Iterable[str]) -> None:
+    """记录本事务内解析出的用户有效权限集（外层事务结束时清除）."""
+    db.info.setdefault(_PERMISSIONS_KEY, {})[user_id] = frozenset(codes)
+
+
+@dataclass
+class PrincipalLookup:
+    """一次认证主体缓存查询的结果.
+
+    命中时 ``user`` 为已挂到会话的用户；未命中时 ``stamp`` 为查询数据库前读取的版本戳，
+    供 ``store`` 写回（Redis 不可用或缓存关闭时为 None，不写回）。
+    """
+
+    user: User | None = None
+    stamp: tuple[int, int] | None = None
+
+    def store(self, user: User, permission_codes: Iterable[str]) -> None:
+        """写回数据库查询得到的用户快照与有效权限集（需已预加载 role 与 roles）."""
+        if self.stamp is None:
+            return
+        snapshot = {
+            "v": _PAYLOAD_VERSION,
+            "stamp": list(self.stamp),
+            "user": _dump_columns(user),
+            "role": _dump_columns(user.role) if user.role is not None else None,
+            "roles": [_dump_columns(role) for role in user.roles],
+            "permissions": sorted(permission_codes),
+        }
+        try:
+            get_redis_client().set(_data_key(user.id), _dumps(snapshot), ex=settings.auth_principal_cache_seconds)
+        except RedisError:
+            logger.debug("写入认证主体缓存失败: user_id=%s", user.id)
+
+
+def lookup_principal(db: Session, user_id: str, token_version: object = _ANY_TOKEN_VERSION) -> PrincipalLookup:
+    """按用户ID与 Token 版本号查询认证主体缓存.
+
+    一次 pipeline 往返读取全局代数、用户代数与快照；命中时把用户（含 role/roles）合并到会话，
+    并记录本事务的有效权限集。不传 ``token_version`` 时不校验版本号（API Key 认证）。
+    """
+    if settings.auth_principal_cache_seconds <= 0:
+        return PrincipalLookup()
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        pipe.get(_GENERATION_KEY)
+        pipe.get(_version_key(user_id))
+        pipe.get(_data_key(user_id))
+        generation, version, data = pipe.execute()
+    except RedisError:
+        logger.debug("读取认证主体缓存失败，回退查询数据库: user_id=%s", user_id)
+        return PrincipalLookup()
+
+    lookup = PrincipalLookup(stamp=(int(generation or 0), int(version or 0)))
+    if data is None:
+        return lookup
+    try:
+        snapshot = _loads(data)
+        if (
+            snapshot["v"] != _PAYLOAD_VERSION
+            or tuple(snapshot["stamp"]) != lookup.stamp
+            or (token_version is not _ANY_TOKEN_VERSION and snapshot["user"]["token_version"] != token_version)
+        ):
+            return lookup
+        user = _restore(User, snapshot["user"])
+        role = _restore(Role, snapshot["role"]) if snapshot["role"] is not None else None
+        roles = [_restore(Role, values) for values in snapshot["roles"]]
+        permission_codes = snapshot["permissions"]
+    except (ValueError, KeyError, TypeError):
+        logger.warning("认证主体缓存数据无效，回退查询数据库: user_id=%s", user_id)
+        return lookup
+
+    set_committed_value(user, "role", role)
+    set_committed_value(user, "roles", roles)
+    for obj in (user, *roles, *([role] if role is not None else [])):
+        make_transient_to_detached(obj)
+    lookup.user = db.merge(user, load=False)
+    remember_permission_codes(db, user_id, permission_codes)
+    return lookup
+
+
+@dataclass
+class ApiKeyLookup:
+    """一次 API Key 缓存查询的结果.
+
+    命中时 ``key_id`` / ``user_id`` / ``expires_at`` 来自缓存；未命中时 ``stamp`` 供 ``store`` 写回。
+    """
+
+    key_hash: str
+    key_id: uuid.UUID | None = None
+    user_id: str | None = None
+    expires_at: datetime | None = None
+    stamp: tuple[int, int] | None = None
+
+    def store(self, key_record: ApiKey) -> None:
+        """写回数据库验证通过的 Key."""
+        if self.stamp is None:
+            return
+        entry = {
+            "v": _PAYLOAD_VERSION,
+            "stamp": list(self.stamp),
+            "key_id": str(key_record.id),
+            "user_id": key_record.user_id,
+            "expires_at": key_record.expires_at.isoformat() if key_record.expires_at else None,
+        }
+        try:
+            get_redis_client().set(
+                f"{_API_KEY_PREFIX}{self.key_hash}",
+                _dumps(entry),
+                ex=settings.auth_principal_cache_seconds,
+            )
+        except RedisError:
+            logger.debug("写入 API Key 缓存失败: key_id=%s", key_record.id)
+
+
+def lookup_api_key(key_hash: str) -> ApiKeyLookup:
+    """按 Key 哈希查询已验证的 API Key（一次 pipeline 往返）."""
+    lookup = ApiKeyLookup(key_hash=key_hash)
+    if settings.auth_principal_cache_seconds <= 0:
+        return lookup
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        pipe.get(_GENERATION_KEY)
+        pipe.get(_api_key_version_key(key_hash))
+        pipe.get(f"{_API_KEY_PREFIX}{key_hash}")
+        generation, version, data = pipe.execute()
+    except RedisError:
+        logger.debug("读取 API Key 缓存失败，回退查询数据库")
+        return lookup
+
+    lookup.stamp = (int(generation or 0), int(version or 0))
+    if data is None:
+        return lookup
+    try:
+        entry = _loads(data)
+        if entry["v"] != _PAYLOAD_VERSION or tuple(entry["stamp"]) != lookup.stamp:
+            return lookup
+        key_id = uuid.UUID(entry["key_id"])
+        expires_at = datetime.fromisoformat(entry["expires_at"]) if entry["expires_at"] else None
+        lookup.user_id = entry["user_id"]
+    except (ValueError, KeyError, TypeError):
+        logger.warning("API Key 缓存数据无效，回退查询数据库")
+        return lookup
+    lookup.key_id = key_id
+    lookup.expires_at = expires_at
+    return lookup
+
+
+@dataclass
+class _PendingInvalidation:
+    """一个事务内待失效的认证主体."""
+
+    user_ids: set[str] = field(default_factory=set)
+    api_key_hashes: set[str] = field(default_factory=set)
+    everyone: bool = False
+
+
+def _pending(db: Session) -> _PendingInvalidation:
+    # 本事务改动了用户/角色/权限，已解析的权限集不再可信
+    db.info.pop(_PERMISSIONS_KEY, None)
+    return db.info.setdefault(_PENDING_KEY, _PendingInvalidation())
+
+
+def _invalidate(pending: _PendingInvalidation) -> None:
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        if pending.everyone:
+            pipe.incr(_GENERATION_KEY)
+        else:
+            for user_id in sorted(pending.user_ids):
+                pipe.incr(_version_key(user_id))
+                pipe.expire(_version_key(user_id), _VERSION_TTL_SECONDS)
+        for key_hash in sorted(pending.api_key_hashes):
+            pipe.incr(_api_key_version_key(key_hash))
+            pipe.expire(_api_key_version_key(key_hash), _VERSION_TTL_SECONDS)
+        pipe.execute()
+    except RedisError:
+        logger.warning("认证主体缓存失效失败，快照将在 TTL 内过期: everyone=%s", pending.everyone)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_principals(session: Session, _flush_context: UOWTransaction, _instances: object) -> None:
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, User) and obj not in session.new:
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            _pending(session).user_ids.add(obj.id)
+        elif isinstance(obj, UserRole):
+            _pending(session).user_ids.update(
+                uid for uid in (obj.user_id, *(inspect(obj).attrs.user_id.history.deleted or ())) if uid
+            )
+        elif isinstance(obj, (Role, Permission)) and obj not in session.new:
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            _pending(session).everyone = True
+        elif isinstance(obj, ApiKey) and obj not in session.new:
+            # 新建 Key 不可能已被缓存；撤销与哈希升级使该 Key 新旧哈希的缓存失效（不影响权限集）
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            session.info.setdefault(_PENDING_KEY, _PendingInvalidation()).api_key_hashes.update(
+                key_hash
+                for key_hash in (obj.key_hash, *(inspect(obj).attrs.key_hash.history.deleted or ()))
+                if key_hash
+            )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_writes(orm_execute_state: ORMExecuteState) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) in _PRINCIPAL_TABLES:
+        _pending(orm_execute_state.session).everyone = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    pending: _PendingInvalidation | None = session.info.pop(_PENDING_KEY, None)
+    if pending is None:
+        return
+    _invalidate(pending)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_transaction_state(session: Session, transaction: SessionTransaction) -> None:
+    # 外层事务结束：回滚时丢弃待失效登记；本事务的权限集不跨事务复用
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+        session.info.pop(_PERMISSIONS_KEY, None)
+
+
+__all__ = [
+    "ApiKeyLookup",
+    "PrincipalLookup",
+    "cached_permission_codes",
+    "lookup_api_key",
+    "lookup_principal",
+    "remember_permission_codes",
+]
@@ -100,6 +100,11 @@ class Settings(BaseSettings):
     oss_bucket_name: str | None = None
     oss_endpoint: str | None = None  # 内网endpoint，如 oss-cn-shanghai-internal.aliyuncs.com
     oss_public_base_url: str | None = None  # 公网/CDN访问基址，无尾斜杠
+    oss_multipart_threshold: int = 20971520  # 超过该大小（字节）的文件走 OSS 分片上传，默认 20MB
+    oss_multipart_part_size: int = 5242880  # OSS 分片大小（字节），默认 5MB
+    oss_multipart_threads: int = 4  # 单个文件分片并发上传线程数
+    storage_max_background_uploads: int = 32  # 后台上传线程上限（进程级），超出时在调用线程内同步上传
+    storage_local_latency_ms: int = 0  # local 存储模拟的单次上传延迟（毫秒），仅用于测试/压测，生产保持 0
 
     # 文件上传配置
     upload_dir: str = str(_base_dir / "static" / "uploads")
@@ -137,19 +142,52 @@ class Settings(BaseSettings):
         "video/webm",  # 视频
     }
 
+    # 导出配置
+    ledger_receipt_fetch_concurrency: int = 4  # 资金账本 zip 导出票据并发获取数（内存约为 2 倍该数张票据）
+    export_embedded_workers: int = 1  # API 进程内后台导出工作线程数（0=不在 API 进程内生成导出文件）
+    export_worker_poll_seconds: float = 5.0  # 导出队列空闲时的轮询间隔（秒）
+    export_job_reuse_seconds: int = 600  # 相同类型与参数的导出在该时间内复用已生成的文件（秒，0=不复用）
+    export_job_retention_hours: int = 24  # 导出文件保留时长（小时），过期后删除文件并标记 expired
+    export_job_stale_seconds: int = 1800  # processing 导出任务超过该时长无心跳视为工作线程崩溃，重新领取（秒）
+    export_job_heartbeat_seconds: int = 60  # 导出生成期间刷新心跳的间隔（秒），须小于 export_job_stale_seconds
+
     # 分页配置
     default_page_size: int = 50
     max_page_size: int = 200  # 限制单页大小，防止配合 joinedload 消耗过多内存
+    property_count_cache_seconds: int = 60  # 房源游标分页 total_mode=cached 时总数缓存秒数
 
     # 数据导入配置
     batch_commit_size: int = 1000  # 批量提交大小
     import_upload_dir: str = "temp/uploads"  # CSV导入任务文件存储目录
+    import_bulk_upsert: bool = False  # 导入任务是否使用集合式批量 upsert（COPY 暂存 + ON CONFLICT）
+    import_embedded_workers: int = 1  # API 进程内导入工作线程数（0=仅由 scripts.run_import_workers 独立进程消费）
+    import_worker_processes: int = 2  # scripts.run_import_workers 启动的导入工作进程数
+    import_worker_poll_seconds: float = 5.0  # 导入队列空闲时的轮询间隔（秒）
+    import_task_stale_seconds: int = 600  # processing 任务心跳超时（秒），超时视为工作进程崩溃并重新领取
+    push_job_max_records: int = 10000  # JSON 推送异步任务单次最多记录数（同步推送仍为 1000 条）
+    media_download_concurrency: int = 4  # 户型图下载工作池并发线程数
+    media_download_per_host: int = 2  # 同一图床主机的最大并发下载数
+    media_download_max_attempts: int = 5  # 户型图下载最大尝试次数（含首次）
+    media_download_backoff_seconds: float = 30.0  # 下载失败重试的退避基数（秒，按 2^n 递增）
+    media_gc_grace_hours: int = 24  # 媒体垃圾回收宽限期（小时），期间内使用过的未引用存储对象不回收
+
+    # 报表配置
+    reports_use_rollups: bool = True  # 报表统计是否读取 market_stats_rollups 汇总表（False=直接扫描 property_current）
+    reports_cache_local_max_entries: int = 256  # 报表缓存进程内 LRU 最大条目数（0=关闭进程内缓存，仅用 Redis）
+    reports_cache_local_ttl_seconds: float = 30.0  # 进程内缓存条目存活秒数（其他 worker 清空缓存的最大感知延迟）
+    reports_cache_lock_seconds: float = 30.0  # 缓存未命中时跨 worker 计算锁的持有上限/等待上限（秒）
+    reports_warm_enabled: bool = True  # 是否在 API 进程内运行报表缓存预热线程
+    reports_warm_interval_seconds: float = 240.0  # 定时预热间隔（秒，应小于报表缓存 TTL 300 秒）
+    reports_warm_top_communities: int = 10  # 预热小区分析的访问量前 N 个小区
+    reports_panel_concurrency: int = 5  # 批量面板查询的并发线程数（每个面板占用一个数据库连接）
 
     # JWT配置
     jwt_secret_key: str  # 强制从环境变量读取，不再提供默认值
     jwt_algorithm: str = "HS256"
     jwt_access_token_expire_minutes: int = 30  # 访问令牌过期时间(分钟)，符合行业安全标准
     jwt_refresh_token_expire_days: int = 7  # 刷新令牌过期时间(天)
+    auth_principal_cache_seconds: int = 60  # 认证主体缓存（用户+权限集+API Key）Redis TTL 秒数（0=关闭）
+    api_key_last_used_interval_seconds: float = 60.0  # API Key 最后使用时间的批量写回间隔（秒，进程内缓冲）
 
     # JWT密钥轮换配置
     jwt_secret_key_old: str | None = None  # 旧密钥（用于密钥轮换过渡期）
@@ -184,6 +222,19 @@ class Settings(BaseSettings):
     # 招募新线索订阅消息模板 ID（env 可配，空 = 功能关闭）
     wechat_recruit_lead_template_id: str = ""
 
+    # 招募小程序码配置
+    recruit_qrcode_concurrency: int = 4  # 批量生成小程序码的并发线程数
+    recruit_qrcode_rate_per_second: float = 10.0  # 每进程调用微信小程序码接口的速率上限（次/秒，0=不限速）
+    recruit_qrcode_bulk_max: int = 500  # 单次批量生成的员工数上限
+    recruit_qrcode_cache_max_age: int = 86400  # 小程序码图片响应的 HTTP 缓存秒数（Cache-Control max-age）
+
+    # 招募埋点缓冲写入配置
+    recruit_event_buffer_enabled: bool = True  # 访问/分享埋点是否经 Redis Stream 缓冲批量写库（False=逐条同步写库）
+    recruit_event_flush_interval_ms: int = 200  # 埋点批量写库间隔（毫秒，即埋点落库的最大延迟）
+    recruit_event_flush_batch_size: int = 500  # 每批写库的最大事件数
+    recruit_event_reclaim_idle_seconds: float = 60.0  # 未确认埋点空闲多久后由其他写入线程认领重试（秒）
+    recruit_event_max_deliveries: int = 5  # 埋点最大投递次数（超过后记错误日志并丢弃）
+
     @model_validator(mode="after")
     def validate_oss_config(self) -> "Settings":
         """当 storage_backend=oss 时，校验 OSS 必填配置."""
@@ -0,0 +1,206 @@
+"""招募埋点缓冲写入测试.
+
+事件流使用 ``settings.redis_url`` 指向的 Redis（不可用时跳过），每个测试使用独立的 key 前缀；
+写入线程使用真实提交的数据库会话，校验：
+- 客户端重试（同一 Idempotency-Key）与消费进程崩溃后的重复投递只落库一条
+- 同批中单条写库失败不影响其余条目，失败条目留在待确认列表
+- 离开事件先于进入事件落库时延迟重试，进入事件落库后收敛
+- 离开上报只为已落库或本人待落库的访问入队
+"""
+
+import time
+import uuid
+from collections.abc import Generator
+from datetime import datetime, timezone
+
+import pytest
+from redis import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import delete, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from models import User
+from models.recruit import RecruitLeadSource, RecruitShareEvent, RecruitShareType, RecruitVisit
+from schemas.recruit import RecruitVisitCreate, RecruitVisitUpdate
+from services.recruit import events
+from services.recruit.attribution import RecruitAttributionService
+from services.recruit.events import EVENT_SHARE, EVENT_VISIT, enqueue_recruit_event, flush_recruit_events
+from services.system.exceptions import ResourceNotFoundError
+from settings import settings
+from utils.redis_client import get_redis_client
+
+
+@pytest.fixture
+def event_stream(test_engine: Engine, monkeypatch: pytest.MonkeyPatch) -> Generator[Redis, None, None]:
+    """事件流 / 延迟队列 / 待落库标记使用本测试独占的 key，写入线程使用真实提交的会话."""
+    try:
+        redis_client = get_redis_client()
+    except RedisError:
+        pytest.skip("Redis 不可用")
+    prefix = f"test:{uuid.uuid4().hex}:"
+    monkeypatch.setattr(settings, "recruit_event_buffer_enabled", True)
+    monkeypatch.setattr(events, "_STREAM_KEY", f"{prefix}events")
+    monkeypatch.setattr(events, "_DELAYED_KEY", f"{prefix}delayed")
+    monkeypatch.setattr(events, "_PENDING_VISIT_PREFIX", f"{prefix}pending-visit:")
+    monkeypatch.setattr(events, "_group_ready", False)
+    monkeypatch.setattr(events, "SessionLocal", sessionmaker(bind=test_engine))
+    yield redis_client
+    keys = list(redis_client.scan_iter(f"{prefix}*"))
+    if keys:
+        redis_client.delete(*keys)
+
+
+@pytest.fixture
+def committed_session(test_engine: Engine) -> Generator[Session, None, None]:
+    """真实提交的会话（写入线程另开会话读取），结束后清理本测试活动的埋点记录."""
+    session = sessionmaker(bind=test_engine)()
+    session.info["campaign_id"] = str(uuid.uuid4())
+    yield session
+    session.rollback()
+    campaign_id = session.info["campaign_id"]
+    session.execute(delete(RecruitVisit).where(RecruitVisit.campaign_id == campaign_id))
+    session.execute(delete(RecruitShareEvent).where(RecruitShareEvent.campaign_id == campaign_id))
+    session.commit()
+    session.close()
+
+
+def _flush_all() -> int:
+    """连续写入直到事件流中没有可读条目，返回处理的事件总数."""
+    total = 0
+    while written := flush_recruit_events("test-writer"):
+        total += written
+    return total
+
+
+def _visit_event(campaign_id: str, *, openid_hash: str = "hash") -> dict:
+    return {
+        "type": EVENT_VISIT,
+        "id": str(uuid.uuid4()),
+        "campaign_id": campaign_id,
+        "visitor_id": str(uuid.uuid4()),
+        "openid_hash": openid_hash,
+        "referrer_employee_id": None,
+        "source": RecruitLeadSource.CARD.value,
+        "entered_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _visit_count(session: Session) -> int:
+    session.expire_all()
+    return session.scalar(
+        select(func.count()).select_from(RecruitVisit).where(RecruitVisit.campaign_id == session.info["campaign_id"])
+    )
+
+
+def test_retried_and_redelivered_visit_written_once(
+    event_stream: Redis, committed_session: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """同一幂等键重复上报得到同一记录ID；消费进程崩溃未确认的条目被认领重写，最终只有一条记录."""
+    service = RecruitAttributionService(committed_session)
+    user = User(id=str(uuid.uuid4()), wechat_openid="openid-1")
+    data = RecruitVisitCreate(campaign_id=committed_session.info["campaign_id"])
+
+    first = service.create_visit(user, data, idempotency_key="enter-1")
+    second = service.create_visit(user, data, idempotency_key="enter-1")
+    assert first == second
+
+    # 模拟已读取首条事件后崩溃的消费进程：条目留在待确认列表
+    events._ensure_group(event_stream)
+    event_stream.xreadgroup(events._GROUP, "crashed-writer", {events._STREAM_KEY: ">"}, count=1)
+    monkeypatch.setattr(settings, "recruit_event_reclaim_idle_seconds", 0)
+
+    assert _flush_all() == 2
+    assert _visit_count(committed_session) == 1
+    assert event_stream.xlen(events._STREAM_KEY) == 0
+    assert event_stream.xpending(events._STREAM_KEY, events._GROUP)["pending"] == 0
+
+
+def test_bad_event_does_not_block_batch(event_stream: Redis, committed_session: Session) -> None:
+    """同批中单条写库失败（openid_hash 超长）时其余条目照常落库，失败条目留待认领重试."""
+    campaign_id = committed_session.info["campaign_id"]
+    good = _visit_event(campaign_id)
+    bad = _visit_event(campaign_id, openid_hash="x" * 65)
+    share = {
+        "type": EVENT_SHARE,
+        "id": str(uuid.uuid4()),
+        "campaign_id": campaign_id,
+        "employee_id": str(uuid.uuid4()),
+        "share_type": RecruitShareType.CARD.value,
+        "shared_at": datetime.now(timezone.utc).isoformat(),
+    }
+    for event in (good, bad, share):
+        assert enqueue_recruit_event(event)
+
+    assert flush_recruit_events("test-writer") == 3
+
+    committed_session.expire_all()
+    assert committed_session.get(RecruitVisit, good["id"]) is not None
+    assert committed_session.get(RecruitVisit, bad["id"]) is None
+    assert committed_session.get(RecruitShareEvent, share["id"]) is not None
+    pending = event_stream.xpending_range(events._STREAM_KEY, events._GROUP, min="-", max="+", count=10)
+    assert len(pending) == 1
+    assert event_stream.xlen(events._STREAM_KEY) == 1
+
+
+def test_exit_before_visit_converges(
+    event_stream: Redis, committed_session: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """离开事件先于进入事件落库时放入延迟队列，进入事件落库后重试应用."""
+    service = RecruitAttributionService(committed_session)
+    user = User(id=str(uuid.uuid4()), wechat_openid="openid-2")
+    visit_id = service.create_visit(user, RecruitVisitCreate(campaign_id=committed_session.info["campaign_id"]))
+
+    # 进入事件被另一进程读取、尚未落库
+    events._ensure_group(event_stream)
+    event_stream.xreadgroup(events._GROUP, "other-writer", {events._STREAM_KEY: ">"}, count=1)
+
+    service.update_visit(visit_id, RecruitVisitUpdate(stayed_ms=5000), user_id=user.id)
+    assert flush_recruit_events("test-writer") == 1
+    delayed = event_stream.zrange(events._DELAYED_KEY, 0, -1, withscores=True)
+    assert len(delayed) == 1
+    # 退避：到期时间晚于当前时间，未到期前不会被移回事件流
+    assert delayed[0][1] > time.time() * 1000
+    assert flush_recruit_events("test-writer") == 0
+
+    # 另一进程的进入事件由认领重试落库，到期后离开事件随之应用
+    monkeypatch.setattr(settings, "recruit_event_reclaim_idle_seconds", 0)
+    deadline = time.monotonic() + 5
+    visit = None
+    while time.monotonic() < deadline:
+        flush_recruit_events("test-writer")
+        committed_session.expire_all()
+        visit = committed_session.get(RecruitVisit, visit_id)
+        if visit is not None and visit.exited_at is not None:
+            break
+        time.sleep(0.05)
+
+    assert visit is not None
+    assert visit.exited_at is not None
+    assert visit.stayed_ms == 5000
+    assert visit.is_deep_view is True
+    assert event_stream.zcard(events._DELAYED_KEY) == 0
+    assert event_stream.xlen(events._STREAM_KEY) == 0
+
+
+def test_update_visit_rejects_unknown_or_foreign_visit(event_stream: Redis, committed_session: Session) -> None:
+    """既未落库也不是本人待落库的访问：抛 ResourceNotFoundError，不入队离开事件."""
+    service = RecruitAttributionService(committed_session)
+    owner = User(id=str(uuid.uuid4()), wechat_openid="openid-3")
+    visit_id = service.create_visit(owner, RecruitVisitCreate(campaign_id=committed_session.info["campaign_id"]))
+    stream_length = event_stream.xlen(events._STREAM_KEY)
+
+    with pytest.raises(ResourceNotFoundError):
+        service.update_visit(str(uuid.uuid4()), RecruitVisitUpdate(stayed_ms=100), user_id=owner.id)
+    with pytest.raises(ResourceNotFoundError):
+        service.update_visit(visit_id, RecruitVisitUpdate(stayed_ms=100), user_id=str(uuid.uuid4()))
+    assert event_stream.xlen(events._STREAM_KEY) == stream_length
+
+    # 本人待落库的访问可入队；落库后（标记仍在或已过期）同样可入队
+    service.update_visit(visit_id, RecruitVisitUpdate(stayed_ms=100), user_id=owner.id)
+    _flush_all()
+    event_stream.delete(events._PENDING_VISIT_PREFIX + visit_id)
+    service.update_visit(visit_id, RecruitVisitUpdate(stayed_ms=200), user_id=owner.id)
+    _flush_all()
+    committed_session.expire_all()
+    assert committed_session.get(RecruitVisit, visit_id).stayed_ms == 200
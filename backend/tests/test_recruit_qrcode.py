@@ -0,0 +1,252 @@
+"""招募小程序码缓存测试.
+
+微信接口由 ``scripts.wechat_api_stub`` 在进程内提供（随机端口），校验：
+- 同一短码只调用一次 getwxacodeunlimit，之后读取存储
+- 批量生成按员工返回失败原因，不影响其余员工
+- 图片接口的 ETag / Cache-Control 与 304，以及短码失效 / 活动停用时不返回 304
+- 微信接口限速器的调用间隔
+"""
+
+import io
+import threading
+import time
+from collections.abc import Generator
+from http.server import ThreadingHTTPServer
+from itertools import pairwise
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+import db
+from models.recruit import RecruitCampaign, RecruitCampaignStatus
+from models.recruit.recruit import RecruitQRScene
+from scripts.wechat_api_stub import _make_handler, _StubState
+from services.recruit import qrcode
+from services.recruit.qrcode import RecruitQRCodeService, _IntervalRateLimiter
+from settings import settings
+
+
+class _WeChatStub:
+    """进程内微信接口桩，``failing_scenes`` 中的 scene 返回微信错误 JSON."""
+
+    def __init__(self) -> None:
+        self.state = _StubState(latency_ms=0)
+        self.failing_scenes: set[str] = set()
+        base = _make_handler(self.state)
+        failing_scenes = self.failing_scenes
+
+        class Handler(base):
+            def do_POST(self) -> None:  # noqa: N802
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length)
+                if any(f'"{scene}"'.encode() in body for scene in failing_scenes):
+                    self._send_json({"errcode": 45009, "errmsg": "reach max api daily quota limit"})
+                    return
+                # 交还给桩的原始处理逻辑（重新提供已读取的请求体）
+                self.rfile = io.BytesIO(body)
+                super().do_POST()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def calls(self) -> int:
+        return self.state.calls
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def wechat_stub(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Generator[_WeChatStub, None, None]:
+    """启动微信接口桩，并将小程序码图片存储指向临时目录."""
+    stub = _WeChatStub()
+    monkeypatch.setattr(settings, "wechat_miniapp_token_url", f"{stub.url}/cgi-bin/token")
+    monkeypatch.setattr(settings, "wechat_miniapp_qrcode_url", f"{stub.url}/wxa/getwxacodeunlimit")
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    yield stub
+    stub.close()
+
+
+def _add_campaign(session: Session, status: RecruitCampaignStatus = RecruitCampaignStatus.ENABLED) -> RecruitCampaign:
+    campaign = RecruitCampaign(name="小程序码测试活动", title="加入我们", status=status)
+    session.add(campaign)
+    session.commit()
+    return campaign
+
+
+def test_generate_calls_wechat_once_per_code(db_session: Session, wechat_stub: _WeChatStub) -> None:
+    """同一（活动, 员工）首次生成调用微信接口，之后读取存储."""
+    campaign = _add_campaign(db_session)
+    service = RecruitQRCodeService(db_session)
+
+    first = service.generate(campaign.id, "emp-1")
+    second = service.generate(campaign.id, "emp-1")
+
+    assert wechat_stub.calls == 1
+    assert second["code"] == first["code"]
+    assert second["image_base64"] == first["image_base64"]
+    scene = db_session.query(RecruitQRScene).filter(RecruitQRScene.code == first["code"]).one()
+    assert scene.image_key == f"recruit/qrcodes/{first['code']}.png"
+    assert (Path(settings.upload_dir) / scene.image_key).is_file()
+
+    # 另一员工是另一个短码，需要再调用一次
+    service.generate(campaign.id, "emp-2")
+    assert wechat_stub.calls == 2
+
+
+def test_generate_regenerates_when_cached_file_missing(db_session: Session, wechat_stub: _WeChatStub) -> None:
+    """存储文件丢失时重新调用微信接口并回写存储."""
+    campaign = _add_campaign(db_session)
+    service = RecruitQRCodeService(db_session)
+    code = service.generate(campaign.id, "emp-1")["code"]
+    (Path(settings.upload_dir) / f"recruit/qrcodes/{code}.png").unlink()
+
+    service.generate(campaign.id, "emp-1")
+    service.generate(campaign.id, "emp-1")
+
+    assert wechat_stub.calls == 2
+
+
+@pytest.fixture
+def committed_session(test_engine: Engine, monkeypatch: pytest.MonkeyPatch) -> Generator[Session, None, None]:
+    """批量生成在线程池中使用独立 Session：测试数据需真实提交，结束后清理."""
+    factory = sessionmaker(bind=test_engine)
+    monkeypatch.setattr(qrcode, "SessionLocal", factory)
+    session = factory()
+    campaign_ids: list[str] = []
+    session.info["campaign_ids"] = campaign_ids
+    yield session
+    session.rollback()
+    session.execute(delete(RecruitQRScene).where(RecruitQRScene.campaign_id.in_(campaign_ids)))
+    session.execute(delete(RecruitCampaign).where(RecruitCampaign.id.in_(campaign_ids)))
+    session.commit()
+    session.close()
+
+
+def test_bulk_generate_reports_failures_per_employee(committed_session: Session, wechat_stub: _WeChatStub) -> None:
+    """单个员工生成失败不影响其余员工，失败原因按员工返回；已缓存的员工不再调用微信接口."""
+    campaign = _add_campaign(committed_session)
+    committed_session.info["campaign_ids"].append(campaign.id)
+    service = RecruitQRCodeService(committed_session)
+    cached_code = service.generate(campaign.id, "emp-cached")["code"]
+    failing_code = service._ensure_scene(campaign.id, "emp-bad").code
+    wechat_stub.failing_scenes.add(f"code={failing_code}")
+    calls_before = wechat_stub.calls
+
+    result = service.bulk_generate(campaign.id, ["emp-1", "emp-bad", "emp-cached", "emp-2", "emp-1"])
+
+    items = {item["employee_id"]: item for item in result["items"]}
+    assert set(items) == {"emp-1", "emp-cached", "emp-2"}
+    assert items["emp-cached"]["code"] == cached_code
+    assert items["emp-1"]["image_url"] == qrcode.qrcode_image_url(items["emp-1"]["code"])
+    assert result["failures"] == [{"employee_id": "emp-bad", "reason": "小程序码生成失败，请检查微信配置"}]
+    # emp-1 / emp-2 各一次成功调用，emp-bad 一次失败调用（由桩直接返回错误，不计入桩的成功计数）
+    assert wechat_stub.calls - calls_before == 2
+
+
+def test_bulk_generate_rejects_disabled_campaign(db_session: Session, wechat_stub: _WeChatStub) -> None:
+    """活动停用时整批拒绝，不调用微信接口."""
+    from services.system.exceptions import ValidationError
+
+    campaign = _add_campaign(db_session, RecruitCampaignStatus.DISABLED)
+
+    with pytest.raises(ValidationError):
+        RecruitQRCodeService(db_session).bulk_generate(campaign.id, ["emp-1"])
+    assert wechat_stub.calls == 0
+
+
+@pytest.fixture
+def public_client(db_session: Session) -> Generator[TestClient, None, None]:
+    """未登录客户端（公开接口），数据库依赖指向隔离会话."""
+    from main import app
+
+    def _override_get_db() -> Generator[Session, None, None]:
+        yield db_session
+
+    app.dependency_overrides[db.get_db] = _override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def _image_path(code: str) -> str:
+    return f"{settings.api_prefix}/v1/public/recruit/qr/{code}/image"
+
+
+def test_qr_image_cache_headers_and_not_modified(
+    db_session: Session, public_client: TestClient, wechat_stub: _WeChatStub
+) -> None:
+    """图片响应带 ETag / Cache-Control，If-None-Match 命中返回 304，且只调用一次微信接口."""
+    campaign = _add_campaign(db_session)
+    code = RecruitQRCodeService(db_session)._ensure_scene(campaign.id, "emp-1").code
+
+    response = public_client.get(_image_path(code))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["etag"] == f'"qr-{code}"'
+    assert response.headers["cache-control"] == f"public, max-age={settings.recruit_qrcode_cache_max_age}, immutable"
+
+    not_modified = public_client.get(_image_path(code), headers={"If-None-Match": response.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == response.headers["etag"]
+
+    again = public_client.get(_image_path(code))
+    assert again.content == response.content
+    assert wechat_stub.calls == 1
+
+
+def test_qr_image_validates_code_before_not_modified(
+    db_session: Session, public_client: TestClient, wechat_stub: _WeChatStub
+) -> None:
+    """短码无效或活动停用时即使 If-None-Match 命中也不返回 304."""
+    response = public_client.get(_image_path("deadbeef"), headers={"If-None-Match": '"qr-deadbeef"'})
+    assert response.status_code == 404
+
+    campaign = _add_campaign(db_session)
+    code = RecruitQRCodeService(db_session)._ensure_scene(campaign.id, "emp-1").code
+    campaign.status = RecruitCampaignStatus.DISABLED
+    db_session.commit()
+
+    response = public_client.get(_image_path(code), headers={"If-None-Match": f'"qr-{code}"'})
+    assert response.status_code == 400
+    assert wechat_stub.calls == 0
+
+
+def test_interval_rate_limiter_spaces_calls() -> None:
+    """限速器相邻两次放行至少间隔 1 / rate 秒（多线程争用时同样成立）."""
+    limiter = _IntervalRateLimiter(rate_per_second=20)
+    passed: list[float] = []
+    lock = threading.Lock()
+
+    def _call() -> None:
+        limiter.acquire()
+        with lock:
+            passed.append(time.monotonic())
+
+    threads = [threading.Thread(target=_call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    passed.sort()
+    gaps = [later - earlier for earlier, later in pairwise(passed)]
+    assert min(gaps) >= 0.05 * 0.9
+    assert passed[-1] - passed[0] >= 5 * 0.05 * 0.9
+
+
+def test_interval_rate_limiter_unlimited() -> None:
+    """速率为 0 时不限速."""
+    limiter = _IntervalRateLimiter(rate_per_second=0)
+    start = time.monotonic()
+    for _ in range(100):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.05
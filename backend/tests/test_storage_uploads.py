@@ -0,0 +1,131 @@
+"""存储上传并发测试.
+
+本地存储（local）通过 ``settings.storage_local_latency_ms`` 模拟远端存储的单次上传延迟，校验：
+- 模拟延迟生效，且延迟为 0 时不等待
+- ``submit_upload`` 各次调用独立线程上传，互不排队（总耗时接近单次延迟而非延迟之和）
+- 后台上传线程额度用尽时在调用线程内同步上传，线程数不超过上限
+- ``store_image_bytes`` 原图与缩略图并发上传
+"""
+
+import io
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from settings import settings
+from utils import storage
+from utils.image_download import store_image_bytes
+from utils.storage import LocalStorage, submit_upload
+
+_LATENCY_MS = 300
+_UPLOADS = 8
+
+
+@pytest.fixture
+def local_storage(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    """本地存储指向临时目录，返回 upload_dir."""
+    upload_dir = tmp_path / "uploads"
+    monkeypatch.setattr(settings, "storage_backend", "local")
+    monkeypatch.setattr(settings, "upload_dir", str(upload_dir))
+    monkeypatch.setattr(storage, "_storage_backend", LocalStorage())
+    return upload_dir
+
+
+def _png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_local_upload_simulated_latency(local_storage: Path, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """配置模拟延迟时每次上传至少等待该延迟，文件复制到 upload_dir."""
+    source = tmp_path / "source.txt"
+    source.write_text("hello")
+    monkeypatch.setattr(settings, "storage_local_latency_ms", _LATENCY_MS)
+
+    start = time.perf_counter()
+    url = LocalStorage().upload_file(source, "docs/a.txt")
+
+    assert time.perf_counter() - start >= _LATENCY_MS / 1000
+    assert url == "/static/uploads/docs/a.txt"
+    assert (local_storage / "docs" / "a.txt").read_text() == "hello"
+
+
+def test_local_upload_without_latency(local_storage: Path, tmp_path: Path) -> None:
+    """默认不模拟延迟."""
+    source = tmp_path / "source.txt"
+    source.write_text("hello")
+
+    start = time.perf_counter()
+    LocalStorage().upload_file(source, "a.txt")
+
+    assert time.perf_counter() - start < _LATENCY_MS / 1000
+
+
+def test_submit_upload_runs_concurrently(local_storage: Path, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """多个上传各自在独立线程中并发执行（不受共享线程池大小限制），按提交顺序取回各自的 URL."""
+    monkeypatch.setattr(settings, "storage_local_latency_ms", _LATENCY_MS)
+    sources = []
+    for index in range(_UPLOADS):
+        source = tmp_path / f"{index}.txt"
+        source.write_text(str(index))
+        sources.append(source)
+
+    start = time.perf_counter()
+    futures = [submit_upload(source, f"batch/{source.name}") for source in sources]
+    urls = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    assert urls == [f"/static/uploads/batch/{index}.txt" for index in range(_UPLOADS)]
+    assert elapsed < 2 * _LATENCY_MS / 1000
+    assert [(local_storage / "batch" / f"{index}.txt").read_text() for index in range(_UPLOADS)] == [
+        str(index) for index in range(_UPLOADS)
+    ]
+
+
+def test_submit_upload_bounds_background_threads(
+    local_storage: Path, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """后台上传线程额度用尽后，其余上传在调用线程内同步完成."""
+    monkeypatch.setattr(storage, "_upload_slots", threading.BoundedSemaphore(2))
+    monkeypatch.setattr(settings, "storage_local_latency_ms", _LATENCY_MS)
+    threads: list[str] = []
+    upload = LocalStorage.upload_file
+
+    def recording_upload(self: LocalStorage, local_path: Path, key: str) -> str:
+        threads.append(threading.current_thread().name)
+        return upload(self, local_path, key)
+
+    monkeypatch.setattr(LocalStorage, "upload_file", recording_upload)
+    sources = []
+    for index in range(4):
+        source = tmp_path / f"{index}.txt"
+        source.write_text(str(index))
+        sources.append(source)
+
+    futures = [submit_upload(source, f"bounded/{source.name}") for source in sources]
+    urls = [future.result() for future in futures]
+
+    assert urls == [f"/static/uploads/bounded/{index}.txt" for index in range(4)]
+    assert sum(name.startswith("StorageUpload") for name in threads) == 2
+    assert threads.count(threading.current_thread().name) == 2
+    # 额度在上传结束后归还
+    assert storage._upload_slots.acquire(blocking=False)
+
+
+def test_store_image_bytes_uploads_thumbnail_concurrently(local_storage: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """原图后台上传、缩略图当前线程上传：总耗时小于两次上传延迟之和."""
+    monkeypatch.setattr(settings, "storage_local_latency_ms", _LATENCY_MS)
+
+    start = time.perf_counter()
+    result = store_image_bytes(_png_bytes(), "images/photo.png", with_thumbnail=True)
+    elapsed = time.perf_counter() - start
+
+    assert result.url == "/static/uploads/images/photo.png"
+    assert result.thumbnail_url == "/static/uploads/thumbs/photo.webp"
+    assert (local_storage / "images" / "photo.png").is_file()
+    assert (local_storage / "thumbs" / "photo.webp").is_file()
+    assert elapsed < 2 * _LATENCY_MS / 1000
@@ -138,6 +138,7 @@ class RateLimits:
 
     # ==================== 现金流模块 ====================
     CASHFLOW_DELETE = "200/hour"
+    LEDGER_EXPORT = "60/hour"  # 资金账本后台导出任务
 
     # ==================== 科目管理模块 ====================
     # 科目为财务配置表，写操作低频；删除需更严格限流防误操作
@@ -166,6 +167,7 @@ class RateLimits:
     COMMUNITY_MERGE = "20/hour"
     COMMUNITY_CREATE = "1000/hour"
     COMMUNITY_UPDATE = "1000/hour"
+    PROPERTY_EXPORT = "60/hour"
     # 小区户型图库：上传复用 FILE_UPLOAD，删除/编辑低频
     COMMUNITY_IMAGE_UPDATE = "1000/hour"
     COMMUNITY_IMAGE_DELETE = "200/hour"
@@ -208,5 +210,7 @@ class RateLimits:
     RECRUIT_QR_SCENE = "120/minute"
     # 员工生成小程序码：每次调用微信接口生成图片，收敛频次防刷
     RECRUIT_QR_GENERATE = "20/hour"
+    # 小程序码图片：已缓存的图片直接读存储，仅首次访问调用微信接口
+    RECRUIT_QR_IMAGE = "120/minute"
     # 查看线索完整手机号：隐私敏感数据，收敛频次防遍历爬取
     RECRUIT_PHONE_VIEW = "30/minute"
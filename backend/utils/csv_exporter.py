@@ -6,13 +6,17 @@
 import csv
 import io
 import logging
-from collections.abc import Sequence
+from collections.abc import Generator, Iterable, Iterator, Sequence
 from datetime import datetime, timezone
+from pathlib import Path
 
 from fastapi.responses import StreamingResponse
 
 logger = logging.getLogger(__name__)
 
+# 流式导出每累积多少行输出一块
+_STREAM_CHUNK_ROWS = 500
+
 
 def sanitize_csv_cell(value: object) -> object:
     r"""转义 CSV/Excel 公式注入.
@@ -50,13 +54,90 @@ def generate_csv_response(
     csv_content = output.getvalue()
     output.close()
 
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    filename = f"{filename_prefix}_{timestamp}.csv"
+    filename = export_filename(filename_prefix)
 
     logger.info("导出完成: %s 条记录, 文件名: %s", len(rows), filename)
 
+    return _csv_streaming_response(iter([csv_content.encode("utf-8-sig")]), filename)
+
+
+def stream_csv_response(
+    headers: Sequence[str],
+    rows: Iterable[Sequence[object]],
+    filename_prefix: str,
+) -> StreamingResponse:
+    """生成逐块输出的 CSV 流响应.
+
+    ``rows`` 可以是惰性迭代器（如服务端游标结果）：先输出 BOM 与表头，之后每累积
+    ``_STREAM_CHUNK_ROWS`` 行输出一块，内存占用与总行数无关。
+
+    Args:
+        headers: CSV 表头列表
+        rows: 数据行迭代器，每行为字段值序列
+        filename_prefix: 文件名前缀，如 "properties_export"
+
+    Returns:
+        StreamingResponse: UTF-8-SIG 编码的 CSV 流响应
+
+    """
+    filename = export_filename(filename_prefix)
+
+    def chunks() -> Iterator[bytes]:
+        count = yield from iter_csv_chunks(headers, rows)
+        logger.info("导出完成: %s 条记录, 文件名: %s", count, filename)
+
+    return _csv_streaming_response(chunks(), filename)
+
+
+def iter_csv_chunks(headers: Sequence[str], rows: Iterable[Sequence[object]]) -> Generator[bytes, None, int]:
+    """逐块产出 UTF-8-SIG 编码的 CSV 字节（首块为 BOM + 表头），返回值为数据行数."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    def drain(encoding: str = "utf-8") -> bytes:
+        data = output.getvalue().encode(encoding)
+        output.seek(0)
+        output.truncate()
+        return data
+
+    writer.writerow(headers)
+    yield drain("utf-8-sig")
+
+    count = 0
+    for row in rows:
+        writer.writerow([sanitize_csv_cell(cell) for cell in row])
+        count += 1
+        if count % _STREAM_CHUNK_ROWS == 0:
+            yield drain()
+    if output.tell():
+        yield drain()
+    return count
+
+
+def write_csv_file(path: Path, headers: Sequence[str], rows: Iterable[Sequence[object]]) -> int:
+    """将 CSV 逐块写入文件（格式与导出响应一致），返回数据行数."""
+    count = 0
+
+    def counted() -> Iterator[Sequence[object]]:
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    with path.open("wb") as f:
+        f.writelines(iter_csv_chunks(headers, counted()))
+    return count
+
+
+def export_filename(filename_prefix: str) -> str:
+    """带 UTC 时间戳的导出文件名，如 properties_export_20260707_120000.csv."""
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    return f"{filename_prefix}_{timestamp}.csv"
+
+
+def _csv_streaming_response(content: Iterator[bytes], filename: str) -> StreamingResponse:
     return StreamingResponse(
-        iter([csv_content.encode("utf-8-sig")]),
+        content,
         media_type="text/csv",
         headers={
             "Content-Disposition": f'attachment; filename="{filename}"',
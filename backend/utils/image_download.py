@@ -8,14 +8,15 @@
 - SSRF 防护：禁止 localhost / 内网 IP
 - 超时 10s，大小限制 10MB
 - ``filetype`` 校验响应体确实是图片
-- 通过 ``get_storage_backend()`` 上传（兼容 local / oss 双模式）
+- 通过存储后端上传（兼容 local / oss 双模式），原图经 ``submit_upload`` 后台上传，与缩略图上传并发
+- 可选生成 WebP 缩略图（``thumbs/{stem}.webp``，与上传接口命名约定一致）
 - 失败返回 None，调用方回退到原 URL
 """
 
 import ipaddress
 import logging
-import uuid
-from datetime import datetime, timezone
+from concurrent.futures import wait
+from dataclasses import dataclass
 from pathlib import Path
 from urllib.parse import urlparse
 
@@ -23,7 +24,8 @@ import filetype
 import httpx
 
 from settings import settings
-from utils.storage import get_storage_backend
+from utils.image_processing import generate_thumbnail
+from utils.storage import get_storage_backend, submit_upload
 
 logger = logging.getLogger(__name__)
 
@@ -39,9 +41,6 @@ _MAX_IMAGE_BYTES = 10 * 1024 * 1024
 # 允许的图片扩展名
 _IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
 
-# 子目录名（与其他上传文件隔离）
-_SUBDIR = "properties"
-
 # 浏览器 UA：链家/我爱我家图床会拒绝非浏览器 UA（httpx 默认 UA 返回 403）
 _BROWSER_UA = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -165,18 +164,30 @@ def _guess_extension(url: str, content_type: str | None) -> str:
     return ".jpg"
 
 
-def download_external_image(url: str) -> str | None:
-    """下载外站图片到本地存储.
+@dataclass
+class FetchedImage:
+    """外站图片下载内容（已通过校验，未写入存储）."""
+
+    content: bytes
+    extension: str
+
+
+@dataclass
+class DownloadedImage:
+    """外站图片下载结果."""
 
-    下载成功后通过存储后端（local/oss）保存，返回访问 URL：
-    - local 模式：``/static/uploads/properties/20260811_abc.jpg``
-    - oss 模式：``{oss_public_base_url}/properties/20260811_abc.jpg``
+    url: str
+    thumbnail_url: str | None = None
+
+
+def fetch_external_image(url: str) -> FetchedImage | None:
+    """下载外站图片并校验（SSRF、大小、图片类型），不写入存储.
 
     Args:
         url: 外站图片 URL（http/https）
 
     Returns:
-        成功返回存储后端的访问 URL，失败返回 None（调用方回退原 URL）。
+        成功返回图片内容与扩展名，失败返回 None。
 
     """
     if not _is_url_safe(url):
@@ -208,26 +219,42 @@ def download_external_image(url: str) -> str | None:
                 logger.warning("非图片内容，跳过: %s", url)
                 return None
 
-            content_type = resp.headers.get("content-type")
-            ext = _guess_extension(url, content_type)
-            filename = f"{datetime.now(timezone.utc).strftime('%Y%m%d')}_{uuid.uuid4().hex[:8]}{ext}"
-            key = f"{_SUBDIR}/{filename}"
+            return FetchedImage(content=content, extension=_guess_extension(url, resp.headers.get("content-type")))
 
-            # 写到本地临时文件（storage.upload_file 需要本地路径）
-            local_path = Path(settings.upload_dir) / key
-            local_path.parent.mkdir(parents=True, exist_ok=True)
-            local_path.write_bytes(content)
+    except Exception:
+        logger.warning("下载外站图片失败: %s", url, exc_info=True)
+        return None
 
-            # 通过存储后端上传（local 模式同文件跳过复制，oss 模式上传后清理本地）
-            storage = get_storage_backend()
-            stored_url = storage.upload_file(local_path, key)
 
-            if settings.storage_backend == "oss":
-                local_path.unlink(missing_ok=True)
+def store_image_bytes(content: bytes, key: str, *, with_thumbnail: bool) -> DownloadedImage:
+    """将图片内容写入存储后端（存储键 ``key``），可选生成缩略图 ``thumbs/{stem}.webp``.
 
-            logger.info("下载外站图片成功: %s -> %s", url, stored_url)
-            return stored_url
+    缩略图生成失败不影响原图结果；上传失败时抛出存储后端的异常。
+    """
+    # 写到本地临时文件（storage.upload_file 需要本地路径）
+    local_path = Path(settings.upload_dir) / key
+    local_path.parent.mkdir(parents=True, exist_ok=True)
+    local_path.write_bytes(content)
 
-    except Exception:
-        logger.warning("下载外站图片失败: %s", url, exc_info=True)
-        return None
+    # 通过存储后端上传（local 模式同文件跳过复制，oss 模式上传后清理本地）
+    # 原图在后台线程上传，同时在当前线程生成并上传缩略图
+    original_upload = submit_upload(local_path, key)
+
+    thumbnail_url: str | None = None
+    thumb_path: Path | None = None
+    try:
+        if with_thumbnail:
+            thumb_filename = f"{Path(key).stem}.webp"
+            thumb_path = Path(settings.upload_dir) / "thumbs" / thumb_filename
+            if generate_thumbnail(local_path, thumb_path):
+                thumbnail_url = get_storage_backend().upload_file(thumb_path, f"thumbs/{thumb_filename}")
+
+        stored_url = original_upload.result()
+    finally:
+        if settings.storage_backend == "oss":
+            wait([original_upload])
+            local_path.unlink(missing_ok=True)
+            if thumb_path is not None:
+                thumb_path.unlink(missing_ok=True)
+
+    return DownloadedImage(url=stored_url, thumbnail_url=thumbnail_url)
@@ -4,6 +4,7 @@
 """
 
 from collections.abc import Collection
+from typing import Any, Literal
 
 from pydantic import BaseModel, ConfigDict
 
@@ -115,3 +116,44 @@ class PropertyExportParams(BaseModel):
     # 排序参数（导出通常不需要分页）
     sort_by: str = "updated_at"
     sort_order: str = "desc"
+
+
+class PropertyScrollParams(BaseModel):
+    """房源游标分页参数对象."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    # 基础筛选条件
+    status: str | None = None
+    keyword: str | None = None
+    community_name: str | None = None
+    community_ids: list[str] | None = None
+
+    # 地理位置筛选
+    districts: list[str] | None = None
+    business_circles: list[str] | None = None
+
+    # 房屋属性筛选
+    orientations: list[str] | None = None
+    floor_levels: list[str] | None = None
+    rooms: list[int] | None = None
+    rooms_gte: int | None = None
+
+    # 价格范围筛选
+    min_price: float | None = None
+    max_price: float | None = None
+    min_area: float | None = None
+    max_area: float | None = None
+
+    # 排序参数
+    sort_by: str = "updated_at"
+    sort_order: str = "desc"
+
+    # 游标分页参数
+    cursor: str | None = None
+    page_size: int = settings.default_page_size
+    total_mode: Literal["none", "estimated", "cached"] = "none"
+
+    def filter_kwargs(self) -> dict[str, Any]:
+        """筛选条件（传给 apply_filters，不含排序/分页参数）."""
+        return self.model_dump(exclude={"sort_by", "sort_order", "cursor", "page_size", "total_mode"})
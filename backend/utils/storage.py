@@ -7,10 +7,20 @@
 - StorageBackend 为 Protocol，LocalStorage/OSSStorage 为具体实现
 - get_storage_backend() 工厂函数返回单例，避免重复初始化 OSS 客户端
 - OSSStorage 延迟导入 oss2，local 模式下无需安装 oss2
+- ``submit_upload`` 在本次调用独占的短生命周期线程中上传，调用方可同时生成并上传缩略图；
+  不使用进程级共享线程池，各请求的上传互不排队。后台上传线程总数受
+  ``settings.storage_max_background_uploads`` 限制，额度用尽时在调用线程内同步上传
+- 大文件（视频）超过 ``settings.oss_multipart_threshold`` 时走 OSS 分片上传，分片并发
+- local 模式可通过 ``settings.storage_local_latency_ms`` 模拟每次上传的网络延迟，
+  便于在本地测试/压测并发上传
 """
 
 import logging
 import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Protocol, runtime_checkable
 
@@ -48,6 +58,18 @@ class StorageBackend(Protocol):
         """
         ...
 
+    def read_file(self, key: str) -> bytes | None:
+        """读取文件内容.
+
+        Args:
+            key: 存储键
+
+        Returns:
+            文件内容，文件不存在时为 None
+
+        """
+        ...
+
     def file_exists(self, key: str) -> bool:
         """检查文件是否存在.
 
@@ -70,6 +92,9 @@ class LocalStorage:
         当 local_path 已位于 upload_dir/{key} 时（save_upload_file 直接写入
         upload_dir 的场景）跳过复制：shutil.copy2 对同文件会抛 SameFileError。
         """
+        if settings.storage_local_latency_ms > 0:
+            # 模拟远端存储的单次上传延迟（仅测试/压测使用）
+            time.sleep(settings.storage_local_latency_ms / 1000)
         target_path = Path(settings.upload_dir) / key
         if local_path.resolve() == target_path.resolve():
             return f"/static/uploads/{key}"
@@ -77,6 +102,11 @@ class LocalStorage:
         shutil.copy2(local_path, target_path)
         return f"/static/uploads/{key}"
 
+    def read_file(self, key: str) -> bytes | None:
+        """读取 upload_dir 中的文件，不存在时返回 None."""
+        target = Path(settings.upload_dir) / key
+        return target.read_bytes() if target.is_file() else None
+
     def file_exists(self, key: str) -> bool:
         """检查文件是否存在于 upload_dir."""
         return (Path(settings.upload_dir) / key).exists()
@@ -97,17 +127,45 @@ class OSSStorage:
 
         auth = oss2.Auth(settings.oss_access_key_id, settings.oss_access_key_secret)
         self._bucket = oss2.Bucket(auth, settings.oss_endpoint, settings.oss_bucket_name)
+        # 分片上传断点记录目录（进程重启后同一文件可续传）
+        self._resumable_store = oss2.ResumableStore(root=tempfile.gettempdir())
 
     def upload_file(self, local_path: Path, key: str) -> str:
         """上传文件到 OSS，返回公网/CDN URL.
 
+        超过 ``settings.oss_multipart_threshold`` 的文件（视频等）走分片上传：
+        分片大小 ``settings.oss_multipart_part_size``，``settings.oss_multipart_threads``
+        个线程并发上传分片，失败重试时从已完成的分片续传。
+
         注意：阿里云对 2022 年后新建的 public-read Bucket 强制返回
         Content-Disposition: attachment，导致浏览器下载而非内联显示。
         后续绑定 CDN/自定义域名后可解决此问题。
         """
-        self._bucket.put_object_from_file(key, str(local_path))
+        if local_path.stat().st_size >= settings.oss_multipart_threshold:
+            import oss2
+
+            oss2.resumable_upload(
+                self._bucket,
+                key,
+                str(local_path),
+                store=self._resumable_store,
+                multipart_threshold=settings.oss_multipart_threshold,
+                part_size=settings.oss_multipart_part_size,
+                num_threads=settings.oss_multipart_threads,
+            )
+        else:
+            self._bucket.put_object_from_file(key, str(local_path))
         return f"{settings.oss_public_base_url}/{key}"
 
+    def read_file(self, key: str) -> bytes | None:
+        """读取 OSS 对象内容，不存在时返回 None."""
+        import oss2
+
+        try:
+            return self._bucket.get_object(key).read()
+        except oss2.exceptions.NoSuchKey:
+            return None
+
     def file_exists(self, key: str) -> bool:
         """检查 OSS 对象是否存在."""
         return self._bucket.object_exists(key)
@@ -134,3 +192,41 @@ def get_storage_backend() -> StorageBackend:
     _storage_backend = OSSStorage() if settings.storage_backend == "oss" else LocalStorage()
     logger.info("存储后端初始化: %s", settings.storage_backend)
     return _storage_backend
+
+
+# 后台上传线程额度（进程级），防止突发上传无限制地创建线程
+_upload_slots = threading.BoundedSemaphore(max(1, settings.storage_max_background_uploads))
+
+
+def submit_upload(local_path: Path, key: str) -> Future[str]:
+    """在本次调用独占的线程中开始上传，立即返回 Future（结果为访问 URL）.
+
+    调用方可在上传进行的同时做其他工作（如生成并上传缩略图），再 ``result()`` 取 URL。
+    线程池仅服务本次上传，提交后即关闭（上传完成后线程退出）。
+    后台上传线程额度用尽时不排队等待，直接在调用线程内上传，返回已完成的 Future。
+    """
+    backend = get_storage_backend()
+    if not _upload_slots.acquire(blocking=False):
+        future: Future[str] = Future()
+        try:
+            future.set_result(backend.upload_file(local_path, key))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="StorageUpload")
+    try:
+        return executor.submit(_upload_in_slot, backend, local_path, key)
+    except BaseException:
+        _upload_slots.release()
+        raise
+    finally:
+        executor.shutdown(wait=False)
+
+
+def _upload_in_slot(backend: StorageBackend, local_path: Path, key: str) -> str:
+    """在后台线程中上传，结束后释放上传线程额度."""
+    try:
+        return backend.upload_file(local_path, key)
+    finally:
+        _upload_slots.release()
@@ -0,0 +1,51 @@
+"""Excel 导出工具.
+
+基于 openpyxl 只写模式（write-only）生成 .xlsx：行数据逐行写入临时 XML，
+不在内存中保留单元格对象，供同步导出接口与后台导出任务共用.
+"""
+
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import IO
+
+# 默认列宽（字符）
+_DEFAULT_COLUMN_WIDTH = 18
+
+
+def write_xlsx(
+    target: Path | IO[bytes],
+    sheet_title: str,
+    headers: Sequence[str],
+    rows: Iterable[Sequence[object]],
+    column_width: float = _DEFAULT_COLUMN_WIDTH,
+) -> int:
+    """将表头与数据行写入单工作表 .xlsx.
+
+    Args:
+        target: 输出文件路径或二进制缓冲
+        sheet_title: 工作表名称
+        headers: 表头列表
+        rows: 数据行迭代器（单元格需已做公式注入转义）
+        column_width: 各列宽度
+
+    Returns:
+        写入的数据行数（不含表头）
+
+    """
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
+    # 只写模式下列宽须在写入任何行之前设置
+    for col_idx in range(1, len(headers) + 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = column_width
+
+    ws.append(list(headers))
+    count = 0
+    for row in rows:
+        ws.append(list(row))
+        count += 1
+
+    wb.save(target)
+    return count